@@ -0,0 +1,115 @@
+"""
+Trigger-to-Wire Latency Benchmark
+
+This example measures how long it takes from a trading decision to the
+order bytes being ready to send:
+1. Cold path: ClobClient.create_order (tick size / neg-risk / fee lookups + sign)
+2. Stock signing: py-clob-client's builder with known options (re-parses the key)
+3. Hot path: PolymarketClient.fire signing from a prepared OrderTemplate
+4. Optionally, a real post over the warm connection (--post, places orders!)
+
+Run offline (no config, throwaway key, synthetic template):
+    python examples/fire_latency.py --iterations 200
+
+Run against a live token with your configured wallet:
+    python examples/fire_latency.py --url <event-url> --outcome 0
+"""
+
+import argparse
+import statistics
+import time
+from eth_account import Account
+from py_clob_client.clob_types import OrderArgs, CreateOrderOptions
+from py_clob_client.order_builder.constants import BUY
+from poly402 import Poly402Client
+from poly402.models import OrderTemplate
+from poly402.polymarket_client import PolymarketClient
+
+
+def report(label, samples):
+    samples = sorted(s * 1000 for s in samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"  {label:<28} median {statistics.median(samples):8.3f} ms   p99 {p99:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure trigger-to-wire latency")
+    parser.add_argument("--url", help="Polymarket event URL (omit for offline mode)")
+    parser.add_argument("--outcome", type=int, default=0)
+    parser.add_argument("--price", type=float, default=0.01)
+    parser.add_argument("--size", type=float, default=5.0)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--post", action="store_true", help="Actually post orders (live mode only)")
+    args = parser.parse_args()
+    
+    if args.url:
+        client = Poly402Client()
+        polymarket = client.polymarket
+        print("Preparing template...")
+        started = time.perf_counter()
+        template = client.prepare(args.url, [args.outcome])[0]
+        print(f"  prepare() took {(time.perf_counter() - started) * 1000:.1f} ms (one-off)")
+    else:
+        polymarket = PolymarketClient(
+            host="https://clob.polymarket.com",
+            chain_id=137,
+            private_key=Account.create().key.hex()
+        )
+        template = OrderTemplate(token_id="1" * 77, tick_size="0.01", neg_risk=False)
+        polymarket.templates[template.token_id] = template
+    
+    def order_args():
+        return OrderArgs(
+            price=args.price, size=args.size, side=BUY, token_id=template.token_id,
+            fee_rate_bps=template.fee_rate_bps
+        )
+    
+    options = CreateOrderOptions(tick_size=template.tick_size, neg_risk=template.neg_risk)
+    
+    print(f"\nLatency over {args.iterations} iterations:")
+    
+    if args.url:
+        cold = []
+        for _ in range(args.iterations):
+            started = time.perf_counter()
+            polymarket.client.create_order(order_args())
+            cold.append(time.perf_counter() - started)
+        report("cold create_order", cold)
+    
+    stock = []
+    for _ in range(args.iterations):
+        started = time.perf_counter()
+        polymarket.client.builder.create_order(order_args(), options)
+        stock.append(time.perf_counter() - started)
+    report("stock sign (known options)", stock)
+    
+    hot = []
+    for _ in range(args.iterations):
+        started = time.perf_counter()
+        polymarket._sign_from_template(template, args.price, args.size, BUY)
+        hot.append(time.perf_counter() - started)
+    report("hot sign (template)", hot)
+    
+    if args.url:
+        ping = []
+        for _ in range(min(args.iterations, 20)):
+            started = time.perf_counter()
+            polymarket.warm()
+            ping.append(time.perf_counter() - started)
+        report("warm round trip", ping)
+    
+    if args.url and args.post:
+        fired = []
+        for _ in range(min(args.iterations, 5)):
+            result = polymarket.fire(template.token_id, args.price, args.size)
+            if result.error:
+                print(f"  fire() failed: {result.error}")
+                break
+            polymarket.cancel_order(result.order_id)
+            fired.append(sum(result.timings.values()))
+        if fired:
+            report("fire() sign + post", fired)
+
+
+if __name__ == "__main__":
+    main()
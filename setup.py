@@ -37,9 +37,14 @@ setup(
         "tabulate>=0.9.0",
         "cryptography>=41.0.0",
         "aiohttp>=3.9.0",
+        "numpy>=1.24.0",
         "pyyaml>=6.0.1",
         "jsonschema>=4.20.0",
     ],
+    extras_require={
+        # Native secp256k1 signing; eth-keys picks it up automatically
+        "fast": ["coincurve>=18.0.0"],
+    },
     entry_points={
         "console_scripts": [
             "poly402=poly402.cli:main",
@@ -6,7 +6,13 @@ Bridges Coinbase's x402 payment protocol with Polymarket's prediction market API
 
 __version__ = "1.0.0"
 
+from . import profiling
 from .client import Poly402Client
 from .models import Market, Outcome, TradeResult
 
+# Import time is measured from when profiling (imported first) was loaded;
+# POLY402_PROFILE starts the profiler only after the package is imported
+profiling.imported()
+profiling.from_env()
+
 __all__ = ["Poly402Client", "Market", "Outcome", "TradeResult"]
@@ -0,0 +1,178 @@
+"""
+Pool of Polymarket accounts that orders are routed across
+"""
+
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional
+from eth_account import Account
+from .models import AccountProfile
+from .polymarket_client import PolymarketClient
+
+
+class TradingAccount:
+    """A Polymarket account with its own warm CLOB client"""
+    
+    def __init__(self, name: str, polymarket: PolymarketClient, address: str):
+        """
+        Initialize trading account
+        
+        Args:
+            name: Account name used for routing and reporting
+            polymarket: CLOB client signing with this account's key
+            address: Address holding the account's USDC
+        """
+        self.name = name
+        self.polymarket = polymarket
+        self.address = address
+        self.balance: Optional[float] = None  # Last known USDC balance
+        self.reserved = 0.0  # USDC committed to orders in flight
+    
+    @property
+    def available(self) -> float:
+        """Last known balance less USDC reserved by in-flight orders"""
+        return (self.balance or 0.0) - self.reserved
+    
+    def __repr__(self) -> str:
+        return f"TradingAccount({self.name!r}, {self.address})"
+
+
+class AccountPool:
+    """
+    Routes orders across Polymarket accounts
+    
+    Each account keeps its own PolymarketClient (credentials, order builders
+    and pooled connection), so spreading orders over accounts also spreads
+    per-key API rate limits. USDC is reserved on selection, which keeps
+    parallel orders from all being routed to the same balance.
+    """
+    
+    STRATEGIES = ("round_robin", "balance")
+    
+    def __init__(
+        self,
+        default: TradingAccount,
+        accounts: List[TradingAccount],
+        balance_of: Callable[[str], float],
+        strategy: str = "round_robin",
+        max_workers: int = 16
+    ):
+        """
+        Initialize account pool
+        
+        Args:
+            default: The primary account from the networks configuration
+            accounts: Sub-accounts orders are routed across (empty routes
+                everything to the default account)
+            balance_of: Returns the USDC balance of an address
+            strategy: "round_robin" or "balance" (most available USDC first)
+            max_workers: Maximum number of accounts contacted concurrently
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown account routing strategy: {strategy}")
+        
+        self.default = default
+        self.routable = accounts or [default]
+        self._accounts: Dict[str, TradingAccount] = {default.name: default}
+        self._accounts.update((account.name, account) for account in accounts)
+        self.balance_of = balance_of
+        self.strategy = strategy
+        self.max_workers = max_workers
+        self._cycle = itertools.cycle(self.routable)
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_profiles(
+        cls,
+        default: TradingAccount,
+        profiles: List[AccountProfile],
+        host: str,
+        chain_id: int,
+        data_endpoint: str,
+        balance_of: Callable[[str], float],
+        strategy: str = "round_robin"
+    ) -> "AccountPool":
+        """Build a pool with one PolymarketClient per configured sub-account"""
+        accounts = []
+        for profile in profiles:
+            polymarket = PolymarketClient(
+                host=host,
+                chain_id=chain_id,
+                private_key=profile.polygon_private_key,
+                signature_type=profile.signature_type,
+                proxy_address=profile.proxy_address,
+                data_endpoint=data_endpoint
+            )
+            if profile.api_key and profile.api_secret and profile.api_passphrase:
+                polymarket.set_credentials(profile.api_key, profile.api_secret, profile.api_passphrase)
+            address = profile.proxy_address or Account.from_key(profile.polygon_private_key).address
+            accounts.append(TradingAccount(profile.name, polymarket, address))
+        return cls(default, accounts, balance_of, strategy)
+    
+    def get(self, name: str) -> TradingAccount:
+        """Look up an account by name"""
+        try:
+            return self._accounts[name]
+        except KeyError:
+            raise ValueError(f"Unknown account: {name}")
+    
+    def __iter__(self) -> Iterator[TradingAccount]:
+        return iter(self._accounts.values())
+    
+    def __len__(self) -> int:
+        return len(self._accounts)
+    
+    def _each(self, fn: Callable[[TradingAccount], object]) -> list:
+        accounts = list(self._accounts.values())
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(accounts))) as pool:
+            return list(pool.map(fn, accounts))
+    
+    def refresh_balances(self) -> Dict[str, float]:
+        """Fetch every account's USDC balance concurrently"""
+        def refresh(account: TradingAccount) -> float:
+            account.balance = self.balance_of(account.address)
+            return account.balance
+        
+        return dict(zip(self._accounts, self._each(refresh)))
+    
+    def warm(self):
+        """Derive missing API credentials, open connections and load balances for every account"""
+        def warm(account: TradingAccount):
+            account.polymarket._ensure_credentials()
+            account.polymarket.warm()
+            account.balance = self.balance_of(account.address)
+        
+        self._each(warm)
+    
+    def select(self, amount_usdc: float = 0.0, name: Optional[str] = None) -> TradingAccount:
+        """
+        Choose the account for an order and reserve its USDC
+        
+        Args:
+            amount_usdc: USDC the order commits
+            name: Use this account instead of routing
+        
+        Returns:
+            The selected account; pass it to release() once the order is done
+        """
+        with self._lock:
+            if name is not None:
+                account = self.get(name)
+            elif self.strategy == "balance":
+                account = max(self.routable, key=lambda a: a.available)
+            else:
+                # Skip accounts known to be short, unless every account is
+                for _ in range(len(self.routable)):
+                    account = next(self._cycle)
+                    if account.balance is None or account.available >= amount_usdc:
+                        break
+            account.reserved += amount_usdc
+            return account
+    
+    def release(self, account: TradingAccount, amount_usdc: float, spent: bool = False):
+        """Release a reservation, deducting it from the known balance if it was spent"""
+        with self._lock:
+            account.reserved -= amount_usdc
+            if spent and account.balance is not None:
+                account.balance -= amount_usdc
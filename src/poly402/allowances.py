@@ -0,0 +1,268 @@
+"""
+Cached USDC allowances and conditional-token approvals for the exchange contracts
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from eth_abi import decode, encode
+from eth_account import Account
+from py_clob_client.config import get_contract_config  # type: ignore[import-untyped]
+from web3 import Web3
+from web3.types import Nonce, TxParams
+from .models import WalletAllowances
+
+# Multicall3, deployed at the same address on Polygon and its testnets
+MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# The neg-risk adapter converts No positions and also needs approvals
+NEG_RISK_ADAPTERS = {137: "0xd91E80cF2E7be2e162c6513ceD06f1dD0dA35296"}
+
+MAX_UINT256 = 2 ** 256 - 1
+
+# Allowances at or above this are treated as unlimited
+UNLIMITED = 2 ** 255
+
+
+def _selector(signature: str) -> bytes:
+    return bytes(Web3.keccak(text=signature)[:4])
+
+
+BALANCE_OF = _selector("balanceOf(address)")
+ALLOWANCE = _selector("allowance(address,address)")
+IS_APPROVED_FOR_ALL = _selector("isApprovedForAll(address,address)")
+APPROVE = _selector("approve(address,uint256)")
+SET_APPROVAL_FOR_ALL = _selector("setApprovalForAll(address,bool)")
+AGGREGATE3 = _selector("aggregate3((address,bool,bytes)[])")
+
+
+class AllowanceCache:
+    """
+    Exchange approvals per wallet, read once and tracked locally
+    
+    A buy needs a USDC allowance for the exchange that settles it and a sell
+    needs the exchange approved as operator of the wallet's outcome tokens;
+    neg-risk markets settle through their own exchange and adapter. Without
+    them the CLOB rejects an order only after it has been signed and posted.
+    
+    Balance lookups go through one Multicall3 eth_call, and the first lookup
+    for a wallet reads its allowances in that same call. Buys then deduct
+    from the cached allowance, so checking an order costs no RPC; the wallet
+    is only re-read when the cached figures come up short.
+    """
+    
+    def __init__(self, w3: Web3, chain_id: int = 137):
+        """
+        Initialize allowance cache
+        
+        Args:
+            w3: Web3 connected to Polygon
+            chain_id: Polygon chain ID (selects the exchange contracts)
+        """
+        self.w3 = w3
+        self.chain_id = chain_id
+        contracts = get_contract_config(chain_id)
+        neg_risk_contracts = get_contract_config(chain_id, neg_risk=True)
+        self.collateral = Web3.to_checksum_address(contracts.collateral)
+        self.conditional_tokens = Web3.to_checksum_address(contracts.conditional_tokens)
+        
+        # Spenders an order needs, by whether its market is neg-risk; the
+        # first one settles the order
+        self._spenders: Dict[bool, List[str]] = {
+            False: [Web3.to_checksum_address(contracts.exchange)],
+            True: [Web3.to_checksum_address(neg_risk_contracts.exchange)]
+        }
+        if chain_id in NEG_RISK_ADAPTERS:
+            self._spenders[True].append(NEG_RISK_ADAPTERS[chain_id])
+        self.spenders = list(dict.fromkeys(self._spenders[False] + self._spenders[True]))
+        
+        self._wallets: Dict[str, WalletAllowances] = {}
+        self._lock = threading.Lock()
+    
+    def _read(self, address: str, allowances: bool) -> float:
+        """Read a wallet's USDC balance, and optionally its approvals, in one eth_call"""
+        address = Web3.to_checksum_address(address)
+        calls = [(self.collateral, BALANCE_OF + encode(['address'], [address]))]
+        if allowances:
+            calls += [
+                (self.collateral, ALLOWANCE + encode(['address', 'address'], [address, spender]))
+                for spender in self.spenders
+            ]
+            calls += [
+                (self.conditional_tokens, IS_APPROVED_FOR_ALL + encode(['address', 'address'], [address, spender]))
+                for spender in self.spenders
+            ]
+        
+        data = AGGREGATE3 + encode(['(address,bool,bytes)[]'], [[(target, False, call) for target, call in calls]])
+        try:
+            raw = self.w3.eth.call({'to': MULTICALL3, 'data': data})
+            values = [decode(['uint256'], result)[0] for _, result in decode(['(bool,bytes)[]'], bytes(raw))[0]]
+        except Exception as e:
+            raise RuntimeError(f"Could not fetch USDC balance for polygon: {e}")
+        
+        if allowances:
+            n = len(self.spenders)
+            wallet = WalletAllowances(
+                address=address,
+                usdc={spender: value / 1e6 for spender, value in zip(self.spenders, values[1:n + 1])},
+                conditional={spender: bool(value) for spender, value in zip(self.spenders, values[n + 1:])},
+                loaded_at=time.time()
+            )
+            with self._lock:
+                self._wallets[address.lower()] = wallet
+        # USDC has 6 decimals
+        return values[0] / 1e6
+    
+    def balance(self, address: str) -> float:
+        """
+        USDC balance of a wallet
+        
+        The first lookup for a wallet also loads its approvals, in the same
+        eth_call.
+        
+        Raises:
+            RuntimeError: If no RPC endpoint could provide the balance
+        """
+        with self._lock:
+            loaded = address.lower() in self._wallets
+        return self._read(address, allowances=not loaded)
+    
+    def load(self, address: str) -> WalletAllowances:
+        """Re-read a wallet's approvals from chain, discarding local deductions"""
+        self._read(address, allowances=True)
+        wallet = self.get(address)
+        if wallet is None:
+            raise RuntimeError(f"Could not read the approvals of {address}")
+        return wallet
+    
+    def get(self, address: str) -> Optional[WalletAllowances]:
+        """Cached approvals of a wallet (None if never loaded)"""
+        with self._lock:
+            return self._wallets.get(address.lower())
+    
+    def shortfall(self, address: str, side: str, amount_usdc: float, neg_risk: bool) -> List[str]:
+        """
+        Approvals an order lacks according to the cache
+        
+        Args:
+            address: Wallet placing the order
+            side: "BUY" or "SELL"
+            amount_usdc: USDC the order commits (BUY)
+            neg_risk: Whether the market is neg-risk
+        
+        Returns:
+            Descriptions of what is missing (empty if the order is covered)
+        """
+        with self._lock:
+            return self._shortfall(self._wallets.get(address.lower()), side, amount_usdc, neg_risk)
+    
+    def _shortfall(self, wallet: Optional[WalletAllowances], side: str, amount_usdc: float, neg_risk: bool) -> List[str]:
+        if wallet is None:
+            return ["allowances not loaded"]
+        spenders = self._spenders[neg_risk]
+        if side == "BUY":
+            exchange = spenders[0]
+            if wallet.usdc.get(exchange, 0.0) < amount_usdc:
+                return [f"USDC allowance for {exchange} ({wallet.usdc.get(exchange, 0.0):.2f} < {amount_usdc:.2f})"]
+            return []
+        return [f"outcome token approval for {spender}" for spender in spenders if not wallet.conditional.get(spender)]
+    
+    def reserve(self, address: str, side: str, amount_usdc: float, neg_risk: bool) -> bool:
+        """
+        Check an order against the cache, deducting a buy from the allowance
+        
+        Returns:
+            True if the order is covered; False if the cache has no record of
+            the wallet or comes up short
+        """
+        with self._lock:
+            wallet = self._wallets.get(address.lower())
+            if wallet is None or self._shortfall(wallet, side, amount_usdc, neg_risk):
+                return False
+            if side == "BUY":
+                wallet.usdc[self._spenders[neg_risk][0]] -= amount_usdc
+            return True
+    
+    def release(self, address: str, amount_usdc: float, neg_risk: bool):
+        """Return a buy's deduction to the allowance once its order has failed"""
+        with self._lock:
+            wallet = self._wallets.get(address.lower())
+            if wallet is not None:
+                wallet.usdc[self._spenders[neg_risk][0]] += amount_usdc
+    
+    def missing(self, address: str) -> List[Tuple[str, str]]:
+        """
+        Approvals a wallet does not grant in full, as of the last read
+        
+        Returns:
+            List of ("usdc" | "conditional", spender) tuples
+        """
+        wallet = self.get(address) or self.load(address)
+        missing = [("usdc", spender) for spender in self.spenders if wallet.usdc[spender] * 1e6 < UNLIMITED]
+        missing += [("conditional", spender) for spender in self.spenders if not wallet.conditional[spender]]
+        return missing
+    
+    def approve(self, address: str, private_key: str, timeout: float = 120.0) -> List[str]:
+        """
+        Grant every missing approval from an externally owned wallet
+        
+        USDC allowances are set to unlimited and every exchange contract is
+        approved as outcome token operator, as Polymarket's own setup does.
+        Transactions are sent back to back and then awaited together.
+        
+        Args:
+            address: Wallet to approve from
+            private_key: Key controlling the wallet
+            timeout: Seconds to wait for each receipt
+        
+        Returns:
+            Transaction hashes (empty if nothing was missing)
+        
+        Raises:
+            ValueError: If the key does not control the wallet
+            RuntimeError: If a transaction could not be sent or reverted
+        """
+        owner = Account.from_key(private_key)
+        if owner.address.lower() != address.lower():
+            raise ValueError(
+                f"Wallet {address} is not controlled by its signing key; "
+                "approve proxy wallets through Polymarket"
+            )
+        
+        self.load(address)
+        txs = [
+            (self.collateral, APPROVE + encode(['address', 'uint256'], [spender, MAX_UINT256]))
+            if kind == "usdc" else
+            (self.conditional_tokens, SET_APPROVAL_FOR_ALL + encode(['address', 'bool'], [spender, True]))
+            for kind, spender in self.missing(address)
+        ]
+        if not txs:
+            return []
+        
+        try:
+            nonce = self.w3.eth.get_transaction_count(owner.address, 'pending')
+            gas_price = self.w3.eth.gas_price
+            tx_hashes = []
+            for target, data in txs:
+                tx: TxParams = {
+                    'from': owner.address,
+                    'to': target,
+                    'data': data,
+                    'nonce': nonce,
+                    'chainId': self.chain_id,
+                    'gasPrice': gas_price
+                }
+                tx['gas'] = self.w3.eth.estimate_gas(tx)
+                signed = owner.sign_transaction(tx)
+                raw = getattr(signed, 'raw_transaction', None) or signed.rawTransaction
+                tx_hashes.append(self.w3.eth.send_raw_transaction(raw))
+                nonce = Nonce(nonce + 1)
+            receipts = [self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout) for tx_hash in tx_hashes]
+        except Exception as e:
+            raise RuntimeError(f"Failed to send approvals: {e}")
+        
+        reverted = [Web3.to_hex(tx_hash) for tx_hash, receipt in zip(tx_hashes, receipts) if receipt['status'] != 1]
+        if reverted:
+            raise RuntimeError(f"Approval transactions reverted: {', '.join(reverted)}")
+        self.load(address)
+        return [Web3.to_hex(tx_hash) for tx_hash in tx_hashes]
@@ -0,0 +1,261 @@
+"""
+Basket arbitrage across the outcomes of neg-risk events
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from py_clob_client.clob_types import OrderType  # type: ignore[import-untyped]
+from .models import ArbitrageLeg, ArbitrageOpportunity, Market, TradeResult
+
+Levels = List[Tuple[float, float]]
+
+
+class ArbitrageScanner:
+    """
+    Finds mispriced baskets in neg-risk events
+    
+    Exactly one outcome of a neg-risk event resolves Yes, so one Yes share
+    of every outcome pays 1 USDC and one No share of every outcome pays
+    n - 1. When the best asks sum below 1, buying the Yes basket locks in
+    the difference; when the best bids sum above 1, buying the No basket
+    (each No at one minus the Yes bid) does. Top-of-book sums for the whole
+    catalog are computed in one vectorized pass, and only events that clear
+    the edge threshold have their depth walked to size the basket.
+    """
+    
+    def __init__(
+        self,
+        polymarket,
+        min_edge: float = 0.005,
+        fee_rate_bps: float = 0.0,
+        max_cost: Optional[float] = None,
+        min_size: float = 5.0,
+        max_workers: int = 8
+    ):
+        """
+        Initialize arbitrage scanner
+        
+        Args:
+            polymarket: PolymarketClient used for books and orders
+            min_edge: Minimum profit per basket, in USDC per share
+            fee_rate_bps: Taker fee rate for tokens without a prepared
+                template (prepared templates carry their own)
+            max_cost: Maximum USDC to spend on one basket (optional)
+            min_size: Smallest basket in shares
+            max_workers: Maximum number of concurrent requests
+        """
+        self.polymarket = polymarket
+        self.min_edge = min_edge
+        self.fee_rate_bps = fee_rate_bps
+        self.max_cost = max_cost
+        self.min_size = min_size
+        self.max_workers = max_workers
+    
+    @staticmethod
+    def eligible(market: Market) -> bool:
+        """Whether a market is a tradable neg-risk event with several outcomes"""
+        return (
+            market.neg_risk and market.active and len(market.outcomes) >= 2
+            and all(outcome.token_id for outcome in market.outcomes)
+        )
+    
+    def _fee_rate(self, token_id: str) -> float:
+        template = self.polymarket.templates.get(token_id)
+        return (template.fee_rate_bps if template is not None else self.fee_rate_bps) / 1e4
+    
+    def evaluate(self, market: Market, books: Dict[str, Tuple[Levels, Levels]]) -> List[ArbitrageOpportunity]:
+        """
+        Size the Yes and No baskets of an event against its books
+        
+        Args:
+            market: Neg-risk event
+            books: (bids, asks) per Yes token id, best first
+        
+        Returns:
+            Profitable opportunities (at most one per side)
+        """
+        if not self.eligible(market) or any(o.token_id not in books for o in market.outcomes):
+            return []
+        
+        opportunities = []
+        n = len(market.outcomes)
+        yes_legs = [(o.token_id, o.name, books[o.token_id][1]) for o in market.outcomes]
+        opportunity = self._basket(market, "YES", yes_legs, payout=1.0)
+        if opportunity:
+            opportunities.append(opportunity)
+        
+        # A No bought at 1 - p matches a Yes bid at p
+        if all(o.no_token_id for o in market.outcomes):
+            no_legs = [
+                (o.no_token_id, f"Not {o.name}", [(round(1 - price, 6), size) for price, size in books[o.token_id][0]])
+                for o in market.outcomes
+            ]
+            opportunity = self._basket(market, "NO", no_legs, payout=float(n - 1))
+            if opportunity:
+                opportunities.append(opportunity)
+        return opportunities
+    
+    def _basket(
+        self,
+        market: Market,
+        side: str,
+        legs: List[Tuple[str, str, Levels]],
+        payout: float
+    ) -> Optional[ArbitrageOpportunity]:
+        """Largest profitable basket buying every leg up its ask levels"""
+        if any(not levels for _, _, levels in legs):
+            return None
+        
+        prices = [np.array([price for price, _ in levels]) for _, _, levels in legs]
+        depths = [np.cumsum([size for _, size in levels]) for _, _, levels in legs]
+        rates = np.array([self._fee_rate(token_id) for token_id, _, _ in legs])
+        
+        # Walk the merged depth: between consecutive level boundaries of any
+        # leg, every leg trades at a fixed price
+        depth = min(d[-1] for d in depths)
+        ends = np.unique(np.concatenate(depths))
+        ends = ends[ends <= depth + 1e-9]
+        starts = np.concatenate(([0.0], ends[:-1]))
+        level = np.array([
+            np.minimum(np.searchsorted(d, starts, side='right'), len(d) - 1) for d in depths
+        ])
+        leg_prices = np.array([p[i] for p, i in zip(prices, level)])
+        fees = (rates[:, None] * np.minimum(leg_prices, 1 - leg_prices)).sum(axis=0)
+        marginal = leg_prices.sum(axis=0)
+        
+        # Marginal cost only rises with depth, so the profitable part is a prefix
+        take = int(np.count_nonzero(payout - marginal - fees >= self.min_edge))
+        if not take:
+            return None
+        widths = ends[:take] - starts[:take]
+        if self.max_cost is not None:
+            spent = np.cumsum(widths * marginal[:take])
+            over = np.searchsorted(spent, self.max_cost, side='right')
+            if over < take:
+                left = self.max_cost - (spent[over - 1] if over else 0.0)
+                widths = np.append(widths[:over], left / marginal[over])
+                take = int(over) + 1
+        
+        baskets = np.floor(widths.sum() * 100) / 100
+        if baskets < self.min_size:
+            return None
+        widths[-1] -= widths.sum() - baskets
+        return ArbitrageOpportunity(
+            market_slug=market.slug,
+            title=market.title,
+            side=side,
+            legs=[
+                ArbitrageLeg(token_id, name, float(leg_prices[k, take - 1]), float(baskets))
+                for k, (token_id, name, _) in enumerate(legs)
+            ],
+            baskets=float(baskets),
+            cost=float((widths * marginal[:take]).sum()),
+            fees=float((widths * fees[:take]).sum()),
+            payout=float(baskets * payout)
+        )
+    
+    def scan(self, markets: Iterable[Market]) -> List[ArbitrageOpportunity]:
+        """
+        Fetch live books for every eligible event and find opportunities
+        
+        Args:
+            markets: Events to evaluate (ineligible ones are skipped)
+        
+        Returns:
+            Opportunities, most profitable first
+        """
+        markets = [market for market in markets if self.eligible(market)]
+        if not markets:
+            return []
+        books = self.polymarket.get_books(
+            [o.token_id for market in markets for o in market.outcomes], self.max_workers
+        )
+        
+        # Top-of-book sums for every event at once
+        event = np.repeat(np.arange(len(markets)), [len(m.outcomes) for m in markets])
+        tops = [books.get(o.token_id, ([], [])) for market in markets for o in market.outcomes]
+        best_bid = np.array([bids[0][0] if bids else np.nan for bids, _ in tops])
+        best_ask = np.array([asks[0][0] if asks else np.nan for _, asks in tops])
+        ask_sum = np.bincount(event, best_ask, minlength=len(markets))
+        bid_sum = np.bincount(event, best_bid, minlength=len(markets))
+        candidates = np.flatnonzero(
+            (ask_sum <= 1 - self.min_edge) | (bid_sum >= 1 + self.min_edge)
+        )
+        
+        opportunities = []
+        for k in candidates:
+            opportunities.extend(self.evaluate(markets[k], books))
+        return sorted(opportunities, key=lambda opportunity: opportunity.profit, reverse=True)
+    
+    def execute(self, opportunity: ArbitrageOpportunity) -> List[TradeResult]:
+        """
+        Fire every leg of a basket at once as fill-or-kill orders
+        
+        Legs are prepared concurrently where needed, then posted together in
+        batches, so each leg either fills in full at its limit or not at all.
+        
+        Args:
+            opportunity: Basket to buy
+        
+        Returns:
+            TradeResult per leg, in leg order
+        """
+        missing = [leg for leg in opportunity.legs if leg.token_id not in self.polymarket.templates]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as pool:
+                list(pool.map(
+                    lambda leg: self.polymarket.prepare(leg.token_id, opportunity.market_slug, leg.outcome_name),
+                    missing
+                ))
+        
+        responses = self.polymarket.post_orders(
+            [(leg.token_id, leg.price, leg.size, "BUY") for leg in opportunity.legs],
+            max_workers=self.max_workers,
+            order_type=OrderType.FOK
+        )
+        results = []
+        for leg, resp in zip(opportunity.legs, responses):
+            result = self.polymarket.order_result(
+                resp, leg.outcome_name, "BUY", leg.price, leg.size, leg.price * leg.size
+            )
+            result.market_slug = opportunity.market_slug
+            results.append(result)
+        return results
+    
+    def run(
+        self,
+        catalog: Callable[[], List[Market]],
+        on_opportunity: Callable[[ArbitrageOpportunity], None],
+        interval: float = 5.0,
+        catalog_ttl: float = 300.0,
+        stop: Optional[threading.Event] = None
+    ):
+        """
+        Scan the catalog repeatedly until stopped
+        
+        Args:
+            catalog: Function returning the events to watch; called again
+                every catalog_ttl seconds
+            on_opportunity: Callback invoked with each opportunity found
+            interval: Seconds between scans
+            catalog_ttl: Seconds between catalog refreshes
+            stop: Event that ends the loop when set
+        """
+        stop = stop or threading.Event()
+        markets: List[Market] = []
+        loaded_at = None
+        while not stop.is_set():
+            started = time.monotonic()
+            try:
+                if loaded_at is None or started - loaded_at >= catalog_ttl:
+                    markets = [market for market in catalog() if self.eligible(market)]
+                    loaded_at = started
+                for opportunity in self.scan(markets):
+                    on_opportunity(opportunity)
+            except (RuntimeError, ValueError) as e:
+                print(f"Warning: Arbitrage scan failed: {e}", file=sys.stderr)
+            stop.wait(max(0.0, interval - (time.monotonic() - started)))
@@ -0,0 +1,539 @@
+"""
+Backtest replay of recorded snapshots through a simulated exchange
+"""
+
+import itertools
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from .market_parser import MarketParser
+from .models import (
+    Market, Outcome, TradeResult, PaymentInfo, OrderStatus, Position, Balance, BacktestReport
+)
+from .polymarket_client import PolymarketClient
+from .snapshots import SnapshotStore, BOOK_DEPTH
+
+# Tolerance for comparing float32 book prices against limits
+PRICE_EPSILON = 1e-6
+
+
+class _RestingOrder:
+    """Unfilled remainder of a limit order"""
+    
+    __slots__ = ('result', 'token', 'side', 'price', 'remaining')
+    
+    def __init__(self, result: TradeResult, token: int, side: str, price: float, remaining: float):
+        self.result = result
+        self.token = token
+        self.side = side
+        self.price = price
+        self.remaining = remaining
+
+
+class SimulatedExchange:
+    """
+    Matching against recorded order books
+    
+    Holds the latest book snapshot of every token as dense arrays indexed by
+    the store's token index, so a batch of snapshot rows is applied with a few
+    vectorized assignments. Marketable orders walk the recorded levels up to
+    their limit and deplete them until the next snapshot of that token; the
+    remainder rests at the limit price and fills once a later snapshot
+    crosses it. Tokens recorded without books fill in full at the recorded
+    price.
+    """
+    
+    def __init__(self, tokens: List[dict], cash: float, fee_rate_bps: float = 0.0):
+        """
+        Initialize simulated exchange
+        
+        Args:
+            tokens: The snapshot store's token table
+            cash: Starting USDC balance
+            fee_rate_bps: Taker fee in basis points of notional
+        """
+        self.tokens = tokens
+        self.token_index = {token['token_id']: i for i, token in enumerate(tokens)}
+        self.cash = cash
+        self.fee_rate = fee_rate_bps / 1e4
+        self.now = 0.0
+        
+        n = len(tokens)
+        self.price = np.full(n, np.nan)
+        self.bid_px = np.full((n, BOOK_DEPTH), np.nan)
+        self.bid_sz = np.zeros((n, BOOK_DEPTH))
+        self.ask_px = np.full((n, BOOK_DEPTH), np.nan)
+        self.ask_sz = np.zeros((n, BOOK_DEPTH))
+        
+        self.shares = np.zeros(n)
+        self.cost = np.zeros(n)  # USDC paid for currently held shares
+        self.reserved_cash = 0.0  # Committed to resting buys
+        self.reserved_shares = np.zeros(n)  # Committed to resting sells
+        self.resting: List[_RestingOrder] = []
+        self.fills: List[tuple] = []  # (ts, token_id, side, price, size)
+        self._order_ids = itertools.count(1)
+    
+    @property
+    def available_cash(self) -> float:
+        return self.cash - self.reserved_cash
+    
+    def best_bid(self, token: int) -> Optional[float]:
+        bid = self.bid_px[token, 0]
+        if np.isnan(bid):
+            bid = self.price[token]
+        return None if np.isnan(bid) else float(bid)
+    
+    def best_ask(self, token: int) -> Optional[float]:
+        ask = self.ask_px[token, 0]
+        if np.isnan(ask):
+            ask = self.price[token]
+        return None if np.isnan(ask) else float(ask)
+    
+    def apply(self, batch: Dict[str, np.ndarray]):
+        """
+        Apply a time-ordered batch of snapshot rows
+        
+        Resting orders are matched against the rows first (each order at the
+        first row that crosses it), then every token is set to its last
+        snapshot in the batch.
+        """
+        if self.resting:
+            self._match_resting(batch)
+        
+        tokens = batch['token']
+        # Last row of each token wins
+        _, reverse = np.unique(tokens[::-1], return_index=True)
+        last = len(tokens) - 1 - reverse
+        index = tokens[last]
+        self.price[index] = batch['price'][last]
+        self.bid_px[index] = batch['bid_px'][last]
+        self.bid_sz[index] = np.nan_to_num(batch['bid_sz'][last])
+        self.ask_px[index] = batch['ask_px'][last]
+        self.ask_sz[index] = np.nan_to_num(batch['ask_sz'][last])
+        self.now = float(batch['ts'][-1])
+    
+    def _match_resting(self, batch: Dict[str, np.ndarray]):
+        tokens = batch['token']
+        for order in list(self.resting):
+            rows = tokens == order.token
+            if not rows.any():
+                continue
+            if order.side == "BUY":
+                px, sz = batch['ask_px'][rows], batch['ask_sz'][rows]
+                crossing = px <= order.price + PRICE_EPSILON
+                no_book = np.isnan(px[:, 0]) & (batch['price'][rows] <= order.price + PRICE_EPSILON)
+            else:
+                px, sz = batch['bid_px'][rows], batch['bid_sz'][rows]
+                crossing = px >= order.price - PRICE_EPSILON
+                no_book = np.isnan(px[:, 0]) & (batch['price'][rows] >= order.price - PRICE_EPSILON)
+            
+            liquidity = np.where(crossing, np.nan_to_num(sz), 0.0).sum(axis=1)
+            liquidity[no_book] = np.inf
+            hit = np.flatnonzero(liquidity > 0)
+            if not len(hit):
+                continue
+            
+            # Resting orders are makers: they fill at their own limit price
+            size = min(order.remaining, float(liquidity[hit[0]]))
+            ts = float(batch['ts'][rows][hit[0]])
+            self._settle(order.token, order.side, order.price, size, fee=0.0, ts=ts)
+            if order.side == "BUY":
+                self.reserved_cash -= order.price * size
+            else:
+                self.reserved_shares[order.token] -= size
+            order.remaining -= size
+            order.result.shares_purchased += size
+            if order.remaining <= PRICE_EPSILON:
+                order.result.status = OrderStatus.COMPLETED
+                self.resting.remove(order)
+    
+    def _take(self, token: int, side: str, limit: float, size: float) -> tuple:
+        """Walk the book up to the limit; returns (filled shares, notional)"""
+        if side == "BUY":
+            px, sz = self.ask_px[token], self.ask_sz[token]
+            crossing = px <= limit + PRICE_EPSILON
+        else:
+            px, sz = self.bid_px[token], self.bid_sz[token]
+            crossing = px >= limit - PRICE_EPSILON
+        
+        if np.isnan(px[0]):
+            price = self.price[token]
+            if np.isnan(price):
+                return 0.0, 0.0
+            crosses = price <= limit + PRICE_EPSILON if side == "BUY" else price >= limit - PRICE_EPSILON
+            return (size, size * float(price)) if crosses else (0.0, 0.0)
+        
+        available = np.where(crossing, sz, 0.0)
+        before = np.concatenate(([0.0], np.cumsum(available)[:-1]))
+        taken = np.clip(size - before, 0.0, available)
+        sz -= taken  # Deplete until the token's next snapshot
+        return float(taken.sum()), float(np.dot(taken, np.nan_to_num(px)))
+    
+    def _settle(self, token: int, side: str, price: float, size: float, fee: float, ts: float):
+        notional = price * size
+        if side == "BUY":
+            self.cash -= notional + fee
+            self.shares[token] += size
+            self.cost[token] += notional
+        else:
+            if self.shares[token] > 0:
+                self.cost[token] *= max(0.0, 1 - size / self.shares[token])
+            self.cash += notional - fee
+            self.shares[token] -= size
+        self.fills.append((ts, self.tokens[token]['token_id'], side, price, size))
+    
+    def place(self, token_id: str, side: str, price: float, size: float) -> TradeResult:
+        """
+        Place a limit order at the current replay time
+        
+        Args:
+            token_id: Outcome token id
+            side: "BUY" or "SELL"
+            price: Limit price per share
+            size: Number of shares
+        
+        Returns:
+            TradeResult; COMPLETED when fully filled, TRADING while a
+            remainder rests, FAILED if rejected
+        """
+        token = self.token_index.get(token_id)
+        info = self.tokens[token] if token is not None else {}
+        result = TradeResult(
+            order_id=f"sim-{next(self._order_ids)}",
+            market_slug=info.get('market_slug', ""),
+            outcome_name=info.get('outcome_name', ""),
+            amount_usdc=price * size,
+            shares_purchased=0.0,
+            price_per_share=price,
+            status=OrderStatus.FAILED,
+            tx_hash=None,
+            payment_info=PaymentInfo(amount=0.0, network="simulated", token="USDC", tx_hash=None, status="simulated"),
+            timestamp=datetime.fromtimestamp(self.now),
+            side=side
+        )
+        
+        if token is None:
+            result.error = f"Unknown token id: {token_id}"
+            return result
+        if not 0 < price < 1 or size <= 0:
+            result.error = f"Invalid order: price {price}, size {size}"
+        elif side == "BUY" and price * size * (1 + self.fee_rate) > self.available_cash + PRICE_EPSILON:
+            result.error = (
+                f"Insufficient USDC balance. Required: {price * size}, Available: {self.available_cash}"
+            )
+        elif side == "SELL" and size > self.shares[token] - self.reserved_shares[token] + PRICE_EPSILON:
+            result.error = f"Insufficient shares. Required: {size}, Available: {self.shares[token] - self.reserved_shares[token]}"
+        if result.error:
+            return result
+        
+        filled, notional = self._take(token, side, price, size)
+        if filled > 0:
+            self._settle(token, side, notional / filled, filled, fee=notional * self.fee_rate, ts=self.now)
+            result.price_per_share = notional / filled
+        result.shares_purchased = filled
+        
+        remaining = size - filled
+        if remaining <= PRICE_EPSILON:
+            result.status = OrderStatus.COMPLETED
+        else:
+            result.status = OrderStatus.TRADING
+            self.resting.append(_RestingOrder(result, token, side, price, remaining))
+            if side == "BUY":
+                self.reserved_cash += price * remaining
+            else:
+                self.reserved_shares[token] += remaining
+        return result
+    
+    def cancel(self, order_id: str) -> bool:
+        """Cancel a resting order; returns False if it is not resting"""
+        for order in self.resting:
+            if order.result.order_id == order_id:
+                self.resting.remove(order)
+                if order.side == "BUY":
+                    self.reserved_cash -= order.price * order.remaining
+                else:
+                    self.reserved_shares[order.token] -= order.remaining
+                order.result.status = OrderStatus.CANCELLED
+                return True
+        return False
+    
+    def equity(self) -> float:
+        """Cash plus held shares marked at the best bid (or last price)"""
+        marks = np.where(np.isnan(self.bid_px[:, 0]), self.price, self.bid_px[:, 0])
+        return self.cash + float(np.dot(self.shares, np.nan_to_num(marks)))
+
+
+class BacktestClient:
+    """
+    Stand-in for Poly402Client backed by a simulated exchange
+    
+    Implements the trading calls strategies use (get_market, execute_trade,
+    fire, get_positions, close_positions, get_balance, get_trade_history,
+    cancel_order) with the same signatures and result types, so a strategy
+    written against Poly402Client runs unchanged in a backtest. x402 fees
+    and network latency are not simulated.
+    """
+    
+    def __init__(self, store: SnapshotStore, exchange: SimulatedExchange):
+        """
+        Initialize backtest client
+        
+        Args:
+            store: Snapshot store being replayed (for market metadata)
+            exchange: Simulated exchange holding replay state
+        """
+        self.store = store
+        self.exchange = exchange
+        self.market_parser = MarketParser("")
+        self._markets = store.markets()
+        self.history: List[TradeResult] = []
+    
+    def get_market(self, url: str) -> Market:
+        """Recorded market with outcome prices as of the replay clock"""
+        slug = self.market_parser.extract_slug(url)
+        try:
+            recorded = self._markets[slug]
+        except KeyError:
+            raise ValueError(f"Market '{slug}' was not recorded")
+        
+        outcomes = []
+        for outcome in recorded.outcomes:
+            price = float(self.exchange.price[self.exchange.token_index[outcome.token_id]])
+            price = 0.0 if np.isnan(price) else price
+            outcomes.append(Outcome(outcome.index, outcome.name, outcome.token_id, price, price * 100))
+        
+        market = Market(**{**recorded.__dict__, 'outcomes': outcomes})
+        if market.end_date is not None and market.end_date.timestamp() <= self.exchange.now:
+            market.active = False
+        return market
+    
+    def _record(self, result: TradeResult, market_slug: str = "", client_order_key: Optional[str] = None) -> TradeResult:
+        if market_slug:
+            result.market_slug = market_slug
+        result.client_order_key = client_order_key
+        self.history.append(result)
+        return result
+    
+    def execute_trade(
+        self,
+        market_url: str,
+        outcome_index: int,
+        amount_usdc: float,
+        max_price: Optional[float] = None,
+        client_order_key: Optional[str] = None,
+        account: Optional[str] = None
+    ) -> TradeResult:
+        """
+        Buy an outcome on the simulated exchange (see Poly402Client.execute_trade)
+        
+        Raises:
+            ValueError: For inactive markets, invalid outcomes or insufficient balance
+        """
+        if client_order_key:
+            for result in self.history:
+                if result.client_order_key == client_order_key:
+                    return result
+        
+        market = self.get_market(market_url)
+        if not market.active:
+            raise ValueError(f"Market '{market.title}' is not active")
+        if outcome_index >= len(market.outcomes):
+            raise ValueError(f"Invalid outcome index {outcome_index}. Market has {len(market.outcomes)} outcomes.")
+        
+        outcome = market.outcomes[outcome_index]
+        if self.exchange.available_cash < amount_usdc:
+            raise ValueError(
+                f"Insufficient USDC balance on Polygon. Required: {amount_usdc}, "
+                f"Available: {self.exchange.available_cash}"
+            )
+        
+        price, size = PolymarketClient.buy_terms(outcome, amount_usdc, max_price)
+        result = self.exchange.place(outcome.token_id, "BUY", price, size)
+        if result.status == OrderStatus.FAILED:
+            raise ValueError(result.error)
+        result.amount_usdc = amount_usdc
+        return self._record(result, market.slug, client_order_key)
+    
+    def prepare(self, market_url: str, outcome_indices: Optional[List[int]] = None) -> list:
+        """No-op: nothing needs arming on the simulated exchange"""
+        return []
+    
+    def fire(self, token_id: str, price: float, size: float, side: str = "BUY") -> TradeResult:
+        """Place a limit order directly (see Poly402Client.fire)"""
+        return self._record(self.exchange.place(token_id, side, price, size))
+    
+    def cancel_order(self, order_id: str) -> bool:
+        """Cancel a resting simulated order"""
+        return self.exchange.cancel(order_id)
+    
+    def get_positions(self, value: bool = True, max_workers: int = 16) -> List[Position]:
+        """Simulated holdings with current best bid and ask"""
+        exchange = self.exchange
+        positions = []
+        for token in np.flatnonzero(exchange.shares > PRICE_EPSILON).tolist():
+            info = exchange.tokens[token]
+            size = float(exchange.shares[token])
+            positions.append(Position(
+                token_id=info['token_id'],
+                size=size,
+                avg_price=float(exchange.cost[token]) / size,
+                condition_id=self._markets[info['market_slug']].condition_id,
+                market_slug=info['market_slug'],
+                outcome_name=info['outcome_name'],
+                best_bid=exchange.best_bid(token) if value else None,
+                best_ask=exchange.best_ask(token) if value else None
+            ))
+        return positions
+    
+    def close_positions(
+        self,
+        positions: Optional[List[Position]] = None,
+        min_price: Optional[float] = None,
+        max_workers: int = 16
+    ) -> List[TradeResult]:
+        """Sell positions at their best bid (see Poly402Client.close_positions)"""
+        if positions is None:
+            positions = self.get_positions()
+        
+        results = []
+        for position in positions:
+            bid = self.exchange.best_bid(self.exchange.token_index[position.token_id])
+            price = max(bid or 0.0, min_price or 0.0)
+            results.append(self.fire(position.token_id, price, position.size, "SELL"))
+        return results
+    
+    def get_balance(self, network: str = "both") -> dict:
+        """Simulated USDC balance (reported on Polygon)"""
+        balances = {}
+        if network in ["polygon", "both"]:
+            balances["polygon"] = Balance(network="Polygon", usdc_balance=self.exchange.cash, address="simulated")
+        return balances
+    
+    def get_trade_history(
+        self,
+        market: Optional[str] = None,
+        outcome: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 50,
+        account: Optional[str] = None
+    ) -> List[TradeResult]:
+        """Simulated trades, newest first (see Poly402Client.get_trade_history)"""
+        slug = self.market_parser.extract_slug(market) if market else None
+        results = [
+            result for result in reversed(self.history)
+            if (slug is None or result.market_slug == slug)
+            and (outcome is None or result.outcome_name == outcome)
+            and (status is None or result.status.value == status)
+            and (since is None or result.timestamp >= since)
+            and (until is None or result.timestamp < until)
+            and (account is None or result.account == account)
+        ]
+        return results[:limit]
+
+
+class Backtest:
+    """
+    Replays a snapshot store through a strategy
+    
+    The strategy is called as strategy(client, now) with a BacktestClient
+    and the replay time (Unix seconds). Snapshot rows between two strategy
+    calls are applied to the exchange as one vectorized batch, so the
+    callback interval, not the number of recorded rows, bounds the Python
+    work per replayed second.
+    """
+    
+    def __init__(self, store: SnapshotStore, cash: float = 1000.0, fee_rate_bps: float = 0.0):
+        """
+        Initialize backtest
+        
+        Args:
+            store: Recorded snapshots
+            cash: Starting USDC balance
+            fee_rate_bps: Taker fee in basis points of notional
+        """
+        self.store = store
+        self.initial_cash = cash
+        self.exchange = SimulatedExchange(store.tokens(), cash, fee_rate_bps)
+        self.client = BacktestClient(store, self.exchange)
+    
+    def run(
+        self,
+        strategy: Optional[Callable[[BacktestClient, float], None]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        interval: float = 0.0
+    ) -> BacktestReport:
+        """
+        Replay recorded snapshots
+        
+        Args:
+            strategy: Called once per tick (optional; without one the replay
+                only advances the exchange)
+            start: Replay from this time
+            end: Replay until this time
+            interval: Minimum replay seconds between ticks (0 calls the
+                strategy at every recorded timestamp)
+        
+        Returns:
+            BacktestReport summarizing the replay
+        """
+        started = time.perf_counter()
+        events = ticks = 0
+        first = last = None
+        next_tick = None
+        
+        for columns in self.store.read(
+            start.timestamp() if start else None,
+            end.timestamp() if end else None
+        ):
+            ts = columns['ts']
+            n = len(ts)
+            events += n
+            first = float(ts[0]) if first is None else first
+            last = float(ts[-1])
+            
+            if strategy is None:
+                self.exchange.apply(columns)
+                continue
+            
+            # Batch boundaries: the first row of each tick's timestamp
+            if interval > 0:
+                if next_tick is None:
+                    next_tick = float(ts[0])
+                bounds = []
+                position = 0
+                while position < n:
+                    position = int(np.searchsorted(ts, next_tick, side='left'))
+                    if position >= n:
+                        break
+                    tick_ts = ts[position]
+                    position = int(np.searchsorted(ts, tick_ts, side='right'))
+                    bounds.append(position)
+                    next_tick = float(tick_ts) + interval
+            else:
+                bounds = (np.flatnonzero(np.diff(ts)) + 1).tolist() + [n]
+            
+            begin = 0
+            for bound in bounds:
+                self.exchange.apply({name: array[begin:bound] for name, array in columns.items()})
+                strategy(self.client, self.exchange.now)
+                ticks += 1
+                begin = bound
+            if begin < n:
+                self.exchange.apply({name: array[begin:] for name, array in columns.items()})
+        
+        return BacktestReport(
+            start=datetime.fromtimestamp(first) if first is not None else None,
+            end=datetime.fromtimestamp(last) if last is not None else None,
+            events=events,
+            ticks=ticks,
+            orders=len(self.client.history),
+            fills=len(self.exchange.fills),
+            initial_cash=self.initial_cash,
+            cash=self.exchange.cash,
+            equity=self.exchange.equity(),
+            elapsed=time.perf_counter() - started
+        )
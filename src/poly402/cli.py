@@ -2,12 +2,19 @@
 CLI interface for poly402
 """
 
+import sys
+import time
 import click
-from colorama import init, Fore, Style
-from tabulate import tabulate
-from typing import Optional
+import colorama
+from colorama import init, deinit, Fore, Style
+from datetime import datetime
+from typing import Dict, Optional
 from .client import Poly402Client
 from .config import ConfigManager
+from .market_parser import SEARCH_RANKS
+from .models import OrderStatus
+from .output import FORMATS, RecordWriter, to_record
+from . import profiling
 
 # Initialize colorama for cross-platform colored output
 init(autoreset=True)
@@ -15,13 +22,26 @@ init(autoreset=True)
 
 @click.group()
 @click.version_option(version="1.0.0")
-def cli():
+@click.option('--profile', is_flag=True, help='Run the command under a sampling profiler')
+@click.option('--profile-output', help='Profile file (.folded/.txt for folded stacks; default: speedscope JSON)')
+@click.option('--profile-interval', default=0.001, help='Seconds between profiler samples')
+@click.pass_context
+def cli(ctx, profile: bool, profile_output: Optional[str], profile_interval: float):
     """
     poly402 - Programmatic Prediction Market Trading via HTTP Payment Protocol
     
     Execute prediction market trades using x402 payments on Base and Polymarket on Polygon.
     """
-    pass
+    if profile or profile_output:
+        profiling.start(profile_interval)
+        started = time.perf_counter()
+        name = ctx.invoked_subcommand or "poly402"
+        
+        def finish():
+            profiling.record("command", time.perf_counter() - started)
+            profiling.finish(profile_output, name)
+        
+        ctx.call_on_close(finish)
 
 
 @cli.command()
@@ -57,14 +77,72 @@ def init(base_key: str, polygon_key: str):
     click.echo("  3. Run: poly402 balance")
 
 
+def _output_option(f):
+    return click.option(
+        '--output', 'output_format', type=click.Choice(('table',) + FORMATS), default='table',
+        help='Output format; jsonl, csv and json stream plain records to stdout'
+    )(f)
+
+
+def _record_writer(output_format: str) -> Optional[RecordWriter]:
+    """Record writer for machine-readable output, or None for tables"""
+    if output_format == 'table':
+        return None
+    # colorama's stdout wrapper scans every write for escape codes
+    if sys.stdout is colorama.initialise.wrapped_stdout:
+        deinit()
+    return RecordWriter(output_format)
+
+
+def _market_record(market, quotes: Optional[dict] = None) -> dict:
+    record = to_record(market)
+    record['url'] = f"https://polymarket.com/event/{market.slug}"
+    if quotes is not None:
+        for outcome in record['outcomes']:
+            outcome['bid'], outcome['ask'] = quotes.get(outcome['token_id'], (None, None))
+    return record
+
+
+def _live_quotes(client: Poly402Client, markets: list) -> dict:
+    """Best bid/ask of every outcome of active markets, fetched in batches"""
+    token_ids = [o.token_id for market in markets if market.active for o in market.outcomes if o.token_id]
+    try:
+        return client.polymarket.get_prices(token_ids)
+    except RuntimeError as e:
+        click.echo(f"{Fore.YELLOW}Live quotes unavailable: {e}{Style.RESET_ALL}", err=True)
+        return {}
+
+
+def _format_quote(quote: Optional[tuple]) -> str:
+    bid, ask = quote or (None, None)
+    return f"{f'{bid:.3f}' if bid is not None else '-'} / {f'{ask:.3f}' if ask is not None else '-'}"
+
+
 @cli.command()
 @click.option('--url', required=True, help='Polymarket event URL or slug')
-def markets(url: str):
+@_output_option
+def markets(url: str, output_format: str):
     """View market details and available outcomes"""
     try:
+        writer = _record_writer(output_format)
         client = Poly402Client()
         market = client.get_market(url)
         
+        if writer:
+            quotes = _live_quotes(client, [market])
+            for outcome in market.outcomes:
+                bid, ask = quotes.get(outcome.token_id, (None, None))
+                writer.write({
+                    'market_slug': market.slug,
+                    'market_title': market.title,
+                    'active': market.active,
+                    **to_record(outcome),
+                    'bid': bid,
+                    'ask': ask
+                })
+            writer.close()
+            return
+        
         click.echo(f"\n{Fore.CYAN}Market: {market.title}{Style.RESET_ALL}")
         if market.description:
             click.echo(f"Description: {market.description[:100]}...")
@@ -74,18 +152,24 @@ def markets(url: str):
         if market.volume:
             click.echo(f"Volume: ${market.volume:,.2f}")
         
+        quotes = _live_quotes(client, [market])
+        
         # Display outcomes table
         click.echo(f"\n{Fore.YELLOW}Outcomes:{Style.RESET_ALL}")
         table_data = []
         for outcome in market.outcomes:
+            bid, ask = quotes.get(outcome.token_id, (None, None))
             table_data.append([
                 outcome.index,
                 outcome.name,
                 f"${outcome.price:.4f}",
-                f"{outcome.probability:.2f}%"
+                f"{outcome.probability:.2f}%",
+                f"${bid:.4f}" if bid is not None else "-",
+                f"${ask:.4f}" if ask is not None else "-"
             ])
         
-        headers = ["Index", "Outcome", "Price (USDC)", "Probability"]
+        headers = ["Index", "Outcome", "Price (USDC)", "Probability", "Bid", "Ask"]
+        from tabulate import tabulate
         click.echo(tabulate(table_data, headers=headers, tablefmt="grid"))
         
     except Exception as e:
@@ -98,14 +182,20 @@ def markets(url: str):
 @click.option('--outcome', required=True, type=int, help='Outcome index to bet on')
 @click.option('--amount', required=True, type=float, help='Amount in USDC to wager')
 @click.option('--max-price', type=float, help='Maximum price per share')
+@click.option('--key', help='Client order key; re-running with the same key never places a second order')
+@click.option('--account', help='Place the order from this account instead of routing it')
 @click.option('--yes', is_flag=True, help='Skip confirmation prompt')
-def trade(url: str, outcome: int, amount: float, max_price: Optional[float], yes: bool):
+@_output_option
+def trade(url: str, outcome: int, amount: float, max_price: Optional[float], key: Optional[str],
+          account: Optional[str], yes: bool, output_format: str):
     """Execute a trade on a prediction market"""
     try:
+        writer = _record_writer(output_format)
         client = Poly402Client()
         
         # Fetch market info
-        click.echo(f"{Fore.CYAN}Fetching market data...{Style.RESET_ALL}")
+        if not writer:
+            click.echo(f"{Fore.CYAN}Fetching market data...{Style.RESET_ALL}")
         market = client.get_market(url)
         
         if outcome >= len(market.outcomes):
@@ -114,6 +204,28 @@ def trade(url: str, outcome: int, amount: float, max_price: Optional[float], yes
         
         outcome_obj = market.outcomes[outcome]
         
+        if writer:
+            # Keep stdout to the record: confirm on stderr, skip progress output
+            if not yes:
+                click.confirm(
+                    f"Buy {outcome_obj.name} on {market.title} for ${amount:.2f} USDC "
+                    f"at ~${outcome_obj.price:.4f}?",
+                    abort=True,
+                    err=True
+                )
+            result = client.execute_trade(
+                market_url=url,
+                outcome_index=outcome,
+                amount_usdc=amount,
+                max_price=max_price,
+                client_order_key=key,
+                account=account
+            )
+            client.wait_for_settlements()
+            writer.write(to_record(result))
+            writer.close()
+            return
+        
         # Display trade details
         click.echo(f"\n{Fore.YELLOW}Trade Details:{Style.RESET_ALL}")
         click.echo(f"Market: {market.title}")
@@ -148,8 +260,12 @@ def trade(url: str, outcome: int, amount: float, max_price: Optional[float], yes
                 market_url=url,
                 outcome_index=outcome,
                 amount_usdc=amount,
-                max_price=max_price
+                max_price=max_price,
+                client_order_key=key,
+                account=account
             )
+            # Payment settles after the order is posted; wait for the final outcome
+            client.wait_for_settlements()
             
             bar.update(1)
         
@@ -157,12 +273,21 @@ def trade(url: str, outcome: int, amount: float, max_price: Optional[float], yes
         if result.error:
             click.echo(f"\n{Fore.RED}✗ Trade Failed{Style.RESET_ALL}")
             click.echo(f"Error: {result.error}")
+            click.echo(f"Client Order Key: {result.client_order_key}")
         else:
             click.echo(f"\n{Fore.GREEN}✓ Trade Executed Successfully!{Style.RESET_ALL}")
             click.echo(f"Order ID: {result.order_id}")
+            click.echo(f"Client Order Key: {result.client_order_key}")
+            click.echo(f"Account: {result.account}")
             click.echo(f"Shares Purchased: {result.shares_purchased:.2f} @ ${result.price_per_share:.4f}")
             click.echo(f"Status: {result.status.value}")
             click.echo(f"Network: Polygon")
+            if result.payment_info:
+                payment = result.payment_info
+                click.echo(
+                    f"x402 Payment: ${payment.amount:.4f} {payment.token} on {payment.network} "
+                    f"({payment.status}{', tx ' + payment.tx_hash if payment.tx_hash else ''})"
+                )
         
     except Exception as e:
         click.echo(f"\n{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
@@ -170,12 +295,19 @@ def trade(url: str, outcome: int, amount: float, max_price: Optional[float], yes
 
 
 @cli.command()
-def balance():
+@_output_option
+def balance(output_format: str):
     """Check wallet balances on Base and Polygon"""
     try:
+        writer = _record_writer(output_format)
         client = Poly402Client()
         balances = client.get_balance()
         
+        if writer:
+            writer.write_all(to_record(bal) for bal in balances.values())
+            writer.close()
+            return
+        
         click.echo(f"\n{Fore.CYAN}Wallet Balances:{Style.RESET_ALL}\n")
         
         for network, bal in balances.items():
@@ -186,6 +318,258 @@ def balance():
                 native_symbol = "ETH" if network == "base" else "MATIC"
                 click.echo(f"  {native_symbol}: {bal.native_balance:.4f}")
             click.echo()
+            
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
+@cli.command()
+def accounts():
+    """List trading accounts and their USDC balances"""
+    try:
+        client = Poly402Client()
+        balances = client.accounts.refresh_balances()
+        routable = {account.name for account in client.accounts.routable}
+        
+        table_data = [
+            [
+                account.name,
+                account.address,
+                f"${balances[account.name]:.2f}",
+                "yes" if account.name in routable else "explicit only"
+            ]
+            for account in client.accounts
+        ]
+        
+        click.echo(f"\n{Fore.CYAN}Accounts (routing: {client.accounts.strategy}):{Style.RESET_ALL}\n")
+        from tabulate import tabulate
+        click.echo(tabulate(table_data, headers=["Name", "Address", "USDC", "Routed"], tablefmt="grid"))
+        
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
+@cli.command()
+@click.option('--account', help='Only this account (default: every account)')
+@click.option('--yes', is_flag=True, help='Skip confirmation prompt')
+def approve(account: Optional[str], yes: bool):
+    """Check exchange approvals and grant any that are missing"""
+    try:
+        client = Poly402Client()
+        accounts = [client.accounts.get(account)] if account else list(client.accounts)
+        
+        table_data = []
+        pending = []
+        for trading_account in accounts:
+            wallet = client.allowances.load(trading_account.address)
+            missing = client.allowances.missing(trading_account.address)
+            for spender in client.allowances.spenders:
+                allowance = wallet.usdc[spender]
+                table_data.append([
+                    trading_account.name,
+                    spender,
+                    "unlimited" if ("usdc", spender) not in missing else f"${allowance:.2f}",
+                    "yes" if wallet.conditional[spender] else "no"
+                ])
+            if missing:
+                pending.append((trading_account, missing))
+        
+        from tabulate import tabulate
+        click.echo(tabulate(table_data, headers=["Account", "Spender", "USDC Allowance", "Tokens Approved"], tablefmt="grid"))
+        if not pending:
+            click.echo(f"\n{Fore.GREEN}✓ All exchange approvals are set{Style.RESET_ALL}")
+            return
+        
+        for trading_account, missing in pending:
+            if trading_account.polymarket.proxy_address:
+                click.echo(f"{Fore.YELLOW}Skipping '{trading_account.name}': proxy wallets are approved through Polymarket{Style.RESET_ALL}")
+                continue
+            if not yes:
+                click.confirm(
+                    f"\n{Fore.YELLOW}Send {len(missing)} approval transaction(s) from '{trading_account.name}'?{Style.RESET_ALL}",
+                    abort=True
+                )
+            for tx_hash in client.approve(trading_account.name):
+                click.echo(f"{Fore.GREEN}✓ {tx_hash}{Style.RESET_ALL}")
+        
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
+@cli.command('batch-trade')
+@click.option('--config', 'trades_file', required=True, type=click.File('r'), help='JSON file of trades')
+@click.option('--workers', default=8, help='Maximum number of trades in flight')
+@click.option('--yes', is_flag=True, help='Skip confirmation prompt')
+def batch_trade(trades_file, workers: int, yes: bool):
+    """Execute a list of trades in parallel across accounts"""
+    import json
+    
+    try:
+        trades = json.load(trades_file)
+        client = Poly402Client()
+        
+        total = sum(float(trade['amount']) for trade in trades)
+        click.echo(f"{len(trades)} trades totalling ${total:.2f} USDC across {len(client.accounts.routable)} account(s)")
+        if not yes:
+            click.confirm(f"{Fore.YELLOW}Execute these trades?{Style.RESET_ALL}", abort=True)
+        
+        results = client.execute_trades(trades, max_workers=workers)
+        client.wait_for_settlements()
+        
+        for trade, result in zip(trades, results):
+            if result.error:
+                click.echo(f"{Fore.RED}✗ {trade['url']} [{trade['outcome']}] ({result.account}): {result.error}{Style.RESET_ALL}")
+            else:
+                click.echo(
+                    f"{Fore.GREEN}✓ {result.market_slug} {result.outcome_name} ({result.account}): "
+                    f"{result.shares_purchased:.2f} @ ${result.price_per_share:.4f}, order {result.order_id}{Style.RESET_ALL}"
+                )
+            
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
+@cli.command()
+def rpc():
+    """Health-check every configured RPC endpoint"""
+    try:
+        client = Poly402Client()
+        
+        for network, w3 in (("Base", client.base_w3), ("Polygon", client.polygon_w3)):
+            endpoints = w3.provider.check_health()
+            rows = [
+                [
+                    endpoint.url,
+                    f"{Fore.GREEN}healthy{Style.RESET_ALL}" if endpoint.healthy else f"{Fore.RED}down{Style.RESET_ALL}",
+                    f"{endpoint.latency * 1000:.0f} ms" if endpoint.latency is not None else "-",
+                    endpoint.block if endpoint.block is not None else "-",
+                    endpoint.error or ""
+                ]
+                for endpoint in sorted(endpoints, key=lambda e: e.latency if e.latency is not None else float('inf'))
+            ]
+            click.echo(f"\n{Fore.YELLOW}{network} RPC Endpoints:{Style.RESET_ALL}")
+            from tabulate import tabulate
+            click.echo(tabulate(rows, headers=["Endpoint", "Status", "Latency", "Block", "Error"], tablefmt="grid"))
+        
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
+@cli.command()
+@click.option('--close-all', is_flag=True, help='Sell every position at its best bid')
+@click.option('--min-price', type=float, help='Minimum sell price per share when closing')
+@click.option('--workers', default=16, help='Number of concurrent requests')
+@click.option('--yes', is_flag=True, help='Skip confirmation prompt')
+def positions(close_all: bool, min_price: Optional[float], workers: int, yes: bool):
+    """View open positions valued against current order books"""
+    try:
+        client = Poly402Client()
+        held = client.get_positions(max_workers=workers)
+        
+        if not held:
+            click.echo(f"{Fore.YELLOW}No open positions{Style.RESET_ALL}")
+            return
+        
+        click.echo(f"\n{Fore.CYAN}Open Positions ({len(held)}):{Style.RESET_ALL}\n")
+        
+        table_data = []
+        total_value = 0.0
+        total_cost = 0.0
+        for position in held:
+            total_cost += position.cost_basis
+            if position.value is not None:
+                total_value += position.value
+            table_data.append([
+                position.market_slug[:40],
+                position.outcome_name,
+                f"{position.size:.2f}",
+                f"${position.avg_price:.4f}",
+                f"${position.best_bid:.4f}" if position.best_bid is not None else "N/A",
+                f"${position.value:,.2f}" if position.value is not None else "N/A",
+                f"${position.pnl:+,.2f}" if position.pnl is not None else "N/A"
+            ])
+        
+        headers = ["Market", "Outcome", "Shares", "Avg Price", "Best Bid", "Value", "PnL"]
+        from tabulate import tabulate
+        click.echo(tabulate(table_data, headers=headers, tablefmt="grid"))
+        click.echo(f"\nTotal Value: ${total_value:,.2f} (cost ${total_cost:,.2f})")
+        
+        if not close_all:
+            return
+        
+        if not yes:
+            click.confirm(
+                f"\n{Fore.YELLOW}Sell all {len(held)} positions at the best bid?{Style.RESET_ALL}",
+                abort=True
+            )
+        
+        click.echo(f"\n{Fore.CYAN}Closing positions...{Style.RESET_ALL}")
+        results = client.close_positions(held, min_price=min_price, max_workers=workers)
+        
+        failed = [r for r in results if r.error]
+        for result in failed:
+            click.echo(f"{Fore.RED}✗ {result.market_slug} {result.outcome_name}: {result.error}{Style.RESET_ALL}")
+        click.echo(f"{Fore.GREEN}✓ Submitted {len(results) - len(failed)}/{len(results)} sell orders{Style.RESET_ALL}")
+        
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
+@cli.command()
+@click.option('--by', type=click.Choice(['event', 'market', 'set']), default='event',
+              help='Group exposure by event, market or mutually exclusive outcome set')
+@click.option('--scenarios', default=10000, help='Number of simulated resolutions')
+@click.option('--confidence', default=0.95, help='Confidence level of the value at risk')
+@click.option('--seed', type=int, help='Random seed for the scenarios')
+@click.option('--workers', default=16, help='Number of concurrent requests')
+@_output_option
+def risk(by: str, scenarios: int, confidence: float, seed: Optional[int], workers: int, output_format: str):
+    """Show portfolio exposure, worst-case loss and simulated resolution PnL"""
+    from .risk import RiskEngine
+    
+    try:
+        writer = _record_writer(output_format)
+        client = Poly402Client()
+        engine = RiskEngine(client.get_positions(max_workers=workers))
+        rows = engine.exposures(by)
+        
+        if writer:
+            writer.write_all(dict(to_record(row), group=by, pnl=row.pnl) for row in rows)
+            writer.close()
+            return
+        
+        if not rows:
+            click.echo(f"{Fore.YELLOW}No open positions{Style.RESET_ALL}")
+            return
+        
+        summary = engine.summary()
+        report, _ = engine.scenarios(scenarios, confidence=confidence, seed=seed)
+        
+        click.echo(f"\n{Fore.CYAN}Exposure by {by} ({len(rows)}):{Style.RESET_ALL}\n")
+        table_data = [
+            [row.label[:50], row.positions, f"${row.cost:,.2f}", f"${row.value:,.2f}", f"${row.pnl:+,.2f}",
+             f"${row.max_loss:,.2f}"]
+            for row in rows
+        ]
+        from tabulate import tabulate
+        click.echo(tabulate(
+            table_data, headers=["Group", "Positions", "Cost", "Value", "PnL", "Max Loss"], tablefmt="grid"
+        ))
+        
+        click.echo(f"\nTotal Value: ${summary.value:,.2f} (cost ${summary.cost:,.2f}, PnL ${summary.pnl:+,.2f})")
+        click.echo(f"Worst-Case Loss: ${summary.max_loss:,.2f}")
+        click.echo(f"\n{Fore.CYAN}Resolution Scenarios ({report.scenarios:,}):{Style.RESET_ALL}")
+        click.echo(f"  Expected PnL: ${report.expected_pnl:+,.2f} (std ${report.std_pnl:,.2f})")
+        click.echo(f"  Value at Risk ({report.confidence:.0%}): ${report.value_at_risk:,.2f}")
+        click.echo(f"  Expected Shortfall: ${report.expected_shortfall:,.2f}")
+        click.echo(f"  Probability of Loss: {report.prob_loss:.1%}")
+        click.echo(f"  Range: ${report.worst_pnl:+,.2f} to ${report.best_pnl:+,.2f}")
         
     except Exception as e:
         click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
@@ -193,13 +577,558 @@ def balance():
 
 
 @cli.command()
-@click.option('--query', required=True, help='Search query')
-@click.option('--limit', default=10, help='Number of results')
-def search(query: str, limit: int):
+@click.option('--limit', default=10, help='Number of trades to display')
+@click.option('--market', help='Only trades on this event URL or slug')
+@click.option('--outcome', help='Only trades on this outcome name')
+@click.option('--status', type=click.Choice([s.value for s in OrderStatus]), help='Only trades with this status')
+@click.option('--since', type=click.DateTime(), help='Only trades at or after this time')
+@click.option('--until', type=click.DateTime(), help='Only trades before this time')
+@click.option('--account', help='Only trades placed by this account')
+def history(limit: int, market: Optional[str], outcome: Optional[str], status: Optional[str],
+            since: Optional[datetime], until: Optional[datetime], account: Optional[str]):
+    """View trades recorded in the local journal"""
+    try:
+        client = Poly402Client()
+        trades = client.get_trade_history(
+            market=market,
+            outcome=outcome,
+            status=status,
+            since=since,
+            until=until,
+            limit=limit,
+            account=account
+        )
+        
+        if not trades:
+            click.echo(f"{Fore.YELLOW}No trades recorded{Style.RESET_ALL}")
+            return
+        
+        click.echo(f"\n{Fore.CYAN}Recent Trades ({len(trades)}):{Style.RESET_ALL}\n")
+        
+        table_data = []
+        for trade in trades:
+            table_data.append([
+                trade.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+                trade.account,
+                trade.market_slug[:40],
+                trade.outcome_name,
+                trade.side,
+                f"${trade.amount_usdc:.2f}",
+                f"{trade.shares_purchased:.2f} @ ${trade.price_per_share:.4f}",
+                trade.status.value,
+                f"{sum(trade.timings.values()) * 1000:.0f}ms" if trade.timings else "N/A",
+                (trade.error or "")[:40]
+            ])
+        
+        headers = ["Time", "Account", "Market", "Outcome", "Side", "Amount", "Shares", "Status", "Latency", "Error"]
+        from tabulate import tabulate
+        click.echo(tabulate(table_data, headers=headers, tablefmt="grid"))
+        
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
+@cli.command()
+@click.option('--url', required=True, help='Polymarket event URL or slug')
+@click.option('--outcome', default=0, help='Outcome index')
+@click.option('--resolution', default='1h', help='Bar width, e.g. 5m, 1h, 1d')
+@click.option('--since', type=click.DateTime(), help='Only prices at or after this time')
+@click.option('--until', type=click.DateTime(), help='Only prices before this time')
+@click.option('--limit', default=24, help='Number of most recent bars to display')
+@click.option('--refresh/--no-refresh', default=True, help='Backfill newer history from the CLOB first')
+def prices(url: str, outcome: int, resolution: str, since: Optional[datetime], until: Optional[datetime],
+           limit: int, refresh: bool):
+    """View price history of an outcome from the local price store"""
+    try:
+        client = Poly402Client()
+        market = client.get_market(url)
+        
+        if outcome >= len(market.outcomes):
+            raise ValueError(f"Invalid outcome index {outcome}. Market has {len(market.outcomes)} outcomes.")
+        outcome_obj = market.outcomes[outcome]
+        
+        bars = client.get_price_history(outcome_obj.token_id, since, until, resolution, refresh=refresh)
+        if not bars:
+            click.echo(f"{Fore.YELLOW}No price history stored{Style.RESET_ALL}")
+            return
+        
+        click.echo(f"\n{Fore.CYAN}{market.title} - {outcome_obj.name} ({resolution} bars):{Style.RESET_ALL}\n")
+        
+        table_data = []
+        for bar in bars[-limit:]:
+            table_data.append([
+                datetime.fromtimestamp(bar.ts).strftime("%Y-%m-%d %H:%M"),
+                f"${bar.open:.4f}",
+                f"${bar.high:.4f}",
+                f"${bar.low:.4f}",
+                f"${bar.close:.4f}",
+                bar.count
+            ])
+        
+        headers = ["Time", "Open", "High", "Low", "Close", "Ticks"]
+        from tabulate import tabulate
+        click.echo(tabulate(table_data, headers=headers, tablefmt="grid"))
+        
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
+@cli.command()
+@click.option('--rules', 'rules_file', required=True, type=click.File('r'), help='JSON file of trigger rules')
+@click.option('--interval', default=1.0, help='Seconds between price polls')
+def watch(rules_file, interval: float):
+    """Arm conditional orders and fire them when prices cross thresholds"""
+    import json
+    from .triggers import TriggerEngine
+    
+    def on_fill(rule, result):
+        if result.error:
+            click.echo(f"{Fore.RED}✗ {rule.market_slug} {rule.outcome_name}: {result.error}{Style.RESET_ALL}")
+        else:
+            click.echo(
+                f"{Fore.GREEN}✓ {rule.side} {result.shares_purchased:.2f} {rule.outcome_name} "
+                f"@ ${result.price_per_share:.4f} on {rule.market_slug} (order {result.order_id}){Style.RESET_ALL}"
+            )
+    
+    try:
+        client = Poly402Client()
+        engine = TriggerEngine(client, on_fill=on_fill)
+        
+        for spec in json.load(rules_file):
+            rule = engine.add(
+                market_url=spec['url'],
+                outcome_index=int(spec['outcome']),
+                threshold=float(spec['threshold']),
+                direction=spec.get('direction', 'below'),
+                side=spec.get('side', 'BUY').upper(),
+                amount_usdc=spec.get('amount'),
+                shares=spec.get('shares'),
+                limit_price=spec.get('limit_price')
+            )
+            click.echo(
+                f"Armed: {rule.side} {rule.outcome_name} on {rule.market_slug} "
+                f"if price {rule.direction.value} {rule.threshold}"
+            )
+        
+        click.echo(f"\n{Fore.CYAN}Watching {len(engine.book)} rule(s). Press Ctrl+C to stop.{Style.RESET_ALL}")
+        try:
+            engine.run(interval=interval)
+        except KeyboardInterrupt:
+            pass
+        engine.shutdown()
+        
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
+@cli.command()
+@click.option('--url', required=True, help='Polymarket event URL or slug')
+@click.option('--outcome', required=True, type=int, help='Outcome index to trade')
+@click.option('--algo', 'algorithm', required=True, type=click.Choice(['twap', 'iceberg', 'liquidity']),
+              help='Execution algorithm')
+@click.option('--side', type=click.Choice(['BUY', 'SELL'], case_sensitive=False), default='BUY', help='Order side')
+@click.option('--amount', type=float, help='USDC to spend (BUY)')
+@click.option('--shares', type=float, help='Shares to trade')
+@click.option('--limit-price', type=float, help='Worst price any child order may trade at')
+@click.option('--duration', default=600.0, help='TWAP: seconds to spread the order over')
+@click.option('--slices', default=10, help='TWAP: number of slices')
+@click.option('--clip', type=float, help='Iceberg: visible shares per child order')
+@click.option('--participation', default=0.5, help='Liquidity: fraction of displayed depth to take per pass')
+@click.option('--max-clip', type=float, help='Liquidity: largest child order in shares')
+@click.option('--interval', default=2.0, help='Seconds between passes')
+@click.option('--timeout', type=float, help='Stop after this many seconds')
+@click.option('--yes', is_flag=True, help='Skip confirmation prompt')
+def execute(url: str, outcome: int, algorithm: str, side: str, amount: Optional[float], shares: Optional[float],
+            limit_price: Optional[float], duration: float, slices: int, clip: Optional[float], participation: float,
+            max_clip: Optional[float], interval: float, timeout: Optional[float], yes: bool):
+    """Work a large order as child orders with TWAP, iceberg or liquidity-seeking execution"""
+    
+    def on_child(result):
+        if result.error:
+            click.echo(f"{Fore.RED}✗ Child order failed: {result.error}{Style.RESET_ALL}")
+        else:
+            click.echo(f"  {result.side} {result.shares_purchased:.2f} @ ${result.price_per_share:.4f} "
+                       f"({result.status.value}, order {result.order_id})")
+    
+    try:
+        side = side.upper()
+        params: Dict[str, Optional[float]]
+        if algorithm == 'twap':
+            params = {'duration': duration, 'slices': slices}
+        elif algorithm == 'iceberg':
+            if not clip:
+                raise click.UsageError("--clip is required for iceberg execution")
+            params = {'clip_size': clip}
+        else:
+            params = {'participation': participation, 'max_clip': max_clip}
+        if timeout is not None:
+            params['timeout'] = timeout
+        
+        client = Poly402Client()
+        algo = client.work_order(
+            url, outcome, algorithm, side=side, size=shares, amount_usdc=amount,
+            limit_price=limit_price, on_child=on_child, interval=interval, **params
+        )
+        
+        parent = f"${amount:.2f} USDC" if amount is not None else f"{shares:.2f} shares"
+        click.echo(f"\n{Fore.YELLOW}{algorithm.upper()} {side} {parent} of {algo.report.outcome_name} "
+                   f"on {algo.report.market_slug}{Style.RESET_ALL}")
+        if limit_price is not None:
+            click.echo(f"Limit Price: ${limit_price:.4f}")
+        if not yes:
+            click.confirm(f"\n{Fore.YELLOW}Start execution?{Style.RESET_ALL}", abort=True)
+        
+        click.echo(f"{Fore.CYAN}Working order. Press Ctrl+C to stop.{Style.RESET_ALL}")
+        future = algo.start()
+        while True:
+            try:
+                report = future.result()
+                break
+            except KeyboardInterrupt:
+                click.echo("Stopping; cancelling the live child order...")
+                algo.cancel()
+        
+        color = Fore.RED if report.error else Fore.GREEN
+        click.echo(f"\n{color}Filled {report.filled_size:.2f} shares for ${report.notional:.2f} USDC{Style.RESET_ALL}")
+        if report.avg_price is not None:
+            click.echo(f"Average Price: ${report.avg_price:.4f}")
+        click.echo(f"Child Orders: {report.child_orders} ({report.cancelled_orders} cancelled, "
+                   f"{report.failed_orders} failed)")
+        if report.error:
+            click.echo(f"Error: {report.error}")
+            
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
+@cli.command()
+@click.option('--limit', default=1000, help='Number of active events to scan')
+@click.option('--min-edge', default=0.005, help='Minimum profit per basket share in USDC')
+@click.option('--max-cost', type=float, help='Maximum USDC to spend on one basket')
+@click.option('--watch', is_flag=True, help='Keep rescanning until interrupted')
+@click.option('--interval', default=5.0, help='Seconds between scans when watching')
+@click.option('--execute', 'execute_baskets', is_flag=True, help='Buy each basket found')
+@click.option('--yes', is_flag=True, help='Skip confirmation prompts')
+@_output_option
+def arb(limit: int, min_edge: float, max_cost: Optional[float], watch: bool, interval: float,
+        execute_baskets: bool, yes: bool, output_format: str):
+    """Find (and optionally buy) mispriced outcome baskets in neg-risk events"""
+    from .arbitrage import ArbitrageScanner
+    
+    def show(opportunity):
+        if writer:
+            writer.write_all([dict(to_record(opportunity), profit=opportunity.profit, edge=opportunity.edge)])
+        else:
+            click.echo(
+                f"{Fore.GREEN}{opportunity.side} basket on {opportunity.market_slug}: "
+                f"{opportunity.baskets:.2f} × {len(opportunity.legs)} legs for ${opportunity.cost:,.2f}, "
+                f"profit ${opportunity.profit:,.2f} ({opportunity.edge:.2%}){Style.RESET_ALL}"
+            )
+        if not execute_baskets:
+            return
+        if not yes and not click.confirm(f"{Fore.YELLOW}Buy this basket?{Style.RESET_ALL}", err=writer is not None):
+            return
+        results = client.execute_arbitrage(opportunity)
+        filled = [r for r in results if r.status != OrderStatus.FAILED]
+        color = Fore.GREEN if len(filled) == len(results) else Fore.RED
+        click.echo(f"{color}{len(filled)}/{len(results)} legs filled{Style.RESET_ALL}", err=writer is not None)
+        for result in results:
+            if result.error:
+                click.echo(f"{Fore.RED}✗ {result.outcome_name}: {result.error}{Style.RESET_ALL}", err=writer is not None)
+    
+    try:
+        writer = _record_writer(output_format)
+        client = Poly402Client()
+        scanner = ArbitrageScanner(client.polymarket, min_edge=min_edge, max_cost=max_cost)
+        
+        if watch:
+            if not writer:
+                click.echo(f"{Fore.CYAN}Scanning neg-risk events every {interval:g}s. Press Ctrl+C to stop.{Style.RESET_ALL}")
+            try:
+                scanner.run(lambda: client.neg_risk_events(limit), show, interval=interval)
+            except KeyboardInterrupt:
+                pass
+            if writer:
+                writer.close()
+            return
+        
+        events = client.neg_risk_events(limit)
+        opportunities = scanner.scan(events)
+        if writer:
+            for opportunity in opportunities:
+                show(opportunity)
+            writer.close()
+            return
+        
+        click.echo(f"\n{Fore.CYAN}Scanned {len(events)} neg-risk events{Style.RESET_ALL}\n")
+        if not opportunities:
+            click.echo(f"{Fore.YELLOW}No arbitrage above ${min_edge} per basket{Style.RESET_ALL}")
+            return
+        
+        table_data = [
+            [o.market_slug[:40], o.side, len(o.legs), f"{o.baskets:,.2f}", f"${o.cost:,.2f}", f"${o.fees:,.2f}",
+             f"${o.profit:,.2f}", f"{o.edge:.2%}"]
+            for o in opportunities
+        ]
+        from tabulate import tabulate
+        click.echo(tabulate(
+            table_data, headers=["Event", "Side", "Legs", "Baskets", "Cost", "Fees", "Profit", "Edge"], tablefmt="grid"
+        ))
+        if execute_baskets:
+            for opportunity in opportunities:
+                click.echo()
+                show(opportunity)
+                
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
+@cli.command()
+@click.option('--config', 'quotes_file', required=True, type=click.File('r'), help='JSON file of tokens to quote')
+@click.option('--interval', default=0.5, help='Seconds between book polls')
+@click.option('--requote-ticks', default=1, help='Price move in ticks that triggers a requote')
+@click.option('--yes', is_flag=True, help='Skip confirmation prompt')
+def quote(quotes_file, interval: float, requote_ticks: int, yes: bool):
+    """Make markets: keep two-sided quotes around fair value on selected outcomes"""
+    import json
+    from .models import QuoteSpec
+    from .quoting import QuotingEngine
+    
+    def on_fill(token_id, side, price, size):
+        spec = engine.specs.get(token_id)
+        name = f"{spec.outcome_name} on {spec.market_slug}" if spec else token_id
+        click.echo(
+            f"{Fore.GREEN}✓ {side} {size:.2f} {name} @ ${price:.4f} "
+            f"(inventory {engine.inventory[token_id]:.2f}){Style.RESET_ALL}"
+        )
+    
+    try:
+        client = Poly402Client()
+        held = {p.token_id: p.size for p in client.get_positions(value=False)}
+        
+        specs = []
+        for entry in json.load(quotes_file):
+            template = client.prepare(entry['url'], [int(entry['outcome'])])[0]
+            specs.append(QuoteSpec(
+                token_id=template.token_id,
+                size=float(entry['size']),
+                half_spread=float(entry['half_spread']),
+                max_position=float(entry['max_position']),
+                min_position=float(entry.get('min_position', 0.0)),
+                skew=float(entry.get('skew', 0.0)),
+                market_slug=template.market_slug,
+                outcome_name=template.outcome_name
+            ))
+        
+        table_data = [
+            [s.market_slug, s.outcome_name, f"{s.size:.2f}", f"±{s.half_spread:.4f}",
+             f"{held.get(s.token_id, 0.0):.2f} / {s.max_position:.2f}"]
+            for s in specs
+        ]
+        from tabulate import tabulate
+        click.echo(tabulate(table_data, headers=["Market", "Outcome", "Size", "Spread", "Held / Max"], tablefmt="grid"))
+        if not yes:
+            click.confirm(f"\n{Fore.YELLOW}Start quoting?{Style.RESET_ALL}", abort=True)
+        
+        engine = QuotingEngine(client.polymarket, specs, requote_ticks=requote_ticks, inventory=held, on_fill=on_fill)
+        
+        def on_close(market):
+            # Quotes on a market reaching its deadline are pulled on the next flush
+            for outcome in market.outcomes:
+                if outcome.token_id in engine.specs:
+                    engine.remove(outcome.token_id)
+                    click.echo(f"{Fore.YELLOW}Stopped quoting {market.slug} / {outcome.name}: market closing{Style.RESET_ALL}")
+        
+        client.lifecycle.subscribe(on_close)
+        click.echo(f"\n{Fore.CYAN}Quoting {len(specs)} token(s). Press Ctrl+C to stop.{Style.RESET_ALL}")
+        started = time.monotonic()
+        try:
+            engine.run(interval=interval)
+        except KeyboardInterrupt:
+            pass
+        
+        elapsed = max(time.monotonic() - started, 1e-9)
+        stats = engine.stats
+        click.echo(
+            f"\nQuotes pulled. {stats['requotes']} requotes ({stats['requotes'] / elapsed:.1f}/s), "
+            f"{stats['posts']} posted, {stats['cancels']} cancelled, {stats['rejects']} rejected, "
+            f"{stats['fills']} fills"
+        )
+        
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
+@cli.command()
+@click.argument('strategy_files', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--interval', default=1.0, help='Seconds between price polls')
+@click.option('--fill-interval', default=2.0, help='Seconds between fill polls')
+@click.option('--workers', default=16, help='Threads for blocking client calls')
+@click.option('--keep-orders', is_flag=True, help='Leave strategy orders open on exit')
+def run(strategy_files, interval: float, fill_interval: float, workers: int, keep_orders: bool):
+    """Run strategy files together on one shared client"""
+    from .runtime import StrategyRuntime
+    
+    try:
+        client = Poly402Client()
+        runtime = StrategyRuntime(client, interval=interval, fill_interval=fill_interval, max_workers=workers)
+        for path in strategy_files:
+            runtime.load(path)
+        
+        click.echo(f"{Fore.CYAN}Running {len(runtime.strategies)} strategy(ies). Press Ctrl+C to stop.{Style.RESET_ALL}")
+        started = time.monotonic()
+        try:
+            runtime.run(cancel_on_stop=not keep_orders)
+        except KeyboardInterrupt:
+            pass
+        
+        elapsed = max(time.monotonic() - started, 1e-9)
+        table_data = [
+            [
+                name,
+                ctx.stats['events'],
+                ctx.stats['errors'],
+                f"{ctx.stats['busy'] / elapsed:.1%}",
+                ctx.stats['orders'],
+                ctx.stats['fills']
+            ]
+            for name, ctx in runtime.strategies.items()
+        ]
+        from tabulate import tabulate
+        click.echo(tabulate(table_data, headers=["Strategy", "Events", "Errors", "Busy", "Orders", "Fills"], tablefmt="grid"))
+        
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
+@cli.command()
+@click.option('--url', 'urls', required=True, multiple=True, help='Polymarket event URL or slug (repeatable)')
+@click.option('--store', 'store_path', default='~/.poly402/snapshots', help='Snapshot store directory')
+@click.option('--interval', default=5.0, help='Seconds between snapshots')
+@click.option('--duration', type=float, help='Stop after this many seconds')
+@click.option('--no-books', is_flag=True, help='Record Gamma prices only, without CLOB order books')
+def record(urls, store_path: str, interval: float, duration: Optional[float], no_books: bool):
+    """Record market snapshots for backtesting"""
+    from .snapshots import SnapshotStore, SnapshotRecorder
+    
+    try:
+        client = Poly402Client()
+        store = SnapshotStore(store_path)
+        recorder = SnapshotRecorder(client.market_parser, store, None if no_books else client.polymarket)
+        
+        click.echo(f"{Fore.CYAN}Recording {len(urls)} market(s) to {store.path}. Press Ctrl+C to stop.{Style.RESET_ALL}")
+        try:
+            rows = recorder.run(list(urls), interval=interval, duration=duration)
+        except KeyboardInterrupt:
+            # run() flushes buffered snapshots on the way out
+            rows = None
+        click.echo(f"{Fore.GREEN}✓ Store holds {len(store)} snapshot rows{Style.RESET_ALL}" + (
+            f" ({rows} recorded this run)" if rows is not None else ""
+        ))
+        
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
+@cli.command()
+@click.option('--strategy', required=True, help='Strategy callable as module:function or path/to/file.py:function')
+@click.option('--store', 'store_path', default='~/.poly402/snapshots', help='Snapshot store directory')
+@click.option('--cash', default=1000.0, help='Starting USDC balance')
+@click.option('--fee-bps', default=0.0, help='Taker fee in basis points')
+@click.option('--interval', default=0.0, help='Minimum replay seconds between strategy calls')
+@click.option('--since', type=click.DateTime(), help='Replay from this time')
+@click.option('--until', type=click.DateTime(), help='Replay until this time')
+def backtest(strategy: str, store_path: str, cash: float, fee_bps: float, interval: float,
+             since: Optional[datetime], until: Optional[datetime]):
+    """Replay recorded snapshots through a strategy on a simulated exchange"""
+    import importlib
+    import os
+    from .backtest import Backtest
+    from .runtime import _load_strategy
+    from .snapshots import SnapshotStore
+    
+    try:
+        target, _, name = strategy.rpartition(':')
+        if not target or not name:
+            raise ValueError("Strategy must be given as module:function or path/to/file.py:function")
+        if target.endswith('.py'):
+            module = _load_strategy("poly402_strategy", os.path.abspath(os.path.expanduser(target)))
+        else:
+            module = importlib.import_module(target)
+        
+        runner = Backtest(SnapshotStore(store_path), cash=cash, fee_rate_bps=fee_bps)
+        report = runner.run(getattr(module, name), start=since, end=until, interval=interval)
+        
+        click.echo(f"\n{Fore.CYAN}Backtest Results:{Style.RESET_ALL}")
+        click.echo(f"  Period: {report.start} - {report.end}")
+        click.echo(f"  Events: {report.events} ({report.events_per_second:,.0f}/s), Ticks: {report.ticks}")
+        click.echo(f"  Orders: {report.orders}, Fills: {report.fills}")
+        click.echo(f"  Cash: ${report.cash:.2f}, Equity: ${report.equity:.2f}")
+        color = Fore.GREEN if report.pnl >= 0 else Fore.RED
+        click.echo(f"  PnL: {color}${report.pnl:+.2f}{Style.RESET_ALL}")
+        
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
+@cli.command()
+def reconcile():
+    """Settle orders whose submission outcome is unknown (e.g. after a crash)"""
+    try:
+        client = Poly402Client()
+        results = client.reconcile_intents()
+        
+        if not results:
+            click.echo(f"{Fore.GREEN}✓ No pending orders{Style.RESET_ALL}")
+            return
+        
+        for result in results:
+            if result.error:
+                click.echo(f"{Fore.RED}✗ {result.client_order_key}: {result.error}{Style.RESET_ALL}")
+            else:
+                click.echo(
+                    f"{Fore.GREEN}✓ {result.client_order_key}: order {result.order_id} "
+                    f"({result.status.value}){Style.RESET_ALL}"
+                )
+                
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
+@cli.command()
+@click.option('--query', 'queries', multiple=True, help='Search query (repeatable)')
+@click.option('--queries-file', type=click.File('r'), help='File of search queries, one per line')
+@click.option('--limit', default=10, help='Number of results per query')
+@click.option('--rank', type=click.Choice(SEARCH_RANKS), default='relevance', help='Result ordering')
+@click.option('--workers', default=16, help='Maximum number of concurrent searches')
+@_output_option
+def search(queries, queries_file, limit: int, rank: str, workers: int, output_format: str):
     """Search for prediction markets"""
     try:
+        queries = list(queries)
+        if queries_file:
+            queries.extend(line.strip() for line in queries_file if not line.lstrip().startswith('#'))
+        if not any(q.strip() for q in queries):
+            raise click.UsageError("Provide --query or --queries-file")
+        
+        writer = _record_writer(output_format)
         client = Poly402Client()
-        markets = client.search_markets(query, limit)
+        markets = client.search_many(queries, limit, rank, workers)
+        
+        if writer:
+            writer.write_all(_market_record(market) for market in markets)
+            writer.close()
+            return
         
         if not markets:
             click.echo(f"{Fore.YELLOW}No markets found{Style.RESET_ALL}")
@@ -221,25 +1150,41 @@ def search(query: str, limit: int):
 
 @cli.command()
 @click.option('--limit', default=20, help='Number of markets to display')
-def active(limit: int):
+@_output_option
+def active(limit: int, output_format: str):
     """List active prediction markets"""
     try:
+        writer = _record_writer(output_format)
         client = Poly402Client()
+        
+        if writer:
+            # Each page is written as soon as it and its quotes arrive
+            for page in client.iter_active_markets(limit):
+                quotes = _live_quotes(client, page)
+                writer.write_all(_market_record(market, quotes) for market in page)
+            writer.close()
+            return
+        
         markets = client.get_active_markets(limit)
         
         click.echo(f"\n{Fore.CYAN}Active Markets ({len(markets)}):{Style.RESET_ALL}\n")
         
+        markets = markets[:limit]
+        quotes = _live_quotes(client, markets)
+        
         table_data = []
-        for market in markets[:limit]:
+        for market in markets:
             volume_str = f"${market.volume:,.0f}" if market.volume else "N/A"
             table_data.append([
                 market.title[:50] + "..." if len(market.title) > 50 else market.title,
-                len(market.outcomes),
+                "\n".join(o.name[:30] for o in market.outcomes),
+                "\n".join(_format_quote(quotes.get(o.token_id)) for o in market.outcomes),
                 volume_str,
                 f"https://polymarket.com/event/{market.slug}"
             ])
         
-        headers = ["Market", "Outcomes", "Volume", "URL"]
+        headers = ["Market", "Outcomes", "Bid / Ask", "Volume", "URL"]
+        from tabulate import tabulate
         click.echo(tabulate(table_data, headers=headers, tablefmt="grid"))
         
     except Exception as e:
@@ -247,6 +1192,34 @@ def active(limit: int):
         raise click.Abort()
 
 
+@cli.command()
+@click.option('--pay-to', help='Address receiving trade fees (default: your Base wallet)')
+@click.option('--price', default=0.01, help='Fee in USDC charged per trade')
+@click.option('--host', default='127.0.0.1', help='Interface to bind')
+@click.option('--port', default=4020, help='Port to bind')
+def facilitator(pay_to: Optional[str], price: float, host: str, port: int):
+    """Run a local x402 facilitator and paid trade resource for testing"""
+    from .facilitator import LocalFacilitator
+    
+    try:
+        if not pay_to:
+            from eth_account import Account
+            config = ConfigManager().load()
+            pay_to = Account.from_key(config.base_private_key).address
+        
+        local = LocalFacilitator(pay_to=pay_to, price_usdc=price, host=host, port=port)
+        click.echo(f"{Fore.GREEN}Local x402 facilitator listening on {local.url}{Style.RESET_ALL}")
+        click.echo(f"Set x402.facilitator to {local.url} and x402.resource to {local.url}/trade")
+        click.echo(f"Fees of ${price:.4f} USDC are payable to {pay_to}. Press Ctrl+C to stop.")
+        local.serve_forever()
+        
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}", err=True)
+        raise click.Abort()
+
+
 @cli.command()
 def config_path():
     """Display configuration file path"""
@@ -2,13 +2,34 @@
 Main poly402 client - orchestrates x402 payments and Polymarket trades
 """
 
-from typing import Optional
+import sys
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Callable, Dict, List, Optional, Set
 from web3 import Web3
 from eth_account import Account
+from .accounts import AccountPool, TradingAccount
+from .allowances import AllowanceCache
+from .arbitrage import ArbitrageScanner
 from .config import ConfigManager
-from .models import Market, TradeResult, Balance, Config
+from .execution import ALGORITHMS, ExecutionAlgorithm
+from .models import (
+    Market, Outcome, TradeResult, Balance, Config, Position, OrderIntent, IntentStatus, OrderStatus,
+    OrderTemplate, PaymentInfo, PriceBar, ArbitrageOpportunity
+)
+from .intents import IntentStore
+from .journal import TradeJournal
+from .lifecycle import LifecycleScheduler
 from .market_parser import MarketParser
 from .polymarket_client import PolymarketClient
+from .prices import PriceStore
+from . import profiling
+from .risk import RiskEngine
+from .rpc import RPCPool
+from .x402 import X402Client
 
 
 class Poly402Client:
@@ -25,9 +46,12 @@ class Poly402Client:
         Args:
             config_path: Path to configuration file (optional)
         """
+        started = time.perf_counter()
+        
         # Load configuration
-        config_manager = ConfigManager(config_path)
-        self.config: Config = config_manager.load()
+        with profiling.stage("config"):
+            config_manager = ConfigManager(config_path)
+            self.config: Config = config_manager.load()
         
         # Initialize market parser
         self.market_parser = MarketParser(self.config.polymarket_gamma_endpoint)
@@ -37,21 +61,77 @@ class Poly402Client:
             host=self.config.polymarket_clob_endpoint,
             chain_id=self.config.polygon_chain_id,
             private_key=self.config.polygon_private_key,
-            signature_type=self.config.signature_type
+            signature_type=self.config.signature_type,
+            data_endpoint=self.config.polymarket_data_endpoint
+        )
+        
+        # Initialize x402 payment client (pays the configured resource per trade)
+        self.x402 = X402Client(
+            facilitator_url=self.config.x402_facilitator,
+            private_key=self.config.base_private_key,
+            chain_id=self.config.base_chain_id,
+            max_payment=self.config.x402_max_payment,
+            batch_threshold=self.config.x402_batch_threshold
         )
         
-        # Initialize Web3 for balance checks
-        self.base_w3 = Web3(Web3.HTTPProvider(self.config.base_rpc_url))
-        self.polygon_w3 = Web3(Web3.HTTPProvider(self.config.polygon_rpc_url))
+        # Initialize Web3 for balance checks, routed over each chain's RPC endpoints
+        self.base_w3 = Web3(RPCPool(self.config.base_rpc_urls or [self.config.base_rpc_url]))
+        self.polygon_w3 = Web3(RPCPool(self.config.polygon_rpc_urls or [self.config.polygon_rpc_url]))
         
         # Get wallet addresses
         self.base_account = Account.from_key(self.config.base_private_key)
         self.polygon_account = Account.from_key(self.config.polygon_private_key)
         
+        # Exchange approvals, read alongside Polygon balances and tracked per order
+        self.allowances = AllowanceCache(self.polygon_w3, self.config.polygon_chain_id)
+        
+        # Orders are routed across configured sub-accounts (or the primary wallet)
+        self.accounts = AccountPool.from_profiles(
+            default=TradingAccount("default", self.polymarket, self.polygon_account.address),
+            profiles=self.config.accounts,
+            host=self.config.polymarket_clob_endpoint,
+            chain_id=self.config.polygon_chain_id,
+            data_endpoint=self.config.polymarket_data_endpoint,
+            balance_of=lambda address: self.allowances.balance(address),
+            strategy=self.config.account_routing
+        )
+        
+        # Local trade journal (written off the hot path by a background thread)
+        self.journal = TradeJournal(self.config.journal_path) if self.config.journal_enabled else None
+        
+        # Signed orders are persisted here before posting for idempotent retries
+        self.intents = IntentStore(self.config.journal_path)
+        
+        # Local price history, fed by CLOB backfills and every price this client sees
+        self.prices = PriceStore(self.config.prices_path)
+        
+        # Pre-trade risk limits; positions are loaded on the first checked trade
+        self.risk = RiskEngine(
+            max_event_exposure=self.config.risk_max_event_exposure,
+            max_market_exposure=self.config.risk_max_market_exposure,
+            max_loss=self.config.risk_max_loss
+        )
+        
+        # When each event's metadata was last fetched or checked (see refresh_markets)
+        self._metadata_checked: Dict[str, float] = {}
+        
+        # Markets are scheduled for cleanup shortly before their end date:
+        # resting orders are cancelled and cached state dropped
+        self.lifecycle = LifecycleScheduler(lead=self.config.lifecycle_lead)
+        self.lifecycle.subscribe(self._on_market_close)
+        self._order_accounts: Dict[str, Set[str]] = {}  # Slug -> accounts with resting orders
+        self._closed: Dict[str, None] = {}  # Recently closed slugs, oldest first
+        
+        # Background x402 verification/settlement, keyed by client order key
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="poly402-x402")
+        self._settlements: Dict[str, Future] = {}
+        
         # USDC contract addresses
         self.USDC_BASE = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
         self.USDC_POLYGON = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"  # USDC (bridged)
         
+        profiling.record("client_init", time.perf_counter() - started)
+        
     def get_market(self, url: str) -> Market:
         """
         Fetch market data from URL
@@ -62,66 +142,869 @@ class Poly402Client:
         Returns:
             Market object with all details
         """
-        return self.market_parser.fetch_market(url)
+        market = self.market_parser.fetch_market(url)
+        now = time.time()
+        for outcome in market.outcomes:
+            if outcome.token_id:
+                self.prices.record(outcome.token_id, now, outcome.price)
+        self._metadata_checked[market.slug] = time.monotonic()
+        self.lifecycle.track(market)
+        return market
+    
+    def refresh_markets(
+        self,
+        markets: List[Market],
+        metadata_ttl: float = 300.0,
+        max_workers: int = 8
+    ) -> List[Market]:
+        """
+        Update previously fetched markets in place
+        
+        Prices of every outcome come from batched CLOB midpoint requests.
+        An event is refetched from Gamma only when its metadata is older than
+        metadata_ttl or one of its tokens has no midpoint (e.g. the market
+        closed), and then only re-parsed if its ETag or updatedAt changed.
+        
+        Args:
+            markets: Markets from get_market() (updated in place; markets
+                that reached their close deadline are removed from the list)
+            metadata_ttl: Seconds between metadata checks per event
+            max_workers: Maximum number of concurrent metadata requests
+        
+        Returns:
+            Markets whose metadata changed
+        """
+        markets[:] = [market for market in markets if market.slug not in self._closed]
+        token_ids = [o.token_id for market in markets for o in market.outcomes if o.token_id]
+        prices = self.polymarket.get_midpoints(token_ids) if token_ids else {}
+        
+        now = time.time()
+        stale = []
+        for market in markets:
+            missing = False
+            for outcome in market.outcomes:
+                price = prices.get(outcome.token_id)
+                if price is None:
+                    missing = True
+                    continue
+                outcome.price = price
+                outcome.probability = price * 100
+                self.prices.record(outcome.token_id, now, price)
+            checked = self._metadata_checked.get(market.slug)
+            # A token without a midpoint on a market still believed active
+            # usually means it closed; confirm without waiting for the TTL
+            if (missing and market.active) or checked is None or time.monotonic() - checked > metadata_ttl:
+                stale.append(market)
+        
+        if not stale:
+            return []
+        
+        def check(market: Market) -> Optional[Market]:
+            fresh = self.market_parser.fetch_market_if_changed(market)
+            self._metadata_checked[market.slug] = time.monotonic()
+            if fresh is None:
+                return None
+            for field_name in market.__dataclass_fields__:
+                setattr(market, field_name, getattr(fresh, field_name))
+            self.lifecycle.track(market)
+            return market
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(stale))) as pool:
+            return [market for market in pool.map(check, stale) if market is not None]
     
     def execute_trade(
         self,
         market_url: str,
         outcome_index: int,
         amount_usdc: float,
-        max_price: Optional[float] = None
+        max_price: Optional[float] = None,
+        client_order_key: Optional[str] = None,
+        account: Optional[str] = None
     ) -> TradeResult:
         """
         Execute a complete trade flow:
         1. Fetch market data
-        2. Verify x402 payment (simulated for now)
-        3. Execute Polymarket trade
+        2. Authorize an x402 payment and verify it while the order is signed
+           (when an x402 resource is configured)
+        3. Post the Polymarket order once the payment verifies
+        4. Settle the payment in the background, cancelling the order if
+           settlement fails (see wait_for_settlements)
         
         Args:
             market_url: Polymarket event URL
             outcome_index: Index of outcome to bet on
             amount_usdc: Amount in USDC to wager
             max_price: Maximum price per share (optional)
+            client_order_key: Idempotency key (optional). Retrying with the same
+                key returns the original order instead of placing a new one.
+            account: Place the order from this named account instead of
+                routing it (optional)
             
         Returns:
             TradeResult with execution details
         """
-        # Step 1: Fetch market data
+        if client_order_key:
+            intent = self.intents.get(client_order_key)
+            if intent is not None:
+                return self._resume_intent(intent)
+        
+        key = client_order_key or uuid.uuid4().hex
+        timings = {}
+        market = None
+        outcome = None
+        resource = self.config.x402_resource
+        payment = None
+        payload = None
+        requirements = None
+        before_post = None
+        trading_account = None
+        reserved = None
+        approved = None
+        
+        try:
+            # Step 1: Fetch market data
+            started = time.perf_counter()
+            market = self.get_market(market_url)
+            timings['fetch_market'] = time.perf_counter() - started
+        
+            if not market.active:
+                raise ValueError(f"Market '{market.title}' is not active")
+        
+            if outcome_index >= len(market.outcomes):
+                raise ValueError(f"Invalid outcome index {outcome_index}. Market has {len(market.outcomes)} outcomes.")
+        
+            outcome = market.outcomes[outcome_index]
+            
+            # Step 2: Route to an account and verify its balance
+            started = time.perf_counter()
+            trading_account = self.accounts.select(amount_usdc, account)
+            polygon_balance = self.allowances.balance(trading_account.address)
+            trading_account.balance = polygon_balance
+            timings['polygon_balance'] = time.perf_counter() - started
+            # Leave room for this account's other orders still in flight
+            available = polygon_balance - (trading_account.reserved - amount_usdc)
+            if available < amount_usdc:
+                raise ValueError(
+                    f"Insufficient USDC balance on Polygon for account '{trading_account.name}'. "
+                    f"Required: {amount_usdc}, Available: {available}"
+                )
+            
+            # Step 3: Authorize the x402 payment and start verifying it in the
+            # background; without a resource, just check the Base balance
+            started = time.perf_counter()
+            if resource:
+                payment, payload, requirements = self.x402.authorize(resource)
+                if payload is not None and requirements is not None:
+                    verification = self._executor.submit(self.x402.verify, payload, requirements)
+                    before_post = partial(self._await_verification, verification, payment, timings)
+                timings['x402_authorize'] = time.perf_counter() - started
+            else:
+                # Advisory only: a Base RPC outage must not block Polygon trading
+                try:
+                    base_balance = self._get_usdc_balance("base")
+                except RuntimeError as e:
+                    print(f"Warning: Could not check USDC balance on Base: {e}", file=sys.stderr)
+                else:
+                    if base_balance < self.config.x402_max_payment:
+                        print(f"Warning: Low USDC balance on Base for x402 payments: {base_balance}", file=sys.stderr)
+                timings['base_balance'] = time.perf_counter() - started
+            
+            # Step 4: Sign the Polymarket order while the payment is verified,
+            # and post it once verification succeeds
+            started = time.perf_counter()
+            price, size = self.polymarket.buy_terms(outcome, amount_usdc, max_price)
+            checked = time.perf_counter()
+            approved = self._preflight(trading_account, "BUY", price * size, market.neg_risk)
+            timings['allowance_check'] = time.perf_counter() - checked
+            if self.risk.enabled:
+                checked = time.perf_counter()
+                reserved = self._reserve_risk(market, outcome, size, price)
+                timings['risk_check'] = time.perf_counter() - checked
+            expiration = self.lifecycle.gtd_expiration(market) if self.config.lifecycle_gtd_orders else 0
+            result = self._submit_order(
+                key, market.slug, outcome, "BUY", price, size, amount_usdc, before_post, trading_account, expiration
+            )
+            timings['order'] = time.perf_counter() - started
+        except Exception as e:
+            if trading_account is not None:
+                self.accounts.release(trading_account, amount_usdc)
+            if reserved is not None:
+                self.risk.apply(*reserved)
+            if approved is not None:
+                self.allowances.release(*approved)
+            if payment is not None and resource:
+                self.x402.release(resource, payment)
+            failed = self.polymarket._failed_result(
+                outcome_name=outcome.name if outcome else str(outcome_index),
+                amount_usdc=amount_usdc,
+                price=max_price or (outcome.price if outcome else 0.0),
+                side="BUY",
+                error=str(e)
+            )
+            failed.market_slug = market.slug if market else market_url
+            failed.payment_info = payment
+            failed.timings = timings
+            failed.client_order_key = key
+            failed.account = trading_account.name if trading_account else (account or "default")
+            self._journal(failed)
+            raise
+        
+        self.accounts.release(trading_account, amount_usdc, spent=result.status != OrderStatus.FAILED)
+        if result.status == OrderStatus.FAILED:
+            if reserved is not None:
+                self.risk.apply(*reserved)
+            if approved is not None:
+                self.allowances.release(*approved)
+            if payment is not None and resource:
+                self.x402.release(resource, payment)
+        
+        # Update result with market info
+        result.market_slug = market.slug
+        result.payment_info = payment
+        result.timings = timings
+        self._track_order(result)
+        
+        if (
+            resource and payment is not None and payload is not None and requirements is not None
+            and result.status != OrderStatus.FAILED
+        ):
+            # Step 5: Settle off the critical path; journaled once settled
+            self._settlements[key] = self._executor.submit(
+                self._settle_trade, key, resource, result, payment, payload, requirements
+            )
+        else:
+            # Rejected orders are never charged: the authorization is left to expire
+            self._journal(result)
+        
+        return result
+    
+    def execute_trades(self, trades: List[dict], max_workers: int = 8) -> List[TradeResult]:
+        """
+        Execute several trades in parallel, routed across accounts
+        
+        Args:
+            trades: Dicts with "url", "outcome" (index or name) and "amount",
+                and optionally "max_price", "key" and "account"
+            max_workers: Maximum number of trades in flight
+        
+        Returns:
+            TradeResult for each trade, in input order (failed results for
+            trades that raised)
+        """
+        if not trades:
+            return []
+        
+        # Derive credentials and load balances for every account up front
+        self.accounts.warm()
+        
+        def run(trade: dict) -> TradeResult:
+            try:
+                outcome = trade['outcome']
+                if isinstance(outcome, str):
+                    names = [o.name.lower() for o in self.get_market(trade['url']).outcomes]
+                    if outcome.lower() not in names:
+                        raise ValueError(f"Unknown outcome '{outcome}'")
+                    outcome = names.index(outcome.lower())
+                return self.execute_trade(
+                    market_url=trade['url'],
+                    outcome_index=outcome,
+                    amount_usdc=float(trade['amount']),
+                    max_price=trade.get('max_price'),
+                    client_order_key=trade.get('key'),
+                    account=trade.get('account')
+                )
+            except Exception as e:
+                failed = self.polymarket._failed_result(
+                    str(trade.get('outcome')), float(trade.get('amount', 0)), trade.get('max_price') or 0.0, "BUY", str(e)
+                )
+                failed.market_slug = trade.get('url', '')
+                failed.account = trade.get('account') or failed.account
+                return failed
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(trades))) as pool:
+            return list(pool.map(run, trades))
+    
+    def _reserve_risk(self, market: Market, outcome: Outcome, size: float, price: float) -> tuple:
+        """
+        Check a buy against the risk limits and count it against them
+        
+        Returns:
+            Arguments for risk.apply() that release the reservation
+        
+        Raises:
+            ValueError: If the buy would breach a limit
+        """
+        self.risk.ensure_loaded(lambda: self.polymarket.get_positions())
+        self.risk.check(
+            outcome.token_id, size, price, market.slug, outcome.condition_id, market.neg_risk, reserve=True
+        )
+        return (outcome.token_id, -size, price, market.slug, outcome.condition_id, market.neg_risk)
+    
+    def refresh_risk(self) -> RiskEngine:
+        """Reload the positions the pre-trade risk checks are measured against"""
+        self.risk.load(self.polymarket.get_positions())
+        return self.risk
+    
+    def _await_verification(self, verification: Future, payment: PaymentInfo, timings: dict):
+        """Block until the facilitator has verified the payment (pre-post gate)"""
+        started = time.perf_counter()
+        response = verification.result()
+        timings['x402_verify_wait'] = time.perf_counter() - started
+        if not response.get('isValid'):
+            payment.status = "failed"
+            raise ValueError(f"x402 payment verification failed: {response.get('invalidReason', 'unknown reason')}")
+        payment.status = "verified"
+    
+    def _settle_trade(
+        self,
+        key: str,
+        resource: str,
+        result: TradeResult,
+        payment: PaymentInfo,
+        payload: dict,
+        requirements: dict
+    ) -> TradeResult:
+        """Settle a posted trade's payment, cancelling the order if settlement fails"""
+        started = time.perf_counter()
+        try:
+            self.x402.complete(resource, payment, payload, requirements)
+        except Exception as e:
+            # The batch this payment carried is settled with a later one
+            self.x402.release(resource, payment)
+            payment.status = "failed"
+            try:
+                cancelled = self.accounts.get(result.account).polymarket.cancel_order(result.order_id)
+            except RuntimeError as cancel_error:
+                print(f"Warning: {cancel_error}", file=sys.stderr)
+                cancelled = False
+            if cancelled:
+                result.status = OrderStatus.CANCELLED
+                result.error = f"{e} (order cancelled)"
+            else:
+                result.error = f"{e} (order could not be cancelled)"
+        result.timings['x402_settle'] = time.perf_counter() - started
+        
+        self._settlements.pop(key, None)
+        self._journal(result)
+        return result
+    
+    def wait_for_settlements(self, timeout: Optional[float] = None) -> List[TradeResult]:
+        """
+        Wait for outstanding x402 settlements of posted trades
+        
+        Trade results are updated in place: payment status becomes "settled",
+        or the order is cancelled when settlement fails.
+        
+        Returns:
+            Results whose settlement completed
+        """
+        done, _ = wait(list(self._settlements.values()), timeout=timeout)
+        return [future.result() for future in done]
+    
+    def _submit_order(
+        self,
+        key: str,
+        market_slug: str,
+        outcome: Outcome,
+        side: str,
+        price: float,
+        size: float,
+        amount_usdc: float,
+        before_post: Optional[Callable[[], None]] = None,
+        account: Optional[TradingAccount] = None,
+        expiration: int = 0
+    ) -> TradeResult:
+        """
+        Sign an order, durably record the intent, then post it
+        
+        before_post runs after signing and before anything is persisted or
+        sent; an exception from it aborts the order. The order is signed and
+        posted by account (default: the primary wallet), as a GTD order when
+        an expiration is given.
+        """
+        account = account or self.accounts.default
+        polymarket = account.polymarket
+        try:
+            signed_order = polymarket.sign_order(outcome.token_id, side, price, size, expiration)
+        except Exception as e:
+            result = polymarket._failed_result(outcome.name, amount_usdc, price, side, str(e))
+            result.client_order_key = key
+            result.account = account.name
+            return result
+        
+        if before_post is not None:
+            before_post()
+        
+        payload = signed_order.dict()
+        # The builder rounds price to the tick and size down; record the
+        # order as the CLOB sees it so reconciliation can find it
+        shares = int(payload['takerAmount' if side == "BUY" else 'makerAmount'])
+        usdc = int(payload['makerAmount' if side == "BUY" else 'takerAmount'])
+        intent = OrderIntent(
+            key=key,
+            market_slug=market_slug,
+            outcome_name=outcome.name,
+            token_id=outcome.token_id,
+            side=side,
+            # Tick sizes go down to 0.0001 and amounts are exact to well within half of that
+            price=round(usdc / shares, 4) if shares else price,
+            size=shares / 1e6,
+            amount_usdc=amount_usdc,
+            signed_order=payload,
+            status=IntentStatus.PENDING,
+            created_at=datetime.now(),
+            account=account.name
+        )
+        self.intents.save(intent)
+        
+        try:
+            resp = polymarket.post_signed_order(signed_order)
+        except Exception as e:
+            # The order may or may not have reached the CLOB; leave the intent
+            # pending so a retry with the same key or reconcile_intents() settles it
+            result = polymarket._failed_result(
+                outcome.name, amount_usdc, price, side,
+                f"{e} (order state unknown, pending reconciliation)"
+            )
+            result.client_order_key = key
+            result.account = account.name
+            return result
+        
+        result = polymarket.order_result(resp, outcome.name, side, intent.price, intent.size, amount_usdc)
+        result.client_order_key = key
+        result.account = account.name
+        self.intents.resolve(intent, result)
+        return result
+    
+    def _reconcile_intent(self, intent: OrderIntent) -> TradeResult:
+        """
+        Settle a pending intent against the CLOB
+        
+        If the order is found among open orders or trades it is marked posted;
+        otherwise the persisted signed order is re-posted, which the exchange
+        deduplicates by order hash.
+        """
+        polymarket = self.accounts.get(intent.account).polymarket
+        # Allow for clock skew between this host and the CLOB
+        since = intent.created_at - timedelta(minutes=1)
+        order = polymarket.find_order(intent.token_id, intent.side, intent.price, intent.size, since)
+        
+        if order is not None:
+            resp = {'success': True, 'orderID': order.get('id', ''), 'status': str(order.get('status', '')).lower()}
+        else:
+            resp = polymarket.post_signed_order(intent.signed_order)
+        
+        result = polymarket.order_result(
+            resp, intent.outcome_name, intent.side, intent.price, intent.size, intent.amount_usdc
+        )
+        result.market_slug = intent.market_slug
+        result.client_order_key = intent.key
+        result.account = intent.account
+        self.intents.resolve(intent, result)
+        return result
+    
+    def _resume_intent(self, intent: OrderIntent) -> TradeResult:
+        """Return the outcome of an already-submitted intent without placing a new order"""
+        if intent.status == IntentStatus.PENDING:
+            try:
+                result = self._reconcile_intent(intent)
+                self._journal(result)
+                return result
+            except Exception as e:
+                intent.error = f"{e} (order state unknown, pending reconciliation)"
+        
+        if intent.status == IntentStatus.POSTED:
+            matched = intent.order_status == OrderStatus.COMPLETED.value
+            resp = {'success': True, 'orderID': intent.order_id, 'status': 'matched' if matched else 'live'}
+        else:
+            resp = {'success': False, 'errorMsg': intent.error or 'Unknown error'}
+        
+        result = self.polymarket.order_result(
+            resp, intent.outcome_name, intent.side, intent.price, intent.size, intent.amount_usdc
+        )
+        result.market_slug = intent.market_slug
+        result.client_order_key = intent.key
+        result.account = intent.account
+        return result
+    
+    def reconcile_intents(self) -> List[TradeResult]:
+        """
+        Settle every pending order intent, e.g. after a crash or restart
+        
+        Returns:
+            TradeResult for each pending intent (failed if still unresolved)
+        """
+        return [self._resume_intent(intent) for intent in self.intents.pending()]
+    
+    def prepare(self, market_url: str, outcome_indices: Optional[List[int]] = None) -> List[OrderTemplate]:
+        """
+        Arm outcomes for latency-critical trading
+        
+        Resolves the market and token ids, caches tick size, neg-risk flag and
+        fee rate per token, derives API credentials and warms the CLOB
+        connection, so fire() only has to sign and post.
+        
+        Args:
+            market_url: Polymarket event URL or slug
+            outcome_indices: Outcomes to arm (defaults to all)
+        
+        Returns:
+            List of OrderTemplate, one per armed outcome
+        """
         market = self.get_market(market_url)
+        indices = range(len(market.outcomes)) if outcome_indices is None else outcome_indices
+        
+        templates = []
+        for index in indices:
+            if index >= len(market.outcomes):
+                raise ValueError(f"Invalid outcome index {index}. Market has {len(market.outcomes)} outcomes.")
+            outcome = market.outcomes[index]
+            templates.append(self.polymarket.prepare(outcome.token_id, market.slug, outcome.name))
+        
+        self.polymarket.warm()
+        return templates
+    
+    def fire(self, token_id: str, price: float, size: float, side: str = "BUY") -> TradeResult:
+        """
+        Hot-path order placement for a token armed with prepare()
         
-        if not market.active:
-            raise ValueError(f"Market '{market.title}' is not active")
+        Skips market fetch, balance checks and x402 gating; only checks cached
+        exchange approvals, signs and posts.
         
+        Args:
+            token_id: Prepared outcome token id
+            price: Limit price per share
+            size: Number of shares
+            side: "BUY" or "SELL"
+        
+        Returns:
+            TradeResult with sign/post timings
+        """
+        template = self.polymarket.templates.get(token_id)
+        approved = None
+        if template is not None:
+            approved = self._preflight(self.accounts.default, side, price * size, template.neg_risk)
+        result = self.polymarket.fire(token_id, price, size, side)
+        if approved is not None and result.status == OrderStatus.FAILED:
+            self.allowances.release(*approved)
+        self._journal(result)
+        self._track_order(result)
+        return result
+    
+    def work_order(
+        self,
+        market_url: str,
+        outcome_index: int,
+        algorithm: str,
+        side: str = "BUY",
+        size: Optional[float] = None,
+        amount_usdc: Optional[float] = None,
+        limit_price: Optional[float] = None,
+        on_child: Optional[Callable[[TradeResult], None]] = None,
+        **params
+    ) -> ExecutionAlgorithm:
+        """
+        Set up an execution algorithm to work a large order
+        
+        Child orders go through the fire() hot path (no x402 gating or
+        account routing): exchange approvals are checked, buys count against
+        the risk limits and every child is journaled like any other trade.
+        Children are not recorded as order intents; one that fails is never
+        re-posted, the algorithm places a fresh child instead.
+        
+        Examples:
+            client.work_order(slug, 0, "twap", amount_usdc=5000, duration=3600, slices=60).run()
+            client.work_order(slug, 1, "iceberg", size=20000, clip_size=500, limit_price=0.41).start()
+        
+        Args:
+            market_url: Polymarket event URL or slug
+            outcome_index: Index of outcome to trade
+            algorithm: "twap", "iceberg" or "liquidity"
+            side: "BUY" or "SELL"
+            size: Parent size in shares
+            amount_usdc: Parent budget in USDC (BUY only, instead of size)
+            limit_price: Worst price any child may trade at (optional)
+            on_child: Callback invoked with each child order's TradeResult
+            **params: Algorithm parameters (see poly402.execution)
+        
+        Returns:
+            ExecutionAlgorithm; call run() to block or start() for a Future
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown execution algorithm: {algorithm} (expected one of {', '.join(ALGORITHMS)})")
+        market = self.get_market(market_url)
         if outcome_index >= len(market.outcomes):
             raise ValueError(f"Invalid outcome index {outcome_index}. Market has {len(market.outcomes)} outcomes.")
-        
         outcome = market.outcomes[outcome_index]
+        self.polymarket.prepare(outcome.token_id, market.slug, outcome.name)
+        self.polymarket.warm()
+        
+        def fire(token_id: str, price: float, size: float, side: str) -> TradeResult:
+            reserved = None
+            if side == "BUY" and self.risk.enabled:
+                reserved = self._reserve_risk(market, outcome, size, price)
+            try:
+                result = self.fire(token_id, price, size, side)
+            except Exception:
+                if reserved is not None:
+                    self.risk.apply(*reserved)
+                raise
+            if reserved is not None and result.status == OrderStatus.FAILED:
+                self.risk.apply(*reserved)
+            return result
+        
+        return ALGORITHMS[algorithm](
+            self.polymarket,
+            outcome.token_id,
+            side=side,
+            size=size,
+            amount_usdc=amount_usdc,
+            limit_price=limit_price,
+            on_child=on_child,
+            fire=fire,
+            **params
+        )
+    
+    def neg_risk_events(self, limit: int = 1000) -> List[Market]:
+        """
+        Active neg-risk events with several outcomes, the arbitrage catalog
+        
+        Args:
+            limit: Number of active events to page through
+        
+        Returns:
+            List of Market objects
+        """
+        return [
+            market for page in self.market_parser.iter_active_markets(limit)
+            for market in page if ArbitrageScanner.eligible(market)
+        ]
+    
+    def find_arbitrage(
+        self,
+        limit: int = 1000,
+        min_edge: float = 0.005,
+        max_cost: Optional[float] = None
+    ) -> List[ArbitrageOpportunity]:
+        """
+        Scan active neg-risk events once for basket arbitrage
+        
+        Args:
+            limit: Number of active events to scan
+            min_edge: Minimum profit per basket share in USDC
+            max_cost: Maximum USDC to spend on one basket (optional)
+        
+        Returns:
+            Opportunities, most profitable first
+        """
+        scanner = ArbitrageScanner(self.polymarket, min_edge=min_edge, max_cost=max_cost)
+        return scanner.scan(self.neg_risk_events(limit))
+    
+    def execute_arbitrage(self, opportunity: ArbitrageOpportunity) -> List[TradeResult]:
+        """
+        Buy every leg of an arbitrage basket concurrently as fill-or-kill orders
+        
+        Legs go through the prepared-template hot path (no x402 gating or
+        account routing) and are journaled like any other trade.
+        
+        Returns:
+            TradeResult per leg; a leg that could not fill in full is FAILED
+        """
+        results = ArbitrageScanner(self.polymarket).execute(opportunity)
+        for result in results:
+            self._journal(result)
+        return results
+    
+    def _preflight(self, account: TradingAccount, side: str, amount_usdc: float, neg_risk: bool) -> Optional[tuple]:
+        """
+        Check an order against the account's cached exchange approvals before signing
+        
+        The wallet is only re-read from chain when the cache comes up short.
+        Approvals still missing are sent from externally owned wallets when
+        auto_approve is set.
+        
+        Returns:
+            Arguments for allowances.release() if a buy was deducted, else None
+        
+        Raises:
+            ValueError: If an approval is missing and cannot be set here
+        """
+        address = account.address
+        if not self.allowances.reserve(address, side, amount_usdc, neg_risk):
+            # Orders counted since the last read may have been cancelled,
+            # or the wallet approved elsewhere
+            self.allowances.load(address)
+            if not self.allowances.reserve(address, side, amount_usdc, neg_risk):
+                missing = self.allowances.shortfall(address, side, amount_usdc, neg_risk)
+                if not self.config.auto_approve or account.polymarket.proxy_address:
+                    raise ValueError(
+                        f"Account '{account.name}' is missing exchange approvals: {'; '.join(missing)}. "
+                        f"Run 'poly402 approve' to set them."
+                    )
+                print(f"Setting exchange approvals for account '{account.name}'...", file=sys.stderr)
+                self.approve(account.name)
+                if not self.allowances.reserve(address, side, amount_usdc, neg_risk):
+                    missing = self.allowances.shortfall(address, side, amount_usdc, neg_risk)
+                    raise ValueError(f"Account '{account.name}' is missing exchange approvals: {'; '.join(missing)}")
+        return (address, amount_usdc, neg_risk) if side == "BUY" else None
+    
+    def approve(self, account: Optional[str] = None) -> List[str]:
+        """
+        Grant an account's missing exchange approvals on chain
+        
+        Args:
+            account: Account name (default: the primary wallet)
         
-        # Step 2: Verify balances
-        polygon_balance = self._get_usdc_balance("polygon")
-        if polygon_balance < amount_usdc:
+        Returns:
+            Transaction hashes (empty if nothing was missing)
+        """
+        trading_account = self.accounts.get(account) if account else self.accounts.default
+        polymarket = trading_account.polymarket
+        if polymarket.proxy_address:
             raise ValueError(
-                f"Insufficient USDC balance on Polygon. "
-                f"Required: {amount_usdc}, Available: {polygon_balance}"
+                f"Account '{trading_account.name}' trades from a proxy wallet; approve it through Polymarket"
             )
+        tx_hashes = self.allowances.approve(trading_account.address, polymarket._private_key)
+        if tx_hashes:
+            try:
+                polymarket.sync_allowances()
+            except RuntimeError as e:
+                print(f"Warning: {e}", file=sys.stderr)
+        return tx_hashes
+    
+    def _track_order(self, result: TradeResult):
+        """Remember accounts with orders resting on markets that have a deadline"""
+        if result.status == OrderStatus.TRADING and self.lifecycle.tracked(result.market_slug):
+            self._order_accounts.setdefault(result.market_slug, set()).add(result.account)
+    
+    def _on_market_close(self, market: Market):
+        """Cancel resting orders on a market reaching its deadline and drop its cached state"""
+        token_ids = [token for o in market.outcomes for token in (o.token_id, o.no_token_id) if token]
+        self._closed[market.slug] = None
+        if len(self._closed) > 4096:
+            del self._closed[next(iter(self._closed))]
+        self._metadata_checked.pop(market.slug, None)
+        self.market_parser.forget(market.slug)
+        self.prices.evict(token_ids)
+        for account in self.accounts:
+            account.polymarket.forget(token_ids)
+        
+        # Whole-market cancels also catch orders placed outside this process
+        conditions = {o.condition_id for o in market.outcomes if o.condition_id}
+        for name in self._order_accounts.pop(market.slug, ()):
+            polymarket = self.accounts.get(name).polymarket
+            try:
+                if conditions:
+                    for condition_id in conditions:
+                        polymarket.cancel_market_orders(condition_id=condition_id)
+                else:
+                    for token_id in token_ids:
+                        polymarket.cancel_market_orders(token_id=token_id)
+            except RuntimeError as e:
+                print(f"Warning: Could not cancel orders on {market.slug} for account '{name}': {e}", file=sys.stderr)
+    
+    def _journal(self, result: TradeResult):
+        """Queue a trade result for the local journal"""
+        if self.journal is not None:
+            self.journal.record(result)
+    
+    def get_trade_history(
+        self,
+        market: Optional[str] = None,
+        outcome: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 50,
+        account: Optional[str] = None
+    ) -> List[TradeResult]:
+        """
+        Query the local trade journal, newest first
         
-        # Step 3: Verify x402 payment capability (check Base balance)
-        # In a full implementation, this would involve actual x402 payment flow
-        base_balance = self._get_usdc_balance("base")
-        if base_balance < self.config.x402_max_payment:
-            print(f"Warning: Low USDC balance on Base for x402 payments: {base_balance}")
+        Args:
+            market: Polymarket event URL or slug
+            outcome: Outcome name
+            status: OrderStatus value (e.g. "completed", "failed")
+            since: Only trades at or after this time
+            until: Only trades before this time
+            limit: Maximum number of results
+            account: Only trades placed by this account
         
-        # Step 4: Execute Polymarket trade
-        result = self.polymarket.create_buy_order(
-            outcome=outcome,
-            amount_usdc=amount_usdc,
-            max_price=max_price
+        Returns:
+            List of TradeResult objects
+        """
+        if self.journal is None:
+            return []
+        
+        self.journal.flush()
+        return self.journal.query(
+            market_slug=self.market_parser.extract_slug(market) if market else None,
+            outcome_name=outcome,
+            status=status,
+            since=since,
+            until=until,
+            limit=limit,
+            account=account
         )
+    
+    def get_price_history(
+        self,
+        token_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        resolution: Optional[str] = None,
+        refresh: bool = False
+    ) -> List[PriceBar]:
+        """
+        Query the local price history of a token
         
-        # Update result with market info
-        result.market_slug = market.slug
+        Args:
+            token_id: Outcome token id
+            start: Only prices at or after this time
+            end: Only prices before this time
+            resolution: Bar width, e.g. "1m", "1h", "1d" or seconds (optional;
+                raw observations when omitted)
+            refresh: First backfill newer history from the CLOB (the full
+                history if the token was never backfilled)
         
-        return result
+        Returns:
+            List of PriceBar, oldest first
+        """
+        if refresh:
+            self.backfill_prices([token_id])
+        return self.prices.get_price_history(
+            token_id,
+            start.timestamp() if start else None,
+            end.timestamp() if end else None,
+            resolution
+        )
+    
+    def backfill_prices(self, token_ids: List[str], fidelity: int = 1, max_workers: int = 8) -> Dict[str, int]:
+        """
+        Fetch CLOB price history newer than each token's last backfill, concurrently
+        
+        Args:
+            token_ids: Outcome token ids
+            fidelity: History resolution in minutes
+            max_workers: Maximum number of concurrent requests
+        
+        Returns:
+            Dictionary of token id to number of stored observations added
+        """
+        def backfill(token_id: str) -> int:
+            # Resume from the last backfill rather than the newest stored
+            # tick: live ticks recorded first would otherwise hide the history
+            since = self.prices.backfilled(token_id)
+            history = self.polymarket.get_price_history(token_id, start_ts=since, fidelity=fidelity)
+            if not history:
+                return 0
+            timestamps, prices = zip(*history)
+            added = self.prices.append(token_id, timestamps, prices)
+            self.prices.mark_backfilled(token_id, timestamps[-1])
+            return added
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(token_ids) or 1)) as pool:
+            return dict(zip(token_ids, pool.map(backfill, token_ids)))
     
     def get_balance(self, network: str = "both") -> dict:
         """
@@ -163,44 +1046,99 @@ class Poly402Client:
         
         return balances
     
-    def _get_usdc_balance(self, network: str) -> float:
-        """Get USDC balance for a network"""
+    def _get_usdc_balance(self, network: str, address: Optional[str] = None) -> float:
+        """
+        Get USDC balance for a network
+        
+        Args:
+            network: "base" or "polygon"
+            address: Address to check (default: the configured wallet)
+        
+        Raises:
+            RuntimeError: If no RPC endpoint could provide the balance
+        """
+        if network == "base":
+            w3 = self.base_w3
+            usdc_address = self.USDC_BASE
+            account = address or self.base_account.address
+        elif network == "polygon":
+            w3 = self.polygon_w3
+            usdc_address = self.USDC_POLYGON
+            account = address or self.polygon_account.address
+        else:
+            raise ValueError(f"Unknown network: {network}")
+        
+        # USDC ERC20 ABI (balanceOf only)
+        usdc_abi = [
+            {
+                "constant": True,
+                "inputs": [{"name": "_owner", "type": "address"}],
+                "name": "balanceOf",
+                "outputs": [{"name": "balance", "type": "uint256"}],
+                "type": "function"
+            }
+        ]
+        
         try:
-            if network == "base":
-                w3 = self.base_w3
-                usdc_address = self.USDC_BASE
-                account = self.base_account.address
-            elif network == "polygon":
-                w3 = self.polygon_w3
-                usdc_address = self.USDC_POLYGON
-                account = self.polygon_account.address
-            else:
-                return 0.0
-            
-            # USDC ERC20 ABI (balanceOf only)
-            usdc_abi = [
-                {
-                    "constant": True,
-                    "inputs": [{"name": "_owner", "type": "address"}],
-                    "name": "balanceOf",
-                    "outputs": [{"name": "balance", "type": "uint256"}],
-                    "type": "function"
-                }
-            ]
-            
             contract = w3.eth.contract(address=usdc_address, abi=usdc_abi)
             balance_wei = contract.functions.balanceOf(account).call()
-            
-            # USDC has 6 decimals
-            return balance_wei / 1e6
         except Exception as e:
-            print(f"Warning: Could not fetch USDC balance for {network}: {e}")
-            return 0.0
+            raise RuntimeError(f"Could not fetch USDC balance for {network}: {e}")
+            
+        # USDC has 6 decimals
+        return balance_wei / 1e6
+    
+    def get_positions(self, value: bool = True, max_workers: int = 16) -> List[Position]:
+        """
+        Get open positions aggregated per token id
+        
+        Args:
+            value: Fetch order books concurrently to value each position
+            max_workers: Maximum number of concurrent book requests
+            
+        Returns:
+            List of Position objects
+        """
+        positions = self.polymarket.get_positions()
+        if value:
+            self.polymarket.value_positions(positions, max_workers=max_workers)
+        return positions
+    
+    def close_positions(
+        self,
+        positions: Optional[List[Position]] = None,
+        min_price: Optional[float] = None,
+        max_workers: int = 16
+    ) -> List[TradeResult]:
+        """
+        Sell positions at their best bid in one concurrent batch
+        
+        Args:
+            positions: Positions to close (defaults to all open positions)
+            min_price: Minimum price per share (optional)
+            max_workers: Maximum number of orders in flight
+            
+        Returns:
+            List of TradeResult, one per position
+        """
+        if positions is None:
+            positions = self.get_positions(max_workers=max_workers)
+        for neg_risk in {position.neg_risk for position in positions}:
+            self._preflight(self.accounts.default, "SELL", 0.0, neg_risk)
+        return self.polymarket.close_positions(positions, min_price=min_price, max_workers=max_workers)
     
     def search_markets(self, query: str, limit: int = 10):
         """Search for markets"""
         return self.market_parser.search_markets(query, limit)
     
+    def search_many(self, queries, limit: int = 10, rank: str = 'relevance', max_workers: int = 16):
+        """Search for markets with many queries, deduplicated and ranked"""
+        return self.market_parser.search_many(queries, limit, rank, max_workers)
+    
     def get_active_markets(self, limit: int = 100):
         """Get active markets"""
         return self.market_parser.get_active_markets(limit)
+    
+    def iter_active_markets(self, limit: int = 100, page_size: int = 100):
+        """Get active markets one page at a time"""
+        return self.market_parser.iter_active_markets(limit, page_size)
@@ -5,8 +5,8 @@ Configuration management for poly402
 import json
 import os
 from pathlib import Path
-from typing import Optional
-from .models import Config
+from typing import Any, Dict, Optional
+from .models import Config, AccountProfile
 
 
 class ConfigManager:
@@ -14,7 +14,7 @@ class ConfigManager:
     
     DEFAULT_CONFIG_PATH = Path.home() / ".poly402" / "config.json"
     
-    DEFAULT_CONFIG = {
+    DEFAULT_CONFIG: Dict[str, Any] = {
         "networks": {
             "base": {
                 "rpc_url": "https://mainnet.base.org",
@@ -30,20 +30,42 @@ class ConfigManager:
         "polymarket": {
             "clob_endpoint": "https://clob.polymarket.com",
             "gamma_endpoint": "https://gamma-api.polymarket.com",
+            "data_endpoint": "https://data-api.polymarket.com",
             "api_key": "",
             "api_secret": "",
             "api_passphrase": ""
         },
         "x402": {
             "facilitator": "https://x402.coinbase.com",
-            "max_payment_amount": "100.00"
+            "max_payment_amount": "100.00",
+            "resource": "",
+            "batch_threshold": "0"
+        },
+        "journal": {
+            "enabled": True,
+            "path": "~/.poly402/journal.db"
+        },
+        "prices": {
+            "path": "~/.poly402/prices"
+        },
+        "risk": {
+            "max_event_exposure": None,
+            "max_market_exposure": None,
+            "max_loss": None
+        },
+        "lifecycle": {
+            "close_lead": 300,
+            "gtd_orders": False
+        },
+        "allowances": {
+            "auto_approve": False
         }
     }
     
     def __init__(self, config_path: Optional[str] = None):
         """Initialize configuration manager"""
         self.config_path = Path(config_path) if config_path else self.DEFAULT_CONFIG_PATH
-        
+    
     def load(self) -> Config:
         """Load configuration from file"""
         if not self.config_path.exists():
@@ -68,12 +90,20 @@ class ConfigManager:
         if polygon_key and not polygon_key.startswith('0x'):
             raise ValueError("Polygon network private key must start with '0x'")
         
+        journal = data.get('journal', self.DEFAULT_CONFIG['journal'])
+        risk = data.get('risk') or {}
+        lifecycle = data.get('lifecycle') or {}
+        allowances = data.get('allowances') or {}
+        accounts = data.get('accounts') or {}
+        base_rpc_urls = self._rpc_urls(data['networks']['base'])
+        polygon_rpc_urls = self._rpc_urls(data['networks']['polygon'])
+        
         return Config(
             base_private_key=base_key,
-            base_rpc_url=data['networks']['base']['rpc_url'],
+            base_rpc_url=base_rpc_urls[0],
             base_chain_id=data['networks']['base']['chain_id'],
             polygon_private_key=polygon_key,
-            polygon_rpc_url=data['networks']['polygon']['rpc_url'],
+            polygon_rpc_url=polygon_rpc_urls[0],
             polygon_chain_id=data['networks']['polygon']['chain_id'],
             polymarket_clob_endpoint=data['polymarket']['clob_endpoint'],
             polymarket_gamma_endpoint=data['polymarket']['gamma_endpoint'],
@@ -81,7 +111,56 @@ class ConfigManager:
             polymarket_api_secret=data['polymarket'].get('api_secret'),
             polymarket_api_passphrase=data['polymarket'].get('api_passphrase'),
             x402_facilitator=data['x402']['facilitator'],
-            x402_max_payment=float(data['x402']['max_payment_amount'])
+            x402_max_payment=float(data['x402']['max_payment_amount']),
+            x402_resource=data['x402'].get('resource') or None,
+            x402_batch_threshold=float(data['x402'].get('batch_threshold', 0)),
+            polymarket_data_endpoint=data['polymarket'].get(
+                'data_endpoint', self.DEFAULT_CONFIG['polymarket']['data_endpoint']
+            ),
+            journal_enabled=journal.get('enabled', True),
+            journal_path=journal.get('path', self.DEFAULT_CONFIG['journal']['path']),
+            prices_path=data.get('prices', {}).get('path', self.DEFAULT_CONFIG['prices']['path']),
+            base_rpc_urls=base_rpc_urls,
+            polygon_rpc_urls=polygon_rpc_urls,
+            accounts=[self._account_profile(profile) for profile in accounts.get('profiles', [])],
+            account_routing=accounts.get('routing', 'round_robin'),
+            risk_max_event_exposure=self._limit(risk.get('max_event_exposure')),
+            risk_max_market_exposure=self._limit(risk.get('max_market_exposure')),
+            risk_max_loss=self._limit(risk.get('max_loss')),
+            lifecycle_lead=float(lifecycle.get('close_lead', 300)),
+            lifecycle_gtd_orders=bool(lifecycle.get('gtd_orders', False)),
+            auto_approve=bool(allowances.get('auto_approve', False))
+        )
+    
+    @staticmethod
+    def _limit(value) -> Optional[float]:
+        """Optional numeric risk limit (unset, null or empty disables it)"""
+        return None if value in (None, "") else float(value)
+    
+    def _rpc_urls(self, network_config: dict) -> list:
+        """RPC endpoints for a network: rpc_url first, then any extra rpc_urls"""
+        urls = [network_config.get('rpc_url')] + list(network_config.get('rpc_urls') or [])
+        return list(dict.fromkeys(url for url in urls if url))
+    
+    def _account_profile(self, profile: dict) -> AccountProfile:
+        """Build a sub-account profile, honouring POLY402_ACCOUNT_<NAME>_KEY"""
+        name = profile['name']
+        env_name = f"POLY402_ACCOUNT_{name.upper().replace('-', '_')}_KEY"
+        key = os.getenv(env_name) or profile.get('polygon_private_key', '')
+        
+        if not key:
+            raise ValueError(f"Account '{name}' has no polygon_private_key (or {env_name})")
+        if not key.startswith('0x'):
+            raise ValueError(f"Account '{name}' private key must start with '0x'")
+        
+        return AccountProfile(
+            name=name,
+            polygon_private_key=key,
+            signature_type=profile.get('signature_type', 2),
+            proxy_address=profile.get('proxy_address'),
+            api_key=profile.get('api_key') or None,
+            api_secret=profile.get('api_secret') or None,
+            api_passphrase=profile.get('api_passphrase') or None
         )
     
     def save(self, config: dict):
@@ -103,13 +182,21 @@ class ConfigManager:
             if key not in data:
                 raise ValueError(f"Missing required configuration section: {key}")
         
+        accounts = data.get('accounts') or {}
+        if accounts.get('routing', 'round_robin') not in ('round_robin', 'balance'):
+            raise ValueError("accounts.routing must be 'round_robin' or 'balance'")
+        names = [profile.get('name') for profile in accounts.get('profiles', [])]
+        if not all(names) or len(set(names)) != len(names) or 'default' in names:
+            raise ValueError("Account profiles need unique names other than 'default'")
+        
         # Validate network configs
         for network in ['base', 'polygon']:
             if network not in data['networks']:
                 raise ValueError(f"Missing network configuration: {network}")
             
             network_config = data['networks'][network]
-            if 'rpc_url' not in network_config or 'chain_id' not in network_config:
+            has_rpc = network_config.get('rpc_url') or network_config.get('rpc_urls')
+            if not has_rpc or 'chain_id' not in network_config:
                 raise ValueError(f"Invalid {network} network configuration")
     
     def exists(self) -> bool:
@@ -0,0 +1,465 @@
+"""
+Execution algorithms that work a large order as a series of child orders
+"""
+
+import math
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+from .models import ExecutionReport, OrderStatus, TradeResult
+
+Levels = List[Tuple[float, float]]
+
+# Order statuses under which a child can still fill
+LIVE_STATUSES = ('LIVE', 'DELAYED')
+
+# Consecutive rejected child orders before an algorithm gives up
+MAX_FAILURES = 3
+
+# Status polls after cancelling a child before the cancel is left pending,
+# and the seconds between them (the CLOB can lag behind a cancel)
+CANCEL_POLLS = 3
+CANCEL_POLL_INTERVAL = 0.2
+
+
+class _Child:
+    """The one live child order of an algorithm"""
+    
+    __slots__ = ('order_id', 'price', 'size', 'filled')
+    
+    def __init__(self, order_id: str, price: float, size: float):
+        self.order_id = order_id
+        self.price = price
+        self.size = size
+        self.filled = 0.0
+
+
+class ExecutionAlgorithm(ABC):
+    """
+    Works a parent order through a sequence of child limit orders
+    
+    At most one child order is live at a time. Each pass reads the order
+    book, syncs the live child's fills from the CLOB and lets the algorithm
+    keep, re-price or replace it. A parent is sized either in shares or, for
+    buys, as a USDC budget; it is done once less than min_size shares remain
+    (the CLOB's minimum order size). Subclasses implement step().
+    
+    A cancelled child the CLOB still reports live is followed until it
+    closes, and its open size counts against the parent meanwhile, so late
+    fills never overfill it.
+    """
+    
+    name = ""
+    
+    def __init__(
+        self,
+        polymarket,
+        token_id: str,
+        side: str = "BUY",
+        size: Optional[float] = None,
+        amount_usdc: Optional[float] = None,
+        limit_price: Optional[float] = None,
+        interval: float = 1.0,
+        timeout: Optional[float] = None,
+        min_size: float = 5.0,
+        on_child: Optional[Callable[[TradeResult], None]] = None,
+        fire: Optional[Callable[[str, float, float, str], TradeResult]] = None
+    ):
+        """
+        Initialize execution algorithm
+        
+        Args:
+            polymarket: PolymarketClient placing the child orders
+            token_id: Outcome token id
+            side: "BUY" or "SELL"
+            size: Parent size in shares
+            amount_usdc: Parent budget in USDC (BUY only, instead of size)
+            limit_price: Worst price any child may trade at (optional)
+            interval: Seconds between passes
+            timeout: Give up after this many seconds (optional)
+            min_size: Smallest child order in shares
+            on_child: Callback invoked with each child order's TradeResult
+            fire: Places a child order as fire(token_id, price, size, side)
+                (default: polymarket.fire, which skips the allowance, risk
+                and journal checks of Poly402Client.work_order)
+        """
+        if side not in ("BUY", "SELL"):
+            raise ValueError(f"Invalid side: {side}")
+        if (size is None) == (amount_usdc is None):
+            raise ValueError("Specify exactly one of size or amount_usdc")
+        if side == "SELL" and amount_usdc is not None:
+            raise ValueError("SELL orders are sized in shares")
+        
+        self.polymarket = polymarket
+        self.token_id = token_id
+        self.side = side
+        self.limit_price = limit_price
+        self.interval = interval
+        self.timeout = timeout
+        self.min_size = min_size
+        self.on_child = on_child
+        self._fire = fire or polymarket.fire
+        
+        template = polymarket.templates.get(token_id) or polymarket.prepare(token_id)
+        self.tick = float(template.tick_size)
+        self.report = ExecutionReport(
+            algorithm=self.name,
+            token_id=token_id,
+            side=side,
+            size=size,
+            amount_usdc=amount_usdc,
+            limit_price=limit_price,
+            market_slug=template.market_slug,
+            outcome_name=template.outcome_name
+        )
+        self._child: Optional[_Child] = None
+        self._cancelling: List[_Child] = []  # Cancelled children the CLOB still reports live
+        self._failures = 0
+        self._reference_price: Optional[float] = limit_price
+        self._stop = threading.Event()
+    
+    @abstractmethod
+    def step(self, bids: Levels, asks: Levels):
+        """Decide on child orders given the current book (best levels first)"""
+    
+    def run(self, stop: Optional[threading.Event] = None) -> ExecutionReport:
+        """
+        Work the parent order until it is filled, stopped or timed out
+        
+        The live child order is cancelled on the way out.
+        
+        Args:
+            stop: Event that ends the run when set (cancel() sets the
+                algorithm's own event)
+        
+        Returns:
+            The final ExecutionReport
+        """
+        if stop is not None:
+            self._stop = stop
+        report = self.report
+        report.started_at = datetime.now()
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        
+        try:
+            while not self._stop.is_set() and not self.done:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                started = time.monotonic()
+                try:
+                    self._sync()
+                    bids, asks = self.polymarket.get_books([self.token_id]).get(self.token_id, ([], []))
+                except RuntimeError as e:
+                    # Transient CLOB errors skip a pass rather than end the run
+                    print(f"Warning: {self.name} pass skipped: {e}", file=sys.stderr)
+                else:
+                    if self.done:
+                        break
+                    self._reference_price = self._cap(self._take_price(bids, asks)) or self._reference_price
+                    self.step(bids, asks)
+                self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+        except Exception as e:
+            report.error = str(e)
+        finally:
+            try:
+                self._cancel_child()
+                self._sync()
+            except RuntimeError as e:
+                report.error = report.error or str(e)
+            if self._cancelling:
+                orders = ', '.join(child.order_id for child in self._cancelling)
+                report.error = report.error or f"Cancel of child order(s) {orders} not confirmed; they may still fill"
+            report.finished_at = datetime.now()
+        return report
+    
+    def start(self) -> Future:
+        """
+        Run in a background thread
+        
+        Returns:
+            Future resolving to the final ExecutionReport
+        """
+        future: Future = Future()
+        
+        def work():
+            try:
+                future.set_result(self.run())
+            except BaseException as e:
+                future.set_exception(e)
+        
+        threading.Thread(target=work, name=f"poly402-{self.name}", daemon=True).start()
+        return future
+    
+    def cancel(self):
+        """Stop working the order; the live child is cancelled"""
+        self._stop.set()
+    
+    @property
+    def done(self) -> bool:
+        """Whether too little of the parent remains for another child order and no cancelled child can still fill"""
+        if self._cancelling:
+            return False
+        if self.report.size is not None:
+            return self.remaining() < self.min_size
+        # A USDC budget is measured in shares at the best price we could pay
+        return self._reference_price is not None and self.remaining(self._reference_price) < self.min_size
+    
+    def remaining(self, price: Optional[float] = None, fraction: float = 1.0) -> float:
+        """
+        Shares still to trade for the first fraction of the parent
+        
+        Args:
+            price: Price per share (converts a USDC budget into shares)
+            fraction: Portion of the parent due so far (TWAP schedules)
+        
+        Raises:
+            ValueError: If the parent is a USDC budget and no price is given
+        """
+        report = self.report
+        pending = [(child.size - child.filled, child.price) for child in self._cancelling]
+        if report.size is not None:
+            return max(report.size * fraction - report.filled_size - sum(size for size, _ in pending), 0.0)
+        if not price or report.amount_usdc is None:
+            raise ValueError("A USDC-sized parent needs a reference price to size child orders")
+        committed = report.notional + sum(size * child_price for size, child_price in pending)
+        return max(report.amount_usdc * fraction - committed, 0.0) / price
+    
+    def _take_price(self, bids: Levels, asks: Levels) -> Optional[float]:
+        """Best price on the opposite side of the book"""
+        levels = asks if self.side == "BUY" else bids
+        return levels[0][0] if levels else None
+    
+    def _join_price(self, bids: Levels, asks: Levels) -> Optional[float]:
+        """Best price on our own side of the book"""
+        levels = bids if self.side == "BUY" else asks
+        return levels[0][0] if levels else None
+    
+    def _cap(self, price: Optional[float]) -> Optional[float]:
+        """Bound a price by the limit price"""
+        if price is None or self.limit_price is None:
+            return price
+        return min(price, self.limit_price) if self.side == "BUY" else max(price, self.limit_price)
+    
+    def _within_limit(self, price: float) -> bool:
+        if self.limit_price is None:
+            return True
+        return price <= self.limit_price if self.side == "BUY" else price >= self.limit_price
+    
+    def _place(self, price: float, size: float) -> Optional[TradeResult]:
+        """Post a child order; returns None if it would be below min_size"""
+        # Snap to the tick grid on the conservative side of the limit
+        ticks = price / self.tick
+        ticks = math.floor(ticks + 1e-9) if self.side == "BUY" else math.ceil(ticks - 1e-9)
+        price = min(max(round(ticks * self.tick, 6), self.tick), 1 - self.tick)
+        size = math.floor(size * 100) / 100
+        if size < self.min_size:
+            return None
+        
+        result = self._fire(self.token_id, price, size, self.side)
+        self.report.child_orders += 1
+        if self.on_child:
+            self.on_child(result)
+        
+        if result.status == OrderStatus.FAILED:
+            self.report.failed_orders += 1
+            self._failures += 1
+            if self._failures >= MAX_FAILURES:
+                raise RuntimeError(f"Child order failed {self._failures} times: {result.error}")
+            return result
+        self._failures = 0
+        
+        child = _Child(result.order_id, price, size)
+        if result.status == OrderStatus.COMPLETED:
+            # Matched in full on arrival
+            self._fill(child, size)
+        else:
+            self._child = child
+        return result
+    
+    def _fill(self, child: _Child, matched: float):
+        delta = matched - child.filled
+        if delta > 0:
+            child.filled = matched
+            self.report.filled_size += delta
+            self.report.notional += delta * child.price
+    
+    def _open(self, child: _Child) -> bool:
+        """Record new fills of a child; returns whether it can still fill"""
+        order = self.polymarket.get_order(child.order_id)
+        self._fill(child, float(order.get('size_matched') or 0))
+        return (order.get('status') or '').upper() in LIVE_STATUSES and child.filled < child.size - 1e-9
+    
+    def _sync(self):
+        """Record new fills of our children, forgetting each once it is closed"""
+        self._cancelling = [child for child in self._cancelling if self._open(child)]
+        if self._child is not None and not self._open(self._child):
+            self._child = None
+    
+    def _cancel_child(self):
+        """Cancel the live child and record any fills up to the cancel"""
+        child = self._child
+        if child is None:
+            return
+        try:
+            self.polymarket.cancel_order(child.order_id)
+        except RuntimeError:
+            pass  # Already filled or closed; the polls below tell
+        for attempt in range(CANCEL_POLLS):
+            if attempt:
+                time.sleep(CANCEL_POLL_INTERVAL)
+            try:
+                if not self._open(child):
+                    break
+            except RuntimeError:
+                continue
+        else:
+            # Still reported live; keep following it until it closes
+            self._cancelling.append(child)
+        self._child = None
+        self.report.cancelled_orders += 1
+
+
+class TWAP(ExecutionAlgorithm):
+    """
+    Time-weighted execution in equal slices over a duration
+    
+    Each slice posts a marketable child for whatever of the schedule is
+    still due, capped at the limit price. A child still resting when its
+    slice ends is cancelled and its remainder rolls into the next slice.
+    """
+    
+    name = "twap"
+    
+    def __init__(self, polymarket, token_id: str, duration: float, slices: int = 10, **kwargs):
+        """
+        Initialize TWAP
+        
+        Args:
+            duration: Seconds over which to spread the parent order
+            slices: Number of equal slices
+            **kwargs: See ExecutionAlgorithm (timeout defaults to the
+                duration plus one slice to catch up)
+        """
+        if slices < 1:
+            raise ValueError("TWAP needs at least one slice")
+        kwargs.setdefault('timeout', duration * (1 + 1 / slices))
+        super().__init__(polymarket, token_id, **kwargs)
+        self.duration = duration
+        self.slices = slices
+        self._started: Optional[float] = None
+        self._slice = -1
+    
+    def step(self, bids: Levels, asks: Levels):
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+        index = min(int((now - self._started) / (self.duration / self.slices)), self.slices - 1)
+        if index != self._slice:
+            self._cancel_child()
+            self._slice = index
+        if self._child is not None:
+            return
+        
+        price = self._cap(self._take_price(bids, asks)) or self._cap(self._join_price(bids, asks)) or self.limit_price
+        if price is None:
+            return
+        self._place(price, self.remaining(price, (index + 1) / self.slices))
+
+
+class Iceberg(ExecutionAlgorithm):
+    """
+    Passive execution showing only clip_size shares at a time
+    
+    One clip rests at the best price on our side of the book. When the book
+    moves away from it the clip is cancelled and re-posted at the new best
+    price (never past the limit); when it fills, the next clip is posted.
+    """
+    
+    name = "iceberg"
+    
+    def __init__(self, polymarket, token_id: str, clip_size: float, **kwargs):
+        """
+        Initialize iceberg
+        
+        Args:
+            clip_size: Visible size of each child order in shares
+            **kwargs: See ExecutionAlgorithm
+        """
+        super().__init__(polymarket, token_id, **kwargs)
+        self.clip_size = clip_size
+    
+    def step(self, bids: Levels, asks: Levels):
+        price = self._cap(self._join_price(bids, asks)) or self.limit_price
+        if price is None:
+            return
+        if self._child is not None:
+            # Our own clip is part of the book, so it only differs from the
+            # best price once someone improved on it or the book moved
+            if abs(self._child.price - price) < self.tick / 2:
+                return
+            self._cancel_child()
+            if self.done:
+                return
+        self._place(price, min(self.clip_size, self.remaining(price)))
+
+
+class LiquiditySeeking(ExecutionAlgorithm):
+    """
+    Takes a share of the displayed liquidity within the limit each pass
+    
+    Child orders are sized from the depth available on the opposite side of
+    the book up to the limit price, so a thin book is never swept. Children
+    do not rest: whatever did not match is cancelled on the next pass,
+    after the book has had interval seconds to refill.
+    """
+    
+    name = "liquidity"
+    
+    def __init__(
+        self,
+        polymarket,
+        token_id: str,
+        participation: float = 0.5,
+        max_clip: Optional[float] = None,
+        **kwargs
+    ):
+        """
+        Initialize liquidity-seeking execution
+        
+        Args:
+            participation: Fraction of the displayed depth to take per pass
+            max_clip: Largest child order in shares (optional)
+            **kwargs: See ExecutionAlgorithm
+        """
+        if not 0 < participation <= 1:
+            raise ValueError("participation must be in (0, 1]")
+        super().__init__(polymarket, token_id, **kwargs)
+        self.participation = participation
+        self.max_clip = max_clip
+    
+    def step(self, bids: Levels, asks: Levels):
+        self._cancel_child()
+        if self.done:
+            return
+        
+        depth = 0.0
+        price = None
+        for level_price, level_size in (asks if self.side == "BUY" else bids):
+            if not self._within_limit(level_price):
+                break
+            depth += level_size
+            price = level_price
+        if price is None:
+            return
+        
+        size = min(depth * self.participation, self.remaining(price))
+        if self.max_clip is not None:
+            size = min(size, self.max_clip)
+        self._place(price, size)
+
+
+ALGORITHMS = {algorithm.name: algorithm for algorithm in (TWAP, Iceberg, LiquiditySeeking)}
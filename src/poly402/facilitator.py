@@ -0,0 +1,243 @@
+"""
+Local x402 facilitator and paid resource for development and testing
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Set, Tuple
+from eth_account import Account
+from eth_account.messages import encode_typed_data
+from web3 import Web3
+from .x402 import (
+    X402_VERSION, NETWORKS, authorization_typed_data, decode_payment_header, encode_payment_header
+)
+
+
+class LocalFacilitator:
+    """
+    In-process stand-in for an x402 facilitator
+    
+    Serves the facilitator API (/verify, /settle, /supported) plus a paid
+    resource at /trade that answers with a 402 challenge. Signatures, amounts,
+    recipients, validity windows and nonce reuse are checked exactly as a real
+    facilitator would; settlement is simulated and returns a deterministic
+    pseudo transaction hash instead of submitting transferWithAuthorization.
+    """
+    
+    USDC = {
+        8453: "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
+        84532: "0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+    }
+    
+    def __init__(
+        self,
+        pay_to: str,
+        price_usdc: float = 0.01,
+        chain_id: int = 8453,
+        host: str = "127.0.0.1",
+        port: int = 4020
+    ):
+        """
+        Initialize local facilitator
+        
+        Args:
+            pay_to: Address that receives trade fees
+            price_usdc: Fee charged per access to /trade
+            chain_id: Base chain ID the authorizations are signed for
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        self.pay_to = Web3.to_checksum_address(pay_to)
+        self.price_usdc = price_usdc
+        self.chain_id = chain_id
+        self.network = NETWORKS.get(chain_id, str(chain_id))
+        self.host = host
+        self.port = port
+        self.settled: list = []
+        self._used_nonces: Set[str] = set()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        """Base URL of the facilitator"""
+        return f"http://{self.host}:{self.port}"
+    
+    def requirements(self, resource: str) -> dict:
+        """Payment requirements advertised for a resource"""
+        return {
+            "scheme": "exact",
+            "network": self.network,
+            "maxAmountRequired": str(int(round(self.price_usdc * 1e6))),
+            "resource": resource,
+            "description": "poly402 trade execution fee",
+            "mimeType": "application/json",
+            "payTo": self.pay_to,
+            "maxTimeoutSeconds": 60,
+            "asset": self.USDC.get(self.chain_id, self.USDC[8453]),
+            "extra": {"name": "USD Coin", "version": "2"},
+        }
+    
+    def verify(self, payload: dict, requirements: dict) -> Tuple[bool, Optional[str], Optional[str]]:
+        """
+        Check a payment payload against requirements
+        
+        Returns:
+            Tuple of (is_valid, invalid_reason, payer)
+        """
+        try:
+            authorization = payload['payload']['authorization']
+            signature = payload['payload']['signature']
+        except (KeyError, TypeError):
+            return False, "invalid_payload", None
+        
+        payer = authorization.get('from')
+        now = int(time.time())
+        
+        if payload.get('scheme') != "exact" or requirements.get('scheme') != "exact":
+            return False, "unsupported_scheme", payer
+        if payload.get('network') != self.network or requirements.get('network') != self.network:
+            return False, "invalid_network", payer
+        if authorization['to'].lower() != requirements['payTo'].lower():
+            return False, "invalid_exact_evm_payload_recipient_mismatch", payer
+        if int(authorization['value']) < int(requirements['maxAmountRequired']):
+            return False, "invalid_exact_evm_payload_authorization_value", payer
+        if int(authorization['validAfter']) > now:
+            return False, "invalid_exact_evm_payload_authorization_valid_after", payer
+        if int(authorization['validBefore']) <= now:
+            return False, "invalid_exact_evm_payload_authorization_valid_before", payer
+        if authorization['nonce'].lower() in self._used_nonces:
+            return False, "invalid_exact_evm_payload_authorization_nonce_used", payer
+        
+        try:
+            signable = encode_typed_data(full_message=authorization_typed_data(authorization, requirements, self.chain_id))
+            signer = Account.recover_message(signable, signature=signature)
+        except Exception:
+            return False, "invalid_exact_evm_payload_signature", payer
+        if signer.lower() != payer.lower():
+            return False, "invalid_exact_evm_payload_signature", payer
+        
+        return True, None, payer
+    
+    def settle(self, payload: dict, requirements: dict) -> dict:
+        """Verify a payment and record it as settled"""
+        with self._lock:
+            valid, reason, payer = self.verify(payload, requirements)
+            if not valid:
+                return {
+                    "success": False,
+                    "errorReason": reason,
+                    "transaction": "",
+                    "network": self.network,
+                    "payer": payer,
+                }
+            authorization = payload['payload']['authorization']
+            self._used_nonces.add(authorization['nonce'].lower())
+            self.settled.append(authorization)
+        
+        return {
+            "success": True,
+            "errorReason": None,
+            "transaction": Web3.to_hex(Web3.keccak(text=payload['payload']['signature'])),
+            "network": self.network,
+            "payer": payer,
+        }
+    
+    def _bind(self) -> ThreadingHTTPServer:
+        server = self._server = ThreadingHTTPServer((self.host, self.port), _handler(self))
+        self.port = server.server_address[1]
+        return server
+    
+    def start(self) -> str:
+        """Serve in a background thread; returns the base URL"""
+        server = self._bind()
+        self._thread = threading.Thread(target=server.serve_forever, name="poly402-facilitator", daemon=True)
+        self._thread.start()
+        return self.url
+    
+    def serve_forever(self):
+        """Serve in the calling thread"""
+        self._bind().serve_forever()
+    
+    def stop(self):
+        """Stop serving"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _handler(facilitator: LocalFacilitator):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        
+        def log_message(self, format, *args):
+            pass
+        
+        def _send(self, status: int, body: dict, headers: Optional[dict] = None):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+        
+        def _read_json(self) -> dict:
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"{}")
+        
+        def do_GET(self):
+            if self.path == "/supported":
+                self._send(200, {"kinds": [
+                    {"x402Version": X402_VERSION, "scheme": "exact", "network": facilitator.network}
+                ]})
+            elif self.path.split("?")[0] == "/trade":
+                requirements = facilitator.requirements(f"{facilitator.url}/trade")
+                header = self.headers.get("X-PAYMENT")
+                if header is None:
+                    self._send(402, {
+                        "x402Version": X402_VERSION,
+                        "error": "X-PAYMENT header is required",
+                        "accepts": [requirements],
+                    })
+                    return
+                try:
+                    payload = decode_payment_header(header)
+                except ValueError:
+                    self._send(402, {"x402Version": X402_VERSION, "error": "invalid_payload", "accepts": [requirements]})
+                    return
+                settlement = facilitator.settle(payload, requirements)
+                if not settlement["success"]:
+                    self._send(402, {
+                        "x402Version": X402_VERSION,
+                        "error": settlement["errorReason"],
+                        "accepts": [requirements],
+                    })
+                    return
+                self._send(200, {"ok": True}, {"X-PAYMENT-RESPONSE": encode_payment_header(settlement)})
+            else:
+                self._send(404, {"error": "not found"})
+        
+        def do_POST(self):
+            try:
+                body = self._read_json()
+                payload = body["paymentPayload"]
+                requirements = body["paymentRequirements"]
+            except (ValueError, KeyError):
+                self._send(400, {"error": "expected paymentPayload and paymentRequirements"})
+                return
+            
+            if self.path == "/verify":
+                valid, reason, payer = facilitator.verify(payload, requirements)
+                self._send(200, {"isValid": valid, "invalidReason": reason, "payer": payer})
+            elif self.path == "/settle":
+                self._send(200, facilitator.settle(payload, requirements))
+            else:
+                self._send(404, {"error": "not found"})
+    
+    return Handler
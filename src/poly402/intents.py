@@ -0,0 +1,142 @@
+"""
+Durable store of order submission intents for idempotent trading
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from .models import OrderIntent, IntentStatus, TradeResult, OrderStatus
+
+
+class IntentStore:
+    """
+    Persists signed orders before they are posted
+    
+    Unlike the trade journal, writes here are synchronous and fully synced:
+    an intent must be on disk before its order reaches the CLOB, so that a
+    crash between posting and recording the response can be reconciled.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS intents (
+            key TEXT PRIMARY KEY,
+            created REAL NOT NULL,
+            market_slug TEXT NOT NULL,
+            outcome_name TEXT NOT NULL,
+            token_id TEXT NOT NULL,
+            side TEXT NOT NULL,
+            price REAL NOT NULL,
+            size REAL NOT NULL,
+            amount_usdc REAL NOT NULL,
+            signed_order TEXT NOT NULL,
+            status TEXT NOT NULL,
+            order_id TEXT,
+            order_status TEXT,
+            error TEXT,
+            account TEXT NOT NULL DEFAULT 'default'
+        );
+        CREATE INDEX IF NOT EXISTS idx_intents_status ON intents (status, created);
+    """
+    
+    def __init__(self, path: str):
+        """
+        Initialize intent store
+        
+        Args:
+            path: SQLite database file (may be shared with the trade journal)
+        """
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(self.SCHEMA)
+    
+        # Stores created before sub-accounts existed lack the account column
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(intents)")}
+        if 'account' not in columns:
+            self._conn.execute("ALTER TABLE intents ADD COLUMN account TEXT NOT NULL DEFAULT 'default'")
+    
+    def save(self, intent: OrderIntent):
+        """Durably persist a new intent"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO intents (
+                    key, created, market_slug, outcome_name, token_id, side, price,
+                    size, amount_usdc, signed_order, status, order_id, order_status, error, account
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    intent.key,
+                    intent.created_at.timestamp(),
+                    intent.market_slug,
+                    intent.outcome_name,
+                    intent.token_id,
+                    intent.side,
+                    intent.price,
+                    intent.size,
+                    intent.amount_usdc,
+                    json.dumps(intent.signed_order),
+                    intent.status.value,
+                    intent.order_id,
+                    intent.order_status,
+                    intent.error,
+                    intent.account
+                )
+            )
+    
+    def resolve(self, intent: OrderIntent, result: TradeResult):
+        """Record the CLOB outcome of an intent's order"""
+        if result.status == OrderStatus.FAILED:
+            intent.status = IntentStatus.REJECTED
+        else:
+            intent.status = IntentStatus.POSTED
+        intent.order_id = result.order_id or intent.order_id
+        intent.order_status = result.status.value
+        intent.error = result.error
+        
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE intents SET status = ?, order_id = ?, order_status = ?, error = ? WHERE key = ?",
+                (intent.status.value, intent.order_id, intent.order_status, intent.error, intent.key)
+            )
+    
+    def get(self, key: str) -> Optional[OrderIntent]:
+        """Look up an intent by client order key"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM intents WHERE key = ?", (key,)).fetchone()
+        return self._row_to_intent(row) if row else None
+    
+    def pending(self) -> List[OrderIntent]:
+        """All intents whose post outcome is unknown, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM intents WHERE status = ? ORDER BY created",
+                (IntentStatus.PENDING.value,)
+            ).fetchall()
+        return [self._row_to_intent(row) for row in rows]
+    
+    def _row_to_intent(self, row: sqlite3.Row) -> OrderIntent:
+        return OrderIntent(
+            key=row['key'],
+            market_slug=row['market_slug'],
+            outcome_name=row['outcome_name'],
+            token_id=row['token_id'],
+            side=row['side'],
+            price=row['price'],
+            size=row['size'],
+            amount_usdc=row['amount_usdc'],
+            signed_order=json.loads(row['signed_order']),
+            status=IntentStatus(row['status']),
+            created_at=datetime.fromtimestamp(row['created']),
+            order_id=row['order_id'],
+            order_status=row['order_status'],
+            error=row['error'],
+            account=row['account']
+        )
@@ -0,0 +1,242 @@
+"""
+Durable local trade journal backed by SQLite in WAL mode
+"""
+
+import atexit
+import json
+import queue
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from .models import TradeResult, PaymentInfo, OrderStatus
+
+
+class TradeJournal:
+    """
+    Append-only journal of trade results
+    
+    Writes are queued and committed in batches by a background thread, so
+    recording a trade never blocks order placement on disk I/O. Queries open
+    their own read connection, which WAL mode allows alongside the writer.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS trades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts REAL NOT NULL,
+            market_slug TEXT NOT NULL,
+            outcome_name TEXT NOT NULL,
+            side TEXT NOT NULL,
+            amount_usdc REAL NOT NULL,
+            shares REAL NOT NULL,
+            price REAL NOT NULL,
+            status TEXT NOT NULL,
+            order_id TEXT,
+            tx_hash TEXT,
+            error TEXT,
+            payment TEXT,
+            timings TEXT,
+            account TEXT NOT NULL DEFAULT 'default'
+        );
+        CREATE INDEX IF NOT EXISTS idx_trades_ts ON trades (ts);
+        CREATE INDEX IF NOT EXISTS idx_trades_market ON trades (market_slug, ts);
+        CREATE INDEX IF NOT EXISTS idx_trades_outcome ON trades (outcome_name, ts);
+        CREATE INDEX IF NOT EXISTS idx_trades_status ON trades (status, ts);
+    """
+    
+    INSERT = """
+        INSERT INTO trades (
+            ts, market_slug, outcome_name, side, amount_usdc, shares, price,
+            status, order_id, tx_hash, error, payment, timings, account
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    def __init__(self, path: str, batch_size: int = 256):
+        """
+        Initialize trade journal
+        
+        Args:
+            path: SQLite database file
+            batch_size: Maximum number of records committed per transaction
+        """
+        self.path = Path(path).expanduser()
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+            # Journals created before sub-accounts existed lack the account column
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(trades)")}
+            if 'account' not in columns:
+                conn.execute("ALTER TABLE trades ADD COLUMN account TEXT NOT NULL DEFAULT 'default'")
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def record(self, result: TradeResult):
+        """Queue a trade result for writing (non-blocking)"""
+        if self._writer is None:
+            self._start_writer()
+        
+        payment = result.payment_info
+        self._queue.put((
+            result.timestamp.timestamp(),
+            result.market_slug,
+            result.outcome_name,
+            result.side,
+            result.amount_usdc,
+            result.shares_purchased,
+            result.price_per_share,
+            result.status.value,
+            result.order_id,
+            result.tx_hash,
+            result.error,
+            json.dumps({
+                'amount': payment.amount,
+                'network': payment.network,
+                'token': payment.token,
+                'tx_hash': payment.tx_hash,
+                'status': payment.status
+            }) if payment else None,
+            json.dumps(result.timings) if result.timings else None,
+            result.account
+        ))
+    
+    def _start_writer(self):
+        with self._lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(target=self._run_writer, name="poly402-journal", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+    
+    def _run_writer(self):
+        conn = self._connect()
+        try:
+            while True:
+                row = self._queue.get()
+                batch = [row]
+                # Drain whatever else is already queued into the same transaction
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                
+                rows = [r for r in batch if r is not None]
+                if rows:
+                    try:
+                        with conn:
+                            conn.executemany(self.INSERT, rows)
+                    except sqlite3.Error as e:
+                        print(f"Warning: Could not write trade journal: {e}", file=sys.stderr)
+                
+                for _ in batch:
+                    self._queue.task_done()
+                
+                if len(rows) < len(batch):
+                    return
+        finally:
+            conn.close()
+    
+    def flush(self):
+        """Block until all queued records are written"""
+        if self._writer is not None:
+            self._queue.join()
+    
+    def close(self):
+        """Flush pending records and stop the writer thread"""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None and writer.is_alive():
+            self._queue.put(None)
+            writer.join()
+    
+    def query(
+        self,
+        market_slug: Optional[str] = None,
+        outcome_name: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 50,
+        account: Optional[str] = None
+    ) -> List[TradeResult]:
+        """
+        Query journaled trades, newest first
+        
+        Args:
+            market_slug: Only trades on this market
+            outcome_name: Only trades on this outcome
+            status: Only trades with this OrderStatus value
+            since: Only trades at or after this time
+            until: Only trades before this time
+            limit: Maximum number of results
+            account: Only trades placed by this account
+        
+        Returns:
+            List of TradeResult objects
+        """
+        clauses = []
+        params: list = []
+        if market_slug:
+            clauses.append("market_slug = ?")
+            params.append(market_slug)
+        if outcome_name:
+            clauses.append("outcome_name = ?")
+            params.append(outcome_name)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if since:
+            clauses.append("ts >= ?")
+            params.append(since.timestamp())
+        if until:
+            clauses.append("ts < ?")
+            params.append(until.timestamp())
+        if account:
+            clauses.append("account = ?")
+            params.append(account)
+        
+        sql = "SELECT * FROM trades"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY ts DESC LIMIT ?"
+        params.append(limit)
+        
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        
+        return [self._row_to_result(row) for row in rows]
+    
+    def _row_to_result(self, row: sqlite3.Row) -> TradeResult:
+        payment = json.loads(row['payment']) if row['payment'] else None
+        return TradeResult(
+            order_id=row['order_id'] or "",
+            market_slug=row['market_slug'],
+            outcome_name=row['outcome_name'],
+            amount_usdc=row['amount_usdc'],
+            shares_purchased=row['shares'],
+            price_per_share=row['price'],
+            status=OrderStatus(row['status']),
+            tx_hash=row['tx_hash'],
+            payment_info=PaymentInfo(**payment) if payment else None,
+            timestamp=datetime.fromtimestamp(row['ts']),
+            error=row['error'],
+            side=row['side'],
+            timings=json.loads(row['timings']) if row['timings'] else {},
+            account=row['account']
+        )
@@ -0,0 +1,196 @@
+"""
+Market lifecycle: act on markets shortly before their end date
+"""
+
+import heapq
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from .models import Market
+
+# Polymarket only accepts GTD expirations at least this far ahead, and an
+# order stops matching this long before its expiration
+GTD_SECURITY_SECONDS = 60
+
+
+class LifecycleScheduler:
+    """
+    Deadlines of tracked markets, lead seconds before each end_date
+    
+    Deadlines sit in a min-heap keyed by time, so tracking a market costs
+    O(log n) and a background thread sleeps until the earliest one instead
+    of polling. When a market's end date moves, its old heap entry is left
+    behind and skipped when popped; the heap is rebuilt once such stale
+    entries outnumber live ones. Expired markets are handed to every
+    subscriber and forgotten, so state scales with open markets only.
+    
+    Markets already past their deadline when first tracked are not
+    scheduled: Polymarket end dates are often estimates, and such markets
+    commonly keep trading until they resolve.
+    """
+    
+    def __init__(self, lead: float = 300.0, clock: Callable[[], float] = time.time):
+        """
+        Initialize lifecycle scheduler
+        
+        Args:
+            lead: Seconds before a market's end date that its deadline falls
+            clock: Source of the current Unix time
+        """
+        self.lead = lead
+        self.clock = clock
+        self._heap: List[Tuple[float, str]] = []
+        self._markets: Dict[str, Tuple[float, Market]] = {}  # Slug -> (deadline, latest Market)
+        self._subscribers: List[Callable[[Market], None]] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+    
+    def deadline_of(self, market: Market) -> Optional[float]:
+        """Unix time of a market's deadline, or None if it has no end date"""
+        if market.end_date is None:
+            return None
+        return market.end_date.timestamp() - self.lead
+    
+    def closing(self, market: Market) -> bool:
+        """Whether a market has passed its deadline"""
+        deadline = self.deadline_of(market)
+        return deadline is not None and deadline <= self.clock()
+    
+    def gtd_expiration(self, market: Market) -> int:
+        """
+        Order expiration that makes the exchange drop an order at the deadline
+        
+        Returns:
+            Unix seconds for a GTD order, or 0 (no expiration) when the market
+            has no end date or its deadline is too close for a GTD order
+        """
+        deadline = self.deadline_of(market)
+        if deadline is None or deadline <= self.clock() + GTD_SECURITY_SECONDS:
+            return 0
+        return int(deadline) + GTD_SECURITY_SECONDS
+    
+    def subscribe(self, callback: Callable[[Market], None]):
+        """Call callback(market) when a tracked market reaches its deadline"""
+        with self._cond:
+            self._subscribers.append(callback)
+    
+    def unsubscribe(self, callback: Callable[[Market], None]):
+        """Stop calling a subscriber"""
+        with self._cond:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+    
+    def track(self, market: Market) -> Optional[float]:
+        """
+        Schedule (or reschedule) a market's deadline
+        
+        Args:
+            market: Market to track; the latest object passed in is the one
+                subscribers receive
+        
+        Returns:
+            The deadline, or None if the market is not scheduled
+        """
+        deadline = self.deadline_of(market)
+        with self._cond:
+            current = self._markets.get(market.slug)
+            if deadline is None or (current is None and deadline <= self.clock()):
+                if current is not None:
+                    del self._markets[market.slug]
+                return None
+            self._markets[market.slug] = (deadline, market)
+            if current is None or current[0] != deadline:
+                heapq.heappush(self._heap, (deadline, market.slug))
+                if len(self._heap) > 2 * len(self._markets) + 64:
+                    self._heap = [(d, slug) for slug, (d, _) in self._markets.items()]
+                    heapq.heapify(self._heap)
+                self._cond.notify()
+            if self._thread is None:
+                self._start()
+        return deadline
+    
+    def untrack(self, slug: str) -> bool:
+        """Stop tracking a market; returns False if it was not tracked"""
+        with self._cond:
+            return self._markets.pop(slug, None) is not None
+    
+    def tracked(self, slug: str) -> bool:
+        """Whether a market is scheduled"""
+        with self._cond:
+            return slug in self._markets
+    
+    def next_deadline(self) -> Optional[float]:
+        """Earliest scheduled deadline"""
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+    
+    def _drop_stale(self):
+        while self._heap:
+            deadline, slug = self._heap[0]
+            current = self._markets.get(slug)
+            if current is not None and current[0] == deadline:
+                return
+            heapq.heappop(self._heap)
+    
+    def expire(self, now: Optional[float] = None) -> List[Market]:
+        """
+        Forget every market whose deadline has passed and notify subscribers
+        
+        Args:
+            now: Unix time to expire against (default: the clock)
+        
+        Returns:
+            Expired markets, earliest deadline first
+        """
+        now = self.clock() if now is None else now
+        expired = []
+        with self._cond:
+            while True:
+                self._drop_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                _, slug = heapq.heappop(self._heap)
+                expired.append(self._markets.pop(slug)[1])
+            subscribers = list(self._subscribers)
+        
+        for market in expired:
+            for callback in subscribers:
+                try:
+                    callback(market)
+                except Exception as e:
+                    print(f"Warning: Close handler for {market.slug} failed: {e}", file=sys.stderr)
+        return expired
+    
+    def _start(self):
+        """Start the background thread (caller holds the lock)"""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="poly402-lifecycle", daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                self._drop_stale()
+                timeout = self._heap[0][0] - self.clock() if self._heap else None
+                if timeout is None or timeout > 0:
+                    self._cond.wait(timeout)
+                    continue
+            self.expire()
+    
+    def stop(self):
+        """Stop the background thread"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+    
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._markets)
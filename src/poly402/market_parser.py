@@ -3,11 +3,21 @@ Polymarket market URL parser and data fetcher
 """
 
 import re
+import sys
+import threading
 import requests
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
 from datetime import datetime
 from .models import Market, Outcome
 
+# Orderings accepted by search_many()
+SEARCH_RANKS = ('relevance', 'volume', 'liquidity')
+
+# Reciprocal rank fusion constant: a result at position p of one query
+# scores 1 / (RRF_K + p + 1)
+RRF_K = 60
+
 
 class MarketParser:
     """Parse Polymarket URLs and fetch market data"""
@@ -15,6 +25,11 @@ class MarketParser:
     def __init__(self, gamma_endpoint: str):
         """Initialize market parser"""
         self.gamma_endpoint = gamma_endpoint
+        self.session = requests.Session()
+        # Room for one pooled connection per concurrent request
+        self.session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=32))
+        self._etags: Dict[str, str] = {}  # Event slug -> ETag of the last response
+        self._lock = threading.Lock()
     
     def extract_slug(self, url: str) -> str:
         """
@@ -55,19 +70,71 @@ class MarketParser:
             Market object with all details
         """
         slug = self.extract_slug(url_or_slug)
+        data = self._fetch_event(slug)
+        if data is None:
+            # Only conditional requests can come back unchanged
+            raise ValueError(f"Failed to fetch market data: no event returned for {slug}")
+        
+        # Parse market data
+        return self._parse_market_data(data, slug)
+    
+    def fetch_market_if_changed(self, market: Market) -> Optional[Market]:
+        """
+        Refetch a market's event only if it changed since it was fetched
+        
+        Sends the last ETag as If-None-Match, so an unchanged event costs an
+        empty 304 response, and skips parsing when the event's updatedAt
+        matches market.updated_at.
+        
+        Args:
+            market: Previously fetched market
         
-        # Fetch event data from Gamma API
+        Returns:
+            The freshly parsed Market, or None if nothing changed
+        """
+        data = self._fetch_event(market.slug, conditional=True)
+        if data is None:
+            return None
+        updated_at = self._updated_at(data)
+        if updated_at is not None and updated_at == market.updated_at:
+            return None
+        return self._parse_market_data(data, market.slug)
+    
+    def forget(self, slug: str):
+        """Drop the cached ETag of an event"""
+        with self._lock:
+            self._etags.pop(slug, None)
+    
+    def _fetch_event(self, slug: str, conditional: bool = False) -> Optional[dict]:
+        """Fetch event data from the Gamma API; None when unchanged (304)"""
         endpoint = f"{self.gamma_endpoint}/events/slug/{slug}"
+        headers = {}
+        with self._lock:
+            etag = self._etags.get(slug)
+        if conditional and etag:
+            headers['If-None-Match'] = etag
         
         try:
-            response = requests.get(endpoint)
+            response = self.session.get(endpoint, headers=headers)
+            if response.status_code == 304:
+                return None
             response.raise_for_status()
             data = response.json()
         except requests.exceptions.RequestException as e:
             raise ValueError(f"Failed to fetch market data: {e}")
         
-        # Parse market data
-        return self._parse_market_data(data, slug)
+        etag = response.headers.get('ETag')
+        if etag:
+            with self._lock:
+                self._etags[slug] = etag
+        return data
+    
+    @staticmethod
+    def _updated_at(data: dict) -> Optional[str]:
+        """Latest updatedAt of an event and its markets (ISO strings sort chronologically)"""
+        candidates = [data.get('updatedAt')] + [market.get('updatedAt') for market in data.get('markets', [])]
+        stamps: List[str] = [stamp for stamp in candidates if stamp]
+        return max(stamps) if stamps else None
     
     def _parse_market_data(self, data: dict, slug: str) -> Market:
         """Parse Gamma API response into Market object"""
@@ -77,12 +144,15 @@ class MarketParser:
         markets_data = data.get('markets', [])
         
         for idx, market in enumerate(markets_data):
+            token_ids = market.get('clobTokenIds', [''])
             outcome = Outcome(
                 index=idx,
                 name=market.get('outcome', f"Outcome {idx}"),
-                token_id=market.get('clobTokenIds', [''])[0],
+                token_id=token_ids[0],
                 price=float(market.get('outcomePrices', [0.5])[0]),
-                probability=float(market.get('outcomePrices', [0.5])[0]) * 100
+                probability=float(market.get('outcomePrices', [0.5])[0]) * 100,
+                condition_id=market.get('conditionId', ''),
+                no_token_id=token_ids[1] if len(token_ids) > 1 else ''
             )
             outcomes.append(outcome)
         
@@ -105,7 +175,9 @@ class MarketParser:
             condition_id=data.get('conditionId', ''),
             question_id=data.get('questionID'),
             volume=data.get('volume'),
-            liquidity=data.get('liquidity')
+            liquidity=data.get('liquidity'),
+            updated_at=self._updated_at(data),
+            neg_risk=bool(data.get('negRisk') or data.get('enableNegRisk'))
         )
     
     def search_markets(self, query: str, limit: int = 10) -> list[Market]:
@@ -126,22 +198,77 @@ class MarketParser:
         }
         
         try:
-            response = requests.get(endpoint, params=params)
+            response = self.session.get(endpoint, params=params)
             response.raise_for_status()
             data = response.json()
         except requests.exceptions.RequestException as e:
             raise ValueError(f"Failed to search markets: {e}")
         
-        markets = []
-        for event_data in data:
+        return self._parse_events(data)
+    
+    def search_many(
+        self,
+        queries: Iterable[str],
+        limit: int = 10,
+        rank: str = 'relevance',
+        max_workers: int = 16
+    ) -> list[Market]:
+        """
+        Run many searches concurrently and merge their results
+        
+        Events found by several queries are returned once. Relevance is the
+        reciprocal rank fusion of each query's result order, so an event near
+        the top of many searches outranks one found by a single query.
+        
+        Args:
+            queries: Search queries (blank and repeated queries are skipped)
+            limit: Maximum number of results per query
+            rank: "relevance", "volume" or "liquidity"
+            max_workers: Maximum number of concurrent searches
+        
+        Returns:
+            List of Market objects, best first
+        """
+        if rank not in SEARCH_RANKS:
+            raise ValueError(f"Invalid rank: {rank} (expected one of {', '.join(SEARCH_RANKS)})")
+        queries = list(dict.fromkeys(q.strip() for q in queries if q.strip()))
+        if not queries:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(queries))) as pool:
+            futures = [pool.submit(self.search_markets, query, limit) for query in queries]
+        
+        markets: Dict[str, Market] = {}
+        scores: Dict[str, float] = {}
+        errors = []
+        for query, future in zip(queries, futures):
             try:
-                slug = event_data.get('slug', '')
-                market = self._parse_market_data(event_data, slug)
-                markets.append(market)
-            except Exception:
+                results = future.result()
+            except ValueError as e:
+                errors.append((query, e))
                 continue
+            for position, market in enumerate(results):
+                markets.setdefault(market.slug, market)
+                scores[market.slug] = scores.get(market.slug, 0.0) + 1.0 / (RRF_K + position + 1)
         
-        return markets
+        if errors and len(errors) == len(queries):
+            raise errors[0][1]
+        for query, error in errors:
+            print(f"Warning: Search for {query!r} failed: {error}", file=sys.stderr)
+        
+        def number(value) -> float:
+            try:
+                return float(value or 0)
+            except (TypeError, ValueError):
+                return 0.0
+        
+        def relevance(m: Market) -> tuple:
+            return scores[m.slug], number(m.volume)
+        
+        def by_field(m: Market) -> float:
+            return number(getattr(m, rank))
+        
+        return sorted(markets.values(), key=relevance if rank == 'relevance' else by_field, reverse=True)
     
     def get_active_markets(self, limit: int = 100, offset: int = 0) -> list[Market]:
         """
@@ -154,6 +281,31 @@ class MarketParser:
         Returns:
             List of Market objects
         """
+        return self._parse_events(self._active_events(limit, offset))
+    
+    def iter_active_markets(self, limit: int = 100, page_size: int = 100) -> Iterator[List[Market]]:
+        """
+        Page through active markets, yielding each page as it arrives
+        
+        Args:
+            limit: Total number of markets to fetch
+            page_size: Markets per request
+        
+        Yields:
+            Lists of Market objects
+        """
+        offset = 0
+        while offset < limit:
+            count = min(page_size, limit - offset)
+            events = self._active_events(count, offset)
+            markets = self._parse_events(events)
+            if markets:
+                yield markets
+            if len(events) < count:
+                return
+            offset += count
+    
+    def _active_events(self, limit: int, offset: int) -> list:
         endpoint = f"{self.gamma_endpoint}/events"
         params = {
             'closed': 'false',
@@ -164,14 +316,15 @@ class MarketParser:
         }
         
         try:
-            response = requests.get(endpoint, params=params)
+            response = self.session.get(endpoint, params=params)
             response.raise_for_status()
-            data = response.json()
+            return response.json()
         except requests.exceptions.RequestException as e:
             raise ValueError(f"Failed to fetch active markets: {e}")
         
+    def _parse_events(self, events: list) -> list[Market]:
         markets = []
-        for event_data in data:
+        for event_data in events:
             try:
                 slug = event_data.get('slug', '')
                 market = self._parse_market_data(event_data, slug)
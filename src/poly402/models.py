@@ -2,8 +2,8 @@
 Data models for poly402
 """
 
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -15,6 +15,20 @@ class OrderStatus(Enum):
     TRADING = "trading"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class IntentStatus(Enum):
+    """Lifecycle of a persisted order submission intent"""
+    PENDING = "pending"  # Signed and persisted; post outcome unknown
+    POSTED = "posted"  # Accepted by the CLOB
+    REJECTED = "rejected"  # Explicitly rejected by the CLOB
+
+
+class TriggerDirection(Enum):
+    """Which side of a threshold arms a trigger rule"""
+    BELOW = "below"  # Fire when price <= threshold
+    ABOVE = "above"  # Fire when price >= threshold
 
 
 class OrderType(Enum):
@@ -33,6 +47,8 @@ class Outcome:
     token_id: str
     price: float  # Current price in USDC (0-1)
     probability: float  # Implied probability (0-100%)
+    condition_id: str = ""  # Condition of the market this outcome trades in
+    no_token_id: str = ""  # Complementary No token of the outcome's market
 
 
 @dataclass
@@ -48,6 +64,8 @@ class Market:
     question_id: Optional[str]
     volume: Optional[float]
     liquidity: Optional[float]
+    updated_at: Optional[str] = None  # Latest Gamma updatedAt of the event or its markets
+    neg_risk: bool = False  # Outcomes are mutually exclusive (at most one resolves Yes)
 
 
 @dataclass
@@ -58,6 +76,7 @@ class PaymentInfo:
     token: str  # "USDC"
     tx_hash: Optional[str]
     status: str
+    carried: float = 0.0  # Earlier accrued payments included in amount (USDC)
 
 
 @dataclass
@@ -71,9 +90,116 @@ class TradeResult:
     price_per_share: float
     status: OrderStatus
     tx_hash: Optional[str]
-    payment_info: PaymentInfo
+    payment_info: Optional[PaymentInfo]  # None when no x402 payment was made
     timestamp: datetime
     error: Optional[str] = None
+    side: str = "BUY"
+    timings: Dict[str, float] = field(default_factory=dict)  # Seconds per execution stage
+    client_order_key: Optional[str] = None
+    account: str = "default"  # Name of the account that placed the order
+
+
+@dataclass
+class Position:
+    """Aggregated holdings for a single outcome token"""
+    token_id: str
+    size: float  # Number of shares held
+    avg_price: float  # Average entry price in USDC
+    condition_id: str = ""
+    market_slug: str = ""
+    outcome_name: str = ""
+    best_bid: Optional[float] = None
+    best_ask: Optional[float] = None
+    outcome_index: int = 0  # 0 for Yes, 1 for No
+    neg_risk: bool = False  # Part of a neg-risk event
+    
+    @property
+    def cost_basis(self) -> float:
+        """USDC spent to acquire the position"""
+        return self.size * self.avg_price
+    
+    @property
+    def value(self) -> Optional[float]:
+        """Liquidation value at the current best bid"""
+        if self.best_bid is None:
+            return None
+        return self.size * self.best_bid
+    
+    @property
+    def pnl(self) -> Optional[float]:
+        """Unrealized PnL against the current best bid"""
+        value = self.value
+        return None if value is None else value - self.cost_basis
+
+
+@dataclass
+class PriceBar:
+    """Price summary of a token over one bar of history"""
+    ts: float  # Unix seconds at the start of the bar
+    open: float
+    high: float
+    low: float
+    close: float
+    count: int  # Observations in the bar
+
+
+@dataclass
+class OrderIntent:
+    """A signed order persisted before posting, keyed by a client order key"""
+    key: str
+    market_slug: str
+    outcome_name: str
+    token_id: str
+    side: str
+    price: float
+    size: float
+    amount_usdc: float
+    signed_order: dict  # Serialized signed order, re-postable as-is
+    status: IntentStatus
+    created_at: datetime
+    order_id: Optional[str] = None
+    order_status: Optional[str] = None  # OrderStatus value once posted
+    error: Optional[str] = None
+    account: str = "default"
+
+
+@dataclass
+class OrderTemplate:
+    """Pre-resolved order parameters for a token, leaving only price and size"""
+    token_id: str
+    tick_size: str
+    neg_risk: bool
+    fee_rate_bps: int = 0
+    market_slug: str = ""
+    outcome_name: str = ""
+
+
+@dataclass
+class TriggerRule:
+    """A conditional order armed against live prices"""
+    rule_id: str
+    token_id: str
+    direction: TriggerDirection
+    threshold: float  # Price (0-1) that arms the rule
+    side: str = "BUY"
+    amount_usdc: Optional[float] = None  # BUY size in USDC
+    shares: Optional[float] = None  # SELL size in shares
+    limit_price: Optional[float] = None  # Defaults to the triggering price
+    market_slug: str = ""
+    outcome_name: str = ""
+
+
+@dataclass
+class QuoteSpec:
+    """Market-making parameters for one token"""
+    token_id: str
+    size: float  # Shares quoted per side
+    half_spread: float  # Distance of each quote from fair value
+    max_position: float  # Stop bidding once this many shares are held
+    min_position: float = 0.0  # Stop offering once holdings fall to this
+    skew: float = 0.0  # Price shift per share held, leaning quotes toward flat
+    market_slug: str = ""
+    outcome_name: str = ""
 
 
 @dataclass
@@ -85,6 +211,154 @@ class Balance:
     native_balance: Optional[float] = None
 
 
+@dataclass
+class AccountProfile:
+    """A Polymarket sub-account that orders can be routed to"""
+    name: str
+    polygon_private_key: str
+    signature_type: int = 2
+    proxy_address: Optional[str] = None
+    api_key: Optional[str] = None  # Derived on first use when unset
+    api_secret: Optional[str] = None
+    api_passphrase: Optional[str] = None
+
+
+@dataclass
+class Fill:
+    """A trade against an order placed by a runtime strategy"""
+    order_id: str
+    token_id: str
+    side: str
+    price: float
+    size: float  # Shares matched
+    strategy: str
+    trade_id: str = ""
+    timestamp: int = 0  # Match time (Unix seconds)
+
+
+@dataclass
+class WalletAllowances:
+    """A wallet's standing approvals for the Polymarket exchange contracts"""
+    address: str
+    usdc: Dict[str, float]  # Spender -> USDC it may still pull, less orders placed since loading
+    conditional: Dict[str, bool]  # Operator -> approved to move the wallet's outcome tokens
+    loaded_at: float = 0.0  # Unix time the on-chain state was read
+
+
+@dataclass
+class BacktestReport:
+    """Summary of a backtest replay"""
+    start: Optional[datetime]
+    end: Optional[datetime]
+    events: int  # Snapshot rows replayed
+    ticks: int  # Strategy callbacks
+    orders: int
+    fills: int
+    initial_cash: float
+    cash: float
+    equity: float  # Cash plus positions marked at the best bid
+    elapsed: float  # Wall-clock seconds
+    
+    @property
+    def pnl(self) -> float:
+        """Profit or loss over the replay"""
+        return self.equity - self.initial_cash
+    
+    @property
+    def events_per_second(self) -> float:
+        """Replay throughput"""
+        return self.events / self.elapsed if self.elapsed > 0 else 0.0
+
+
+@dataclass
+class Exposure:
+    """Aggregate risk of the positions in one event, market or outcome set"""
+    key: str  # Event slug, condition id or outcome set key
+    label: str
+    positions: int
+    cost: float  # USDC cost basis
+    value: float  # Marked at the best bid (cost for unpriced positions)
+    max_loss: float  # Loss if the outcomes resolve as badly as possible
+    
+    @property
+    def pnl(self) -> float:
+        """Mark-to-market PnL"""
+        return self.value - self.cost
+
+
+@dataclass
+class ScenarioReport:
+    """Distribution of portfolio PnL over simulated resolutions"""
+    scenarios: int
+    confidence: float
+    expected_pnl: float
+    std_pnl: float
+    value_at_risk: float  # Loss not exceeded at the confidence level
+    expected_shortfall: float  # Mean loss beyond the value at risk
+    prob_loss: float
+    worst_pnl: float
+    best_pnl: float
+
+
+@dataclass
+class ArbitrageLeg:
+    """One order of an arbitrage basket"""
+    token_id: str
+    outcome_name: str
+    price: float  # Limit price: the deepest level the basket takes
+    size: float  # Shares
+
+
+@dataclass
+class ArbitrageOpportunity:
+    """A basket of outcome tokens in a neg-risk event that pays more than it costs"""
+    market_slug: str
+    title: str
+    side: str  # "YES" (asks sum below 1) or "NO" (bids sum above 1)
+    legs: List[ArbitrageLeg]
+    baskets: float  # Shares bought of every leg
+    cost: float  # USDC paid for the legs at book prices
+    fees: float  # Estimated taker fees in USDC
+    payout: float  # USDC paid out at resolution
+    detected_at: datetime = field(default_factory=datetime.now)
+    
+    @property
+    def profit(self) -> float:
+        """Locked-in profit net of fees"""
+        return self.payout - self.cost - self.fees
+    
+    @property
+    def edge(self) -> float:
+        """Profit per USDC spent"""
+        return self.profit / self.cost if self.cost > 0 else 0.0
+
+
+@dataclass
+class ExecutionReport:
+    """Progress of an execution algorithm working a parent order"""
+    algorithm: str  # "twap", "iceberg" or "liquidity"
+    token_id: str
+    side: str
+    size: Optional[float]  # Parent size in shares (None when sized in USDC)
+    amount_usdc: Optional[float]  # Parent budget in USDC (BUY only)
+    limit_price: Optional[float] = None
+    market_slug: str = ""
+    outcome_name: str = ""
+    filled_size: float = 0.0
+    notional: float = 0.0  # USDC value of fills at child limit prices
+    child_orders: int = 0
+    cancelled_orders: int = 0
+    failed_orders: int = 0
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    
+    @property
+    def avg_price(self) -> Optional[float]:
+        """Average fill price per share"""
+        return self.notional / self.filled_size if self.filled_size else None
+
+
 @dataclass
 class Config:
     """poly402 configuration"""
@@ -102,3 +376,19 @@ class Config:
     x402_facilitator: str
     x402_max_payment: float
     signature_type: int = 2  # Default to browser wallet signature type
+    polymarket_data_endpoint: str = "https://data-api.polymarket.com"
+    journal_enabled: bool = True
+    journal_path: str = "~/.poly402/journal.db"
+    prices_path: str = "~/.poly402/prices"
+    x402_resource: Optional[str] = None  # x402-gated trade endpoint; unset skips payment
+    x402_batch_threshold: float = 0.0
+    base_rpc_urls: List[str] = field(default_factory=list)  # All Base endpoints, base_rpc_url first
+    polygon_rpc_urls: List[str] = field(default_factory=list)
+    accounts: List[AccountProfile] = field(default_factory=list)
+    account_routing: str = "round_robin"  # "round_robin" or "balance"
+    risk_max_event_exposure: Optional[float] = None  # USDC cost basis per event
+    risk_max_market_exposure: Optional[float] = None  # USDC cost basis per market (condition)
+    risk_max_loss: Optional[float] = None  # Worst-case resolution loss across all positions
+    lifecycle_lead: float = 300.0  # Seconds before a market's end date to cancel orders and drop caches
+    lifecycle_gtd_orders: bool = False  # Sign orders as GTD expiring at that deadline
+    auto_approve: bool = False  # Send missing (unlimited) exchange approvals from EOA wallets before trading
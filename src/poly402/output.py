@@ -0,0 +1,84 @@
+"""
+Machine-readable record output for the CLI
+"""
+
+import csv
+import json
+import sys
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Iterable, Optional, TextIO
+
+FORMATS = ('jsonl', 'csv', 'json')
+
+
+def to_record(value: Any) -> Any:
+    """Convert dataclasses, enums and datetimes into JSON-compatible values"""
+    if is_dataclass(value):
+        return {f.name: to_record(getattr(value, f.name)) for f in fields(value)}
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {key: to_record(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_record(item) for item in value]
+    return value
+
+
+class RecordWriter:
+    """
+    Stream records as JSON Lines, CSV or a JSON array
+    
+    Records are written as they are passed in rather than collected first,
+    so a consumer sees the first page of a listing while later pages are
+    still being fetched. CSV columns are taken from the first record and
+    nested values are JSON-encoded.
+    """
+    
+    def __init__(self, output_format: str, stream: Optional[TextIO] = None):
+        """
+        Initialize record writer
+        
+        Args:
+            output_format: One of "jsonl", "csv" or "json"
+            stream: Destination (default: stdout)
+        """
+        if output_format not in FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
+        self.format = output_format
+        self.stream = stream or sys.stdout
+        self.count = 0
+        self._csv: Optional[csv.DictWriter] = None
+    
+    def write(self, record: dict):
+        """Write one record"""
+        if self.format == 'jsonl':
+            self.stream.write(json.dumps(record, default=str) + "\n")
+        elif self.format == 'json':
+            self.stream.write(("[\n" if not self.count else ",\n") + json.dumps(record, default=str))
+        else:
+            if self._csv is None:
+                self._csv = csv.DictWriter(
+                    self.stream, fieldnames=list(record), extrasaction='ignore', lineterminator='\n'
+                )
+                self._csv.writeheader()
+            self._csv.writerow({
+                key: json.dumps(value, default=str) if isinstance(value, (dict, list)) else value
+                for key, value in record.items()
+            })
+        self.count += 1
+    
+    def write_all(self, records: Iterable[dict]):
+        """Write a batch of records and flush them to the consumer"""
+        for record in records:
+            self.write(record)
+        self.stream.flush()
+    
+    def close(self):
+        """Finish the output (closes the JSON array)"""
+        if self.format == 'json':
+            self.stream.write("\n]\n" if self.count else "[]\n")
+        self.stream.flush()
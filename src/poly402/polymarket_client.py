@@ -2,13 +2,59 @@
 Polymarket CLOB client wrapper
 """
 
-from typing import Optional
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
+from eth_keys import keys
 from py_clob_client.client import ClobClient
-from py_clob_client.clob_types import OrderArgs, OrderType
-from py_clob_client.order_builder.constants import BUY
-from .models import TradeResult, OrderStatus, PaymentInfo, Outcome
+from py_clob_client.clob_types import (
+    ApiCreds, AssetType, BalanceAllowanceParams, OrderArgs, OrderType, OpenOrderParams, TradeParams,
+    BookParams, PostOrdersArgs
+)
+from py_clob_client.config import get_contract_config  # type: ignore[import-untyped]
+from py_clob_client.constants import ZERO_ADDRESS  # type: ignore[import-untyped]
+from py_clob_client.order_builder.builder import ROUNDING_CONFIG  # type: ignore[import-untyped]
+from py_clob_client.order_builder.constants import BUY, SELL
+from py_order_utils.builders import OrderBuilder as UtilsOrderBuilder  # type: ignore[import-untyped]
+from py_order_utils.model import OrderData  # type: ignore[import-untyped]
+from py_order_utils.signer import Signer as UtilsSigner  # type: ignore[import-untyped]
+from .models import TradeResult, OrderStatus, PaymentInfo, Outcome, Position, OrderTemplate
 from datetime import datetime
 
+# Tokens per request to the CLOB batch endpoints (/prices, /books, /midpoints)
+BATCH_LIMIT = 100
+
+# Orders per request to the CLOB batch order endpoint
+POST_ORDERS_LIMIT = 15
+
+
+class StoredOrder:
+    """A serialized signed order that can be posted again as-is"""
+    
+    def __init__(self, payload: dict):
+        self.payload = payload
+    
+    def dict(self) -> dict:
+        return self.payload
+
+
+class CachedKeySigner(UtilsSigner):
+    """Order signer that parses the private key once instead of on every signature"""
+    
+    def __init__(self, key: str):
+        super().__init__(key)
+        self._private_key = keys.PrivateKey(bytes.fromhex(key[2:] if key.startswith('0x') else key))
+    
+    def sign(self, struct_hash) -> str:
+        digest = bytes.fromhex(struct_hash[2:]) if isinstance(struct_hash, str) else bytes(struct_hash)
+        signature = self._private_key.sign_msg_hash(digest)
+        return (
+            signature.r.to_bytes(32, 'big')
+            + signature.s.to_bytes(32, 'big')
+            + bytes([signature.v + 27])
+        ).hex()
+
 
 class PolymarketClient:
     """Wrapper for Polymarket CLOB client"""
@@ -19,7 +65,8 @@ class PolymarketClient:
         chain_id: int,
         private_key: str,
         signature_type: int = 2,
-        proxy_address: Optional[str] = None
+        proxy_address: Optional[str] = None,
+        data_endpoint: str = "https://data-api.polymarket.com"
     ):
         """
         Initialize Polymarket client
@@ -30,9 +77,15 @@ class PolymarketClient:
             private_key: Polygon wallet private key
             signature_type: 1 for email/magic, 2 for browser wallet
             proxy_address: Optional proxy wallet address
+            data_endpoint: Polymarket data API endpoint (positions)
         """
         self.host = host
         self.chain_id = chain_id
+        self.proxy_address = proxy_address
+        self.data_endpoint = data_endpoint
+        self.templates: Dict[str, OrderTemplate] = {}
+        self._private_key = private_key
+        self._order_builders: Dict[bool, UtilsOrderBuilder] = {}
         
         # Initialize CLOB client
         if proxy_address:
@@ -59,6 +112,15 @@ class PolymarketClient:
         except Exception as e:
             raise RuntimeError(f"Failed to setup API credentials: {e}")
     
+    def set_credentials(self, api_key: str, api_secret: str, api_passphrase: str):
+        """Use existing API credentials instead of deriving them"""
+        self.client.set_api_creds(ApiCreds(api_key=api_key, api_secret=api_secret, api_passphrase=api_passphrase))
+    
+    def _ensure_credentials(self):
+        """Set up API credentials on first use"""
+        if not getattr(self.client, 'creds', None):
+            self.setup_credentials()
+    
     def create_buy_order(
         self,
         outcome: Outcome,
@@ -72,106 +134,710 @@ class PolymarketClient:
             outcome: The outcome to bet on
             amount_usdc: Amount in USDC to spend
             max_price: Maximum price per share (optional)
-            
+        
         Returns:
             TradeResult with order details
         """
-        # Ensure credentials are set
-        if not hasattr(self.client, 'api_creds') or not self.client.api_creds:
-            self.setup_credentials()
+        price, size = self.buy_terms(outcome, amount_usdc, max_price)
+        
+        return self._place_order(
+            token_id=outcome.token_id,
+            outcome_name=outcome.name,
+            side=BUY,
+            price=price,
+            size=size,
+            amount_usdc=amount_usdc
+        )
+    
+    @staticmethod
+    def buy_terms(outcome: Outcome, amount_usdc: float, max_price: Optional[float] = None) -> tuple:
+        """
+        Limit price and share count for spending amount_usdc on an outcome
         
+        Returns:
+            Tuple of (price, size)
+        """
         # Determine price - use current price or max_price if specified
         price = min(outcome.price, max_price) if max_price else outcome.price
         
         # Calculate size (number of shares)
         size = amount_usdc / price if price > 0 else 0
         
-        # Create order arguments
-        order_args = OrderArgs(
+        return price, size
+    
+    def create_sell_order(
+        self,
+        outcome: Outcome,
+        shares: float,
+        min_price: Optional[float] = None
+    ) -> TradeResult:
+        """
+        Create and execute a sell order
+        
+        Args:
+            outcome: The outcome to sell
+            shares: Number of shares to sell
+            min_price: Minimum price per share (optional)
+        
+        Returns:
+            TradeResult with order details
+        """
+        # Determine price - use current price or min_price if specified
+        price = max(outcome.price, min_price) if min_price else outcome.price
+        
+        return self._place_order(
+            token_id=outcome.token_id,
+            outcome_name=outcome.name,
+            side=SELL,
             price=price,
-            size=size,
-            side=BUY,
-            token_id=outcome.token_id
+            size=shares
         )
+    
+    def close_position(
+        self,
+        position: Position,
+        min_price: Optional[float] = None
+    ) -> TradeResult:
+        """
+        Sell an entire position at the best bid
+        
+        Args:
+            position: Position to unwind (valued with best_bid)
+            min_price: Minimum price per share (optional)
+        
+        Returns:
+            TradeResult with order details
+        """
+        price = position.best_bid
+        error = None
+        if price is None:
+            try:
+                price = self.get_order_book_top(position.token_id)[0]
+            except RuntimeError as e:
+                # Delisted or resolved tokens have no book
+                error = str(e)
+        if min_price is not None:
+            price = max(price or 0.0, min_price)
+        
+        if not price:
+            result = self._failed_result(
+                outcome_name=position.outcome_name,
+                amount_usdc=0.0,
+                price=0.0,
+                side=SELL,
+                error=error or f"No bid available for token {position.token_id}"
+            )
+        else:
+            result = self._place_order(
+                token_id=position.token_id,
+                outcome_name=position.outcome_name,
+                side=SELL,
+                price=price,
+                size=position.size
+            )
+        result.market_slug = position.market_slug
+        return result
+    
+    def close_positions(
+        self,
+        positions: List[Position],
+        min_price: Optional[float] = None,
+        max_workers: int = 16
+    ) -> List[TradeResult]:
+        """
+        Unwind many positions concurrently
+        
+        Args:
+            positions: Positions to close
+            min_price: Minimum price per share applied to every order (optional)
+            max_workers: Maximum number of orders in flight
+        
+        Returns:
+            List of TradeResult in the same order as positions
+        """
+        if not positions:
+            return []
+        
+        # Derive credentials once up front instead of racing in every worker
+        self._ensure_credentials()
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(positions))) as pool:
+            return list(pool.map(lambda p: self.close_position(p, min_price), positions))
+    
+    def _place_order(
+        self,
+        token_id: str,
+        outcome_name: str,
+        side: str,
+        price: float,
+        size: float,
+        amount_usdc: Optional[float] = None
+    ) -> TradeResult:
+        """Sign and post a GTC limit order, wrapping the response in a TradeResult"""
+        # Ensure credentials are set
+        self._ensure_credentials()
+        
+        if amount_usdc is None:
+            amount_usdc = size * price
         
         try:
             # Create and sign order
-            signed_order = self.client.create_order(order_args)
+            signed_order = self.sign_order(token_id, side, price, size)
             
             # Post order as GTC (Good-Til-Cancelled)
-            resp = self.client.post_order(signed_order, OrderType.GTC)
+            resp = self.post_signed_order(signed_order)
             
-            # Parse response
-            if resp.get('success'):
-                order_id = resp.get('orderId', '')
-                status = OrderStatus.COMPLETED if resp.get('status') == 'matched' else OrderStatus.TRADING
-                
-                # Create placeholder payment info (will be filled by orchestrator)
-                payment_info = PaymentInfo(
-                    amount=amount_usdc,
-                    network="polygon",
-                    token="USDC",
-                    tx_hash=None,
-                    status="completed"
-                )
-                
-                return TradeResult(
-                    order_id=order_id,
-                    market_slug="",  # Will be filled by caller
-                    outcome_name=outcome.name,
-                    amount_usdc=amount_usdc,
-                    shares_purchased=size,
-                    price_per_share=price,
-                    status=status,
-                    tx_hash=None,
-                    payment_info=payment_info,
-                    timestamp=datetime.now()
-                )
-            else:
-                error_msg = resp.get('errorMsg', 'Unknown error')
-                payment_info = PaymentInfo(
-                    amount=amount_usdc,
-                    network="polygon",
-                    token="USDC",
-                    tx_hash=None,
-                    status="failed"
-                )
-                
-                return TradeResult(
-                    order_id="",
-                    market_slug="",
-                    outcome_name=outcome.name,
-                    amount_usdc=amount_usdc,
-                    shares_purchased=0,
-                    price_per_share=price,
-                    status=OrderStatus.FAILED,
-                    tx_hash=None,
-                    payment_info=payment_info,
-                    timestamp=datetime.now(),
-                    error=error_msg
-                )
+            return self.order_result(resp, outcome_name, side, price, size, amount_usdc)
         except Exception as e:
+            return self._failed_result(
+                outcome_name=outcome_name,
+                amount_usdc=amount_usdc,
+                price=price,
+                side=side,
+                error=str(e)
+            )
+    
+    def sign_order(self, token_id: str, side: str, price: float, size: float, expiration: int = 0):
+        """
+        Create and sign a limit order without posting it
+        
+        Args:
+            expiration: Unix seconds after which the order lapses (0 for none)
+        
+        Returns:
+            Signed order, postable with post_signed_order
+        """
+        # Ensure credentials are set
+        self._ensure_credentials()
+        
+        # Create order arguments
+        order_args = OrderArgs(
+            price=price,
+            size=size,
+            side=side,
+            token_id=token_id,
+            expiration=expiration
+        )
+        return self.client.create_order(order_args)
+    
+    def post_signed_order(self, signed_order, order_type=None) -> dict:
+        """
+        Post a signed order (a SignedOrder or its serialized dict)
+        
+        Re-posting the same signed order is safe: the exchange identifies
+        orders by their hash, so it can never be filled twice.
+        
+        Args:
+            order_type: CLOB order type (default: GTD for orders signed with
+                an expiration, otherwise GTC)
+        
+        Returns:
+            Raw CLOB response; raises on transport or API errors
+        """
+        if isinstance(signed_order, dict):
+            signed_order = StoredOrder(signed_order)
+        if order_type is None:
+            expiration = int(signed_order.dict().get('expiration') or 0)
+            order_type = OrderType.GTD if expiration else OrderType.GTC
+        self._ensure_credentials()
+        return self.client.post_order(signed_order, order_type)
+    
+    def order_result(
+        self,
+        resp: dict,
+        outcome_name: str,
+        side: str,
+        price: float,
+        size: float,
+        amount_usdc: float
+    ) -> TradeResult:
+        """Wrap a CLOB post_order response in a TradeResult"""
+        # Parse response
+        if resp.get('success'):
+            order_id = resp.get('orderID') or resp.get('orderId', '')
+            status = OrderStatus.COMPLETED if resp.get('status') == 'matched' else OrderStatus.TRADING
+            
+            # Create placeholder payment info (will be filled by orchestrator)
             payment_info = PaymentInfo(
                 amount=amount_usdc,
                 network="polygon",
                 token="USDC",
                 tx_hash=None,
-                status="failed"
+                status="completed"
             )
             
             return TradeResult(
-                order_id="",
-                market_slug="",
-                outcome_name=outcome.name,
+                order_id=order_id,
+                market_slug="",  # Will be filled by caller
+                outcome_name=outcome_name,
                 amount_usdc=amount_usdc,
-                shares_purchased=0,
+                shares_purchased=size,
                 price_per_share=price,
-                status=OrderStatus.FAILED,
+                status=status,
                 tx_hash=None,
                 payment_info=payment_info,
                 timestamp=datetime.now(),
-                error=str(e)
+                side=side
             )
+        
+        return self._failed_result(
+            outcome_name=outcome_name,
+            amount_usdc=amount_usdc,
+            price=price,
+            side=side,
+            error=resp.get('errorMsg', 'Unknown error')
+        )
+    
+    def prepare(self, token_id: str, market_slug: str = "", outcome_name: str = "") -> OrderTemplate:
+        """
+        Resolve everything an order on token_id needs except price and size
+        
+        Fetches tick size, neg-risk flag and fee rate once so that fire() can
+        sign locally without any lookup round trips.
+        
+        Returns:
+            OrderTemplate, also cached for fire()
+        """
+        self._ensure_credentials()
+        
+        try:
+            # Fee rate lookups only exist in newer py-clob-client releases
+            fee_rate_bps = self.client.get_fee_rate_bps(token_id) if hasattr(self.client, 'get_fee_rate_bps') else 0
+            template = OrderTemplate(
+                token_id=token_id,
+                tick_size=str(self.client.get_tick_size(token_id)),
+                neg_risk=bool(self.client.get_neg_risk(token_id)),
+                fee_rate_bps=int(fee_rate_bps or 0),
+                market_slug=market_slug,
+                outcome_name=outcome_name
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to prepare order template: {e}")
+        
+        self.templates[token_id] = template
+        self._order_builder(template.neg_risk)
+        return template
+    
+    def warm(self):
+        """Open (or keep alive) the pooled connection to the CLOB"""
+        try:
+            self.client.get_ok()
+        except Exception as e:
+            raise RuntimeError(f"Failed to reach CLOB: {e}")
+    
+    def fire(
+        self,
+        token_id: str,
+        price: float,
+        size: float,
+        side: str = BUY,
+        order_type=OrderType.GTC
+    ) -> TradeResult:
+        """
+        Sign and post an order from a prepared template
+        
+        Only the local signature and a single POST happen here; call prepare()
+        for the token beforehand.
+        
+        Args:
+            token_id: Prepared outcome token id
+            price: Limit price per share
+            size: Number of shares
+            side: BUY or SELL
+            order_type: CLOB order type
+        
+        Returns:
+            TradeResult with sign/post timings
+        """
+        template = self.templates.get(token_id)
+        if template is None:
+            raise ValueError(f"No prepared template for token {token_id}; call prepare() first")
+        
+        tick = float(template.tick_size)
+        if not tick <= price <= 1 - tick:
+            return self._failed_result(
+                template.outcome_name, size * price, price, side,
+                f"Price {price} outside [{tick}, {1 - tick}]"
+            )
+        
+        started = time.perf_counter()
+        try:
+            signed_order = self._sign_from_template(template, price, size, side)
+            signed = time.perf_counter()
+            resp = self.client.post_order(signed_order, order_type)
+            posted = time.perf_counter()
+        except Exception as e:
+            result = self._failed_result(template.outcome_name, size * price, price, side, str(e))
+            result.market_slug = template.market_slug
+            return result
+        
+        result = self.order_result(resp, template.outcome_name, side, price, size, size * price)
+        result.market_slug = template.market_slug
+        result.timings = {'sign': signed - started, 'post': posted - signed}
+        return result
+    
+    def _order_builder(self, neg_risk: bool) -> UtilsOrderBuilder:
+        """Exchange order builder with a pre-parsed signing key, cached per exchange"""
+        order_builder = self._order_builders.get(neg_risk)
+        if order_builder is None:
+            order_builder = UtilsOrderBuilder(
+                get_contract_config(self.chain_id, neg_risk).exchange,
+                self.chain_id,
+                CachedKeySigner(self._private_key)
+            )
+            self._order_builders[neg_risk] = order_builder
+        return order_builder
+    
+    def _sign_from_template(self, template: OrderTemplate, price: float, size: float, side: str):
+        """Build and sign an order locally with a cached exchange builder and signer"""
+        builder = self.client.builder
+        side_value, maker_amount, taker_amount = builder.get_order_amounts(
+            side, size, price, ROUNDING_CONFIG[template.tick_size]
+        )
+        
+        order_builder = self._order_builder(template.neg_risk)
+        return order_builder.build_signed_order(OrderData(
+            maker=builder.funder,
+            taker=ZERO_ADDRESS,
+            tokenId=template.token_id,
+            makerAmount=str(maker_amount),
+            takerAmount=str(taker_amount),
+            side=side_value,
+            feeRateBps=str(template.fee_rate_bps),
+            nonce="0",
+            signer=order_builder.signer.address(),
+            expiration="0",
+            signatureType=builder.sig_type
+        ))
+    
+    def find_order(
+        self,
+        token_id: str,
+        side: str,
+        price: float,
+        size: float,
+        since: datetime
+    ) -> Optional[dict]:
+        """
+        Look for an order we placed with the given terms, open or already traded
+        
+        Args:
+            token_id: Outcome token id
+            side: BUY or SELL
+            price: Limit price
+            size: Original size in shares
+            since: Only consider orders created at or after this time
+        
+        Returns:
+            CLOB order dict, or None if no such order exists
+        """
+        self._ensure_credentials()
+        after = int(since.timestamp())
+        
+        def matches(order: dict) -> bool:
+            return (
+                order.get('side', '').upper() == side
+                and abs(float(order.get('price', 0)) - price) < 1e-9
+                and abs(float(order.get('original_size', 0)) - size) < 1e-6
+                and int(order.get('created_at') or after) >= after
+            )
+        
+        try:
+            for order in self.client.get_orders(OpenOrderParams(asset_id=token_id)):
+                if matches(order):
+                    return order
+            
+            # Fully matched orders leave the book; find them through our trades
+            address = (self.proxy_address or self.client.get_address()).lower()
+            candidates = []
+            for trade in self.client.get_trades(TradeParams(asset_id=token_id, after=after)):
+                if trade.get('trader_side') == 'TAKER':
+                    candidates.append(trade.get('taker_order_id'))
+                for maker in trade.get('maker_orders') or []:
+                    if (maker.get('maker_address') or '').lower() == address:
+                        candidates.append(maker.get('order_id'))
+            
+            for order_id in dict.fromkeys(c for c in candidates if c):
+                order = self.client.get_order(order_id)
+                if order and matches(order):
+                    return order
+        except Exception as e:
+            raise RuntimeError(f"Failed to look up orders: {e}")
+        
+        return None
+    
+    def _failed_result(
+        self,
+        outcome_name: str,
+        amount_usdc: float,
+        price: float,
+        side: str,
+        error: str
+    ) -> TradeResult:
+        """Build a TradeResult for an order that was not placed"""
+        payment_info = PaymentInfo(
+            amount=amount_usdc,
+            network="polygon",
+            token="USDC",
+            tx_hash=None,
+            status="failed"
+        )
+        
+        return TradeResult(
+            order_id="",
+            market_slug="",
+            outcome_name=outcome_name,
+            amount_usdc=amount_usdc,
+            shares_purchased=0,
+            price_per_share=price,
+            status=OrderStatus.FAILED,
+            tx_hash=None,
+            payment_info=payment_info,
+            timestamp=datetime.now(),
+            error=error,
+            side=side
+        )
+    
+    def get_positions(self, user: Optional[str] = None, size_threshold: float = 0.0) -> List[Position]:
+        """
+        Get open positions from the Polymarket data API, aggregated per token id
+        
+        Args:
+            user: Wallet address holding the positions (defaults to proxy or signer address)
+            size_threshold: Ignore positions smaller than this many shares
+        
+        Returns:
+            List of Position objects
+        """
+        user = user or self.proxy_address or self.client.get_address()
+        endpoint = f"{self.data_endpoint}/positions"
+        limit = 500
+        offset = 0
+        rows = []
+        
+        try:
+            while True:
+                response = requests.get(endpoint, params={
+                    'user': user,
+                    'sizeThreshold': size_threshold,
+                    'limit': limit,
+                    'offset': offset
+                })
+                response.raise_for_status()
+                page = response.json()
+                rows.extend(page)
+                if len(page) < limit:
+                    break
+                offset += limit
+        except requests.exceptions.RequestException as e:
+            raise RuntimeError(f"Failed to fetch positions: {e}")
+        
+        positions: Dict[str, Position] = {}
+        for row in rows:
+            token_id = str(row.get('asset', ''))
+            size = float(row.get('size') or 0)
+            if not token_id or size <= size_threshold:
+                continue
+            
+            avg_price = float(row.get('avgPrice') or 0)
+            existing = positions.get(token_id)
+            if existing:
+                total = existing.size + size
+                existing.avg_price = (existing.cost_basis + size * avg_price) / total
+                existing.size = total
+                continue
+            
+            positions[token_id] = Position(
+                token_id=token_id,
+                size=size,
+                avg_price=avg_price,
+                condition_id=row.get('conditionId', ''),
+                market_slug=row.get('eventSlug') or row.get('slug', ''),
+                outcome_name=row.get('outcome', ''),
+                outcome_index=int(row.get('outcomeIndex') or 0),
+                neg_risk=bool(row.get('negativeRisk'))
+            )
+        
+        return list(positions.values())
+    
+    def get_order_book_top(self, token_id: str) -> tuple:
+        """
+        Get the best bid and ask for a token
+        
+        Returns:
+            Tuple of (best_bid, best_ask), either of which may be None
+        """
+        try:
+            book = self.client.get_order_book(token_id)
+        except Exception as e:
+            raise RuntimeError(f"Failed to get order book: {e}")
+        
+        bids = [float(level.price) for level in (book.bids or [])]
+        asks = [float(level.price) for level in (book.asks or [])]
+        return (max(bids) if bids else None, min(asks) if asks else None)
+    
+    def _batched(self, what: str, fetch, token_ids: List[str], max_workers: int) -> list:
+        """
+        Call a CLOB batch endpoint for any number of tokens
+        
+        Token ids are deduplicated and split into chunks of BATCH_LIMIT,
+        which are requested concurrently.
+        
+        Returns:
+            List of per-chunk responses
+        """
+        token_ids = list(dict.fromkeys(t for t in token_ids if t))
+        chunks = [token_ids[i:i + BATCH_LIMIT] for i in range(0, len(token_ids), BATCH_LIMIT)]
+        
+        def call(chunk: List[str]):
+            try:
+                return fetch(chunk)
+            except Exception as e:
+                raise RuntimeError(f"Failed to get {what}: {e}")
+        
+        if len(chunks) <= 1:
+            return [call(chunk) for chunk in chunks]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+            return list(pool.map(call, chunks))
+    
+    def get_midpoints(self, token_ids: List[str], max_workers: int = 8) -> Dict[str, float]:
+        """
+        Get midpoint prices for any number of tokens in batched requests
+        
+        Returns:
+            Dictionary of token id to midpoint price
+        """
+        responses = self._batched(
+            "midpoints",
+            lambda chunk: self.client.get_midpoints([BookParams(token_id=t) for t in chunk]),
+            token_ids,
+            max_workers
+        )
+        return {token_id: float(price) for resp in responses for token_id, price in resp.items()}
+    
+    def get_prices(self, token_ids: List[str], max_workers: int = 8) -> Dict[str, tuple]:
+        """
+        Get the best bid and ask for any number of tokens in batched requests
+        
+        Args:
+            token_ids: Outcome token ids
+            max_workers: Maximum number of concurrent requests
+        
+        Returns:
+            Dictionary of token id to (best_bid, best_ask), either of which may
+            be None; tokens without a book are omitted
+        """
+        def fetch(chunk: List[str]) -> dict:
+            # The BUY side quotes the best bid, the SELL side the best ask
+            return self.client.get_prices(
+                [BookParams(token_id=t, side=side) for t in chunk for side in (BUY, SELL)]
+            )
+        
+        quotes = {}
+        for resp in self._batched("prices", fetch, token_ids, max_workers):
+            for token_id, sides in resp.items():
+                bid, ask = sides.get(BUY), sides.get(SELL)
+                quotes[token_id] = (
+                    float(bid) if bid is not None else None,
+                    float(ask) if ask is not None else None
+                )
+        return quotes
+    
+    def get_books(self, token_ids: List[str], max_workers: int = 8) -> Dict[str, tuple]:
+        """
+        Get full order books for any number of tokens in batched requests
+        
+        Args:
+            token_ids: Outcome token ids
+            max_workers: Maximum number of concurrent requests
+        
+        Returns:
+            Dictionary of token id to (bids, asks), each a list of
+            (price, size) tuples best first; tokens without a book are omitted
+        """
+        def fetch(chunk: List[str]) -> list:
+            return self.client.get_order_books([BookParams(token_id=t) for t in chunk])
+        
+        books = {}
+        for summaries in self._batched("order books", fetch, token_ids, max_workers):
+            for book in summaries:
+                bids = sorted(((float(level.price), float(level.size)) for level in (book.bids or [])), reverse=True)
+                asks = sorted((float(level.price), float(level.size)) for level in (book.asks or []))
+                books[book.asset_id] = (bids, asks)
+        return books
+    
+    def get_price_history(
+        self,
+        token_id: str,
+        start_ts: Optional[float] = None,
+        end_ts: Optional[float] = None,
+        fidelity: int = 1
+    ) -> List[tuple]:
+        """
+        Get a token's price history from the CLOB
+        
+        Args:
+            token_id: Outcome token id
+            start_ts: Unix start time (defaults to the full history)
+            end_ts: Unix end time (defaults to now)
+            fidelity: Resolution in minutes
+        
+        Returns:
+            List of (timestamp, price) tuples, oldest first
+        """
+        params: Dict[str, Union[str, int]] = {'market': token_id, 'fidelity': fidelity}
+        if start_ts is None:
+            params['interval'] = 'max'
+        else:
+            params['startTs'] = int(start_ts)
+            params['endTs'] = int(end_ts if end_ts is not None else time.time())
+        
+        try:
+            response = requests.get(f"{self.host}/prices-history", params=params)
+            response.raise_for_status()
+            history = response.json().get('history', [])
+        except requests.exceptions.RequestException as e:
+            raise RuntimeError(f"Failed to get price history: {e}")
+        
+        return sorted((float(point['t']), float(point['p'])) for point in history)
+    
+    def value_positions(self, positions: List[Position], max_workers: int = 16) -> List[Position]:
+        """
+        Fill best_bid/best_ask on positions from batched price quotes
+        
+        Args:
+            positions: Positions to value (updated in place)
+            max_workers: Maximum number of concurrent requests
+        
+        Returns:
+            The same list of positions
+        """
+        if not positions:
+            return positions
+        
+        try:
+            quotes = self.get_prices([p.token_id for p in positions], max_workers)
+        except RuntimeError:
+            quotes = None
+        
+        if quotes is not None:
+            for position in positions:
+                position.best_bid, position.best_ask = quotes.get(position.token_id, (None, None))
+            return positions
+        
+        # A batch containing a token without a book can fail as a whole;
+        # fall back to one request per position
+        def fetch(position: Position):
+            try:
+                position.best_bid, position.best_ask = self.get_order_book_top(position.token_id)
+            except RuntimeError:
+                # Resolved or delisted markets have no book; leave unvalued
+                position.best_bid, position.best_ask = None, None
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(positions))) as pool:
+            list(pool.map(fetch, positions))
+        
+        return positions
     
     def get_order(self, order_id: str) -> dict:
         """Get order details by ID"""
@@ -184,10 +850,127 @@ class PolymarketClient:
         """Cancel an active order"""
         try:
             resp = self.client.cancel(order_id)
-            return resp.get('success', False)
+            return resp.get('success', False) or order_id in (resp.get('canceled') or [])
         except Exception as e:
             raise RuntimeError(f"Failed to cancel order: {e}")
     
+    def post_orders(
+        self,
+        orders: List[tuple],
+        post_only: bool = False,
+        max_workers: int = 8,
+        order_type=OrderType.GTC
+    ) -> List[dict]:
+        """
+        Sign orders from prepared templates and post them in batches
+        
+        Orders are signed locally (see prepare()) and posted POST_ORDERS_LIMIT
+        at a time, with batches in flight concurrently.
+        
+        Args:
+            orders: (token_id, price, size, side) tuples for prepared tokens
+            post_only: Reject any order that would take liquidity
+            max_workers: Maximum number of batches in flight
+            order_type: CLOB order type of every order
+        
+        Returns:
+            One CLOB response per order, in order; orders whose batch failed,
+            or whose token has no prepared template (e.g. it was forgotten
+            when its market closed), get {'success': False, 'errorMsg': ...}
+        """
+        if not orders:
+            return []
+        self._ensure_credentials()
+        
+        responses: List[dict] = [{}] * len(orders)
+        signed = []  # Positions of the orders in args
+        args = []
+        for i, (token_id, price, size, side) in enumerate(orders):
+            template = self.templates.get(token_id)
+            if template is None:
+                responses[i] = {'success': False, 'errorMsg': f"No prepared template for token {token_id}"}
+                continue
+            signed.append(i)
+            args.append(PostOrdersArgs(
+                order=self._sign_from_template(template, price, size, side),
+                orderType=order_type,
+                postOnly=post_only
+            ))
+        chunks = [args[i:i + POST_ORDERS_LIMIT] for i in range(0, len(args), POST_ORDERS_LIMIT)]
+        
+        def post(chunk: list) -> List[dict]:
+            try:
+                return list(self.client.post_orders(chunk))
+            except Exception as e:
+                return [{'success': False, 'errorMsg': str(e)}] * len(chunk)
+        
+        if len(chunks) <= 1:
+            posted = [resp for chunk in chunks for resp in post(chunk)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+                posted = [resp for batch in pool.map(post, chunks) for resp in batch]
+        for i, resp in zip(signed, posted):
+            responses[i] = resp
+        return responses
+    
+    def cancel_orders(self, order_ids: List[str]) -> List[str]:
+        """
+        Cancel many orders in one request
+        
+        Returns:
+            Ids of the orders that were cancelled
+        """
+        if not order_ids:
+            return []
+        try:
+            resp = self.client.cancel_orders(list(order_ids))
+        except Exception as e:
+            raise RuntimeError(f"Failed to cancel orders: {e}")
+        return list(resp.get('canceled') or [])
+    
+    def cancel_market_orders(self, condition_id: str = "", token_id: str = "") -> List[str]:
+        """
+        Cancel this account's open orders in a market or on one token
+        
+        Returns:
+            Ids of the orders that were cancelled
+        """
+        try:
+            resp = self.client.cancel_market_orders(market=condition_id, asset_id=token_id)
+        except Exception as e:
+            raise RuntimeError(f"Failed to cancel market orders: {e}")
+        return list(resp.get('canceled') or [])
+    
+    def forget(self, token_ids: List[str]):
+        """Drop cached order templates for tokens that no longer trade"""
+        for token_id in token_ids:
+            self.templates.pop(token_id, None)
+    
+    def get_trades(self, after: Optional[int] = None, token_id: Optional[str] = None) -> List[dict]:
+        """
+        Get this account's trades from the CLOB
+        
+        Args:
+            after: Only trades after this Unix time
+            token_id: Only trades of this token
+        
+        Returns:
+            List of CLOB trade dicts
+        """
+        self._ensure_credentials()
+        try:
+            return self.client.get_trades(TradeParams(asset_id=token_id, after=after))
+        except Exception as e:
+            raise RuntimeError(f"Failed to get trades: {e}")
+    
+    def sync_allowances(self):
+        """Have the CLOB re-read this account's USDC balance and allowances from chain"""
+        self._ensure_credentials()
+        try:
+            self.client.update_balance_allowance(BalanceAllowanceParams(asset_type=AssetType.COLLATERAL))
+        except Exception as e:
+            raise RuntimeError(f"Failed to refresh CLOB balance allowance: {e}")
+    
     def get_balances(self) -> dict:
         """Get wallet balances"""
         try:
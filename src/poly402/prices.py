@@ -0,0 +1,346 @@
+"""
+Append-only, memory-mapped per-token price history
+"""
+
+import atexit
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+from .models import PriceBar
+
+# One fixed-width record per price observation
+RECORD = np.dtype([('ts', '<f8'), ('price', '<f4')])
+
+# One sparse index entry per complete block of INDEX_STRIDE records: the
+# block's first timestamp and its price range
+INDEX_RECORD = np.dtype([('ts', '<f8'), ('low', '<f4'), ('high', '<f4')])
+INDEX_STRIDE = 4096
+
+RESOLUTIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def resolution_seconds(resolution: Union[str, float, None]) -> Optional[float]:
+    """Parse a bar resolution such as 30, "5m", "1h" or "1d" into seconds"""
+    if resolution is None or isinstance(resolution, (int, float)):
+        return resolution
+    try:
+        unit = RESOLUTIONS[resolution[-1]]
+        return float(resolution[:-1] or 1) * unit
+    except (KeyError, ValueError, IndexError):
+        try:
+            return float(resolution)
+        except ValueError:
+            raise ValueError(f"Invalid resolution: {resolution}")
+
+
+class _Series:
+    """Files and cached mapping of one token's history"""
+    
+    __slots__ = ('data_path', 'index_path', 'records', 'index', 'last_ts', 'pending')
+    
+    def __init__(self, data_path: Path, index_path: Path):
+        self.data_path = data_path
+        self.index_path = index_path
+        self.records: Optional[np.ndarray] = None  # Mapped by PriceStore._records()
+        self.index: np.ndarray = np.empty(0, dtype=INDEX_RECORD)
+        self.last_ts = -np.inf
+        self.pending: List[Tuple[float, float]] = []
+
+
+class PriceStore:
+    """
+    Local price history, one append-only file of (ts, price) records per token
+    
+    Records are fixed width, so a token's history is memory-mapped as a
+    NumPy array and never parsed. A sparse index holding the timestamp of
+    every INDEX_STRIDE-th record narrows a time range to a few pages before
+    the binary search, keeping range queries over years of ticks in the
+    millisecond range. Observations newer than a token's history are
+    appended; older ones are merged in by rewriting the stored tail from the
+    first block they touch, and duplicate timestamps are dropped. Live ticks
+    are buffered and written in batches.
+    """
+    
+    def __init__(self, path: str, buffer_size: int = 1024):
+        """
+        Initialize price store
+        
+        Args:
+            path: Store directory (created if missing)
+            buffer_size: Live ticks buffered per token before writing
+        """
+        self.path = Path(path).expanduser()
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.buffer_size = buffer_size
+        self._series: Dict[str, _Series] = {}
+        self._lock = threading.RLock()
+        atexit.register(self.flush)
+    
+    def _get(self, token_id: str) -> _Series:
+        series = self._series.get(token_id)
+        if series is None:
+            series = _Series(self.path / f"{token_id}.prices", self.path / f"{token_id}.index")
+            self._series[token_id] = series
+            records = self._records(series)
+            if len(records):
+                series.last_ts = float(records['ts'][-1])
+        return series
+    
+    def _records(self, series: _Series) -> np.ndarray:
+        """Memory-map a series, remapping only when the file has grown"""
+        try:
+            count = series.data_path.stat().st_size // RECORD.itemsize
+        except FileNotFoundError:
+            count = 0
+        if series.records is None or len(series.records) != count:
+            # Plain ndarray view of the mapping: memmap's subclass hooks
+            # dominate the cost of the many small slices queries take
+            series.records = (
+                np.memmap(series.data_path, dtype=RECORD, mode='r', shape=(count,)).view(np.ndarray)
+                if count else np.empty(0, dtype=RECORD)
+            )
+            series.index = (
+                np.fromfile(series.index_path, dtype=INDEX_RECORD) if series.index_path.exists()
+                else np.empty(0, dtype=INDEX_RECORD)
+            )
+        return series.records
+    
+    def append(self, token_id: str, timestamps: Iterable[float], prices: Iterable[float]) -> int:
+        """
+        Write observations for a token
+        
+        Args:
+            token_id: Outcome token id
+            timestamps: Unix timestamps in seconds
+            prices: Prices (0-1)
+        
+        Returns:
+            Number of records written (already stored timestamps are skipped)
+        """
+        ts = np.asarray(timestamps if isinstance(timestamps, np.ndarray) else list(timestamps), dtype='<f8')
+        prices = np.asarray(prices if isinstance(prices, np.ndarray) else list(prices), dtype='<f4')
+        if len(ts) != len(prices):
+            raise ValueError(f"Got {len(ts)} timestamps but {len(prices)} prices")
+        with self._lock:
+            series = self._get(token_id)
+            self._flush_pending(series)
+            return self._write(series, ts, prices)
+    
+    def _write(self, series: _Series, ts: np.ndarray, prices: np.ndarray) -> int:
+        if not len(ts):
+            return 0
+        # Sort the batch and keep the first observation of each timestamp
+        order = np.argsort(ts, kind='stable')
+        ts, prices = ts[order], prices[order]
+        keep = np.concatenate(([True], ts[1:] > ts[:-1]))
+        records = np.empty(int(keep.sum()), dtype=RECORD)
+        records['ts'] = ts[keep]
+        records['price'] = prices[keep]
+        
+        count = self._count(series)
+        if records['ts'][0] > series.last_ts:
+            start, written = count, records
+        else:
+            # Older observations, such as history backfilled behind live
+            # ticks: merge them into the stored tail they fall in and rewrite
+            # it. The file only grows, so existing mappings stay valid.
+            stored = self._records(series)
+            start = self._search(stored['ts'], series.index['ts'], float(records['ts'][0]))
+            tail = np.array(stored[start:])
+            records = records[~np.isin(records['ts'], tail['ts'])]
+            if not len(records):
+                return 0
+            written = np.concatenate((tail, records))
+            written = written[np.argsort(written['ts'], kind='stable')]
+        
+        with open(series.data_path, 'r+b' if start < count else 'ab') as f:
+            f.seek(start * RECORD.itemsize)
+            f.write(written.tobytes())
+        series.last_ts = max(series.last_ts, float(written['ts'][-1]))
+        
+        # Summarize blocks completed or rewritten by this write, including
+        # records of the partial block already on disk
+        first_block = start // INDEX_STRIDE
+        end_block = (start + len(written)) // INDEX_STRIDE
+        if end_block > first_block:
+            series.records = None
+            stored = self._records(series)[first_block * INDEX_STRIDE:end_block * INDEX_STRIDE]
+            blocks = np.ascontiguousarray(stored['price']).reshape(-1, INDEX_STRIDE)
+            entries = np.empty(len(blocks), dtype=INDEX_RECORD)
+            entries['ts'] = stored['ts'][::INDEX_STRIDE]
+            entries['low'] = blocks.min(axis=1)
+            entries['high'] = blocks.max(axis=1)
+            with open(series.index_path, 'ab') as f:
+                f.truncate(first_block * INDEX_RECORD.itemsize)
+                f.write(entries.tobytes())
+            series.records = None  # Remap with the new index
+        return len(records)
+    
+    def _count(self, series: _Series) -> int:
+        try:
+            return series.data_path.stat().st_size // RECORD.itemsize
+        except FileNotFoundError:
+            return 0
+    
+    def record(self, token_id: str, ts: float, price: float):
+        """Buffer one live observation"""
+        with self._lock:
+            series = self._get(token_id)
+            series.pending.append((ts, price))
+            if len(series.pending) >= self.buffer_size:
+                self._flush_pending(series)
+    
+    def _flush_pending(self, series: _Series):
+        if not series.pending:
+            return
+        pending, series.pending = series.pending, []
+        pending.sort()
+        ts, prices = zip(*pending)
+        self._write(series, np.asarray(ts, dtype='<f8'), np.asarray(prices, dtype='<f4'))
+    
+    def flush(self):
+        """Write every buffered live observation"""
+        with self._lock:
+            for series in self._series.values():
+                self._flush_pending(series)
+    
+    def evict(self, token_ids: Iterable[str]):
+        """Write buffered ticks for tokens and release their in-memory series"""
+        with self._lock:
+            for token_id in token_ids:
+                series = self._series.pop(token_id, None)
+                if series is not None:
+                    self._flush_pending(series)
+    
+    def last_timestamp(self, token_id: str) -> Optional[float]:
+        """Timestamp of the newest stored observation, if any"""
+        with self._lock:
+            series = self._get(token_id)
+            self._flush_pending(series)
+            return series.last_ts if np.isfinite(series.last_ts) else None
+    
+    def backfilled(self, token_id: str) -> Optional[float]:
+        """Newest timestamp covered by a CLOB backfill of a token, if any"""
+        try:
+            return float((self.path / f"{token_id}.backfill").read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+    
+    def mark_backfilled(self, token_id: str, ts: float):
+        """Record that a token's CLOB history has been stored up to ts"""
+        (self.path / f"{token_id}.backfill").write_text(repr(float(ts)))
+    
+    def range(
+        self,
+        token_id: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Raw observations in [start, end)
+        
+        Returns:
+            Tuple of (timestamps, prices) arrays, memory-mapped where possible
+        """
+        records, index, lo, hi = self._bounds(token_id, start, end)
+        return records['ts'][lo:hi], records['price'][lo:hi]
+    
+    def _bounds(self, token_id: str, start: Optional[float], end: Optional[float]) -> tuple:
+        """Mapped records, sparse index and record positions of [start, end)"""
+        with self._lock:
+            series = self._get(token_id)
+            self._flush_pending(series)
+            records = self._records(series)
+            index = series.index
+        
+        ts = records['ts']
+        lo = 0 if start is None else self._search(ts, index['ts'], start)
+        hi = len(records) if end is None else self._search(ts, index['ts'], end)
+        return records, index, lo, hi
+    
+    @staticmethod
+    def _search(ts: np.ndarray, index: np.ndarray, value: float) -> int:
+        """First record position with ts >= value, narrowed by the sparse index"""
+        block = int(np.searchsorted(index, value, side='left'))
+        lo = max(block - 1, 0) * INDEX_STRIDE
+        hi = len(ts) if block >= len(index) else min(block * INDEX_STRIDE + 1, len(ts))
+        # Searching a small slice avoids copying the whole strided column
+        return lo + int(np.searchsorted(ts[lo:hi], value, side='left'))
+    
+    def get_price_history(
+        self,
+        token_id: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        resolution: Union[str, float, None] = None
+    ) -> List[PriceBar]:
+        """
+        Price bars for a token, downsampled on the fly
+        
+        Args:
+            token_id: Outcome token id
+            start: Only observations at or after this Unix time
+            end: Only observations before this Unix time
+            resolution: Bar width in seconds or as "30s", "5m", "1h", "1d"
+                (None returns one bar per observation)
+        
+        Returns:
+            List of PriceBar, oldest first
+        """
+        records, index, lo, hi = self._bounds(token_id, start, end)
+        if lo >= hi:
+            return []
+        ts, prices = records['ts'], records['price']
+        
+        seconds = resolution_seconds(resolution)
+        if not seconds:
+            return [
+                PriceBar(float(t), float(p), float(p), float(p), float(p), 1)
+                for t, p in zip(ts[lo:hi], prices[lo:hi])
+            ]
+        
+        first = np.floor(ts[lo] / seconds)
+        edges = (np.arange(first + 1, np.floor(ts[hi - 1] / seconds) + 1)) * seconds
+        coarse = len(edges) * INDEX_STRIDE < hi - lo
+        
+        if coarse:
+            # Few bars over many records: locate bar edges through the index
+            # and take whole blocks' ranges from their summaries
+            positions = [self._search(ts, index['ts'], edge) for edge in edges]
+        else:
+            positions = (lo + np.searchsorted(np.ascontiguousarray(ts[lo:hi]), edges)).tolist()
+        starts = np.array([lo] + positions)
+        ends = np.array(positions + [hi])
+        filled = ends > starts
+        starts, ends = starts[filled], ends[filled]
+        times = (first + np.flatnonzero(filled)) * seconds
+        
+        highs: Union[List[float], np.ndarray]
+        lows: Union[List[float], np.ndarray]
+        if coarse:
+            highs, lows = [], []
+            for a, b in zip(starts, ends):
+                block_lo, block_hi = -(-a // INDEX_STRIDE), b // INDEX_STRIDE
+                if block_hi > block_lo:
+                    parts = [prices[a:block_lo * INDEX_STRIDE], prices[block_hi * INDEX_STRIDE:b]]
+                    high = max([index['high'][block_lo:block_hi].max()] + [p.max() for p in parts if len(p)])
+                    low = min([index['low'][block_lo:block_hi].min()] + [p.min() for p in parts if len(p)])
+                else:
+                    window = prices[a:b]
+                    high, low = window.max(), window.min()
+                highs.append(high)
+                lows.append(low)
+        else:
+            window = np.ascontiguousarray(prices[lo:hi])
+            highs = np.maximum.reduceat(window, starts - lo)
+            lows = np.minimum.reduceat(window, starts - lo)
+        
+        return [
+            PriceBar(float(t), float(o), float(h), float(l), float(c), int(n))
+            for t, o, h, l, c, n in zip(times, prices[starts], highs, lows, prices[ends - 1], ends - starts)
+        ]
+    
+    def tokens(self) -> List[str]:
+        """Token ids with stored history"""
+        return sorted(p.stem for p in self.path.glob("*.prices"))
@@ -0,0 +1,320 @@
+"""
+Sampling profiler for CLI commands and library use
+"""
+
+import atexit
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# Path fragments that attribute a sample to a category, checked from the
+# innermost frame outwards; the first match wins
+CATEGORIES = (
+    ("http", ("requests/", "urllib3/", "http/client.py", "ssl.py", "socket.py", "selectors.py")),
+    ("signing", ("eth_keys/", "coincurve/", "eth_account/", "py_order_utils/", "eth_hash/", "Crypto/")),
+    ("import", ("<frozen importlib",)),
+    ("waiting", ("threading.py", "concurrent/futures/", "queue.py")),
+)
+
+# POLY402_PROFILE values that profile to a generated file name
+_ENABLED = ("1", "true", "yes", "on")
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples every thread's stack from a background thread
+    
+    Each sample is weighted by the wall time since the previous one, so
+    the totals stay right when the interpreter delays the sampler. Nothing
+    is traced between samples, which keeps the overhead on the profiled
+    code near zero. Stage timings (imports, config, client setup, the
+    command) are recorded separately from the samples.
+    """
+    
+    def __init__(self, interval: float = 0.001):
+        """
+        Initialize sampling profiler
+        
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.stages: Dict[str, float] = {}
+        self.started_at: Optional[float] = None
+        self.elapsed = 0.0
+        self._frames: Dict[Frame, int] = {}
+        self._samples: Dict[str, List[Tuple[Tuple[int, ...], float]]] = {}  # Thread name -> (stack, weight)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start sampling"""
+        self.started_at = time.perf_counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="poly402-profiler", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop sampling"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.elapsed = time.perf_counter() - self.started_at
+    
+    def _frame_id(self, code) -> int:
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        index = self._frames.get(key)
+        if index is None:
+            index = self._frames[key] = len(self._frames)
+        return index
+    
+    def _run(self):
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_id(frame.f_code))
+                    frame = frame.f_back
+                stack.reverse()
+                self._samples.setdefault(names.get(ident, str(ident)), []).append((tuple(stack), weight))
+    
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Add the wall time of a block to a named stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - started)
+    
+    def add_stage(self, name: str, seconds: float):
+        """Add wall time to a named stage"""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+    
+    @property
+    def sample_count(self) -> int:
+        return sum(len(samples) for samples in self._samples.values())
+    
+    def _frame_list(self) -> List[Frame]:
+        return sorted(self._frames, key=self._frames.__getitem__)
+    
+    def _category(self, stack: Tuple[int, ...], frames: List[Frame]) -> str:
+        for index in reversed(stack):
+            path = frames[index][1].replace("\\", "/")
+            for category, fragments in CATEGORIES:
+                if any(fragment in path for fragment in fragments):
+                    return category
+        return "other"
+    
+    def categories(self, thread: str = "MainThread") -> Dict[str, float]:
+        """
+        Sampled seconds per category (http, signing, import, waiting, other)
+        
+        Args:
+            thread: Thread whose samples are attributed
+        """
+        frames = self._frame_list()
+        totals: Dict[str, float] = defaultdict(float)
+        for stack, weight in self._samples.get(thread, []):
+            totals[self._category(stack, frames)] += weight
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+    
+    def top(self, n: int = 15) -> List[Tuple[str, float, float]]:
+        """
+        Hottest functions across all threads, ignoring idle samples
+        
+        Returns:
+            List of (function, self seconds, total seconds), most self time first
+        """
+        frames = self._frame_list()
+        own: Dict[int, float] = defaultdict(float)
+        total: Dict[int, float] = defaultdict(float)
+        for samples in self._samples.values():
+            for stack, weight in samples:
+                if not stack or self._category(stack[-1:], frames) == "waiting":
+                    continue
+                own[stack[-1]] += weight
+                for index in set(stack):
+                    total[index] += weight
+        return [
+            (self._label(frames[index]), seconds, total[index])
+            for index, seconds in sorted(own.items(), key=lambda item: item[1], reverse=True)[:n]
+        ]
+    
+    @staticmethod
+    def _label(frame: Frame) -> str:
+        name, path, line = frame
+        return f"{name} ({os.path.basename(path)}:{line})"
+    
+    def speedscope(self, name: str = "poly402") -> dict:
+        """Profile in speedscope's file format, one sampled profile per thread"""
+        frames = self._frame_list()
+        profiles = []
+        for thread, samples in sorted(self._samples.items(), key=lambda item: item[0] != "MainThread"):
+            weights = [weight * 1000 for _, weight in samples]
+            profiles.append({
+                "type": "sampled",
+                "name": thread,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": [list(stack) for stack, _ in samples],
+                "weights": weights
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": n, "file": path, "line": line} for n, path, line in frames]},
+            "profiles": profiles,
+            "name": name,
+            "activeProfileIndex": 0,
+            "exporter": "poly402"
+        }
+    
+    def collapsed(self) -> List[str]:
+        """Folded stacks ("thread;outer;...;inner microseconds") for flamegraph tools"""
+        frames = self._frame_list()
+        folded: Dict[str, float] = defaultdict(float)
+        for thread, samples in self._samples.items():
+            for stack, weight in samples:
+                folded[";".join([thread] + [self._label(frames[index]) for index in stack])] += weight
+        return [f"{stack} {round(weight * 1e6)}" for stack, weight in folded.items()]
+    
+    def write(self, path: str, name: str = "poly402") -> str:
+        """
+        Write the profile, as folded stacks for .folded/.txt paths and as speedscope JSON otherwise
+        
+        Returns:
+            The path written
+        """
+        path = os.path.expanduser(path)
+        with open(path, 'w') as f:
+            if path.endswith(('.folded', '.txt')):
+                f.write("\n".join(self.collapsed()) + "\n")
+            else:
+                json.dump(self.speedscope(name), f)
+        return path
+    
+    def summary(self, n: int = 15) -> str:
+        """Human-readable stage timings, time by category and hottest functions"""
+        lines = [f"Profile: {self.sample_count} samples over {self.elapsed:.3f} s"]
+        if self.stages:
+            lines.append("\nWall time by stage:")
+            lines.extend(f"  {stage:<14} {seconds:8.3f} s" for stage, seconds in self.stages.items())
+        categories = self.categories()
+        if categories:
+            lines.append("\nMain thread time by category (sampled):")
+            lines.extend(f"  {category:<14} {seconds:8.3f} s" for category, seconds in categories.items())
+        top = self.top(n)
+        if top:
+            lines.append("\nHottest functions (self / total, all threads):")
+            lines.extend(f"  {own:8.3f} s {total:8.3f} s  {label}" for label, own, total in top)
+        return "\n".join(lines)
+
+
+_loaded_at = time.perf_counter()
+_active: Optional[SamplingProfiler] = None
+_import_seconds: Optional[float] = None
+_null_stage = contextlib.nullcontext()
+
+
+def active() -> Optional[SamplingProfiler]:
+    """The running profiler, if any"""
+    return _active
+
+
+def stage(name: str):
+    """
+    Time a block as a named stage of the running profile
+    
+    Returns a shared no-op context manager when profiling is off, so
+    instrumented code pays only a global lookup.
+    """
+    if _active is None:
+        return _null_stage
+    return _active.stage(name)
+
+
+def record(name: str, seconds: float):
+    """Add wall time to a named stage of the running profile (no-op when profiling is off)"""
+    if _active is not None:
+        _active.add_stage(name, seconds)
+
+
+def imported(seconds: Optional[float] = None):
+    """
+    Record how long importing poly402 took
+    
+    Args:
+        seconds: Import time (default: time since this module was loaded)
+    """
+    global _import_seconds
+    if seconds is None:
+        seconds = time.perf_counter() - _loaded_at
+    _import_seconds = seconds
+    if _active is not None:
+        _active.add_stage("imports", seconds)
+
+
+def start(interval: float = 0.001) -> SamplingProfiler:
+    """Start the process-wide profiler (or return the one already running)"""
+    global _active
+    if _active is None:
+        _active = SamplingProfiler(interval)
+        if _import_seconds is not None:
+            _active.add_stage("imports", _import_seconds)
+        _active.start()
+    return _active
+
+
+def finish(path: Optional[str] = None, name: str = "poly402") -> Optional[str]:
+    """
+    Stop the process-wide profiler, write its profile and print a summary to stderr
+    
+    Args:
+        path: Output file (default: poly402-<name>-<timestamp>.speedscope.json)
+        name: Profile name, e.g. the command that ran
+    
+    Returns:
+        The path written, or None if no profiler was running
+    """
+    global _active
+    profiler, _active = _active, None
+    if profiler is None:
+        return None
+    profiler.stop()
+    path = path or f"poly402-{name.replace(' ', '-')}-{time.strftime('%Y%m%d-%H%M%S')}.speedscope.json"
+    written = profiler.write(path, name)
+    print(profiler.summary(), file=sys.stderr)
+    print(f"\nProfile written to {written}", file=sys.stderr)
+    return written
+
+
+def from_env():
+    """
+    Start profiling when POLY402_PROFILE is set, writing the profile at exit
+    
+    POLY402_PROFILE is either an output path or 1/true to name the file
+    automatically.
+    """
+    value = os.environ.get('POLY402_PROFILE', '').strip()
+    if not value or value.lower() in ("0", "false", "no", "off") or _active is not None:
+        return
+    path = None if value.lower() in _ENABLED else value
+    start()
+    atexit.register(finish, path, os.path.basename(sys.argv[0]) or "poly402")
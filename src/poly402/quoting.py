@@ -0,0 +1,362 @@
+"""
+Two-sided quoting engine for market making
+"""
+
+import math
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .models import QuoteSpec
+
+Levels = List[Tuple[float, float]]
+Quote = Optional[Tuple[float, float]]  # (price, size), or None for no quote
+
+# Seconds a closed quote is remembered so late trade reports still count
+ORDER_MEMORY = 600
+
+
+def mid_price(token_id: str, bids: Levels, asks: Levels) -> Optional[float]:
+    """Default fair value: the midpoint of the best bid and ask"""
+    if not bids or not asks:
+        return None
+    return (bids[0][0] + asks[0][0]) / 2
+
+
+class _Quote:
+    """A quote resting on the book"""
+    
+    __slots__ = ('order_id', 'token_id', 'side', 'price', 'size', 'filled', 'closed_at')
+    
+    def __init__(self, order_id: str, token_id: str, side: str, price: float, size: float):
+        self.order_id = order_id
+        self.token_id = token_id
+        self.side = side
+        self.price = price
+        self.size = size
+        self.filled = 0.0
+        self.closed_at: Optional[float] = None
+
+
+class QuotingEngine:
+    """
+    Keeps a bid and an ask around a fair value on a set of tokens
+    
+    Book updates only compute the desired quotes and queue the difference
+    from what is resting; flush() then sends every queued cancel in one
+    request and every new quote in post-only batches. A resting quote is
+    replaced only when its desired price moves by requote_ticks or more,
+    or its size has to shrink to respect an inventory limit, so small book
+    moves cost no traffic. Inventory is kept current from this account's
+    trades and skews both quotes toward a flat position.
+    """
+    
+    def __init__(
+        self,
+        polymarket,
+        specs: Iterable[QuoteSpec] = (),
+        fair_value: Optional[Callable[[str, Levels, Levels], Optional[float]]] = None,
+        requote_ticks: int = 1,
+        min_size: float = 5.0,
+        inventory: Optional[Dict[str, float]] = None,
+        on_fill: Optional[Callable[[str, str, float, float], None]] = None,
+        max_workers: int = 8
+    ):
+        """
+        Initialize quoting engine
+        
+        Args:
+            polymarket: PolymarketClient placing the quotes
+            specs: Tokens to quote and their parameters
+            fair_value: Function of (token_id, bids, asks) returning the fair
+                price, or None to pull quotes (default: mid_price). The book
+                it sees excludes our own quotes.
+            requote_ticks: Price move, in ticks, that triggers a requote
+            min_size: Smallest quote in shares
+            inventory: Shares currently held per token id
+            on_fill: Callback invoked with (token_id, side, price, size) per fill
+            max_workers: Maximum number of order batches in flight
+        """
+        self.polymarket = polymarket
+        self.fair_value = fair_value or mid_price
+        self.requote_ticks = requote_ticks
+        self.min_size = min_size
+        self.inventory: Dict[str, float] = dict(inventory or {})
+        self.on_fill = on_fill
+        self.max_workers = max_workers
+        self.specs: Dict[str, QuoteSpec] = {}
+        self.stats = {'requotes': 0, 'posts': 0, 'cancels': 0, 'rejects': 0, 'fills': 0}
+        
+        self._ticks: Dict[str, float] = {}
+        self._live: Dict[Tuple[str, str], _Quote] = {}  # Resting quote per (token, side)
+        self._orders: Dict[str, _Quote] = {}  # Recent quotes by order id, for fill attribution
+        self._pending: Dict[Tuple[str, str], Quote] = {}  # Replacements awaiting flush()
+        self._cancels: List[str] = []
+        self._seen: Dict[str, int] = {}  # Trade fills already applied -> match time
+        self._trades_after = int(time.time())
+        self._lock = threading.Lock()
+        
+        for spec in specs:
+            self.add(spec)
+    
+    def add(self, spec: QuoteSpec):
+        """Start quoting a token"""
+        template = self.polymarket.templates.get(spec.token_id) or self.polymarket.prepare(
+            spec.token_id, spec.market_slug, spec.outcome_name
+        )
+        with self._lock:
+            self.specs[spec.token_id] = spec
+            self._ticks[spec.token_id] = float(template.tick_size)
+            self.inventory.setdefault(spec.token_id, 0.0)
+    
+    def remove(self, token_id: str):
+        """Stop quoting a token; its quotes are cancelled on the next flush()"""
+        with self._lock:
+            self.specs.pop(token_id, None)
+            for side in ("BUY", "SELL"):
+                self._replace((token_id, side), None)
+    
+    def quotes(self, token_id: str, bids: Levels, asks: Levels) -> Tuple[Quote, Quote]:
+        """
+        Desired bid and ask for a token given its book
+        
+        Args:
+            token_id: Quoted token id
+            bids: Bid levels, best first, excluding our own quotes
+            asks: Ask levels, best first, excluding our own quotes
+        
+        Returns:
+            Tuple of (bid, ask), each (price, size) or None
+        """
+        spec = self.specs[token_id]
+        tick = self._ticks[token_id]
+        fair = self.fair_value(token_id, bids, asks)
+        if fair is None:
+            return None, None
+        
+        held = self.inventory.get(token_id, 0.0)
+        center = fair - spec.skew * held
+        bid = math.floor((center - spec.half_spread) / tick + 1e-9) * tick
+        ask = math.ceil((center + spec.half_spread) / tick - 1e-9) * tick
+        # Stay on our side of the book so post-only quotes are accepted
+        if asks:
+            bid = min(bid, asks[0][0] - tick)
+        if bids:
+            ask = max(ask, bids[0][0] + tick)
+        bid = round(max(bid, tick), 6)
+        ask = round(min(ask, 1 - tick), 6)
+        
+        bid_size = min(spec.size, spec.max_position - held)
+        ask_size = min(spec.size, held - spec.min_position)
+        return (
+            (bid, math.floor(bid_size * 100) / 100) if bid_size >= self.min_size and bid < 1 - tick else None,
+            (ask, math.floor(ask_size * 100) / 100) if ask_size >= self.min_size and ask > tick else None
+        )
+    
+    def on_book(self, token_id: str, bids: Levels, asks: Levels) -> int:
+        """
+        Apply a book update, queueing whatever requotes it calls for
+        
+        Args:
+            token_id: Token whose book changed
+            bids: Bid levels, best first (may include our own quotes)
+            asks: Ask levels, best first (may include our own quotes)
+        
+        Returns:
+            Number of sides requoted
+        """
+        with self._lock:
+            if token_id not in self.specs:
+                return 0
+            bids = self._without_own(bids, self._live.get((token_id, "BUY")))
+            asks = self._without_own(asks, self._live.get((token_id, "SELL")))
+            tick = self._ticks[token_id]
+            
+            requoted = 0
+            for side, desired in zip(("BUY", "SELL"), self.quotes(token_id, bids, asks)):
+                key = (token_id, side)
+                if key in self._pending:
+                    current = self._pending[key]
+                else:
+                    live = self._live.get(key)
+                    current = (live.price, live.size - live.filled) if live else None
+                if self._needs_requote(current, desired, tick):
+                    self._replace(key, desired)
+                    requoted += 1
+            self.stats['requotes'] += requoted
+            return requoted
+    
+    @staticmethod
+    def _without_own(levels: Levels, quote: Optional[_Quote]) -> Levels:
+        """Book levels minus our own resting quote"""
+        if quote is None:
+            return levels
+        remaining = quote.size - quote.filled
+        result = []
+        for price, size in levels:
+            if abs(price - quote.price) < 1e-9:
+                size -= remaining
+                if size <= 1e-9:
+                    continue
+            result.append((price, size))
+        return result
+    
+    def _needs_requote(self, current: Quote, desired: Quote, tick: float) -> bool:
+        if current is None or desired is None:
+            return current != desired
+        price, size = desired
+        if abs(price - current[0]) >= self.requote_ticks * tick - 1e-9:
+            return True
+        # Shrink at once to respect inventory limits; top up only once half
+        # of the resting quote has filled
+        return size < current[1] - 1e-9 or current[1] < size / 2
+    
+    def _replace(self, key: Tuple[str, str], desired: Quote):
+        """Queue a resting quote's cancel and its replacement (caller holds the lock)"""
+        live = self._live.pop(key, None)
+        if live is not None:
+            live.closed_at = time.monotonic()
+            self._cancels.append(live.order_id)
+        if desired is None and live is None:
+            self._pending.pop(key, None)
+        else:
+            self._pending[key] = desired
+    
+    def flush(self) -> int:
+        """
+        Send queued cancels and new quotes
+        
+        Returns:
+            Number of quotes posted
+        """
+        with self._lock:
+            cancels, self._cancels = self._cancels, []
+            pending, self._pending = self._pending, {}
+        
+        if cancels:
+            try:
+                self.polymarket.cancel_orders(cancels)
+            except RuntimeError:
+                # Never post replacements while the old quotes may still rest
+                with self._lock:
+                    self._cancels = cancels + self._cancels
+                    self._pending = {**pending, **self._pending}
+                raise
+            self.stats['cancels'] += len(cancels)
+        
+        posts = [(key, desired) for key, desired in pending.items() if desired is not None]
+        responses = self.polymarket.post_orders(
+            [(token_id, price, size, side) for (token_id, side), (price, size) in posts],
+            post_only=True,
+            max_workers=self.max_workers
+        )
+        
+        posted = 0
+        with self._lock:
+            for ((token_id, side), (price, size)), resp in zip(posts, responses):
+                order_id = resp.get('orderID')
+                if not resp.get('success') or not order_id:
+                    self.stats['rejects'] += 1
+                    continue
+                quote = _Quote(order_id, token_id, side, price, size)
+                self._orders[order_id] = quote
+                if (token_id, side) in self._pending or token_id not in self.specs:
+                    # Superseded while in flight
+                    quote.closed_at = time.monotonic()
+                    self._cancels.append(order_id)
+                else:
+                    self._live[(token_id, side)] = quote
+                posted += 1
+        self.stats['posts'] += posted
+        return posted
+    
+    def sync_fills(self) -> int:
+        """
+        Apply this account's new trades against our quotes to the inventory
+        
+        Returns:
+            Number of fills applied
+        """
+        trades = self.polymarket.get_trades(after=self._trades_after)
+        fills = []
+        with self._lock:
+            newest = self._trades_after
+            for trade in trades:
+                match_time = int(trade.get('match_time') or 0)
+                newest = max(newest, match_time)
+                for maker in trade.get('maker_orders') or []:
+                    quote = self._orders.get(maker.get('order_id'))
+                    fill_id = f"{trade.get('id')}:{maker.get('order_id')}"
+                    if quote is None or fill_id in self._seen:
+                        continue
+                    self._seen[fill_id] = match_time
+                    size = float(maker.get('matched_amount') or 0)
+                    price = float(maker.get('price') or quote.price)
+                    quote.filled += size
+                    self.inventory[quote.token_id] = (
+                        self.inventory.get(quote.token_id, 0.0) + (size if quote.side == "BUY" else -size)
+                    )
+                    if quote.filled >= quote.size - 1e-9 and self._live.get((quote.token_id, quote.side)) is quote:
+                        del self._live[(quote.token_id, quote.side)]
+                        quote.closed_at = time.monotonic()
+                    fills.append((quote.token_id, quote.side, price, size))
+            
+            # Re-read the newest second next time (trades are reported to the
+            # second); fills already applied are skipped by id
+            self._trades_after = max(self._trades_after, newest - 1)
+            self._seen = {k: t for k, t in self._seen.items() if t >= self._trades_after}
+            cutoff = time.monotonic() - ORDER_MEMORY
+            self._orders = {
+                order_id: quote for order_id, quote in self._orders.items()
+                if quote.closed_at is None or quote.closed_at > cutoff
+            }
+        
+        self.stats['fills'] += len(fills)
+        if self.on_fill:
+            for fill in fills:
+                self.on_fill(*fill)
+        return len(fills)
+    
+    def cancel_all(self) -> int:
+        """
+        Pull every quote
+        
+        Returns:
+            Number of orders cancelled
+        """
+        with self._lock:
+            order_ids = self._cancels + [quote.order_id for quote in self._live.values()]
+            for quote in self._live.values():
+                quote.closed_at = time.monotonic()
+            self._live.clear()
+            self._pending.clear()
+            self._cancels = []
+        if not order_ids:
+            return 0
+        cancelled = len(self.polymarket.cancel_orders(order_ids))
+        self.stats['cancels'] += cancelled
+        return cancelled
+    
+    def run(self, interval: float = 0.5, stop: Optional[threading.Event] = None):
+        """
+        Poll books and fills, requoting until stopped; quotes are pulled on exit
+        
+        Args:
+            interval: Seconds between passes
+            stop: Event that ends the loop when set
+        """
+        stop = stop or threading.Event()
+        try:
+            while not stop.is_set():
+                started = time.monotonic()
+                try:
+                    self.sync_fills()
+                    books = self.polymarket.get_books(list(self.specs), self.max_workers)
+                    for token_id, (bids, asks) in books.items():
+                        self.on_book(token_id, bids, asks)
+                    self.flush()
+                except RuntimeError as e:
+                    print(f"Warning: Quoting pass failed: {e}", file=sys.stderr)
+                stop.wait(max(0.0, interval - (time.monotonic() - started)))
+        finally:
+            self.cancel_all()
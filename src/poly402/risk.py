@@ -0,0 +1,490 @@
+"""
+Portfolio risk: exposure, mark-to-market PnL and resolution scenarios
+"""
+
+import threading
+from dataclasses import replace
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from .models import Exposure, Position, ScenarioReport
+
+# Scenarios simulated per vectorized batch, bounding memory
+SCENARIO_BATCH = 2048
+
+RISK_GROUPS = ('event', 'market', 'set')
+
+
+class RiskEngine:
+    """
+    Exposure and resolution risk across all positions
+    
+    Positions are held as arrays and grouped into mutually exclusive
+    outcome sets: a plain market resolves to exactly one of its outcomes,
+    and a neg-risk event resolves Yes on at most one of its markets (or on
+    a market no position is held in). For every set the engine keeps the
+    payout of each possible resolution, so the worst case of a set is a
+    row minimum and thousands of resolution scenarios are a gather and a
+    sum. Pre-trade checks only touch the set of the traded token and two
+    exposure totals, keeping them well under a millisecond.
+    """
+    
+    def __init__(
+        self,
+        positions: Optional[Iterable[Position]] = None,
+        max_event_exposure: Optional[float] = None,
+        max_market_exposure: Optional[float] = None,
+        max_loss: Optional[float] = None
+    ):
+        """
+        Initialize risk engine
+        
+        Args:
+            positions: Current positions (optional; see load())
+            max_event_exposure: Maximum USDC cost basis per event (optional)
+            max_market_exposure: Maximum USDC cost basis per market (optional)
+            max_loss: Maximum worst-case resolution loss across all
+                positions (optional)
+        """
+        self.max_event_exposure = max_event_exposure
+        self.max_market_exposure = max_market_exposure
+        self.max_loss = max_loss
+        self._lock = threading.RLock()
+        self.load(positions or [])
+        self.loaded = positions is not None
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether any pre-trade limit is configured"""
+        return any(limit is not None for limit in (
+            self.max_event_exposure, self.max_market_exposure, self.max_loss
+        ))
+    
+    def load(self, positions: Iterable[Position]):
+        """
+        Replace the tracked positions
+        
+        Args:
+            positions: Current positions (copied)
+        """
+        with self._lock:
+            self.positions: List[Position] = [replace(p) for p in positions]
+            self._build()
+            self.loaded = True
+    
+    def ensure_loaded(self, fetch: Callable[[], Iterable[Position]]):
+        """Load positions from fetch() unless positions were already loaded"""
+        with self._lock:
+            if not self.loaded:
+                self.load(fetch())
+    
+    @staticmethod
+    def _set_key(event: str, condition_id: str, neg_risk: bool) -> str:
+        return f"event:{event}" if neg_risk else f"market:{condition_id}"
+    
+    def _build(self):
+        """Rebuild the position arrays and per-set payout table"""
+        positions = self.positions
+        n = len(positions)
+        self.index: Dict[str, int] = {p.token_id: i for i, p in enumerate(positions)}
+        self.size = np.array([p.size for p in positions], dtype=float)
+        self.cost = np.array([p.cost_basis for p in positions], dtype=float)
+        self.bid = np.array([np.nan if p.best_bid is None else p.best_bid for p in positions], dtype=float)
+        self.ask = np.array([np.nan if p.best_ask is None else p.best_ask for p in positions], dtype=float)
+        
+        # Group keys, and each position's resolution state within its set.
+        # In a neg-risk event the states are the held markets plus "other";
+        # a No token pays in every state but its own market's.
+        self.events: List[str] = []
+        self.markets: List[str] = []
+        self.sets: List[str] = []
+        self._event_ids: Dict[str, int] = {}
+        self._market_ids: Dict[str, int] = {}
+        self._set_ids: Dict[str, int] = {}
+        self._set_event: List[int] = []
+        self._set_states: List[Dict[str, int]] = []  # Condition id (neg-risk) or outcome index -> state
+        self._set_neg_risk: List[bool] = []
+        event_of = np.zeros(n, dtype=np.intp)
+        market_of = np.zeros(n, dtype=np.intp)
+        set_of = np.zeros(n, dtype=np.intp)
+        state_of = np.zeros(n, dtype=np.intp)
+        self.inverse = np.zeros(n, dtype=bool)
+        self.is_yes = np.array([p.outcome_index == 0 for p in positions], dtype=bool)
+        
+        for i, p in enumerate(positions):
+            condition = p.condition_id or p.token_id
+            event_of[i] = self._event_ids.setdefault(p.market_slug, len(self._event_ids))
+            market_of[i] = self._market_ids.setdefault(condition, len(self._market_ids))
+            key = self._set_key(p.market_slug, condition, p.neg_risk)
+            if key not in self._set_ids:
+                self._set_ids[key] = len(self._set_ids)
+                self._set_event.append(event_of[i])
+                self._set_states.append({})
+                self._set_neg_risk.append(p.neg_risk)
+            s = set_of[i] = self._set_ids[key]
+            states = self._set_states[s]
+            if p.neg_risk:
+                state_of[i] = states.setdefault(condition, len(states))
+                self.inverse[i] = p.outcome_index != 0
+            else:
+                state_of[i] = p.outcome_index
+                states.setdefault(str(p.outcome_index), p.outcome_index)
+        
+        self.events = list(self._event_ids)
+        self.markets = list(self._market_ids)
+        self.sets = list(self._set_ids)
+        self.event_of, self.market_of, self.set_of, self.state_of = event_of, market_of, set_of, state_of
+        
+        # Plain markets have (at least) two outcomes; neg-risk sets add "other"
+        n_sets = len(self.sets)
+        self.n_states = np.array([
+            len(states) + 1 if neg_risk else max(2, max(states.values()) + 1)
+            for states, neg_risk in zip(self._set_states, self._set_neg_risk)
+        ], dtype=np.intp)
+        width = int(self.n_states.max()) if n_sets else 1
+        self.valid = np.arange(width)[None, :] < self.n_states[:, None]
+        
+        self.payout = np.zeros((n_sets, width))
+        np.add.at(self.payout, (set_of, state_of), np.where(self.inverse, 0.0, self.size))
+        inverse_total = np.bincount(set_of[self.inverse], self.size[self.inverse], minlength=n_sets)
+        inverse_own = np.zeros((n_sets, width))
+        np.add.at(inverse_own, (set_of[self.inverse], state_of[self.inverse]), self.size[self.inverse])
+        self.payout += (inverse_total[:, None] - inverse_own) * self.valid
+        
+        self.set_cost = np.bincount(set_of, self.cost, minlength=n_sets)
+        self.event_cost = np.bincount(event_of, self.cost, minlength=len(self.events))
+        self.market_cost = np.bincount(market_of, self.cost, minlength=len(self.markets))
+        self.set_loss = self.set_cost - np.where(self.valid, self.payout, np.inf).min(axis=1) if n_sets else np.zeros(0)
+        self.total_loss = float(self.set_loss.sum())
+    
+    def _candidate(
+        self,
+        token_id: str,
+        event: str,
+        condition_id: str,
+        neg_risk: bool,
+        outcome_index: int,
+        size: float,
+        price: float
+    ) -> Tuple[Optional[int], float]:
+        """Outcome set of a hypothetical fill and that set's loss after it"""
+        cost = size * price
+        condition = condition_id or token_id
+        s = self._set_ids.get(self._set_key(event, condition, neg_risk))
+        if s is None:
+            # A new set: the bought outcome may simply lose
+            return None, max(cost, 0.0)
+        
+        n_states = self.n_states[s]
+        row = self.payout[s, :n_states]
+        if not neg_risk:
+            row = np.pad(row, (0, max(0, outcome_index + 1 - n_states)))
+            row[outcome_index] += size
+        else:
+            state = self._set_states[s].get(condition)
+            inverse = outcome_index != 0
+            if state is not None:
+                row = row + size if inverse else row.copy()
+                row[state] += -size if inverse else size
+            else:
+                # A market not yet held becomes a new state, paying like "other"
+                other = row[-1]
+                row = np.append(row + size, other) if inverse else np.append(row, other + size)
+        return s, float(self.set_cost[s] + cost - row.min())
+    
+    def check(
+        self,
+        token_id: str,
+        size: float,
+        price: float,
+        event: str = "",
+        condition_id: str = "",
+        neg_risk: bool = False,
+        outcome_index: int = 0,
+        reserve: bool = False
+    ):
+        """
+        Check a buy against the configured limits
+        
+        Args:
+            token_id: Token to buy
+            size: Shares to buy
+            price: Limit price per share
+            event: Event slug of the market
+            condition_id: Condition id of the market
+            neg_risk: Whether the event is neg-risk
+            outcome_index: 0 for Yes, 1 for No
+            reserve: Count the buy against the limits straight away (release
+                it with apply() and a negative size if it is not placed)
+        
+        Raises:
+            ValueError: If the buy would breach a limit
+        """
+        cost = size * price
+        with self._lock:
+            if self.max_event_exposure is not None:
+                e = self._event_ids.get(event)
+                exposure = (self.event_cost[e] if e is not None else 0.0) + cost
+                if exposure > self.max_event_exposure + 1e-9:
+                    raise ValueError(
+                        f"Risk limit: exposure to event '{event}' would be ${exposure:.2f} "
+                        f"(max ${self.max_event_exposure:.2f})"
+                    )
+            if self.max_market_exposure is not None:
+                m = self._market_ids.get(condition_id or token_id)
+                exposure = (self.market_cost[m] if m is not None else 0.0) + cost
+                if exposure > self.max_market_exposure + 1e-9:
+                    raise ValueError(
+                        f"Risk limit: exposure to market {condition_id or token_id} would be ${exposure:.2f} "
+                        f"(max ${self.max_market_exposure:.2f})"
+                    )
+            if self.max_loss is not None:
+                s, loss = self._candidate(token_id, event, condition_id, neg_risk, outcome_index, size, price)
+                total = self.total_loss - (self.set_loss[s] if s is not None else 0.0) + loss
+                if total > self.max_loss + 1e-9:
+                    raise ValueError(
+                        f"Risk limit: worst-case loss would be ${total:.2f} (max ${self.max_loss:.2f})"
+                    )
+            if reserve:
+                self.apply(token_id, size, price, event, condition_id, neg_risk, outcome_index)
+    
+    def apply(
+        self,
+        token_id: str,
+        size: float,
+        price: float,
+        event: str = "",
+        condition_id: str = "",
+        neg_risk: bool = False,
+        outcome_index: int = 0,
+        outcome_name: str = ""
+    ):
+        """
+        Record a buy (or, with a negative size, undo one at its price)
+        
+        Args:
+            token_id: Token bought
+            size: Shares bought (negative to release a reservation)
+            price: Price per share
+            event: Event slug of the market
+            condition_id: Condition id of the market
+            neg_risk: Whether the event is neg-risk
+            outcome_index: 0 for Yes, 1 for No
+            outcome_name: Outcome name, for reports
+        """
+        with self._lock:
+            i = self.index.get(token_id)
+            if i is None:
+                if size <= 0:
+                    return
+                self.positions.append(Position(
+                    token_id=token_id,
+                    size=size,
+                    avg_price=price,
+                    condition_id=condition_id,
+                    market_slug=event,
+                    outcome_name=outcome_name,
+                    outcome_index=outcome_index,
+                    neg_risk=neg_risk
+                ))
+                self._build()
+                return
+            
+            position = self.positions[i]
+            total = position.size + size
+            position.avg_price = (position.cost_basis + size * price) / total if total > 1e-9 else 0.0
+            position.size = max(total, 0.0)
+            size = position.size - self.size[i]
+            cost = position.cost_basis - self.cost[i]
+            self.size[i] = position.size
+            self.cost[i] = position.cost_basis
+            
+            s, state = self.set_of[i], self.state_of[i]
+            n_states = self.n_states[s]
+            if self.inverse[i]:
+                self.payout[s, :n_states] += size
+                self.payout[s, state] -= size
+            else:
+                self.payout[s, state] += size
+            self.set_cost[s] += cost
+            self.event_cost[self.event_of[i]] += cost
+            self.market_cost[self.market_of[i]] += cost
+            loss = self.set_cost[s] - self.payout[s, :n_states].min()
+            self.total_loss += loss - self.set_loss[s]
+            self.set_loss[s] = loss
+    
+    def _value(self) -> np.ndarray:
+        """Position values at the best bid (cost for unpriced positions)"""
+        return np.where(np.isnan(self.bid), self.cost, self.size * np.nan_to_num(self.bid))
+    
+    def summary(self) -> Exposure:
+        """Exposure of the whole portfolio (max_loss is the sum over outcome sets)"""
+        with self._lock:
+            return Exposure(
+                key="portfolio",
+                label="Portfolio",
+                positions=int(np.count_nonzero(self.size > 0)),
+                cost=float(self.cost.sum()),
+                value=float(self._value().sum()),
+                max_loss=self.total_loss
+            )
+    
+    def exposures(self, by: str = 'event') -> List[Exposure]:
+        """
+        Exposure per event, market or mutually exclusive outcome set
+        
+        Args:
+            by: "event", "market" or "set"
+        
+        Returns:
+            List of Exposure, largest worst-case loss first
+        """
+        if by not in RISK_GROUPS:
+            raise ValueError(f"Invalid grouping: {by} (expected one of {', '.join(RISK_GROUPS)})")
+        
+        with self._lock:
+            value = self._value()
+            held = (self.size > 0).astype(float)
+            if by == 'set':
+                keys, group, cost, max_loss = self.sets, self.set_of, self.set_cost, self.set_loss
+                labels = [self._set_label(s) for s in range(len(keys))]
+            elif by == 'event':
+                keys, group, cost = self.events, self.event_of, self.event_cost
+                max_loss = np.bincount(
+                    np.array(self._set_event, dtype=np.intp), self.set_loss, minlength=len(keys)
+                )
+                labels = keys
+            else:
+                # A market alone resolves Yes or No
+                keys, group, cost = self.markets, self.market_of, self.market_cost
+                yes = np.bincount(group, self.size * self.is_yes, minlength=len(keys))
+                no = np.bincount(group, self.size * ~self.is_yes, minlength=len(keys))
+                max_loss = cost - np.minimum(yes, no)
+                labels = [self._market_label(m) for m in range(len(keys))]
+            
+            values = np.bincount(group, value, minlength=len(keys))
+            counts = np.bincount(group, held, minlength=len(keys))
+            rows = [
+                Exposure(
+                    key=key,
+                    label=label,
+                    positions=int(counts[k]),
+                    cost=float(cost[k]),
+                    value=float(values[k]),
+                    max_loss=float(max_loss[k])
+                )
+                for k, (key, label) in enumerate(zip(keys, labels))
+                if counts[k]
+            ]
+        return sorted(rows, key=lambda row: row.max_loss, reverse=True)
+    
+    def _market_label(self, m: int) -> str:
+        i = int(np.argmax(self.market_of == m))
+        position = self.positions[i]
+        # Markets of a neg-risk event share its slug
+        return f"{position.market_slug} ({self.markets[m][:10]})" if position.neg_risk else position.market_slug
+    
+    def _set_label(self, s: int) -> str:
+        i = int(np.argmax(self.set_of == s))
+        return self.positions[i].market_slug
+    
+    def probabilities(self) -> np.ndarray:
+        """
+        Implied probability of each resolution state per outcome set
+        
+        Each position's mid price (best bid if one-sided, entry price if
+        unpriced) estimates the probability of its state; states no position
+        prices share whatever probability is left.
+        
+        Returns:
+            Array of shape (sets, states), rows summing to 1
+        """
+        with self._lock:
+            mid = np.where(
+                np.isnan(self.ask), self.bid, np.where(np.isnan(self.bid), self.ask, (self.bid + self.ask) / 2)
+            )
+            avg = np.divide(self.cost, self.size, out=np.zeros_like(self.cost), where=self.size > 0)
+            mid = np.clip(np.where(np.isnan(mid), avg, mid), 0.0, 1.0)
+            estimate = np.where(self.inverse, 1.0 - mid, mid)
+            
+            shape = self.payout.shape
+            total = np.zeros(shape)
+            count = np.zeros(shape)
+            np.add.at(total, (self.set_of, self.state_of), estimate)
+            np.add.at(count, (self.set_of, self.state_of), 1.0)
+            known = count > 0
+            prob = np.divide(total, count, out=np.zeros(shape), where=known)
+            
+            unknown = self.valid & ~known
+            left = np.clip(1.0 - prob.sum(axis=1), 0.0, None)
+            n_unknown = unknown.sum(axis=1)
+            prob += unknown * np.divide(left, n_unknown, out=np.zeros_like(left), where=n_unknown > 0)[:, None]
+            sums = prob.sum(axis=1, keepdims=True)
+            uniform = self.valid / np.maximum(self.n_states, 1)[:, None]
+            return np.where(sums > 0, prob / np.where(sums > 0, sums, 1.0), uniform)
+    
+    def scenarios(
+        self,
+        n: int = 10000,
+        confidence: float = 0.95,
+        seed: Optional[int] = None,
+        probabilities: Optional[np.ndarray] = None
+    ) -> Tuple[ScenarioReport, np.ndarray]:
+        """
+        Simulate resolutions and the portfolio PnL at each
+        
+        Every outcome set resolves independently, drawn from its implied
+        probabilities. PnL is the resolution payout less the cost basis.
+        
+        Args:
+            n: Number of scenarios
+            confidence: Confidence level of the value at risk
+            seed: Random seed (optional)
+            probabilities: State probabilities per set (default: probabilities())
+        
+        Returns:
+            Tuple of (ScenarioReport, PnL per scenario)
+        """
+        if n <= 0:
+            raise ValueError("Scenario count must be positive")
+        if not 0 < confidence < 1:
+            raise ValueError("Confidence must be between 0 and 1")
+        
+        prob = self.probabilities() if probabilities is None else probabilities
+        with self._lock:
+            pnl_by_state = np.where(self.valid, self.payout - self.set_cost[:, None], 0.0)
+            last = self.n_states - 1
+        n_sets, width = pnl_by_state.shape
+        rng = np.random.default_rng(seed)
+        
+        pnl = np.zeros(n)
+        if n_sets:
+            # A set's drawn state is the number of its cumulative probabilities
+            # the uniform draw reaches, counted one state column at a time
+            cumulative = np.cumsum(prob, axis=1)
+            offsets = np.arange(n_sets) * width
+            flat = pnl_by_state.ravel()
+            dtype = np.min_scalar_type(width)
+            for start in range(0, n, SCENARIO_BATCH):
+                stop = min(start + SCENARIO_BATCH, n)
+                draws = rng.random((stop - start, n_sets))
+                states = np.zeros(draws.shape, dtype=dtype)
+                for column in range(width - 1):
+                    np.add(states, draws >= cumulative[:, column], out=states, casting='unsafe')
+                states = np.minimum(states, last) + offsets
+                pnl[start:stop] = np.take(flat, states).sum(axis=1)
+        
+        losses = -pnl
+        var = float(np.quantile(losses, confidence))
+        tail = losses[losses >= var]
+        report = ScenarioReport(
+            scenarios=n,
+            confidence=confidence,
+            expected_pnl=float(pnl.mean()),
+            std_pnl=float(pnl.std()),
+            value_at_risk=var,
+            expected_shortfall=float(tail.mean()) if len(tail) else var,
+            prob_loss=float((pnl < 0).mean()),
+            worst_pnl=float(pnl.min()),
+            best_pnl=float(pnl.max())
+        )
+        return report, pnl
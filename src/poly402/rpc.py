@@ -0,0 +1,211 @@
+"""
+Pooled JSON-RPC provider with health checks, latency routing and hedged reads
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, List, Optional
+import requests
+from web3.providers import JSONBaseProvider
+from web3.types import RPCEndpoint as RPCMethod
+
+
+class RPCEndpoint:
+    """One JSON-RPC node and its observed health"""
+    
+    def __init__(self, url: str):
+        self.url = url
+        self.session = requests.Session()
+        self.latency: Optional[float] = None  # EWMA of request latency in seconds
+        self.block: Optional[int] = None
+        self.healthy = True
+        self.down_until = 0.0
+        self.error: Optional[str] = None
+    
+    def available(self, now: float) -> bool:
+        return self.healthy and self.down_until <= now
+
+
+class RPCPool(JSONBaseProvider):
+    """
+    web3 provider that spreads requests over several RPC endpoints
+    
+    Endpoints are health-checked (reachability and block height) and ranked
+    by observed latency. Read-only calls are hedged: if the fastest endpoint
+    has not answered within hedge_after seconds the next one is tried too and
+    the first response wins. Transport failures fail over to the next
+    endpoint and put the failed one on cooldown; when every endpoint fails
+    the last error is raised rather than masked.
+    """
+    
+    HEDGED_METHODS = frozenset({
+        "eth_blockNumber", "eth_call", "eth_chainId", "eth_estimateGas", "eth_feeHistory",
+        "eth_gasPrice", "eth_getBalance", "eth_getBlockByHash", "eth_getBlockByNumber",
+        "eth_getCode", "eth_getLogs", "eth_getStorageAt", "eth_getTransactionByHash",
+        "eth_getTransactionCount", "eth_getTransactionReceipt", "eth_maxPriorityFeePerGas",
+        "net_version", "web3_clientVersion",
+    })
+    
+    LATENCY_ALPHA = 0.3
+    
+    def __init__(
+        self,
+        urls: List[str],
+        timeout: float = 10.0,
+        hedge_after: float = 0.3,
+        health_interval: float = 30.0,
+        max_block_lag: int = 5,
+        cooldown: float = 30.0,
+        max_workers: int = 8,
+        **kwargs: Any
+    ):
+        """
+        Initialize RPC pool
+        
+        Args:
+            urls: JSON-RPC endpoint URLs for one chain
+            timeout: Per-request timeout in seconds
+            hedge_after: Seconds to wait on an endpoint before hedging a read
+            health_interval: Seconds between background health checks
+            max_block_lag: Endpoints this many blocks behind the best are unhealthy
+            cooldown: Seconds a failed endpoint is skipped
+            max_workers: Maximum concurrent requests across endpoints
+        """
+        super().__init__(**kwargs)
+        if not urls:
+            raise ValueError("RPCPool requires at least one endpoint URL")
+        self.endpoints = [RPCEndpoint(url) for url in dict.fromkeys(urls)]
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self.health_interval = health_interval
+        self.max_block_lag = max_block_lag
+        self.cooldown = cooldown
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="poly402-rpc")
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self._checking = False
+    
+    def __str__(self) -> str:
+        return f"RPC pool {[endpoint.url for endpoint in self.endpoints]}"
+    
+    def _post(self, endpoint: RPCEndpoint, request_data: bytes) -> bytes:
+        started = time.perf_counter()
+        try:
+            response = endpoint.session.post(
+                endpoint.url,
+                data=request_data,
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            endpoint.down_until = time.monotonic() + self.cooldown
+            endpoint.error = str(e)
+            raise
+        
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            if endpoint.latency is None:
+                endpoint.latency = elapsed
+            else:
+                endpoint.latency += self.LATENCY_ALPHA * (elapsed - endpoint.latency)
+            endpoint.down_until = 0.0
+            endpoint.error = None
+        return response.content
+    
+    def _ranked(self) -> List[RPCEndpoint]:
+        """Available endpoints, fastest first (all endpoints if none are available)"""
+        now = time.monotonic()
+        candidates = [endpoint for endpoint in self.endpoints if endpoint.available(now)] or self.endpoints
+        return sorted(candidates, key=lambda endpoint: endpoint.latency if endpoint.latency is not None else float('inf'))
+    
+    def check_health(self) -> List[RPCEndpoint]:
+        """
+        Probe every endpoint concurrently with eth_blockNumber
+        
+        Returns:
+            Endpoints with refreshed latency, block height and health
+        """
+        request_data = self.encode_rpc_request(RPCMethod("eth_blockNumber"), [])
+        
+        def probe(endpoint: RPCEndpoint):
+            try:
+                response = self.decode_rpc_response(self._post(endpoint, request_data))
+                endpoint.block = int(response['result'], 16)
+            except Exception as e:
+                endpoint.block = None
+                endpoint.error = str(e)
+        
+        list(self._executor.map(probe, self.endpoints))
+        
+        best = max((endpoint.block for endpoint in self.endpoints if endpoint.block is not None), default=None)
+        for endpoint in self.endpoints:
+            if endpoint.block is None or best is None:
+                endpoint.healthy = False
+                continue
+            endpoint.healthy = endpoint.block >= best - self.max_block_lag
+            if not endpoint.healthy:
+                endpoint.error = f"{best - endpoint.block} blocks behind"
+        
+        self._checked_at = time.monotonic()
+        return self.endpoints
+    
+    def _maybe_check_health(self):
+        if len(self.endpoints) == 1:
+            return
+        with self._lock:
+            due = self._checked_at is None or time.monotonic() - self._checked_at > self.health_interval
+            if not due or self._checking:
+                return
+            self._checking = True
+        # Never wait on a probe: until the first one answers, requests go
+        # out in configured order and are hedged as usual
+        self._executor.submit(self._background_check)
+    
+    def _background_check(self):
+        try:
+            self.check_health()
+        finally:
+            self._checking = False
+    
+    def make_request(self, method, params):
+        self._maybe_check_health()
+        request_data = self.encode_rpc_request(method, params)
+        candidates = self._ranked()
+        
+        if method not in self.HEDGED_METHODS or len(candidates) == 1:
+            # Writes are not hedged, only failed over
+            last_error = None
+            for endpoint in candidates:
+                try:
+                    return self.decode_rpc_response(self._post(endpoint, request_data))
+                except requests.exceptions.RequestException as e:
+                    last_error = e
+            raise RuntimeError(f"All RPC endpoints failed for {method}: {last_error}")
+        
+        remaining = iter(candidates)
+        pending = {self._executor.submit(self._post, next(remaining), request_data)}
+        last_error = None
+        while pending:
+            done, pending = wait(pending, timeout=self.hedge_after, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return self.decode_rpc_response(future.result())
+                except requests.exceptions.RequestException as e:
+                    last_error = e
+            # Slow or failed: bring in the next fastest endpoint
+            endpoint = next(remaining, None)
+            if endpoint is not None:
+                pending.add(self._executor.submit(self._post, endpoint, request_data))
+        
+        raise RuntimeError(f"All RPC endpoints failed for {method}: {last_error}")
+    
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        try:
+            self.make_request("web3_clientVersion", [])
+            return True
+        except RuntimeError:
+            if show_traceback:
+                raise
+            return False
@@ -0,0 +1,528 @@
+"""
+Strategy runtime: many strategies sharing one client on one event loop
+"""
+
+import asyncio
+import functools
+import importlib.util
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from types import ModuleType
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+from .models import Fill, Market, OrderStatus, TradeResult
+from .quoting import ORDER_MEMORY
+
+
+def _load_strategy(module_name: str, path: str) -> ModuleType:
+    """
+    Import a strategy file as module_name, once per process
+    
+    Also the initializer of strategy worker processes, so functions defined
+    in the file unpickle there.
+    """
+    module = sys.modules.get(module_name)
+    if module is not None and getattr(module, '__file__', None) == path:
+        return module
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    if spec is None or spec.loader is None:
+        raise ValueError(f"Cannot load strategy file: {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class _Order:
+    """An order a strategy placed, tracked until filled or forgotten"""
+    
+    __slots__ = ('order_id', 'strategy', 'token_id', 'side', 'price', 'size', 'filled', 'closed_at')
+    
+    def __init__(self, order_id: str, strategy: "StrategyContext", token_id: str, side: str, price: float, size: float):
+        self.order_id = order_id
+        self.strategy = strategy
+        self.token_id = token_id
+        self.side = side
+        self.price = price
+        self.size = size
+        self.filled = 0.0
+        self.closed_at: Optional[float] = None
+
+
+class StrategyContext:
+    """
+    A strategy's handle on the runtime
+    
+    Strategy files define setup(ctx), which subscribes to markets and
+    registers handlers. Handlers may be plain functions or coroutines; a
+    strategy's handlers never run concurrently with each other, so they
+    can share state without locks. Plain handlers run on the event loop
+    and should return quickly: use run_blocking() for I/O and compute()
+    for CPU-heavy work.
+    
+    Example strategy file:
+        
+        def setup(ctx):
+            token = ctx.subscribe("fed-decision-in-october", outcome_index=0)
+            
+            @ctx.on_tick
+            async def buy_dip(token_id, price):
+                if price < 0.30 and not ctx.open_orders():
+                    await ctx.buy(token_id, price, 10)
+    """
+    
+    def __init__(self, runtime: "StrategyRuntime", name: str, setup: Callable, module_name: str = "", path: str = ""):
+        self.runtime = runtime
+        self.name = name
+        self.client = runtime.client
+        self.inventory: Dict[str, float] = {}  # Token id -> shares bought less shares sold, from fills
+        self.stats = {'events': 0, 'errors': 0, 'busy': 0.0, 'orders': 0, 'fills': 0}
+        self._setup = setup
+        self._module_name = module_name
+        self._path = path
+        self._tick_handlers: List[Callable] = []
+        self._fill_handlers: List[Callable] = []
+        self._close_handlers: List[Callable] = []
+        self._stop_handlers: List[Callable] = []
+        self._timers: List[Tuple[float, Callable, bool]] = []
+        self._processes = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        
+        # Pending work: ticks are coalesced per token so a slow strategy
+        # only ever sees the latest price
+        self._ticks: Dict[str, float] = {}
+        self._events: Deque[Tuple[Callable, tuple]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+    
+    def subscribe(self, market_url: str, outcome_index: int = 0, books: bool = False) -> str:
+        """
+        Receive price ticks for a market outcome and prepare it for trading
+        
+        Blocks while the market is fetched; call it from setup().
+        
+        Args:
+            market_url: Polymarket event URL or slug
+            outcome_index: Index of the outcome
+            books: Also keep the outcome's order book in the shared cache
+        
+        Returns:
+            The outcome's token id
+        """
+        template = self.client.prepare(market_url, [outcome_index])[0]
+        self.runtime._subscribe(self, template.token_id, books)
+        return template.token_id
+    
+    def on_tick(self, handler: Callable) -> Callable:
+        """Register handler(token_id, price), called when a subscribed price changes"""
+        self._tick_handlers.append(handler)
+        return handler
+    
+    def on_fill(self, handler: Callable) -> Callable:
+        """Register handler(fill), called with each Fill of this strategy's orders"""
+        self._fill_handlers.append(handler)
+        return handler
+    
+    def on_close(self, handler: Callable) -> Callable:
+        """Register handler(market), called when a subscribed market reaches its close deadline"""
+        self._close_handlers.append(handler)
+        return handler
+    
+    def on_stop(self, handler: Callable) -> Callable:
+        """Register handler(), called once when the runtime shuts down"""
+        self._stop_handlers.append(handler)
+        return handler
+    
+    def every(self, seconds: float, handler: Callable) -> Callable:
+        """Call handler() every so many seconds (a call still pending is not queued twice)"""
+        self._add_timer(seconds, handler, True)
+        return handler
+    
+    def after(self, seconds: float, handler: Callable) -> Callable:
+        """Call handler() once after a delay"""
+        self._add_timer(seconds, handler, False)
+        return handler
+    
+    def _add_timer(self, seconds: float, handler: Callable, repeat: bool):
+        if seconds <= 0:
+            raise ValueError(f"Timer interval must be positive, got {seconds}")
+        if self.runtime._loop is None:
+            self._timers.append((seconds, handler, repeat))
+        else:
+            self.runtime._loop.call_soon_threadsafe(self.runtime._schedule_timer, self, seconds, handler, repeat)
+    
+    def use_processes(self, workers: int = 1):
+        """
+        Give this strategy its own worker processes for compute()
+        
+        Functions passed to compute() must be defined at module level in the
+        strategy file, which each worker imports on start.
+        """
+        self._processes = workers
+    
+    def price(self, token_id: str) -> Optional[float]:
+        """Latest midpoint of a subscribed token"""
+        return self.runtime.prices.get(token_id)
+    
+    def book(self, token_id: str) -> Optional[tuple]:
+        """Latest (bids, asks) of a token subscribed with books=True"""
+        return self.runtime.books.get(token_id)
+    
+    async def buy(self, token_id: str, price: float, size: float) -> TradeResult:
+        """Place a limit buy on a subscribed token; fills arrive through on_fill"""
+        return await self.runtime._place(self, token_id, price, size, "BUY")
+    
+    async def sell(self, token_id: str, price: float, size: float) -> TradeResult:
+        """Place a limit sell on a subscribed token; fills arrive through on_fill"""
+        return await self.runtime._place(self, token_id, price, size, "SELL")
+    
+    async def cancel(self, order_id: str) -> bool:
+        """Cancel one of this strategy's orders"""
+        return await self.runtime._cancel(self, order_id)
+    
+    def open_orders(self) -> List[str]:
+        """Ids of this strategy's orders not yet filled or cancelled"""
+        return self.runtime._open_orders(self)
+    
+    async def run_blocking(self, fn: Callable, *args):
+        """Run a blocking call (e.g. on ctx.client) on the shared thread pool"""
+        return await self.runtime._running_loop().run_in_executor(self.runtime._executor, fn, *args)
+    
+    async def compute(self, fn: Callable, *args):
+        """Run CPU-heavy work in this strategy's worker processes (threads if it has none)"""
+        return await self.runtime._running_loop().run_in_executor(self._pool or self.runtime._executor, fn, *args)
+    
+    def _push(self, handler: Callable, args: tuple):
+        self._events.append((handler, args))
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    def _tick(self, token_id: str, price: float):
+        self._ticks[token_id] = price
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+
+class StrategyRuntime:
+    """
+    Hosts many strategies in one process around one Poly402Client
+    
+    Strategies share the client's connections, credentials and market
+    caches, one price and book poller and one order tracker, so adding a
+    strategy adds handlers rather than another process polling the same
+    endpoints. Everything is scheduled on a single asyncio event loop; each
+    strategy consumes its own queue of ticks, fills and timers and yields
+    after every handler, so strategies take turns fairly. Blocking client
+    calls run on a shared thread pool.
+    """
+    
+    def __init__(self, client, interval: float = 1.0, fill_interval: float = 2.0, max_workers: int = 16):
+        """
+        Initialize strategy runtime
+        
+        Args:
+            client: Poly402Client shared by every strategy
+            interval: Seconds between price and book polls
+            fill_interval: Seconds between trade polls for fills
+            max_workers: Size of the thread pool for blocking calls
+        """
+        self.client = client
+        self.interval = interval
+        self.fill_interval = fill_interval
+        self.max_workers = max_workers
+        self.strategies: Dict[str, StrategyContext] = {}
+        self.prices: Dict[str, float] = {}
+        self.books: Dict[str, tuple] = {}
+        self._tick_subscribers: Dict[str, Set[str]] = {}  # Token id -> strategy names
+        self._book_tokens: Set[str] = set()
+        self._orders: Dict[str, _Order] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def _running_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            raise RuntimeError("Strategy runtime is not running")
+        return self._loop
+    
+    def load(self, path: str) -> StrategyContext:
+        """
+        Load a strategy file defining setup(ctx)
+        
+        The strategy is named after the file.
+        """
+        path = os.path.abspath(os.path.expanduser(path))
+        name = os.path.splitext(os.path.basename(path))[0]
+        module_name = f"poly402_strategy_{name}"
+        module = _load_strategy(module_name, path)
+        
+        setup = getattr(module, 'setup', None)
+        if not callable(setup):
+            raise ValueError(f"Strategy file {path} does not define setup(ctx)")
+        return self.add(name, setup, module_name, path)
+    
+    def add(self, name: str, setup: Callable, module_name: str = "", path: str = "") -> StrategyContext:
+        """Add a strategy from its setup(ctx) function"""
+        if name in self.strategies:
+            raise ValueError(f"Duplicate strategy name: {name}")
+        ctx = StrategyContext(self, name, setup, module_name, path)
+        self.strategies[name] = ctx
+        return ctx
+    
+    def _subscribe(self, ctx: StrategyContext, token_id: str, books: bool):
+        self._tick_subscribers.setdefault(token_id, set()).add(ctx.name)
+        if books:
+            self._book_tokens.add(token_id)
+    
+    def run(self, stop: Optional[threading.Event] = None, cancel_on_stop: bool = True):
+        """
+        Set up every strategy and run them until stopped
+        
+        Args:
+            stop: Event that ends the run when set
+            cancel_on_stop: Cancel the strategies' open orders on shutdown
+        """
+        asyncio.run(self._main(stop or threading.Event(), cancel_on_stop))
+    
+    async def _main(self, stop: threading.Event, cancel_on_stop: bool):
+        loop = self._loop = asyncio.get_running_loop()
+        executor = self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="poly402-runtime")
+        strategies = list(self.strategies.values())
+        tasks: List[asyncio.Task] = []
+        wakeups = {ctx.name: asyncio.Event() for ctx in strategies}
+        for ctx in strategies:
+            ctx._wakeup = wakeups[ctx.name]
+        try:
+            # Setups may block on market fetches, so they run side by side
+            await asyncio.gather(*(
+                loop.run_in_executor(executor, ctx._setup, ctx) for ctx in strategies
+            ))
+            for ctx in strategies:
+                if ctx._processes and ctx._path:
+                    ctx._pool = ProcessPoolExecutor(
+                        max_workers=ctx._processes,
+                        initializer=_load_strategy,
+                        initargs=(ctx._module_name, ctx._path)
+                    )
+                elif ctx._processes:
+                    ctx._pool = ProcessPoolExecutor(max_workers=ctx._processes)
+                for seconds, handler, repeat in ctx._timers:
+                    self._schedule_timer(ctx, seconds, handler, repeat)
+                tasks.append(asyncio.ensure_future(self._consume(ctx, wakeups[ctx.name])))
+            tasks.append(asyncio.ensure_future(self._poll_prices()))
+            tasks.append(asyncio.ensure_future(self._poll_fills()))
+            self.client.lifecycle.subscribe(self._on_market_close)
+            
+            while not stop.is_set():
+                await asyncio.sleep(0.1)
+        finally:
+            self.client.lifecycle.unsubscribe(self._on_market_close)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for ctx in strategies:
+                for handler in ctx._stop_handlers:
+                    await self._call(ctx, handler, ())
+            if cancel_on_stop:
+                await self._cancel_open()
+            for ctx in strategies:
+                if ctx._pool is not None:
+                    ctx._pool.shutdown(wait=False)
+            executor.shutdown(wait=False)
+            self._loop = None
+    
+    def _schedule_timer(self, ctx: StrategyContext, seconds: float, handler: Callable, repeat: bool):
+        """Schedule a timer on the loop; repeating timers keep a fixed cadence"""
+        pending = [False]
+        
+        @functools.wraps(handler)
+        def run():
+            pending[0] = False
+            return handler()
+        
+        def fire(due: float):
+            if not pending[0]:
+                pending[0] = True
+                ctx._push(run, ())
+            if repeat:
+                loop.call_at(due + seconds, fire, due + seconds)
+        
+        loop = self._running_loop()
+        due = loop.time() + seconds
+        loop.call_at(due, fire, due)
+    
+    async def _call(self, ctx: StrategyContext, handler: Callable, args: tuple):
+        started = time.perf_counter()
+        try:
+            result = handler(*args)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            ctx.stats['errors'] += 1
+            name = getattr(handler, '__name__', repr(handler))
+            print(f"Warning: Strategy '{ctx.name}' handler {name} failed: {e}", file=sys.stderr)
+        finally:
+            ctx.stats['events'] += 1
+            ctx.stats['busy'] += time.perf_counter() - started
+    
+    async def _consume(self, ctx: StrategyContext, wakeup: asyncio.Event):
+        """Run a strategy's pending events, one handler at a time"""
+        while True:
+            await wakeup.wait()
+            wakeup.clear()
+            while ctx._events or ctx._ticks:
+                if ctx._events:
+                    handler, args = ctx._events.popleft()
+                    await self._call(ctx, handler, args)
+                else:
+                    token_id = next(iter(ctx._ticks))
+                    price = ctx._ticks.pop(token_id)
+                    for handler in ctx._tick_handlers:
+                        await self._call(ctx, handler, (token_id, price))
+                # Let the other strategies take a turn
+                await asyncio.sleep(0)
+    
+    async def _poll_prices(self):
+        """Fetch midpoints (and books) of subscribed tokens, dispatching changed prices"""
+        polymarket = self.client.polymarket
+        loop = self._running_loop()
+        while True:
+            started = loop.time()
+            token_ids = list(self._tick_subscribers)
+            book_ids = list(self._book_tokens)
+            if token_ids:
+                calls = [loop.run_in_executor(self._executor, polymarket.get_midpoints, token_ids)]
+                if book_ids:
+                    calls.append(loop.run_in_executor(self._executor, polymarket.get_books, book_ids))
+                results = await asyncio.gather(*calls, return_exceptions=True)
+                for result in results:
+                    if isinstance(result, Exception):
+                        print(f"Warning: Could not fetch prices: {result}", file=sys.stderr)
+                if len(results) > 1 and not isinstance(results[1], Exception):
+                    self.books.update(results[1])
+                if not isinstance(results[0], Exception):
+                    self._dispatch_prices(results[0])
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
+    
+    def _dispatch_prices(self, prices: Dict[str, float]):
+        now = time.time()
+        for token_id, price in prices.items():
+            self.client.prices.record(token_id, now, price)
+            if self.prices.get(token_id) == price:
+                continue
+            self.prices[token_id] = price
+            for name in self._tick_subscribers.get(token_id, ()):
+                self.strategies[name]._tick(token_id, price)
+    
+    async def _place(self, ctx: StrategyContext, token_id: str, price: float, size: float, side: str) -> TradeResult:
+        result = await self._running_loop().run_in_executor(self._executor, self.client.fire, token_id, price, size, side)
+        if result.order_id and result.status != OrderStatus.FAILED:
+            self._orders[result.order_id] = _Order(result.order_id, ctx, token_id, side, price, size)
+            ctx.stats['orders'] += 1
+        return result
+    
+    async def _cancel(self, ctx: StrategyContext, order_id: str) -> bool:
+        order = self._orders.get(order_id)
+        if order is None or order.strategy is not ctx:
+            raise ValueError(f"Strategy '{ctx.name}' has no order {order_id}")
+        cancelled = await self._running_loop().run_in_executor(self._executor, self.client.polymarket.cancel_order, order_id)
+        if cancelled and order.closed_at is None:
+            order.closed_at = time.monotonic()
+        return cancelled
+    
+    def _open_orders(self, ctx: StrategyContext) -> List[str]:
+        return [
+            order.order_id for order in self._orders.values()
+            if order.strategy is ctx and order.closed_at is None
+        ]
+    
+    async def _cancel_open(self):
+        order_ids = [order.order_id for order in self._orders.values() if order.closed_at is None]
+        if not order_ids:
+            return
+        try:
+            await self._running_loop().run_in_executor(self._executor, self.client.polymarket.cancel_orders, order_ids)
+        except RuntimeError as e:
+            print(f"Warning: Could not cancel strategy orders: {e}", file=sys.stderr)
+    
+    async def _poll_fills(self):
+        """Match this account's new trades to strategy orders and dispatch the fills"""
+        after = int(time.time())
+        seen: Dict[str, int] = {}
+        while True:
+            await asyncio.sleep(self.fill_interval)
+            if not any(order.closed_at is None for order in self._orders.values()):
+                continue
+            try:
+                trades = await self._running_loop().run_in_executor(self._executor, self.client.polymarket.get_trades, after)
+            except RuntimeError as e:
+                print(f"Warning: Could not fetch fills: {e}", file=sys.stderr)
+                continue
+            
+            newest = after
+            for trade in trades:
+                match_time = int(trade.get('match_time') or 0)
+                newest = max(newest, match_time)
+                legs = [(trade.get('taker_order_id'), trade.get('size'), trade.get('price'))]
+                legs += [
+                    (maker.get('order_id'), maker.get('matched_amount'), maker.get('price'))
+                    for maker in trade.get('maker_orders') or []
+                ]
+                for order_id, size, price in legs:
+                    order = self._orders.get(order_id)
+                    fill_id = f"{trade.get('id')}:{order_id}"
+                    if order is None or fill_id in seen:
+                        continue
+                    seen[fill_id] = match_time
+                    fill = Fill(
+                        order_id=order_id,
+                        token_id=order.token_id,
+                        side=order.side,
+                        price=float(price or order.price),
+                        size=float(size or 0),
+                        strategy=order.strategy.name,
+                        trade_id=str(trade.get('id', '')),
+                        timestamp=match_time
+                    )
+                    self._apply_fill(order, fill)
+            
+            # Trades are reported to the second: re-read the newest second
+            # next time and skip fills already applied by id
+            after = max(after, newest - 1)
+            seen = {fill_id: t for fill_id, t in seen.items() if t >= after}
+            cutoff = time.monotonic() - ORDER_MEMORY
+            self._orders = {
+                order_id: order for order_id, order in self._orders.items()
+                if order.closed_at is None or order.closed_at > cutoff
+            }
+    
+    def _apply_fill(self, order: _Order, fill: Fill):
+        ctx = order.strategy
+        order.filled += fill.size
+        if order.filled >= order.size - 1e-9 and order.closed_at is None:
+            order.closed_at = time.monotonic()
+        signed = fill.size if fill.side == "BUY" else -fill.size
+        ctx.inventory[fill.token_id] = ctx.inventory.get(fill.token_id, 0.0) + signed
+        ctx.stats['fills'] += 1
+        for handler in ctx._fill_handlers:
+            ctx._push(handler, (fill,))
+    
+    def _on_market_close(self, market: Market):
+        """Lifecycle callback (scheduler thread): hand the close to the loop"""
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._close_market, market)
+    
+    def _close_market(self, market: Market):
+        token_ids = {token for o in market.outcomes for token in (o.token_id, o.no_token_id) if token}
+        names = set()
+        for token_id in token_ids:
+            names |= self._tick_subscribers.pop(token_id, set())
+            self._book_tokens.discard(token_id)
+            self.books.pop(token_id, None)
+        for name in names:
+            ctx = self.strategies[name]
+            for handler in ctx._close_handlers:
+                ctx._push(handler, (market,))
@@ -0,0 +1,329 @@
+"""
+Recording market snapshots to columnar, memory-mapped NumPy segments
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from .market_parser import MarketParser
+from .models import Market, Outcome
+
+# Levels stored per side of each book snapshot
+BOOK_DEPTH = 5
+
+# Column name -> (dtype, per-row shape)
+COLUMNS = {
+    'ts': ('<f8', ()),  # Unix seconds
+    'token': ('<u4', ()),  # Index into the store's token table
+    'price': ('<f4', ()),  # Gamma outcome price
+    'bid_px': ('<f4', (BOOK_DEPTH,)),  # Best bid first, NaN padded
+    'bid_sz': ('<f4', (BOOK_DEPTH,)),
+    'ask_px': ('<f4', (BOOK_DEPTH,)),  # Best ask first, NaN padded
+    'ask_sz': ('<f4', (BOOK_DEPTH,)),
+}
+
+Levels = Sequence[Tuple[float, float]]
+
+
+class SnapshotStore:
+    """
+    Append-only store of timestamped market snapshots
+    
+    Rows are buffered in memory and written as immutable segments, one .npy
+    file per column, which are memory-mapped on read. A segment is written to
+    a temporary directory and renamed into place, so readers never see a
+    partial segment. Token ids and market metadata are kept in small JSON
+    side tables; rows refer to tokens by index.
+    
+    Layout:
+        tokens.json, markets.json
+        segments/00000000/{ts,token,price,bid_px,bid_sz,ask_px,ask_sz}.npy
+    """
+    
+    def __init__(self, path: str, segment_rows: int = 262144):
+        """
+        Initialize snapshot store
+        
+        Args:
+            path: Store directory (created if missing)
+            segment_rows: Buffered rows that trigger writing a segment
+        """
+        self.path = Path(path).expanduser()
+        self.segment_rows = segment_rows
+        (self.path / "segments").mkdir(parents=True, exist_ok=True)
+        
+        self._tokens: List[dict] = self._read_json("tokens.json", [])
+        self._token_index = {token['token_id']: i for i, token in enumerate(self._tokens)}
+        self._markets: Dict[str, dict] = self._read_json("markets.json", {})
+        self._buffer: List[tuple] = []
+        self._lock = threading.Lock()
+    
+    def _read_json(self, name: str, default):
+        try:
+            with open(self.path / name) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return default
+    
+    def _write_json(self, name: str, data):
+        tmp = self.path / f".{name}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path / name)
+    
+    def add_market(self, market: Market):
+        """Register a market's metadata and outcome tokens"""
+        with self._lock:
+            self._markets[market.slug] = {
+                'title': market.title,
+                'description': market.description,
+                'active': market.active,
+                'end_date': market.end_date.isoformat() if market.end_date else None,
+                'condition_id': market.condition_id,
+                'question_id': market.question_id,
+                'outcomes': [
+                    {'index': o.index, 'name': o.name, 'token_id': o.token_id} for o in market.outcomes
+                ],
+            }
+            for outcome in market.outcomes:
+                if outcome.token_id not in self._token_index:
+                    self._token_index[outcome.token_id] = len(self._tokens)
+                    self._tokens.append({
+                        'token_id': outcome.token_id,
+                        'market_slug': market.slug,
+                        'outcome_name': outcome.name,
+                        'outcome_index': outcome.index,
+                    })
+    
+    def append(
+        self,
+        ts: float,
+        token_id: str,
+        price: float,
+        bids: Levels = (),
+        asks: Levels = ()
+    ):
+        """
+        Buffer one snapshot row
+        
+        Args:
+            ts: Unix timestamp in seconds
+            token_id: Outcome token id (must belong to a registered market)
+            price: Outcome price
+            bids: (price, size) levels, best first
+            asks: (price, size) levels, best first
+        """
+        row = (ts, self._token_index[token_id], price, bids[:BOOK_DEPTH], asks[:BOOK_DEPTH])
+        with self._lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.segment_rows
+        if full:
+            self.flush()
+    
+    def flush(self) -> Optional[Path]:
+        """Write buffered rows as a new segment; returns its path"""
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            tokens, markets = list(self._tokens), dict(self._markets)
+        self._write_json("tokens.json", tokens)
+        self._write_json("markets.json", markets)
+        if not rows:
+            return None
+        
+        rows.sort(key=lambda row: row[0])
+        n = len(rows)
+        columns = {name: np.full((n,) + shape, np.nan if name != 'token' else 0, dtype=dtype)
+                   for name, (dtype, shape) in COLUMNS.items()}
+        columns['ts'][:] = [row[0] for row in rows]
+        columns['token'][:] = [row[1] for row in rows]
+        columns['price'][:] = [row[2] for row in rows]
+        for i, (_, _, _, bids, asks) in enumerate(rows):
+            for level, (px, sz) in enumerate(bids):
+                columns['bid_px'][i, level] = px
+                columns['bid_sz'][i, level] = sz
+            for level, (px, sz) in enumerate(asks):
+                columns['ask_px'][i, level] = px
+                columns['ask_sz'][i, level] = sz
+        
+        return self._write_segment(columns)
+    
+    def append_columns(self, columns: Dict[str, np.ndarray]) -> Path:
+        """
+        Write pre-built columns (e.g. bulk imports) directly as a segment
+        
+        Args:
+            columns: Arrays for every column in COLUMNS, sorted by ts, with
+                token values indexing this store's token table
+        """
+        missing = set(COLUMNS) - set(columns)
+        if missing:
+            raise ValueError(f"Missing snapshot columns: {sorted(missing)}")
+        self.flush()
+        return self._write_segment({
+            name: np.ascontiguousarray(columns[name], dtype=dtype) for name, (dtype, _) in COLUMNS.items()
+        })
+    
+    def _write_segment(self, columns: Dict[str, np.ndarray]) -> Path:
+        segments = self.path / "segments"
+        with self._lock:
+            existing = [int(p.name) for p in segments.iterdir() if p.name.isdigit()]
+            final = segments / f"{max(existing, default=-1) + 1:08d}"
+            tmp = segments / f".tmp-{final.name}"
+            tmp.mkdir()
+            for name, array in columns.items():
+                np.save(tmp / f"{name}.npy", array)
+            tmp.rename(final)
+        return final
+    
+    def segments(self) -> List[Path]:
+        """Segment directories in write order"""
+        return sorted(p for p in (self.path / "segments").iterdir() if p.name.isdigit())
+    
+    def read(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Iterate over segments as memory-mapped columns
+        
+        Args:
+            start: Only rows at or after this Unix time
+            end: Only rows before this Unix time
+        
+        Yields:
+            Dictionary of column name to (read-only, memory-mapped) array,
+            sliced to the requested time range
+        """
+        for segment in self.segments():
+            ts = np.load(segment / "ts.npy", mmap_mode='r')
+            if not len(ts):
+                continue
+            lo = 0 if start is None else int(np.searchsorted(ts, start, side='left'))
+            hi = len(ts) if end is None else int(np.searchsorted(ts, end, side='left'))
+            if lo >= hi:
+                continue
+            yield {name: np.load(segment / f"{name}.npy", mmap_mode='r')[lo:hi] for name in COLUMNS}
+    
+    def tokens(self) -> List[dict]:
+        """Token table: token_id, market_slug, outcome_name, outcome_index per index"""
+        return list(self._tokens)
+    
+    def markets(self) -> Dict[str, Market]:
+        """Recorded markets by slug (outcome prices are left at 0)"""
+        markets = {}
+        for slug, data in self._markets.items():
+            markets[slug] = Market(
+                slug=slug,
+                title=data['title'],
+                description=data['description'],
+                outcomes=[Outcome(o['index'], o['name'], o['token_id'], 0.0, 0.0) for o in data['outcomes']],
+                active=data['active'],
+                end_date=datetime.fromisoformat(data['end_date']) if data['end_date'] else None,
+                condition_id=data['condition_id'],
+                question_id=data['question_id'],
+                volume=None,
+                liquidity=None
+            )
+        return markets
+    
+    def __len__(self) -> int:
+        """Number of rows written to segments"""
+        return sum(int(np.load(segment / "ts.npy", mmap_mode='r').shape[0]) for segment in self.segments())
+
+
+class SnapshotRecorder:
+    """
+    Polls markets and records their prices and order books
+    
+    Gamma prices come from MarketParser; books (optional) from the CLOB's
+    batch book endpoint.
+    """
+    
+    def __init__(
+        self,
+        market_parser: MarketParser,
+        store: SnapshotStore,
+        polymarket=None,
+        max_workers: int = 8
+    ):
+        """
+        Initialize snapshot recorder
+        
+        Args:
+            market_parser: Source of market metadata and prices
+            store: Destination store
+            polymarket: PolymarketClient for order books (optional)
+            max_workers: Maximum number of concurrent market fetches
+        """
+        self.market_parser = market_parser
+        self.store = store
+        self.polymarket = polymarket
+        self.max_workers = max_workers
+    
+    def _books(self, token_ids: List[str]) -> Dict[str, Tuple[Levels, Levels]]:
+        books = self.polymarket.get_books(token_ids, self.max_workers)
+        return {token_id: (bids[:BOOK_DEPTH], asks[:BOOK_DEPTH]) for token_id, (bids, asks) in books.items()}
+    
+    def snapshot(self, slugs: List[str]) -> int:
+        """
+        Record one snapshot of every market
+        
+        Returns:
+            Number of rows recorded
+        """
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(slugs))) as pool:
+            markets = list(pool.map(self.market_parser.fetch_market, slugs))
+        ts = time.time()
+        
+        outcomes: List[Outcome] = []
+        for market in markets:
+            self.store.add_market(market)
+            outcomes.extend(o for o in market.outcomes if o.token_id)
+        
+        books = self._books([o.token_id for o in outcomes]) if self.polymarket else {}
+        for outcome in outcomes:
+            bids, asks = books.get(outcome.token_id, ((), ()))
+            self.store.append(ts, outcome.token_id, outcome.price, bids, asks)
+        return len(outcomes)
+    
+    def run(
+        self,
+        slugs: List[str],
+        interval: float = 5.0,
+        duration: Optional[float] = None,
+        stop: Optional[threading.Event] = None
+    ) -> int:
+        """
+        Record snapshots until stopped, flushing the store on exit
+        
+        Args:
+            slugs: Event URLs or slugs to record
+            interval: Seconds between snapshots
+            duration: Stop after this many seconds (optional)
+            stop: Event that ends recording when set
+        
+        Returns:
+            Number of rows recorded
+        """
+        stop = stop or threading.Event()
+        deadline = time.monotonic() + duration if duration else None
+        rows = 0
+        try:
+            while not stop.is_set() and (deadline is None or time.monotonic() < deadline):
+                started = time.monotonic()
+                try:
+                    rows += self.snapshot(slugs)
+                except (ValueError, RuntimeError) as e:
+                    print(f"Warning: Snapshot failed: {e}", file=sys.stderr)
+                stop.wait(max(0.0, interval - (time.monotonic() - started)))
+        finally:
+            self.store.flush()
+        return rows
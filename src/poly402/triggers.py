@@ -0,0 +1,300 @@
+"""
+Conditional orders evaluated in-process against live prices
+"""
+
+import bisect
+import math
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from .models import Market, TriggerRule, TriggerDirection, TradeResult
+
+
+class _SortedRules:
+    """Rules for one token and direction, kept sorted by threshold"""
+    
+    def __init__(self):
+        self.thresholds: List[float] = []
+        self.rules: List[TriggerRule] = []
+    
+    def add(self, rule: TriggerRule):
+        index = bisect.bisect_right(self.thresholds, rule.threshold)
+        self.thresholds.insert(index, rule.threshold)
+        self.rules.insert(index, rule)
+    
+    def remove(self, rule: TriggerRule) -> bool:
+        start = bisect.bisect_left(self.thresholds, rule.threshold)
+        end = bisect.bisect_right(self.thresholds, rule.threshold)
+        for index in range(start, end):
+            if self.rules[index] is rule:
+                del self.thresholds[index]
+                del self.rules[index]
+                return True
+        return False
+    
+    def pop_at_least(self, price: float) -> List[TriggerRule]:
+        """Remove and return rules with threshold >= price"""
+        index = bisect.bisect_left(self.thresholds, price)
+        fired = self.rules[index:]
+        del self.thresholds[index:]
+        del self.rules[index:]
+        return fired
+    
+    def pop_at_most(self, price: float) -> List[TriggerRule]:
+        """Remove and return rules with threshold <= price"""
+        index = bisect.bisect_right(self.thresholds, price)
+        fired = self.rules[:index]
+        del self.thresholds[:index]
+        del self.rules[:index]
+        return fired
+    
+    def __len__(self) -> int:
+        return len(self.rules)
+
+
+class TriggerBook:
+    """
+    Index of armed trigger rules keyed by token id
+    
+    Each token keeps its BELOW and ABOVE rules sorted by threshold, so a
+    price tick finds every rule it fires with a binary search instead of
+    scanning all armed rules.
+    """
+    
+    def __init__(self):
+        self._books: Dict[Tuple[str, TriggerDirection], _SortedRules] = {}
+        self._rules: Dict[str, TriggerRule] = {}
+        self._lock = threading.Lock()
+    
+    def add(self, rule: TriggerRule):
+        """Arm a rule"""
+        with self._lock:
+            if rule.rule_id in self._rules:
+                raise ValueError(f"Duplicate trigger rule id: {rule.rule_id}")
+            self._rules[rule.rule_id] = rule
+            self._books.setdefault((rule.token_id, rule.direction), _SortedRules()).add(rule)
+    
+    def cancel(self, rule_id: str) -> bool:
+        """Disarm a rule; returns False if it was not armed"""
+        with self._lock:
+            rule = self._rules.pop(rule_id, None)
+            if rule is None:
+                return False
+            return self._books[(rule.token_id, rule.direction)].remove(rule)
+    
+    def cancel_market(self, market_slug: str) -> List[TriggerRule]:
+        """Disarm every rule on a market, returning them"""
+        with self._lock:
+            rules = [rule for rule in self._rules.values() if rule.market_slug == market_slug]
+            for rule in rules:
+                del self._rules[rule.rule_id]
+                self._books[(rule.token_id, rule.direction)].remove(rule)
+            return rules
+    
+    def on_price(self, token_id: str, price: float) -> List[TriggerRule]:
+        """
+        Apply a price tick, disarming and returning every rule it fires
+        
+        Args:
+            token_id: Outcome token id
+            price: Current price (0-1)
+        
+        Returns:
+            Fired rules, BELOW rules first
+        """
+        with self._lock:
+            fired = []
+            below = self._books.get((token_id, TriggerDirection.BELOW))
+            if below:
+                fired.extend(below.pop_at_least(price))
+            above = self._books.get((token_id, TriggerDirection.ABOVE))
+            if above:
+                fired.extend(above.pop_at_most(price))
+            for rule in fired:
+                del self._rules[rule.rule_id]
+            return fired
+    
+    def token_ids(self) -> List[str]:
+        """Tokens with at least one armed rule"""
+        with self._lock:
+            return list({token_id for (token_id, _), rules in self._books.items() if rules})
+    
+    def rules(self) -> List[TriggerRule]:
+        """All armed rules"""
+        with self._lock:
+            return list(self._rules.values())
+    
+    def __len__(self) -> int:
+        return len(self._rules)
+
+
+class TriggerEngine:
+    """
+    Arms trigger rules and fires their orders when prices cross thresholds
+    
+    Rules are prepared (token ids, tick size, neg-risk) when armed, so a
+    fired rule only signs and posts through Poly402Client.fire. Rules on a
+    market are disarmed when the client's lifecycle scheduler closes it.
+    """
+    
+    def __init__(
+        self,
+        client,
+        on_fill: Optional[Callable[[TriggerRule, TradeResult], None]] = None,
+        max_workers: int = 8
+    ):
+        """
+        Initialize trigger engine
+        
+        Args:
+            client: Poly402Client used to resolve markets and place orders
+            on_fill: Callback invoked with each fired rule and its TradeResult
+            max_workers: Maximum number of orders in flight
+        """
+        self.client = client
+        self.book = TriggerBook()
+        self.on_fill = on_fill
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="poly402-trigger")
+        self.client.lifecycle.subscribe(self._on_market_close)
+    
+    def add(
+        self,
+        market_url: str,
+        outcome_index: int,
+        threshold: float,
+        direction: str = "below",
+        side: str = "BUY",
+        amount_usdc: Optional[float] = None,
+        shares: Optional[float] = None,
+        limit_price: Optional[float] = None
+    ) -> TriggerRule:
+        """
+        Arm a conditional order
+        
+        Examples:
+            add(slug, 1, 0.32, "below", "BUY", amount_usdc=50)  # buy $50 if price <= 0.32
+            add(slug, 0, 0.40, "below", "SELL", shares=100)  # stop-loss below 40%
+        
+        Args:
+            market_url: Polymarket event URL or slug
+            outcome_index: Index of outcome to trade
+            threshold: Price (0-1) that fires the rule
+            direction: "below" (price <= threshold) or "above" (price >= threshold)
+            side: "BUY" or "SELL"
+            amount_usdc: USDC to spend (BUY)
+            shares: Shares to sell (SELL)
+            limit_price: Order limit price (defaults to the triggering price)
+        
+        Returns:
+            The armed TriggerRule
+        """
+        if side == "BUY" and not amount_usdc:
+            raise ValueError("BUY trigger rules require amount_usdc")
+        if side == "SELL" and not shares:
+            raise ValueError("SELL trigger rules require shares")
+        
+        template = self.client.prepare(market_url, [outcome_index])[0]
+        rule = TriggerRule(
+            rule_id=uuid.uuid4().hex,
+            token_id=template.token_id,
+            direction=TriggerDirection(direction),
+            threshold=threshold,
+            side=side,
+            amount_usdc=amount_usdc,
+            shares=shares,
+            limit_price=limit_price,
+            market_slug=template.market_slug,
+            outcome_name=template.outcome_name
+        )
+        self.book.add(rule)
+        return rule
+    
+    def cancel(self, rule_id: str) -> bool:
+        """Disarm a rule"""
+        return self.book.cancel(rule_id)
+    
+    def _on_market_close(self, market: Market):
+        rules = self.book.cancel_market(market.slug)
+        if rules:
+            print(f"Warning: Disarmed {len(rules)} trigger rule(s) on closing market {market.slug}", file=sys.stderr)
+    
+    def on_price(self, token_id: str, price: float) -> List[TriggerRule]:
+        """
+        Feed a price tick; fired rules are submitted without blocking the caller
+        
+        Returns:
+            Rules fired by this tick
+        """
+        fired = self.book.on_price(token_id, price)
+        for rule in fired:
+            self._executor.submit(self._execute, rule, price)
+        return fired
+    
+    def _execute(self, rule: TriggerRule, price: float) -> TradeResult:
+        # Runs on the executor, whose futures are never read: every failure
+        # has to end up in the result
+        limit, size = price, 0.0
+        try:
+            tick = float(self.client.polymarket.templates[rule.token_id].tick_size)
+            if rule.limit_price is not None:
+                limit = round(round(rule.limit_price / tick) * tick, 6)
+            else:
+                # Snap the triggering price down: a buy never pays more than
+                # it, and a sell (typically a stop-loss on a falling price)
+                # stays marketable instead of resting above the market
+                limit = round(math.floor(price / tick + 1e-9) * tick, 6)
+            # Stay inside the valid price range
+            limit = min(max(limit, tick), 1 - tick)
+        
+            if rule.side == "BUY":
+                size = math.floor((rule.amount_usdc or 0.0) / limit * 100) / 100
+            else:
+                size = rule.shares or 0.0
+            result = self.client.fire(rule.token_id, limit, size, rule.side)
+        except Exception as e:
+            result = self.client.polymarket._failed_result(rule.outcome_name, size * limit, limit, rule.side, str(e))
+            result.market_slug = rule.market_slug
+        
+        if self.on_fill:
+            try:
+                self.on_fill(rule, result)
+            except Exception as e:
+                print(f"Warning: Fill handler for trigger rule {rule.rule_id} failed: {e}", file=sys.stderr)
+        return result
+    
+    def poll_prices(self) -> Dict[str, float]:
+        """Fetch midpoints for every armed token and apply them as ticks"""
+        token_ids = self.book.token_ids()
+        if not token_ids:
+            return {}
+        prices = self.client.polymarket.get_midpoints(token_ids)
+        now = time.time()
+        for token_id, price in prices.items():
+            self.client.prices.record(token_id, now, price)
+            self.on_price(token_id, price)
+        return prices
+    
+    def run(self, interval: float = 1.0, stop: Optional[threading.Event] = None):
+        """
+        Poll prices and fire rules until stopped or no rules remain armed
+        
+        Args:
+            interval: Seconds between price polls
+            stop: Event that ends the loop when set
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set() and len(self.book):
+            started = time.monotonic()
+            try:
+                self.poll_prices()
+            except RuntimeError as e:
+                print(f"Warning: Could not fetch prices: {e}", file=sys.stderr)
+            stop.wait(max(0.0, interval - (time.monotonic() - started)))
+    
+    def shutdown(self):
+        """Wait for in-flight orders to finish"""
+        self.client.lifecycle.unsubscribe(self._on_market_close)
+        self._executor.shutdown(wait=True)
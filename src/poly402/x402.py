@@ -0,0 +1,399 @@
+"""
+x402 payment client: 402 challenge, EIP-3009 authorization, facilitator settlement
+"""
+
+import atexit
+import base64
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import requests
+from eth_abi import encode
+from eth_account import Account
+from eth_keys import keys
+from eth_utils import keccak
+from .models import PaymentInfo
+
+X402_VERSION = 1
+
+NETWORKS = {
+    8453: "base",
+    84532: "base-sepolia",
+}
+
+TRANSFER_WITH_AUTHORIZATION_TYPES = {
+    "EIP712Domain": [
+        {"name": "name", "type": "string"},
+        {"name": "version", "type": "string"},
+        {"name": "chainId", "type": "uint256"},
+        {"name": "verifyingContract", "type": "address"},
+    ],
+    "TransferWithAuthorization": [
+        {"name": "from", "type": "address"},
+        {"name": "to", "type": "address"},
+        {"name": "value", "type": "uint256"},
+        {"name": "validAfter", "type": "uint256"},
+        {"name": "validBefore", "type": "uint256"},
+        {"name": "nonce", "type": "bytes32"},
+    ],
+}
+
+
+def authorization_typed_data(authorization: dict, requirements: dict, chain_id: int) -> dict:
+    """EIP-712 typed data for a USDC TransferWithAuthorization (EIP-3009)"""
+    extra = requirements.get('extra') or {}
+    return {
+        "types": TRANSFER_WITH_AUTHORIZATION_TYPES,
+        "primaryType": "TransferWithAuthorization",
+        "domain": {
+            "name": extra.get('name', "USD Coin"),
+            "version": extra.get('version', "2"),
+            "chainId": chain_id,
+            "verifyingContract": requirements['asset'],
+        },
+        "message": {
+            "from": authorization['from'],
+            "to": authorization['to'],
+            "value": int(authorization['value']),
+            "validAfter": int(authorization['validAfter']),
+            "validBefore": int(authorization['validBefore']),
+            "nonce": bytes.fromhex(authorization['nonce'][2:]),
+        },
+    }
+
+
+EIP712_DOMAIN_TYPEHASH = keccak(
+    text="EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"
+)
+TRANSFER_WITH_AUTHORIZATION_TYPEHASH = keccak(
+    text="TransferWithAuthorization(address from,address to,uint256 value,"
+         "uint256 validAfter,uint256 validBefore,bytes32 nonce)"
+)
+
+
+@lru_cache(maxsize=64)
+def _domain_separator(name: str, version: str, chain_id: int, verifying_contract: str) -> bytes:
+    return keccak(encode(
+        ["bytes32", "bytes32", "bytes32", "uint256", "address"],
+        [EIP712_DOMAIN_TYPEHASH, keccak(text=name), keccak(text=version), chain_id, verifying_contract]
+    ))
+
+
+def authorization_digest(authorization: dict, requirements: dict, chain_id: int) -> bytes:
+    """
+    EIP-712 digest of a TransferWithAuthorization
+
+    Equivalent to hashing authorization_typed_data(), but the domain separator
+    is computed once per token contract rather than on every signature.
+    """
+    extra = requirements.get('extra') or {}
+    domain = _domain_separator(
+        extra.get('name', "USD Coin"), extra.get('version', "2"), chain_id, requirements['asset']
+    )
+    struct_hash = keccak(encode(
+        ["bytes32", "address", "address", "uint256", "uint256", "uint256", "bytes32"],
+        [
+            TRANSFER_WITH_AUTHORIZATION_TYPEHASH,
+            authorization['from'],
+            authorization['to'],
+            int(authorization['value']),
+            int(authorization['validAfter']),
+            int(authorization['validBefore']),
+            bytes.fromhex(authorization['nonce'][2:]),
+        ]
+    ))
+    return keccak(b"\x19\x01" + domain + struct_hash)
+
+
+def encode_payment_header(payload: dict) -> str:
+    """Encode a payment payload for the X-PAYMENT header"""
+    return base64.b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+
+
+def decode_payment_header(header: str) -> dict:
+    """Decode an X-PAYMENT (or X-PAYMENT-RESPONSE) header"""
+    return json.loads(base64.b64decode(header))
+
+
+class X402Client:
+    """
+    Pays for x402-gated resources with signed EIP-3009 USDC authorizations
+    
+    Payment requirements are cached per resource and authorization nonces are
+    generated ahead of time, so once a resource has been challenged a payment
+    costs a local signature plus a single facilitator round trip.
+    """
+    
+    def __init__(
+        self,
+        facilitator_url: str,
+        private_key: str,
+        chain_id: int = 8453,
+        max_payment: float = 100.0,
+        requirements_ttl: float = 300.0,
+        batch_threshold: float = 0.0,
+        nonce_pool_size: int = 64
+    ):
+        """
+        Initialize x402 client
+        
+        Args:
+            facilitator_url: x402 facilitator endpoint (verify/settle)
+            private_key: Base wallet private key used to sign authorizations
+            chain_id: Base chain ID (8453 mainnet, 84532 Sepolia)
+            max_payment: Refuse any single payment above this many USDC
+            requirements_ttl: Seconds to cache a resource's payment requirements
+            batch_threshold: Accrue payments smaller than this many USDC and
+                settle them as one authorization once the total reaches it
+                (0 disables batching); whatever is still accrued is settled
+                when the process exits
+            nonce_pool_size: Number of authorization nonces generated per refill
+        """
+        self.facilitator_url = facilitator_url.rstrip('/')
+        self.account = Account.from_key(private_key)
+        self._private_key = keys.PrivateKey(self.account.key)
+        self.chain_id = chain_id
+        self.network = NETWORKS.get(chain_id, str(chain_id))
+        self.max_payment = max_payment
+        self.requirements_ttl = requirements_ttl
+        self.batch_threshold = batch_threshold
+        self.nonce_pool_size = nonce_pool_size
+        self.session = requests.Session()
+        
+        self._requirements: Dict[str, Tuple[dict, float]] = {}
+        self._nonces: deque = deque()
+        self._accrued: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if batch_threshold:
+            atexit.register(self._flush_at_exit)
+    
+    def _next_nonce(self) -> str:
+        """Pop a pre-generated 32-byte authorization nonce"""
+        try:
+            return self._nonces.popleft()
+        except IndexError:
+            self._nonces.extend('0x' + os.urandom(32).hex() for _ in range(self.nonce_pool_size))
+            return self._nonces.popleft()
+    
+    def get_requirements(self, resource_url: str) -> dict:
+        """
+        Get the payment requirements for a resource, issuing the 402 challenge
+        only when nothing valid is cached
+        
+        Returns:
+            The "exact" scheme requirements for this client's network
+        """
+        cached = self._requirements.get(resource_url)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        
+        try:
+            response = self.session.get(resource_url)
+        except requests.exceptions.RequestException as e:
+            raise ValueError(f"Failed to fetch x402 payment requirements: {e}")
+        
+        if response.status_code != 402:
+            raise ValueError(
+                f"Expected HTTP 402 from {resource_url}, got {response.status_code}"
+            )
+        
+        for requirements in response.json().get('accepts', []):
+            if requirements.get('scheme') == 'exact' and requirements.get('network') == self.network:
+                self._requirements[resource_url] = (requirements, time.monotonic() + self.requirements_ttl)
+                return requirements
+        
+        raise ValueError(f"No 'exact' payment option on {self.network} offered by {resource_url}")
+    
+    def create_payment(self, requirements: dict, value: Optional[int] = None) -> dict:
+        """
+        Sign an EIP-3009 authorization satisfying the requirements
+        
+        Args:
+            requirements: Payment requirements from the 402 challenge
+            value: Amount in USDC base units (defaults to maxAmountRequired)
+        
+        Returns:
+            x402 payment payload
+        """
+        now = int(time.time())
+        authorization = {
+            "from": self.account.address,
+            "to": requirements['payTo'],
+            "value": str(value if value is not None else int(requirements['maxAmountRequired'])),
+            # Backdate slightly to tolerate clock skew with the facilitator
+            "validAfter": str(now - 60),
+            "validBefore": str(now + int(requirements.get('maxTimeoutSeconds', 60))),
+            "nonce": self._next_nonce(),
+        }
+        
+        signature = self._private_key.sign_msg_hash(authorization_digest(authorization, requirements, self.chain_id))
+        
+        return {
+            "x402Version": X402_VERSION,
+            "scheme": requirements['scheme'],
+            "network": requirements['network'],
+            "payload": {
+                "signature": '0x' + (
+                    signature.r.to_bytes(32, 'big') + signature.s.to_bytes(32, 'big') + bytes([signature.v + 27])
+                ).hex(),
+                "authorization": authorization,
+            },
+        }
+    
+    def _facilitator(self, action: str, payload: dict, requirements: dict) -> dict:
+        try:
+            response = self.session.post(
+                f"{self.facilitator_url}/{action}",
+                json={
+                    "x402Version": X402_VERSION,
+                    "paymentPayload": payload,
+                    "paymentRequirements": requirements,
+                }
+            )
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            raise ValueError(f"x402 facilitator {action} failed: {e}")
+    
+    def verify(self, payload: dict, requirements: dict) -> dict:
+        """Ask the facilitator whether a payment is valid (no funds move)"""
+        return self._facilitator('verify', payload, requirements)
+    
+    def settle(self, payload: dict, requirements: dict) -> dict:
+        """Ask the facilitator to verify and settle a payment on-chain"""
+        return self._facilitator('settle', payload, requirements)
+    
+    def authorize(self, resource_url: str) -> Tuple[PaymentInfo, Optional[dict], Optional[dict]]:
+        """
+        Sign a payment for one access to an x402-gated resource without sending it
+        
+        Callers verify and settle the returned payload themselves, which lets
+        them overlap verification with other work and settle later.
+        
+        Batched payments are accrued as soon as they are authorized; callers
+        whose order then fails hand the payment back with release().
+        
+        Returns:
+            Tuple of (PaymentInfo with status "authorized", payload, requirements);
+            when the payment was batched the status is "accrued" and payload and
+            requirements are None
+        """
+        requirements = self.get_requirements(resource_url)
+        value = int(requirements['maxAmountRequired'])
+        amount = value / 1e6
+        
+        if amount > self.max_payment:
+            raise ValueError(
+                f"x402 payment of {amount} USDC exceeds configured maximum {self.max_payment}"
+            )
+        
+        carried = 0
+        if self.batch_threshold and amount < self.batch_threshold:
+            with self._lock:
+                carried = self._accrued.get(resource_url, 0)
+                if carried + value < self.batch_threshold * 1e6:
+                    self._accrued[resource_url] = carried + value
+                    return PaymentInfo(amount=amount, network=self.network, token="USDC", tx_hash=None, status="accrued"), None, None
+                self._accrued[resource_url] = 0
+            value += carried
+        
+        requirements = dict(requirements, maxAmountRequired=str(value))
+        payload = self.create_payment(requirements, value)
+        info = PaymentInfo(
+            amount=value / 1e6, network=self.network, token="USDC", tx_hash=None, status="authorized",
+            carried=carried / 1e6
+        )
+        return info, payload, requirements
+    
+    def release(self, resource_url: str, info: PaymentInfo):
+        """
+        Hand back a payment from authorize() whose order failed
+        
+        An accrued payment is removed from its batch. An authorized payment
+        is left to expire, and the earlier accrued payments it carried are
+        returned to the batch so they are still settled.
+        """
+        if info.status == "accrued":
+            delta = -round(info.amount * 1e6)
+        else:
+            delta = round(info.carried * 1e6)
+        if not delta:
+            return
+        with self._lock:
+            self._accrued[resource_url] = max(self._accrued.get(resource_url, 0) + delta, 0)
+    
+    def complete(self, resource_url: str, info: PaymentInfo, payload: dict, requirements: dict) -> PaymentInfo:
+        """
+        Settle an authorized payment, updating info in place
+        
+        Raises:
+            ValueError: If the facilitator rejects or fails to settle the payment
+        """
+        settlement = self.settle(payload, requirements)
+        
+        if not settlement.get('success'):
+            info.status = "failed"
+            # Requirements may have changed on the server; challenge again next time
+            self._requirements.pop(resource_url, None)
+            raise ValueError(f"x402 payment failed: {settlement.get('errorReason', 'unknown error')}")
+        
+        info.status = "settled"
+        info.tx_hash = settlement.get('transaction')
+        return info
+    
+    def pay(self, resource_url: str) -> PaymentInfo:
+        """
+        Pay for one access to an x402-gated resource
+        
+        Returns:
+            PaymentInfo; status is "settled", or "accrued" when the payment
+            was batched for later settlement
+        """
+        info, payload, requirements = self.authorize(resource_url)
+        if payload is None or requirements is None:
+            return info
+        return self.complete(resource_url, info, payload, requirements)
+    
+    def flush(self) -> Dict[str, PaymentInfo]:
+        """
+        Settle every accrued batch of small payments
+        
+        Every batch is attempted; those that fail are kept for the next flush.
+        
+        Returns:
+            PaymentInfo of each settled batch by resource URL
+        
+        Raises:
+            ValueError: If any batch could not be settled
+        """
+        with self._lock:
+            accrued, self._accrued = self._accrued, {}
+        settled = {}
+        error: Optional[Exception] = None
+        for resource_url, value in accrued.items():
+            if not value:
+                continue
+            try:
+                requirements = dict(self.get_requirements(resource_url), maxAmountRequired=str(value))
+                payload = self.create_payment(requirements, value)
+                info = PaymentInfo(amount=value / 1e6, network=self.network, token="USDC", tx_hash=None, status="authorized")
+                settled[resource_url] = self.complete(resource_url, info, payload, requirements)
+            except Exception as e:
+                with self._lock:
+                    self._accrued[resource_url] = self._accrued.get(resource_url, 0) + value
+                error = error or e
+        if error is not None:
+            raise error
+        return settled
+
+    def _flush_at_exit(self):
+        """Settle accrued payments before the process ends; they only live in memory"""
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Warning: Accrued x402 payments were not settled: {e}", file=sys.stderr)
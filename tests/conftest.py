@@ -0,0 +1,37 @@
+import copy
+import json
+import pytest
+from poly402.config import ConfigManager
+from poly402.models import Market, Outcome
+
+BASE_KEY = "0x" + "11" * 32
+POLYGON_KEY = "0x" + "22" * 32
+
+
+def make_market(slug="btc-100k", prices=(0.4, 0.6), neg_risk=False, end_date=None):
+    """Market with one outcome per price, token ids "<slug>-<index>"."""
+    outcomes = [
+        Outcome(i, f"Outcome {i}", f"{slug}-{i}", price, price * 100, f"cond-{i}", f"{slug}-no-{i}")
+        for i, price in enumerate(prices)
+    ]
+    return Market(slug, slug, "", outcomes, True, end_date, "cond", None, None, None, neg_risk=neg_risk)
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    config = copy.deepcopy(ConfigManager.DEFAULT_CONFIG)
+    config['networks']['base']['wallet_private_key'] = BASE_KEY
+    config['networks']['polygon']['wallet_private_key'] = POLYGON_KEY
+    config['journal']['path'] = str(tmp_path / "journal")
+    config['prices'] = dict(config.get('prices', {}), path=str(tmp_path / "prices"))
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(config))
+    return str(path)
+
+
+@pytest.fixture
+def client(config_path):
+    from poly402.client import Poly402Client
+    client = Poly402Client(config_path)
+    yield client
+    client.lifecycle.stop()
@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+import pytest
+from poly402.arbitrage import ArbitrageScanner
+from conftest import make_market
+
+
+def scanner(**kwargs):
+    return ArbitrageScanner(SimpleNamespace(templates={}), **kwargs)
+
+
+def event(slug="fed"):
+    return make_market(slug, prices=(0.3, 0.3, 0.3), neg_risk=True)
+
+
+def yes_books(market, asks):
+    return {o.token_id: ([], levels) for o, levels in zip(market.outcomes, asks)}
+
+
+ASKS = [
+    [(0.30, 100), (0.35, 100)],
+    [(0.30, 50), (0.40, 100)],
+    [(0.30, 200)],
+]
+
+
+def test_yes_basket_stops_where_marginal_cost_reaches_payout():
+    market = event()
+    [opportunity] = scanner().evaluate(market, yes_books(market, ASKS))
+    # 0.90 per basket for the first 50; the next level of B costs 1.00
+    assert opportunity.side == "YES"
+    assert opportunity.baskets == 50
+    assert opportunity.cost == pytest.approx(45)
+    assert opportunity.payout == pytest.approx(50)
+    assert [leg.price for leg in opportunity.legs] == [0.30, 0.30, 0.30]
+    assert all(leg.size == 50 for leg in opportunity.legs)
+
+
+def test_yes_basket_walks_several_levels():
+    market = event()
+    asks = [[(0.30, 100), (0.32, 100)], [(0.30, 50), (0.33, 100)], [(0.30, 200)]]
+    [opportunity] = scanner().evaluate(market, yes_books(market, asks))
+    # 50 at 0.90, 50 at 0.93, then 100 at 0.95 (A's second level)
+    assert opportunity.baskets == 150
+    assert opportunity.cost == pytest.approx(50 * 0.90 + 50 * 0.93 + 50 * 0.95)
+    assert [leg.price for leg in opportunity.legs] == [0.32, 0.33, 0.30]
+
+
+def test_max_cost_and_fees():
+    market = event()
+    [capped] = scanner(max_cost=30).evaluate(market, yes_books(market, ASKS))
+    assert capped.baskets == pytest.approx(33.33)
+    assert capped.cost == pytest.approx(33.33 * 0.9)
+    
+    [taxed] = scanner(fee_rate_bps=100).evaluate(market, yes_books(market, ASKS))
+    assert taxed.fees == pytest.approx(50 * 3 * 0.01 * 0.30)
+    assert taxed.profit == pytest.approx(5 - taxed.fees)
+    
+    assert scanner(min_edge=0.2).evaluate(market, yes_books(market, ASKS)) == []
+    assert scanner(min_size=60).evaluate(market, yes_books(market, ASKS)) == []
+
+
+def test_no_basket_from_bids_above_one():
+    market = event()
+    bids = [[(0.5, 10)], [(0.4, 20)], [(0.3, 30)]]
+    books = {o.token_id: (levels, [(0.99, 100)]) for o, levels in zip(market.outcomes, bids)}
+    [opportunity] = scanner().evaluate(market, books)
+    # No shares at 0.5 + 0.6 + 0.7 pay n - 1 = 2
+    assert opportunity.side == "NO"
+    assert opportunity.baskets == 10
+    assert opportunity.cost == pytest.approx(18)
+    assert opportunity.payout == pytest.approx(20)
+    assert [leg.token_id for leg in opportunity.legs] == [o.no_token_id for o in market.outcomes]
+
+
+def test_scan_filters_and_ranks():
+    fair, cheap, cheaper = event("fair"), event("cheap"), event("cheaper")
+    plain = make_market("plain", prices=(0.3, 0.3))
+    books = {}
+    books.update(yes_books(fair, [[(0.34, 100)]] * 3))
+    books.update(yes_books(cheap, ASKS))
+    books.update(yes_books(cheaper, [[(0.2, 100)]] * 3))
+    polymarket = SimpleNamespace(templates={}, get_books=lambda token_ids, workers: books)
+    
+    opportunities = ArbitrageScanner(polymarket).scan([fair, cheap, cheaper, plain])
+    assert [o.market_slug for o in opportunities] == ["cheaper", "cheap"]
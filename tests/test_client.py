@@ -0,0 +1,97 @@
+from datetime import datetime
+import pytest
+from py_clob_client.clob_types import CreateOrderOptions, OrderArgs
+from poly402.models import IntentStatus, OrderStatus, OrderTemplate, TradeResult
+from conftest import make_market
+
+
+def test_pending_intent_is_found_at_the_signed_tick_price(client, monkeypatch):
+    polymarket = client.polymarket
+    outcome = make_market(prices=(0.345,)).outcomes[0]
+    outcome.token_id = "1234"
+    
+    def sign_order(token_id, side, price, size, expiration=0):
+        return polymarket.client.builder.create_order(
+            OrderArgs(token_id=token_id, price=price, size=size, side=side),
+            CreateOrderOptions(tick_size="0.01", neg_risk=False)
+        )
+    
+    def post_signed_order(signed_order, order_type=None):
+        raise RuntimeError("connection reset")
+    
+    monkeypatch.setattr(polymarket, "sign_order", sign_order)
+    monkeypatch.setattr(polymarket, "post_signed_order", post_signed_order)
+    result = client._submit_order("k1", "btc", outcome, "BUY", 0.345, 10, 3.45)
+    
+    intent = client.intents.get("k1")
+    assert result.status == OrderStatus.FAILED
+    assert intent.status == IntentStatus.PENDING
+    # The builder rounded the midpoint to the 0.01 tick it signed
+    assert intent.price == pytest.approx(0.34, abs=1e-12)
+    assert intent.size == 10
+    
+    # The order did reach the book; reconciliation finds it instead of re-posting
+    resting = {'id': "0xabc", 'side': "BUY", 'price': "0.34", 'original_size': "10",
+               'status': "LIVE", 'created_at': int(datetime.now().timestamp())}
+    monkeypatch.setattr(polymarket, "_ensure_credentials", lambda: None)
+    monkeypatch.setattr(polymarket.client, "get_orders", lambda params: [resting])
+    [reconciled] = client.reconcile_intents()
+    assert reconciled.order_id == "0xabc"
+    assert reconciled.status == OrderStatus.TRADING
+    assert client.intents.get("k1").status == IntentStatus.POSTED
+
+
+def test_work_order_children_are_checked_and_journaled(client, monkeypatch):
+    polymarket = client.polymarket
+    market = make_market(prices=(0.5,))
+    token_id = market.outcomes[0].token_id
+    preflights, journaled = [], []
+    
+    def prepare(token_id, market_slug="", outcome_name=""):
+        polymarket.templates[token_id] = OrderTemplate(token_id, "0.01", False, market_slug=market_slug)
+    
+    def fire(token_id, price, size, side):
+        return TradeResult(f"o{len(journaled)}", "btc", "Yes", price * size, size, price,
+                           OrderStatus.COMPLETED, None, None, None, side=side)
+    
+    monkeypatch.setattr(client, "get_market", lambda url: market)
+    monkeypatch.setattr(polymarket, "prepare", prepare)
+    monkeypatch.setattr(polymarket, "warm", lambda: None)
+    monkeypatch.setattr(polymarket, "fire", fire)
+    monkeypatch.setattr(polymarket, "get_books", lambda token_ids, *args: {token_id: ([], [(0.5, 20)])})
+    monkeypatch.setattr(polymarket, "get_positions", lambda: [])
+    monkeypatch.setattr(client, "_preflight", lambda *args: preflights.append(args[1:]))
+    monkeypatch.setattr(client, "_journal", journaled.append)
+    client.risk.max_market_exposure = 15.0
+    
+    algo = client.work_order("btc-100k", 0, "liquidity", size=60, participation=1.0, interval=0)
+    report = algo.run()
+    
+    # The second 20-share child would take market exposure past $15
+    assert report.filled_size == 20
+    assert "Risk limit" in report.error
+    assert preflights == [("BUY", 10.0, False)]
+    assert [r.order_id for r in journaled] == ["o0"]
+
+
+def test_base_rpc_outage_does_not_block_a_trade(client, monkeypatch, capsys):
+    market = make_market(prices=(0.5,))
+    
+    def base_balance(network, address=None):
+        raise RuntimeError("All RPC endpoints failed for eth_call")
+    
+    def submit(key, market_slug, outcome, side, price, size, amount_usdc, *args):
+        return TradeResult("o1", market_slug, outcome.name, amount_usdc, size, price,
+                           OrderStatus.TRADING, None, None, datetime.now())
+    
+    monkeypatch.setattr(client, "get_market", lambda url: market)
+    monkeypatch.setattr(client.allowances, "balance", lambda address: 100.0)
+    monkeypatch.setattr(client, "_get_usdc_balance", base_balance)
+    monkeypatch.setattr(client, "_preflight", lambda *args: None)
+    monkeypatch.setattr(client, "_submit_order", submit)
+    client.config.x402_resource = ""
+    
+    result = client.execute_trade("btc-100k", 0, 10.0)
+    
+    assert result.status == OrderStatus.TRADING
+    assert "Could not check USDC balance on Base" in capsys.readouterr().err
@@ -0,0 +1,158 @@
+import pytest
+from poly402 import execution
+from poly402.execution import Iceberg, LiquiditySeeking, TWAP
+from poly402.models import OrderStatus, OrderTemplate, TradeResult
+
+
+class FakePolymarket:
+    """CLOB whose orders rest until the test sets their matched size and status"""
+    
+    def __init__(self, books=None, fill_on_arrival=False):
+        self.templates = {"tok": OrderTemplate("tok", "0.01", False, market_slug="btc", outcome_name="Yes")}
+        self.books = books or {"tok": ([(0.48, 100)], [(0.52, 100)])}
+        self.fill_on_arrival = fill_on_arrival
+        self.orders = {}
+        self.cancelled = []
+        self.lagging = False  # Cancelled orders keep showing LIVE
+    
+    def fire(self, token_id, price, size, side):
+        order_id = f"o{len(self.orders)}"
+        status = OrderStatus.COMPLETED if self.fill_on_arrival else OrderStatus.TRADING
+        self.orders[order_id] = {'price': price, 'size': size,
+                                 'size_matched': size if self.fill_on_arrival else 0,
+                                 'status': "MATCHED" if self.fill_on_arrival else "LIVE"}
+        return TradeResult(order_id, "btc", "Yes", price * size, 0, price, status, None, None, None, side=side)
+    
+    def get_order(self, order_id):
+        return self.orders[order_id]
+    
+    def cancel_order(self, order_id):
+        self.cancelled.append(order_id)
+        if not self.lagging:
+            self.orders[order_id]['status'] = "CANCELED"
+    
+    def get_books(self, token_ids, *args):
+        return {t: self.books[t] for t in token_ids if t in self.books}
+    
+    def match(self, order_id, size, status="LIVE"):
+        self.orders[order_id].update(size_matched=size, status=status)
+
+
+def test_partial_fills_accumulate_once_per_delta():
+    polymarket = FakePolymarket()
+    algo = Iceberg(polymarket, "tok", clip_size=10, size=25)
+    bids, asks = polymarket.books["tok"]
+    
+    algo.step(bids, asks)
+    assert algo.report.child_orders == 1
+    polymarket.match("o0", 4)
+    algo._sync()
+    algo._sync()  # Re-reading the same matched size adds nothing
+    assert algo.report.filled_size == pytest.approx(4)
+    assert algo.report.notional == pytest.approx(4 * 0.48)
+    
+    polymarket.match("o0", 10, "MATCHED")
+    algo._sync()
+    assert algo._child is None
+    assert algo.report.filled_size == pytest.approx(10)
+    
+    # Next clip is sized from what is left of the parent
+    algo.step(bids, asks)
+    assert polymarket.orders["o1"]['size'] == 10
+    assert algo.remaining() == pytest.approx(15)
+
+
+def test_cancel_records_fills_up_to_the_cancel():
+    polymarket = FakePolymarket()
+    algo = Iceberg(polymarket, "tok", clip_size=10, size=25)
+    algo.step(*polymarket.books["tok"])
+    polymarket.match("o0", 6)
+    
+    # The bid moves away, so the clip is cancelled and re-posted
+    polymarket.books["tok"] = ([(0.50, 100)], [(0.52, 100)])
+    algo.step(*polymarket.books["tok"])
+    assert polymarket.cancelled == ["o0"]
+    assert algo.report.cancelled_orders == 1
+    assert algo.report.filled_size == pytest.approx(6)
+    assert polymarket.orders["o1"]['price'] == 0.50
+    assert polymarket.orders["o1"]['size'] == 10
+
+
+def test_child_matched_on_arrival_counts_in_full():
+    polymarket = FakePolymarket(fill_on_arrival=True)
+    algo = LiquiditySeeking(polymarket, "tok", participation=0.5, size=30)
+    algo.step(*polymarket.books["tok"])
+    assert algo._child is None
+    assert algo.report.filled_size == pytest.approx(30)
+    assert algo.report.avg_price == pytest.approx(0.52)
+    assert algo.done
+
+
+def test_liquidity_seeking_stays_within_the_limit():
+    books = {"tok": ([(0.48, 100)], [(0.52, 10), (0.53, 10), (0.60, 100)])}
+    polymarket = FakePolymarket(books, fill_on_arrival=True)
+    algo = LiquiditySeeking(polymarket, "tok", participation=1.0, size=50, limit_price=0.55)
+    algo.step(*books["tok"])
+    order = polymarket.orders["o0"]
+    assert (order['price'], order['size']) == (0.53, 20)
+
+
+def test_usdc_budget_is_measured_at_the_reference_price():
+    polymarket = FakePolymarket(fill_on_arrival=True)
+    algo = TWAP(polymarket, "tok", duration=0.05, slices=1, amount_usdc=26, interval=0.01)
+    with pytest.raises(ValueError):
+        algo.remaining()
+    assert not algo.done  # No reference price yet
+    
+    report = algo.run()
+    assert report.error is None
+    # 26 USDC at the 0.52 ask buys 50 shares in one child
+    assert report.child_orders == 1
+    assert report.filled_size == pytest.approx(50)
+    assert report.notional == pytest.approx(26)
+    assert algo.done
+
+
+def test_lagging_cancel_is_followed_without_overfilling(monkeypatch):
+    monkeypatch.setattr(execution, "CANCEL_POLL_INTERVAL", 0)
+    polymarket = FakePolymarket()
+    polymarket.lagging = True
+    algo = Iceberg(polymarket, "tok", clip_size=10, size=25)
+    algo.step(*polymarket.books["tok"])
+    polymarket.match("o0", 2)
+    
+    polymarket.books["tok"] = ([(0.50, 100)], [(0.52, 100)])
+    algo.step(*polymarket.books["tok"])
+    # The cancel is pending, not fatal; its 8 open shares stay reserved
+    assert algo.report.cancelled_orders == 1
+    assert algo.remaining() == pytest.approx(15)
+    assert polymarket.orders["o1"]['size'] == 10
+    
+    # The old clip fills a little more before the CLOB catches up
+    polymarket.match("o0", 5, "CANCELED")
+    algo._sync()
+    assert algo._cancelling == []
+    assert algo.report.filled_size == pytest.approx(5)
+    assert algo.remaining() == pytest.approx(20)
+
+
+def test_unconfirmed_cancel_is_reported(monkeypatch):
+    monkeypatch.setattr(execution, "CANCEL_POLL_INTERVAL", 0)
+    polymarket = FakePolymarket()
+    polymarket.lagging = True
+    algo = Iceberg(polymarket, "tok", clip_size=10, size=25, timeout=0.05, interval=0.01)
+    report = algo.run()
+    assert "o0" in report.error and "not confirmed" in report.error
+
+
+def test_children_use_the_given_fire():
+    polymarket = FakePolymarket(fill_on_arrival=True)
+    placed = []
+    
+    def fire(token_id, price, size, side):
+        placed.append((token_id, price, size, side))
+        return polymarket.fire(token_id, price, size, side)
+    
+    algo = LiquiditySeeking(polymarket, "tok", size=10, fire=fire)
+    algo.step(*polymarket.books["tok"])
+    assert placed == [("tok", 0.52, 10, "BUY")]
@@ -0,0 +1,93 @@
+import threading
+import time
+from datetime import datetime, timezone
+import pytest
+from poly402.lifecycle import GTD_SECURITY_SECONDS, LifecycleScheduler
+from conftest import make_market
+
+NOW = 1_700_000_000.0
+
+
+def ending(slug, at):
+    return make_market(slug, end_date=datetime.fromtimestamp(at, timezone.utc))
+
+
+@pytest.fixture
+def clock():
+    return [NOW]
+
+
+@pytest.fixture
+def scheduler(clock):
+    scheduler = LifecycleScheduler(lead=300, clock=lambda: clock[0])
+    yield scheduler
+    scheduler.stop()
+
+
+def test_track_schedules_lead_seconds_before_the_end(scheduler):
+    assert scheduler.track(ending("a", NOW + 1000)) == NOW + 700
+    assert scheduler.track(make_market("no-end")) is None
+    # Already past its deadline when first seen: left alone
+    assert scheduler.track(ending("late", NOW + 100)) is None
+    assert len(scheduler) == 1
+    assert scheduler.next_deadline() == NOW + 700
+
+
+def test_expire_hands_out_markets_in_deadline_order(scheduler):
+    seen = []
+    scheduler.subscribe(lambda market: 1 / 0)  # A failing handler does not stop the rest
+    scheduler.subscribe(lambda market: seen.append(market.slug))
+    for slug, end in (("b", NOW + 2000), ("a", NOW + 1000), ("c", NOW + 9000)):
+        scheduler.track(ending(slug, end))
+    
+    assert scheduler.expire(NOW + 699) == []
+    assert [m.slug for m in scheduler.expire(NOW + 1700)] == ["a", "b"]
+    assert seen == ["a", "b"]
+    assert not scheduler.tracked("a")
+    assert scheduler.tracked("c")
+
+
+def test_moved_end_date_leaves_a_stale_entry_behind(scheduler):
+    scheduler.track(ending("a", NOW + 1000))
+    moved = ending("a", NOW + 5000)
+    assert scheduler.track(moved) == NOW + 4700
+    
+    # The old deadline is skipped; the latest Market object is handed out
+    assert scheduler.expire(NOW + 1000) == []
+    assert scheduler.next_deadline() == NOW + 4700
+    assert scheduler.expire(NOW + 4700) == [moved]
+    assert len(scheduler) == 0
+
+
+def test_untracked_market_never_expires(scheduler):
+    scheduler.track(ending("a", NOW + 1000))
+    assert scheduler.untrack("a")
+    assert not scheduler.untrack("a")
+    assert scheduler.next_deadline() is None
+    assert scheduler.expire(NOW + 1000) == []
+
+
+def test_heap_is_rebuilt_once_stale_entries_pile_up(scheduler):
+    for i in range(500):
+        scheduler.track(ending("a", NOW + 1000 + i))
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 64
+    assert scheduler.next_deadline() == NOW + 1199
+
+
+def test_gtd_expiration(scheduler):
+    assert scheduler.gtd_expiration(ending("a", NOW + 1000)) == int(NOW + 700) + GTD_SECURITY_SECONDS
+    # Deadline too close for a GTD order, or no end date at all
+    assert scheduler.gtd_expiration(ending("b", NOW + 300 + GTD_SECURITY_SECONDS)) == 0
+    assert scheduler.gtd_expiration(make_market("c")) == 0
+
+
+def test_background_thread_fires_at_the_deadline():
+    scheduler = LifecycleScheduler(lead=0)
+    closed = threading.Event()
+    scheduler.subscribe(lambda market: closed.set())
+    try:
+        scheduler.track(ending("a", time.time() + 0.05))
+        assert closed.wait(2)
+        assert len(scheduler) == 0
+    finally:
+        scheduler.stop()
@@ -0,0 +1,77 @@
+import pytest
+from poly402.models import OrderStatus, OrderTemplate, Position
+from poly402.polymarket_client import PolymarketClient
+from conftest import POLYGON_KEY
+
+
+@pytest.fixture
+def polymarket(monkeypatch):
+    client = PolymarketClient("https://clob.example", 137, POLYGON_KEY)
+    monkeypatch.setattr(client, "_ensure_credentials", lambda: None)
+    return client
+
+
+def test_close_positions_survives_missing_book(polymarket, monkeypatch):
+    def top(token_id):
+        if token_id == "resolved":
+            raise RuntimeError("Failed to get order book: 404")
+        return 0.55, 0.57
+    
+    posted = []
+    
+    def place(token_id, outcome_name, side, price, size, amount_usdc=None):
+        posted.append((token_id, price, size))
+        return polymarket._failed_result(outcome_name, price * size, price, side, "stub")
+    
+    monkeypatch.setattr(polymarket, "get_order_book_top", top)
+    monkeypatch.setattr(polymarket, "_place_order", place)
+    positions = [
+        Position("live", 10, 0.5, market_slug="a"),
+        Position("resolved", 5, 0.5, market_slug="b"),
+        Position("priced", 2, 0.5, market_slug="c", best_bid=0.4),
+    ]
+    
+    results = polymarket.close_positions(positions)
+    
+    assert [r.market_slug for r in results] == ["a", "b", "c"]
+    assert sorted(posted) == [("live", 0.55, 10), ("priced", 0.4, 2)]
+    assert results[1].status == OrderStatus.FAILED
+    assert "404" in results[1].error
+
+
+def test_post_orders_fails_forgotten_tokens_individually(polymarket, monkeypatch):
+    polymarket.templates["kept"] = object()
+    polymarket.templates["closed"] = object()
+    monkeypatch.setattr(polymarket, "_sign_from_template", lambda template, price, size, side: (price, size))
+    monkeypatch.setattr(
+        polymarket.client, "post_orders",
+        lambda args: [{'success': True, 'orderID': f"o{arg.order[0]}"} for arg in args]
+    )
+    polymarket.forget(["closed"])
+    
+    responses = polymarket.post_orders([
+        ("kept", 0.4, 10, "BUY"),
+        ("closed", 0.5, 10, "BUY"),
+        ("kept", 0.6, 10, "SELL"),
+    ])
+    
+    assert [resp['success'] for resp in responses] == [True, False, True]
+    assert [resp.get('orderID') for resp in responses] == ["o0.4", None, "o0.6"]
+    assert "closed" in responses[1]['errorMsg']
+
+
+def test_fire_reads_the_clob_order_id(polymarket, monkeypatch):
+    polymarket.templates["1234"] = OrderTemplate("1234", "0.01", False, market_slug="btc", outcome_name="Yes")
+    posted = []
+    
+    def post_order(order, order_type):
+        posted.append(order.dict())
+        return {'success': True, 'orderID': "0xabc", 'status': "live", 'errorMsg': ""}
+    
+    monkeypatch.setattr(polymarket.client, "post_order", post_order)
+    result = polymarket.fire("1234", 0.42, 10, "BUY")
+    
+    assert result.order_id == "0xabc"
+    assert result.status == OrderStatus.TRADING
+    assert result.market_slug == "btc"
+    assert int(posted[0]['makerAmount']) == 4_200_000
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from poly402.prices import INDEX_STRIDE, PriceStore
+from conftest import make_market
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path / "prices"))
+
+
+def test_append_skips_stored_timestamps(store):
+    assert store.append("tok", [1, 2, 3], [0.1, 0.2, 0.3]) == 3
+    assert store.append("tok", [3, 4], [0.3, 0.4]) == 1
+    ts, prices = store.range("tok")
+    assert ts.tolist() == [1, 2, 3, 4]
+    assert prices.tolist() == pytest.approx([0.1, 0.2, 0.3, 0.4])
+
+
+def test_older_records_are_merged_in_order(store):
+    store.append("tok", [100, 200], [0.5, 0.6])
+    assert store.append("tok", [50, 150, 200, 250], [0.1, 0.2, 0.9, 0.3]) == 3
+    ts, prices = store.range("tok")
+    assert ts.tolist() == [50, 100, 150, 200, 250]
+    # The stored observation wins over a duplicate timestamp
+    assert prices.tolist() == pytest.approx([0.1, 0.5, 0.2, 0.6, 0.3])
+    assert store.last_timestamp("tok") == 250
+
+
+def test_merge_rebuilds_sparse_index(store):
+    n = 2 * INDEX_STRIDE + 10
+    store.append("tok", np.arange(n, dtype=float) * 2 + 1, np.full(n, 0.5))
+    # Even timestamps interleave with every stored record
+    store.append("tok", np.arange(n, dtype=float) * 2, np.full(n, 0.9))
+    
+    ts, _ = store.range("tok")
+    assert len(ts) == 2 * n
+    assert np.all(np.diff(ts) > 0)
+    assert store.range("tok", 10.0, 20.0)[0].tolist() == list(range(10, 20))
+    bars = store.get_price_history("tok", resolution=INDEX_STRIDE)
+    assert sum(bar.count for bar in bars) == 2 * n
+    assert all(bar.high == pytest.approx(0.9) and bar.low == pytest.approx(0.5) for bar in bars)
+
+
+def test_merge_with_reopened_store(tmp_path):
+    path = str(tmp_path / "prices")
+    PriceStore(path).append("tok", [10, 20], [0.1, 0.2])
+    store = PriceStore(path)
+    assert store.append("tok", [5, 15], [0.05, 0.15]) == 2
+    assert PriceStore(path).range("tok")[0].tolist() == [5, 10, 15, 20]
+
+
+def test_backfill_after_live_tick(client, monkeypatch):
+    """History is backfilled even when the token was first seen live"""
+    market = make_market(prices=(0.7, 0.3))
+    monkeypatch.setattr(client.market_parser, "fetch_market", lambda url: market)
+    requested = []
+    
+    def history(token_id, start_ts=None, end_ts=None, fidelity=1):
+        requested.append(start_ts)
+        return [(1000.0, 0.5), (2000.0, 0.6), (3000.0, 0.65)]
+    
+    monkeypatch.setattr(client.polymarket, "get_price_history", history)
+    
+    client.get_market("btc-100k")
+    token_id = market.outcomes[0].token_id
+    assert client.backfill_prices([token_id]) == {token_id: 3}
+    
+    ts, prices = client.prices.range(token_id)
+    assert ts[:3].tolist() == [1000.0, 2000.0, 3000.0]
+    assert len(ts) == 4 and prices[-1] == pytest.approx(0.7)
+    assert requested == [None]
+    
+    # The next backfill resumes from the newest backfilled point
+    client.backfill_prices([token_id])
+    assert requested == [None, 3000.0]
@@ -0,0 +1,102 @@
+import time
+import pytest
+from poly402.models import OrderTemplate, QuoteSpec
+from poly402.quoting import QuotingEngine
+
+
+class FakePolymarket:
+    """CLOB accepting every post-only order and reporting trades the test adds"""
+    
+    def __init__(self):
+        self.templates = {"tok": OrderTemplate("tok", "0.01", False)}
+        self.posted = []
+        self.cancelled = []
+        self.trades = []
+    
+    def post_orders(self, orders, post_only=False, max_workers=8):
+        responses = []
+        for order in orders:
+            self.posted.append(order)
+            responses.append({'success': True, 'orderID': f"o{len(self.posted) - 1}"})
+        return responses
+    
+    def cancel_orders(self, order_ids):
+        self.cancelled.extend(order_ids)
+        return order_ids
+    
+    def get_trades(self, after=None, token_id=None):
+        return list(self.trades)
+    
+    def fill(self, order_id, size, price):
+        self.trades.append({'id': f"t{len(self.trades)}", 'match_time': int(time.time()),
+                            'maker_orders': [{'order_id': order_id, 'matched_amount': size, 'price': price}]})
+
+
+def engine(polymarket, **spec):
+    spec = dict(dict(size=10, half_spread=0.02, max_position=15), **spec)
+    return QuotingEngine(polymarket, [QuoteSpec("tok", **spec)])
+
+
+def test_quotes_respect_inventory_limits_and_skew():
+    quoting = engine(FakePolymarket(), skew=0.001)
+    bids, asks = [(0.48, 100)], [(0.52, 100)]
+    # Flat: nothing to offer yet
+    assert quoting.quotes("tok", bids, asks) == ((0.48, 10), None)
+    
+    # Long 10: center shifts down a cent and only 5 more may be bought
+    quoting.inventory["tok"] = 10
+    assert quoting.quotes("tok", bids, asks) == ((0.47, 5), (0.51, 10))
+
+
+def test_quotes_stay_off_the_other_side_of_the_book():
+    quoting = engine(FakePolymarket(), half_spread=0.001, min_position=-10)
+    bid, ask = quoting.quotes("tok", [(0.49, 100)], [(0.50, 100)])
+    assert bid == (0.49, 10)
+    assert ask == (0.50, 10)
+
+
+def test_requote_only_on_a_tick_move():
+    polymarket = FakePolymarket()
+    quoting = engine(polymarket)
+    assert quoting.on_book("tok", [(0.48, 100)], [(0.52, 100)]) == 1
+    assert quoting.flush() == 1
+    assert polymarket.posted == [("tok", 0.48, 10, "BUY")]
+    
+    # Our own bid shows in the book but does not move the fair value
+    assert quoting.on_book("tok", [(0.48, 110)], [(0.52, 100)]) == 0
+    # Half a tick of movement is absorbed
+    assert quoting.on_book("tok", [(0.485, 100), (0.48, 10)], [(0.52, 100)]) == 0
+    
+    assert quoting.on_book("tok", [(0.50, 100), (0.48, 10)], [(0.54, 100)]) == 1
+    assert quoting.flush() == 1
+    assert polymarket.cancelled == ["o0"]
+    assert polymarket.posted[-1] == ("tok", 0.50, 10, "BUY")
+
+
+def test_fills_update_inventory_once():
+    polymarket = FakePolymarket()
+    fills = []
+    quoting = engine(polymarket)
+    quoting.on_fill = lambda *fill: fills.append(fill)
+    quoting.on_book("tok", [(0.48, 100)], [(0.52, 100)])
+    quoting.flush()
+    
+    polymarket.fill("o0", 6, 0.48)
+    assert quoting.sync_fills() == 1
+    assert quoting.sync_fills() == 0  # The same trade is reported again
+    assert quoting.inventory["tok"] == pytest.approx(6)
+    assert fills == [("tok", "BUY", 0.48, 6)]
+    
+    # Only 4 of the bid rest, below half the 9 the limit now allows, so it
+    # is topped up; holding 6 also opens an offer
+    book = ([(0.48, 104)], [(0.52, 100)])
+    assert quoting.on_book("tok", *book) == 2
+    quoting.flush()
+    assert polymarket.cancelled == ["o0"]
+    assert sorted(polymarket.posted[1:]) == [("tok", 0.48, 9, "BUY"), ("tok", 0.52, 6, "SELL")]
+    
+    # Filling the whole offer closes it and flattens the position
+    polymarket.fill("o2", 6, 0.52)
+    quoting.sync_fills()
+    assert quoting.inventory["tok"] == pytest.approx(0)
+    assert ("tok", "SELL") not in quoting._live
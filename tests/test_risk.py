@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+from poly402.models import Position
+from poly402.risk import RiskEngine
+
+
+def plain_market():
+    """Yes 100 @ 0.40 and No 50 @ 0.50 of one market: cost 65, pays 100 or 50"""
+    return [
+        Position("yes", 100, 0.40, condition_id="c1", market_slug="btc", outcome_index=0, best_bid=0.45, best_ask=0.47),
+        Position("no", 50, 0.50, condition_id="c1", market_slug="btc", outcome_index=1, best_bid=0.52, best_ask=0.54),
+    ]
+
+
+def neg_risk_event():
+    """Yes A 10 @ 0.30 and No B 20 @ 0.60 of a neg-risk event: cost 15"""
+    return [
+        Position("a-yes", 10, 0.30, condition_id="A", market_slug="fed", outcome_index=0, neg_risk=True),
+        Position("b-no", 20, 0.60, condition_id="B", market_slug="fed", outcome_index=1, neg_risk=True),
+    ]
+
+
+def test_plain_market_payout_and_worst_case():
+    engine = RiskEngine(plain_market())
+    s = engine.set_of[0]
+    assert engine.payout[s, :2].tolist() == [100, 50]
+    assert engine.set_cost[s] == pytest.approx(65)
+    assert engine.total_loss == pytest.approx(15)
+    
+    summary = engine.summary()
+    assert summary.cost == pytest.approx(65)
+    assert summary.value == pytest.approx(100 * 0.45 + 50 * 0.52)
+
+
+def test_neg_risk_states_include_other():
+    engine = RiskEngine(neg_risk_event())
+    s = engine.set_of[0]
+    # States: A resolves Yes, B resolves Yes, another market resolves Yes
+    assert engine.n_states[s] == 3
+    assert engine.payout[s, :3].tolist() == [30, 0, 20]
+    [row] = engine.exposures('set')
+    assert row.max_loss == pytest.approx(15)
+    assert row.positions == 2
+
+
+def test_unheld_neg_risk_market_pays_like_other():
+    engine = RiskEngine(neg_risk_event(), max_loss=16.5)
+    # Yes on a new market D: B resolving Yes still pays nothing, cost rises by 2
+    with pytest.raises(ValueError, match="worst-case loss would be \\$17.00"):
+        engine.check("d-yes", 10, 0.2, event="fed", condition_id="D", neg_risk=True)
+    engine.max_loss = 17.5
+    engine.check("d-yes", 10, 0.2, event="fed", condition_id="D", neg_risk=True)
+    # No on B covers the B state and lowers the worst case
+    engine.max_loss = 15.0
+    engine.check("b-yes", 10, 0.1, event="fed", condition_id="B", neg_risk=True, outcome_index=0)
+
+
+def test_exposure_limits():
+    engine = RiskEngine(plain_market(), max_event_exposure=70, max_market_exposure=100)
+    engine.check("yes", 10, 0.5, event="btc", condition_id="c1")
+    with pytest.raises(ValueError, match="exposure to event 'btc'"):
+        engine.check("yes", 20, 0.5, event="btc", condition_id="c1")
+    engine.check("other", 100, 0.5, event="eth", condition_id="c2")
+
+
+@pytest.mark.parametrize("positions, token_id, condition_id, neg_risk, outcome_index", [
+    (plain_market(), "yes", "c1", False, 0),
+    (plain_market(), "new", "c9", False, 0),
+    (neg_risk_event(), "b-no", "B", True, 1),
+    (neg_risk_event(), "c-no", "C", True, 1),
+])
+def test_reserve_and_release_restore_totals(positions, token_id, condition_id, neg_risk, outcome_index):
+    engine = RiskEngine(positions, max_loss=1000)
+    event = positions[0].market_slug
+    before = (engine.total_loss, engine.event_cost.sum(), engine.summary().cost)
+    
+    engine.check(token_id, 40, 0.25, event=event, condition_id=condition_id, neg_risk=neg_risk,
+                 outcome_index=outcome_index, reserve=True)
+    assert engine.summary().cost == pytest.approx(before[2] + 10)
+    
+    engine.apply(token_id, -40, 0.25, event=event, condition_id=condition_id, neg_risk=neg_risk,
+                 outcome_index=outcome_index)
+    after = (engine.total_loss, engine.event_cost.sum(), engine.summary().cost)
+    assert after == pytest.approx(before)
+
+
+def test_incremental_apply_matches_rebuild():
+    engine = RiskEngine(neg_risk_event())
+    engine.apply("b-no", 5, 0.7, event="fed", condition_id="B", neg_risk=True, outcome_index=1)
+    rebuilt = RiskEngine(engine.positions)
+    assert engine.total_loss == pytest.approx(rebuilt.total_loss)
+    assert np.allclose(engine.payout, rebuilt.payout)
+    assert engine.positions[1].avg_price == pytest.approx((20 * 0.6 + 5 * 0.7) / 25)
+
+
+def test_scenarios_with_certain_resolution():
+    engine = RiskEngine(plain_market())
+    report, pnl = engine.scenarios(100, seed=1, probabilities=np.array([[1.0, 0.0]]))
+    assert np.allclose(pnl, 35)
+    report, pnl = engine.scenarios(100, seed=1, probabilities=np.array([[0.0, 1.0]]))
+    assert np.allclose(pnl, -15)
+    assert report.prob_loss == 1.0 and report.value_at_risk == pytest.approx(15)
+
+
+def test_scenarios_sample_state_probabilities():
+    engine = RiskEngine(plain_market() + neg_risk_event())
+    prob = np.array([[0.25, 0.75, 0.0], [0.5, 0.3, 0.2]])
+    report, pnl = engine.scenarios(20000, seed=7, probabilities=prob)
+    # Plain market: +35 or -15; neg-risk event: +15, -15 or +5
+    outcomes = {35 + 15: 0.125, 35 - 15: 0.075, 35 + 5: 0.05, -15 + 15: 0.375, -15 - 15: 0.225, -15 + 5: 0.15}
+    for value, expected in outcomes.items():
+        assert np.mean(np.isclose(pnl, value)) == pytest.approx(expected, abs=0.015)
+    assert report.expected_pnl == pytest.approx(sum(v * p for v, p in outcomes.items()), abs=0.5)
+
+
+def test_probabilities_rows_sum_to_one():
+    engine = RiskEngine(plain_market() + neg_risk_event())
+    prob = engine.probabilities()
+    assert np.allclose(prob.sum(axis=1), 1.0)
+    assert np.all(prob[~engine.valid] == 0)
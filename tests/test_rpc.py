@@ -0,0 +1,43 @@
+import json
+import threading
+import time
+from poly402.rpc import RPCPool
+
+
+def make_pool(delays):
+    """Pool whose endpoints answer after the given delays (seconds)"""
+    pool = RPCPool(list(delays), hedge_after=0.05)
+    probes = []
+    lock = threading.Lock()
+    
+    def post(endpoint, request_data):
+        request = json.loads(request_data)
+        if request['method'] == 'eth_blockNumber':
+            with lock:
+                probes.append(endpoint.url)
+        time.sleep(delays[endpoint.url])
+        return json.dumps({'jsonrpc': '2.0', 'id': request['id'], 'result': '0x10'}).encode()
+    
+    pool._post = post
+    return pool, probes
+
+
+def test_first_request_does_not_wait_for_health_check():
+    pool, probes = make_pool({"http://fast": 0.0, "http://hung": 1.0})
+    started = time.monotonic()
+    assert pool.make_request("eth_call", [{}, "latest"])['result'] == '0x10'
+    assert time.monotonic() - started < 0.5
+
+
+def test_concurrent_first_requests_probe_once():
+    pool, probes = make_pool({"http://a": 0.05, "http://b": 0.05})
+    threads = [threading.Thread(target=pool.make_request, args=("eth_chainId", [])) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    deadline = time.monotonic() + 2
+    while pool._checked_at is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sorted(probes) == ["http://a", "http://b"]
+    assert all(endpoint.block == 16 and endpoint.healthy for endpoint in pool.endpoints)
@@ -0,0 +1,99 @@
+import itertools
+import threading
+from types import SimpleNamespace
+import pytest
+from poly402.models import OrderStatus, OrderTemplate, TradeResult
+from poly402.runtime import StrategyRuntime
+
+
+class FakeClient:
+    """Client whose midpoint drops 0.05 per poll and whose orders fill in full at once"""
+    
+    def __init__(self):
+        steps = itertools.count()
+        self.orders = []
+        self.cancelled = []
+        self.prices = SimpleNamespace(record=lambda token_id, ts, price: None)
+        self.lifecycle = SimpleNamespace(subscribe=lambda callback: None, unsubscribe=lambda callback: None)
+        self.polymarket = SimpleNamespace(
+            get_midpoints=lambda token_ids, *args: {t: round(0.6 - 0.05 * next(steps), 2) for t in token_ids},
+            get_books=lambda token_ids, *args: {},
+            get_trades=self.trades,
+            cancel_orders=lambda order_ids: self.cancelled.extend(order_ids) or order_ids
+        )
+    
+    def prepare(self, url, outcomes):
+        return [OrderTemplate(f"{url}-tok", "0.01", False, market_slug=url, outcome_name="Yes")]
+    
+    def fire(self, token_id, price, size, side):
+        order_id = f"o{len(self.orders)}"
+        self.orders.append((order_id, price, size))
+        return TradeResult(order_id, "", "Yes", price * size, 0, price, OrderStatus.TRADING, None, None, None, side=side)
+    
+    def trades(self, after=None, token_id=None):
+        return [
+            {'id': f"t{order_id}", 'match_time': 0, 'taker_order_id': "other",
+             'maker_orders': [{'order_id': order_id, 'matched_amount': size, 'price': price}]}
+            for order_id, price, size in self.orders
+        ]
+
+
+def run_for(runtime, seconds):
+    stop = threading.Event()
+    threading.Timer(seconds, stop.set).start()
+    runtime.run(stop)
+
+
+def test_strategy_trades_on_ticks_and_receives_fills():
+    client = FakeClient()
+    runtime = StrategyRuntime(client, interval=0.02, fill_interval=0.05)
+    seen = {'ticks': [], 'fills': []}
+    
+    def setup(ctx):
+        ctx.subscribe("btc-100k")
+        
+        @ctx.on_tick
+        async def tick(token_id, price):
+            seen['ticks'].append(price)
+            if price <= 0.45 and not ctx.inventory and not ctx.open_orders():
+                await ctx.buy(token_id, price, 10)
+        
+        ctx.on_fill(lambda fill: seen['fills'].append(fill))
+    
+    ctx = runtime.add("dip", setup)
+    run_for(runtime, 0.5)
+    
+    assert seen['ticks'][:4] == [0.6, 0.55, 0.5, 0.45]
+    assert client.orders == [("o0", 0.45, 10)]
+    assert [(fill.order_id, fill.size) for fill in seen['fills']] == [("o0", 10.0)]
+    assert ctx.inventory == {"btc-100k-tok": 10.0}
+    assert ctx.stats['orders'] == 1 and ctx.stats['fills'] == 1 and ctx.stats['errors'] == 0
+
+
+def test_handler_errors_are_counted_and_open_orders_cancelled():
+    client = FakeClient()
+    client.trades = lambda after=None, token_id=None: []
+    client.polymarket.get_trades = client.trades
+    runtime = StrategyRuntime(client, interval=0.02, fill_interval=0.05)
+    
+    def setup(ctx):
+        ctx.subscribe("btc-100k")
+        
+        @ctx.on_tick
+        async def tick(token_id, price):
+            if not ctx.open_orders():
+                await ctx.buy(token_id, 0.1, 5)
+            raise ValueError("boom")
+    
+    ctx = runtime.add("broken", setup)
+    run_for(runtime, 0.2)
+    
+    assert ctx.stats['errors'] == ctx.stats['events'] > 0
+    assert client.cancelled == ["o0"]
+
+
+def test_load_requires_setup(tmp_path):
+    path = tmp_path / "empty.py"
+    path.write_text("x = 1\n")
+    with pytest.raises(ValueError, match="setup"):
+        StrategyRuntime(FakeClient()).load(str(path))
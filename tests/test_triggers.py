@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+import pytest
+from poly402.models import OrderStatus, OrderTemplate, TriggerDirection, TriggerRule
+from poly402.polymarket_client import PolymarketClient
+from poly402.triggers import TriggerBook, TriggerEngine
+from conftest import POLYGON_KEY
+
+
+@pytest.fixture
+def engine():
+    polymarket = PolymarketClient("https://clob.example", 137, POLYGON_KEY)
+    polymarket.templates["tok"] = OrderTemplate("tok", "0.01", False, market_slug="m", outcome_name="Yes")
+    fired = []
+    
+    def fire(token_id, price, size, side):
+        fired.append((token_id, price, size, side))
+        return polymarket._failed_result("Yes", price * size, price, side, "stub")
+    
+    client = SimpleNamespace(
+        polymarket=polymarket,
+        fire=fire,
+        lifecycle=SimpleNamespace(subscribe=lambda callback: None, unsubscribe=lambda callback: None)
+    )
+    engine = TriggerEngine(client)
+    engine.fired = fired
+    return engine
+
+
+def rule(side="BUY", threshold=0.405, direction="below", **kwargs):
+    kwargs.setdefault('amount_usdc' if side == "BUY" else 'shares', 10)
+    return TriggerRule("r1", "tok", TriggerDirection(direction), threshold, side, market_slug="m", **kwargs)
+
+
+def test_buy_snaps_triggering_price_down(engine):
+    engine._execute(rule("BUY"), 0.405)
+    assert engine.fired == [("tok", 0.40, 25.0, "BUY")]
+
+
+def test_stop_loss_sell_snaps_triggering_price_down(engine):
+    engine._execute(rule("SELL", threshold=0.605), 0.605)
+    assert engine.fired == [("tok", 0.60, 10, "SELL")]
+
+
+def test_explicit_limit_rounds_to_nearest_tick(engine):
+    engine._execute(rule("BUY", limit_price=0.426), 0.40)
+    assert engine.fired[0][1] == 0.43
+
+
+def test_missing_template_becomes_failed_result(engine):
+    engine.client.polymarket.forget(["tok"])
+    results = []
+    engine.on_fill = lambda r, result: results.append(result)
+    result = engine._execute(rule(), 0.4)
+    assert result.status == OrderStatus.FAILED and "tok" in result.error
+    assert results == [result] and result.market_slug == "m"
+
+
+def test_on_fill_failure_is_logged(engine, capsys):
+    def broken(r, result):
+        raise KeyError("boom")
+    
+    engine.on_fill = broken
+    engine._execute(rule(), 0.4)
+    assert "Fill handler for trigger rule r1 failed" in capsys.readouterr().err
+
+
+def armed(*rules):
+    book = TriggerBook()
+    for r in rules:
+        book.add(r)
+    return book
+
+
+def make(rule_id, threshold, direction="below", token_id="tok", market_slug="m"):
+    return TriggerRule(rule_id, token_id, TriggerDirection(direction), threshold, amount_usdc=10, market_slug=market_slug)
+
+
+def test_book_fires_rules_the_price_crosses():
+    book = armed(make("b1", 0.30), make("b2", 0.40), make("a1", 0.60, "above"), make("a2", 0.70, "above"))
+    assert book.on_price("tok", 0.50) == []
+    assert [r.rule_id for r in book.on_price("tok", 0.40)] == ["b2"]  # At the threshold
+    assert [r.rule_id for r in book.on_price("tok", 0.65)] == ["a1"]
+    assert book.on_price("other", 0.01) == []
+    assert sorted(r.rule_id for r in book.rules()) == ["a2", "b1"]
+
+
+def test_book_fires_below_rules_first_in_threshold_order():
+    book = armed(make("b-high", 0.50), make("a-low", 0.10, "above"), make("b-low", 0.45), make("b-tie", 0.45))
+    fired = book.on_price("tok", 0.20)
+    assert [r.rule_id for r in fired] == ["b-low", "b-tie", "b-high", "a-low"]
+    assert len(book) == 0
+    assert book.token_ids() == []
+
+
+def test_book_cancel_and_cancel_market():
+    book = armed(make("r1", 0.40), make("r2", 0.40), make("r3", 0.50, market_slug="other", token_id="tok2"))
+    with pytest.raises(ValueError):
+        book.add(make("r1", 0.30))
+    
+    assert book.cancel("r1")
+    assert not book.cancel("r1")
+    # The equal-threshold neighbour is untouched
+    assert [r.rule_id for r in book.on_price("tok", 0.40)] == ["r2"]
+    
+    assert [r.rule_id for r in book.cancel_market("other")] == ["r3"]
+    assert book.on_price("tok2", 0.10) == []
+    assert len(book) == 0
@@ -0,0 +1,116 @@
+import time
+import pytest
+from poly402.x402 import X402Client
+from conftest import BASE_KEY
+
+RESOURCE = "https://fees.example/trade"
+
+
+@pytest.fixture
+def x402():
+    client = X402Client("https://facilitator.example", BASE_KEY, batch_threshold=0.05)
+    requirements = {
+        'scheme': 'exact',
+        'network': client.network,
+        'maxAmountRequired': '20000',  # 0.02 USDC
+        'payTo': '0x' + '33' * 20,
+        'asset': '0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913',
+        'extra': {'name': 'USD Coin', 'version': '2'}
+    }
+    client._requirements[RESOURCE] = (requirements, time.monotonic() + 300)
+    yield client
+    client._accrued.clear()  # Nothing to settle at exit
+
+
+def test_small_payments_accrue_until_threshold(x402):
+    first, payload, _ = x402.authorize(RESOURCE)
+    assert first.status == "accrued" and payload is None
+    x402.authorize(RESOURCE)
+    batch, payload, requirements = x402.authorize(RESOURCE)
+    assert batch.status == "authorized"
+    assert batch.amount == pytest.approx(0.06)
+    assert batch.carried == pytest.approx(0.04)
+    assert payload['payload']['authorization']['value'] == "60000"
+    assert x402._accrued[RESOURCE] == 0
+
+
+def test_release_of_rejected_accrued_payment(x402):
+    x402.authorize(RESOURCE)
+    rejected, _, _ = x402.authorize(RESOURCE)
+    x402.release(RESOURCE, rejected)
+    assert x402._accrued[RESOURCE] == 20000
+
+
+def test_release_of_rejected_batch_keeps_earlier_payments(x402):
+    x402.authorize(RESOURCE)
+    x402.authorize(RESOURCE)
+    batch, _, _ = x402.authorize(RESOURCE)
+    x402.release(RESOURCE, batch)
+    # The two earlier payments are still owed; the rejected trade's is not
+    assert x402._accrued[RESOURCE] == 40000
+    again, _, _ = x402.authorize(RESOURCE)
+    assert again.status == "authorized" and again.amount == pytest.approx(0.06)
+
+
+@pytest.fixture
+def local():
+    from poly402.facilitator import LocalFacilitator
+    facilitator = LocalFacilitator("0x" + "33" * 20, price_usdc=0.02, port=0)
+    facilitator.start()
+    yield facilitator
+    facilitator.stop()
+
+
+def test_flush_settles_the_batch_with_a_valid_signature(local):
+    x402 = X402Client(local.url, BASE_KEY, batch_threshold=0.05)
+    resource = f"{local.url}/trade"
+    x402.authorize(resource)
+    x402.authorize(resource)
+    
+    settled = x402.flush()
+    
+    info = settled[resource]
+    assert info.status == "settled" and info.tx_hash
+    assert info.amount == pytest.approx(0.04)
+    # The facilitator recovered our address from the signature before settling
+    [authorization] = local.settled
+    assert authorization['from'] == x402.account.address
+    assert authorization['value'] == "40000"
+    assert x402._accrued == {}
+    assert x402.flush() == {}
+
+
+def test_pay_round_trip(local):
+    x402 = X402Client(local.url, BASE_KEY)
+    info = x402.pay(f"{local.url}/trade")
+    assert info.status == "settled"
+    assert local.settled[0]['to'] == local.pay_to
+
+
+def test_failed_flush_keeps_every_unsettled_batch(x402, monkeypatch):
+    other = "https://fees.example/other"
+    x402._requirements[other] = x402._requirements[RESOURCE]
+    x402.authorize(RESOURCE)
+    x402.authorize(other)
+    settled = []
+    
+    def complete(resource_url, info, payload, requirements):
+        if resource_url == RESOURCE:
+            raise ValueError("x402 facilitator settle failed")
+        settled.append(resource_url)
+        return info
+    
+    monkeypatch.setattr(x402, "complete", complete)
+    with pytest.raises(ValueError):
+        x402.flush()
+    assert settled == [other]
+    assert x402._accrued == {RESOURCE: 20000}
+    
+    # A batch whose requirements cannot be fetched is kept as well
+    def get_requirements(resource_url):
+        raise ValueError("Failed to fetch x402 payment requirements")
+    
+    monkeypatch.setattr(x402, "get_requirements", get_requirements)
+    with pytest.raises(ValueError):
+        x402.flush()
+    assert x402._accrued == {RESOURCE: 20000}